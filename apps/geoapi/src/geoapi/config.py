@@ -69,8 +69,21 @@ class Settings(BaseSettings):
     # Lower values reduce memory usage and idle connections that can go stale
     DUCKLAKE_POOL_SIZE: int = int(os.getenv("GEOAPI_DUCKLAKE_POOL_SIZE", "2"))
 
+    # Hand out cursors of one shared DuckDB database instead of independent
+    # databases, sharing extensions, catalog attach, metadata cache and memory limit
+    DUCKLAKE_POOL_SHARED_DATABASE: bool = (
+        os.getenv("GEOAPI_DUCKLAKE_POOL_SHARED_DATABASE", "false").lower() == "true"
+    )
+
+    # Async DuckDB queries running or waiting for a connection before new
+    # requests are shed with 503 Service Unavailable
+    DUCKLAKE_MAX_QUEUE_DEPTH: int = int(
+        os.getenv("GEOAPI_DUCKLAKE_MAX_QUEUE_DEPTH", "64")
+    )
+
     # DuckDB memory limit per connection (e.g., "1GB", "512MB")
-    # Total potential memory = DUCKLAKE_POOL_SIZE * DUCKDB_MEMORY_LIMIT
+    # Total potential memory = DUCKLAKE_POOL_SIZE * DUCKDB_MEMORY_LIMIT,
+    # or DUCKDB_MEMORY_LIMIT for the whole pool with a shared database
     DUCKDB_MEMORY_LIMIT: str = os.getenv("GEOAPI_DUCKDB_MEMORY_LIMIT", "1GB")
 
     # Timeout Settings (in seconds)
@@ -88,6 +101,36 @@ class Settings(BaseSettings):
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://redis:6379/0")
     # Tile cache TTL in seconds (default 1 hour)
     TILE_CACHE_TTL: int = int(os.getenv("GEOAPI_TILE_CACHE_TTL", "3600"))
+    # Byte budget of the in-process tile cache in front of Redis (0 disables it)
+    TILE_MEMORY_CACHE_MAX_BYTES: int = int(
+        os.getenv("GEOAPI_TILE_MEMORY_CACHE_MAX_BYTES", str(128 * 1024 * 1024))
+    )
+    # Seconds a layer's DuckLake snapshot id is reused before it is looked up
+    # again; cached filtered tiles are keyed by it, so this bounds their staleness
+    TILE_SNAPSHOT_CACHE_TTL: int = int(
+        os.getenv("GEOAPI_TILE_SNAPSHOT_CACHE_TTL", "5")
+    )
+    # Highest zoom of the per-snapshot low-zoom tile pyramids built for layers
+    # without PMTiles (-1 disables them)
+    TILE_PYRAMID_MAX_ZOOM: int = int(os.getenv("GEOAPI_TILE_PYRAMID_MAX_ZOOM", "8"))
+    # Tile budget of a pyramid; zooms that would exceed it are left dynamic
+    TILE_PYRAMID_MAX_TILES: int = int(
+        os.getenv("GEOAPI_TILE_PYRAMID_MAX_TILES", "20000")
+    )
+    # Tiles generated concurrently while building a pyramid
+    TILE_PYRAMID_BUILD_CONCURRENCY: int = int(
+        os.getenv("GEOAPI_TILE_PYRAMID_BUILD_CONCURRENCY", "2")
+    )
+    # Seconds before a failed pyramid build of a snapshot is started again
+    TILE_PYRAMID_RETRY_SECONDS: int = int(
+        os.getenv("GEOAPI_TILE_PYRAMID_RETRY_SECONDS", "300")
+    )
+    # Worker processes overzooming PMTiles tiles missing from variable-depth pyramids
+    OVERZOOM_WORKERS: int = int(os.getenv("GEOAPI_OVERZOOM_WORKERS", "4"))
+    # Byte budget of the in-process cache of overzoomed tiles (0 disables it)
+    OVERZOOM_CACHE_MAX_BYTES: int = int(
+        os.getenv("GEOAPI_OVERZOOM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+    )
     # Enable/disable Redis tile cache
     TILE_CACHE_ENABLED: bool = (
         os.getenv("GEOAPI_TILE_CACHE_ENABLED", "true").lower() == "true"
@@ -5,6 +5,7 @@ Re-exports from goatlib with geoapi-specific initialization.
 
 from goatlib.storage import (
     DuckLakePool,
+    PoolOverloadedError,
     execute_query_with_retry,
     execute_with_retry,
     is_connection_error,
@@ -15,6 +16,7 @@ from geoapi.config import settings
 # Re-export for backward compatibility
 __all__ = [
     "DuckLakePool",
+    "PoolOverloadedError",
     "is_connection_error",
     "execute_with_retry",
     "execute_query_with_retry",
@@ -52,6 +54,10 @@ class GeoAPIDuckLakePool(DuckLakePool):
         # Get pool size from settings
         pool_size = getattr(settings, "DUCKLAKE_POOL_SIZE", 2)
         self._pool_size = pool_size
+        self._shared_database_mode = getattr(
+            settings, "DUCKLAKE_POOL_SHARED_DATABASE", False
+        )
+        self._max_queue_depth = getattr(settings, "DUCKLAKE_MAX_QUEUE_DEPTH", 64)
 
         super().init(SettingsWrapper())
 
@@ -19,8 +19,8 @@ from starlette.responses import JSONResponse
 
 from geoapi.config import settings
 from geoapi.ducklake import ducklake_manager
-from geoapi.ducklake_pool import ducklake_pool
-from geoapi.models import HealthCheck
+from geoapi.ducklake_pool import PoolOverloadedError, ducklake_pool
+from geoapi.models import DuckLakePoolStats, HealthCheck
 from geoapi.routers import (
     download_router,
     expressions_router,
@@ -29,6 +29,8 @@ from geoapi.routers import (
     tiles_router,
 )
 from geoapi.services.layer_service import layer_service
+from geoapi.services.tile_service import close_overzoom_executor
+from geoapi.tile_cache import get_cache_stats
 
 # Configure logging
 logging.basicConfig(
@@ -106,6 +108,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await layer_service.close()
     ducklake_pool.close()
     ducklake_manager.close()
+    close_overzoom_executor()
     logger.info("GeoAPI shutdown complete")
 
 
@@ -137,6 +140,23 @@ app.add_middleware(
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 
+@app.exception_handler(PoolOverloadedError)
+async def pool_overloaded_handler(
+    request: Request, exc: PoolOverloadedError
+) -> JSONResponse:
+    """Shed load with 503 when too many DuckDB queries are queued."""
+    logger.warning("Shedding request %s: %s", request.url.path, exc)
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": "Service Unavailable",
+            "message": "Too many concurrent queries, please retry",
+            "path": request.url.path,
+        },
+        headers={"Retry-After": "1"},
+    )
+
+
 # Include routers
 app.include_router(metadata_router)
 app.include_router(features_router)
@@ -154,3 +174,24 @@ app.include_router(download_router)
 async def health_check() -> HealthCheck:
     """Health check endpoint."""
     return HealthCheck(status="ok", ping="pong")
+
+
+@app.get(
+    "/healthz/ducklake-pool",
+    summary="DuckLake pool metrics",
+    response_model=DuckLakePoolStats,
+    tags=["Health"],
+)
+async def ducklake_pool_stats() -> DuckLakePoolStats:
+    """Connection wait times, checkout durations and recreations of the tile pool."""
+    return DuckLakePoolStats(**ducklake_pool.stats())
+
+
+@app.get(
+    "/healthz/tile-cache",
+    summary="Tile cache metrics",
+    tags=["Health"],
+)
+async def tile_cache_stats() -> dict:
+    """Hit/miss/latency counters per cache tier and cache usage."""
+    return get_cache_stats()
@@ -5,6 +5,7 @@ from geoapi.models.ogc import (
     Collection,
     CollectionsResponse,
     Conformance,
+    DuckLakePoolStats,
     Extent,
     Feature,
     FeatureCollection,
@@ -27,6 +28,7 @@ __all__ = [
     "Collection",
     "CollectionsResponse",
     "Conformance",
+    "DuckLakePoolStats",
     "Extent",
     "Feature",
     "FeatureCollection",
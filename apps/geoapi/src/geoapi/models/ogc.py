@@ -166,3 +166,22 @@ class HealthCheck(BaseModel):
 
     status: str = "ok"
     ping: str = "pong"
+
+
+class DuckLakePoolStats(BaseModel):
+    """DuckLake connection pool metrics."""
+
+    checkouts: int
+    wait_time_avg_ms: float
+    wait_time_max_ms: float
+    checkout_duration_avg_ms: float
+    checkout_duration_max_ms: float
+    recreations: int
+    background_recreations: int
+    connection_errors: int
+    rejections: int
+    pool_size: int
+    idle_connections: int
+    spare_connections: int
+    queue_depth: int
+    shared_database: bool
@@ -0,0 +1,667 @@
+"""Minimal Mapbox Vector Tile codec for overzooming tiles in-process.
+
+Decodes the protobuf wire format of a tile, clips and rescales the features of
+a parent tile to one of its descendant tiles, and encodes the result again.
+Keys, values, ids and properties are carried over unchanged, so no geometry
+library or protobuf runtime is needed.
+
+See https://github.com/mapbox/vector-tile-spec/tree/master/2.1
+"""
+
+import gzip
+from typing import Any, Iterator, Optional
+
+# Geometry types
+GEOM_UNKNOWN = 0
+GEOM_POINT = 1
+GEOM_LINESTRING = 2
+GEOM_POLYGON = 3
+
+# Geometry commands
+_MOVE_TO = 1
+_LINE_TO = 2
+_CLOSE_PATH = 7
+
+# Buffer around the child tile kept when clipping, in 1/256 of the tile extent
+DEFAULT_BUFFER = 5
+
+Point = tuple[int, int]
+
+
+# =====================================================================
+#  Protobuf Wire Format
+# =====================================================================
+
+
+def _read_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _iter_fields(buf: bytes) -> Iterator[tuple[int, int, Any]]:
+    """Yield (field number, wire type, value) of a message."""
+    pos = 0
+    end = len(buf)
+    while pos < end:
+        key, pos = _read_varint(buf, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = _read_varint(buf, pos)
+            yield field, wire_type, value
+        elif wire_type == 2:
+            length, pos = _read_varint(buf, pos)
+            yield field, wire_type, buf[pos : pos + length]
+            pos += length
+        elif wire_type == 1:
+            yield field, wire_type, buf[pos : pos + 8]
+            pos += 8
+        elif wire_type == 5:
+            yield field, wire_type, buf[pos : pos + 4]
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+
+
+def _read_packed(buf: bytes) -> list[int]:
+    values: list[int] = []
+    append = values.append
+    pos = 0
+    end = len(buf)
+    while pos < end:
+        byte = buf[pos]
+        pos += 1
+        # Fast path for single byte values, most geometry deltas and tags
+        if byte < 0x80:
+            append(byte)
+            continue
+        result = byte & 0x7F
+        shift = 7
+        while True:
+            byte = buf[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        append(result)
+    return values
+
+
+def _encode_varint(value: int, out: bytearray) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _encode_bytes_field(field: int, data: bytes, out: bytearray) -> None:
+    _encode_varint((field << 3) | 2, out)
+    _encode_varint(len(data), out)
+    out += data
+
+
+def _encode_varint_field(field: int, value: int, out: bytearray) -> None:
+    _encode_varint(field << 3, out)
+    _encode_varint(value, out)
+
+
+def _encode_packed_field(field: int, values: list[int], out: bytearray) -> None:
+    packed = bytearray()
+    for value in values:
+        _encode_varint(value, packed)
+    _encode_bytes_field(field, bytes(packed), out)
+
+
+def _zigzag_decode(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _zigzag_encode(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+# =====================================================================
+#  Geometry Encoding
+# =====================================================================
+
+
+def decode_geometry(commands: list[int]) -> list[list[Point]]:
+    """Decode geometry commands into parts of absolute tile coordinates.
+
+    Points are returned as one part with all points, linestrings as one part
+    per line and polygons as one part per ring (without closing point).
+    """
+    parts: list[list[Point]] = []
+    current: list[Point] = []
+    x = y = 0
+    i = 0
+    n = len(commands)
+    while i < n:
+        command = commands[i]
+        command_id = command & 0x7
+        count = command >> 3
+        i += 1
+        if command_id == _MOVE_TO or command_id == _LINE_TO:
+            if command_id == _MOVE_TO and current and count == 1:
+                parts.append(current)
+                current = []
+            append = current.append
+            for j in range(i, i + 2 * count, 2):
+                dx = commands[j]
+                dy = commands[j + 1]
+                # Inlined zigzag decoding
+                x += (dx >> 1) ^ -(dx & 1)
+                y += (dy >> 1) ^ -(dy & 1)
+                append((x, y))
+            i += 2 * count
+        elif command_id != _CLOSE_PATH:
+            raise ValueError(f"Unknown geometry command {command_id}")
+    if current:
+        parts.append(current)
+    return parts
+
+
+def encode_geometry(geom_type: int, parts: list[list[Point]]) -> list[int]:
+    """Encode parts of absolute tile coordinates as geometry commands."""
+    commands: list[int] = []
+    cx = cy = 0
+
+    if geom_type == GEOM_POINT:
+        points = [point for part in parts for point in part]
+        commands.append(_MOVE_TO | (len(points) << 3))
+        for x, y in points:
+            commands.append(_zigzag_encode(x - cx))
+            commands.append(_zigzag_encode(y - cy))
+            cx, cy = x, y
+        return commands
+
+    for part in parts:
+        x, y = part[0]
+        commands.append(_MOVE_TO | (1 << 3))
+        commands.append(_zigzag_encode(x - cx))
+        commands.append(_zigzag_encode(y - cy))
+        cx, cy = x, y
+        commands.append(_LINE_TO | ((len(part) - 1) << 3))
+        for x, y in part[1:]:
+            commands.append(_zigzag_encode(x - cx))
+            commands.append(_zigzag_encode(y - cy))
+            cx, cy = x, y
+        if geom_type == GEOM_POLYGON:
+            commands.append(_CLOSE_PATH | (1 << 3))
+    return commands
+
+
+def ring_area(ring: list[Point]) -> int:
+    """Twice the signed area of a ring; positive for MVT exterior rings."""
+    area = 0
+    px, py = ring[-1]
+    for x, y in ring:
+        area += px * y - x * py
+        px, py = x, y
+    return area
+
+
+# =====================================================================
+#  Clipping
+# =====================================================================
+
+
+def _dedupe(points: list[Point]) -> list[Point]:
+    result = [points[0]]
+    for point in points[1:]:
+        if point != result[-1]:
+            result.append(point)
+    return result
+
+
+def _clip_line(
+    line: list[Point], xmin: int, ymin: int, xmax: int, ymax: int
+) -> list[list[Point]]:
+    """Clip a linestring to a rectangle (Liang-Barsky per segment)."""
+    parts: list[list[Point]] = []
+    current: list[Point] = []
+    for (x0, y0), (x1, y1) in zip(line, line[1:]):
+        dx = x1 - x0
+        dy = y1 - y0
+        t0, t1 = 0.0, 1.0
+        visible = True
+        for p, q in (
+            (-dx, x0 - xmin),
+            (dx, xmax - x0),
+            (-dy, y0 - ymin),
+            (dy, ymax - y0),
+        ):
+            if p == 0:
+                if q < 0:
+                    visible = False
+                    break
+            else:
+                t = q / p
+                if p < 0:
+                    if t > t1:
+                        visible = False
+                        break
+                    if t > t0:
+                        t0 = t
+                else:
+                    if t < t0:
+                        visible = False
+                        break
+                    if t < t1:
+                        t1 = t
+        if not visible:
+            if current:
+                parts.append(current)
+                current = []
+            continue
+        start = (round(x0 + t0 * dx), round(y0 + t0 * dy))
+        end = (round(x0 + t1 * dx), round(y0 + t1 * dy))
+        if not current:
+            current = [start]
+        elif current[-1] != start:
+            parts.append(current)
+            current = [start]
+        current.append(end)
+        if t1 < 1.0:
+            # Segment leaves the rectangle
+            parts.append(current)
+            current = []
+    if current:
+        parts.append(current)
+
+    result = []
+    for part in parts:
+        part = _dedupe(part)
+        if len(part) >= 2:
+            result.append(part)
+    return result
+
+
+def _clip_ring(
+    ring: list[Point], xmin: int, ymin: int, xmax: int, ymax: int
+) -> list[Point]:
+    """Clip a ring to a rectangle (Sutherland-Hodgman)."""
+    points: list[tuple[float, float]] = list(ring)
+    for axis, bound, keep_below in (
+        (0, xmin, False),
+        (0, xmax, True),
+        (1, ymin, False),
+        (1, ymax, True),
+    ):
+        if not points:
+            break
+        clipped: list[tuple[float, float]] = []
+        prev = points[-1]
+        prev_inside = prev[axis] <= bound if keep_below else prev[axis] >= bound
+        for point in points:
+            inside = point[axis] <= bound if keep_below else point[axis] >= bound
+            if inside != prev_inside:
+                t = (bound - prev[axis]) / (point[axis] - prev[axis])
+                if axis == 0:
+                    clipped.append((bound, prev[1] + t * (point[1] - prev[1])))
+                else:
+                    clipped.append((prev[0] + t * (point[0] - prev[0]), bound))
+            if inside:
+                clipped.append(point)
+            prev, prev_inside = point, inside
+        points = clipped
+
+    if len(points) < 3:
+        return []
+    result = _dedupe([(round(x), round(y)) for x, y in points])
+    if len(result) > 1 and result[0] == result[-1]:
+        result.pop()
+    if len(result) < 3:
+        return []
+    return result
+
+
+def _bbox(parts: list[list[Point]]) -> tuple[int, int, int, int]:
+    if len(parts) == 1:
+        xs, ys = zip(*parts[0])
+    else:
+        xs, ys = zip(*(point for part in parts for point in part))
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def clip_geometry(
+    geom_type: int,
+    parts: list[list[Point]],
+    xmin: int,
+    ymin: int,
+    xmax: int,
+    ymax: int,
+) -> list[list[Point]]:
+    """Clip decoded geometry parts to a rectangle, dropping empty parts."""
+    if geom_type == GEOM_POINT:
+        return [
+            [
+                (x, y)
+                for part in parts
+                for x, y in part
+                if xmin <= x <= xmax and ymin <= y <= ymax
+            ]
+        ]
+
+    if geom_type == GEOM_LINESTRING:
+        return [
+            clipped
+            for line in parts
+            if len(line) >= 2
+            for clipped in _clip_line(line, xmin, ymin, xmax, ymax)
+        ]
+
+    if geom_type == GEOM_POLYGON:
+        rings: list[list[Point]] = []
+        keep_interiors = False
+        for ring in parts:
+            if len(ring) < 3:
+                continue
+            area = ring_area(ring)
+            if area == 0:
+                continue
+            is_exterior = area > 0
+            if not is_exterior and not keep_interiors:
+                # Interior ring of a dropped exterior ring
+                continue
+            clipped = _clip_ring(ring, xmin, ymin, xmax, ymax)
+            if clipped and ring_area(clipped) != 0:
+                rings.append(clipped)
+                if is_exterior:
+                    keep_interiors = True
+            elif is_exterior:
+                keep_interiors = False
+        return rings
+
+    return []
+
+
+# =====================================================================
+#  Tiles
+# =====================================================================
+
+
+def decode_tile(data: bytes) -> list[dict[str, Any]]:
+    """Decode an uncompressed tile into layer dicts.
+
+    Each layer has a name, extent, keys, values (encoded Value messages) and
+    features with id, tags, type and geometry parts.
+    """
+    layers = []
+    for field, _, layer in _iter_fields(data):
+        if field != 3:
+            continue
+        decoded: dict[str, Any] = {
+            "name": "",
+            "extent": 4096,
+            "keys": [],
+            "values": [],
+            "features": [],
+        }
+        for layer_field, _, value in _iter_fields(layer):
+            if layer_field == 1:
+                decoded["name"] = bytes(value).decode()
+            elif layer_field == 3:
+                decoded["keys"].append(bytes(value).decode())
+            elif layer_field == 4:
+                decoded["values"].append(bytes(value))
+            elif layer_field == 5:
+                decoded["extent"] = value
+            elif layer_field == 2:
+                feature: dict[str, Any] = {"id": None, "tags": [], "type": 0}
+                commands: list[int] = []
+                for feature_field, wire_type, item in _iter_fields(value):
+                    if feature_field == 1:
+                        feature["id"] = item
+                    elif feature_field == 2:
+                        feature["tags"] += (
+                            _read_packed(item) if wire_type == 2 else [item]
+                        )
+                    elif feature_field == 3:
+                        feature["type"] = item
+                    elif feature_field == 4:
+                        commands += _read_packed(item) if wire_type == 2 else [item]
+                feature["geometry"] = decode_geometry(commands)
+                decoded["features"].append(feature)
+        layers.append(decoded)
+    return layers
+
+
+def encode_tile(layers: list[dict[str, Any]]) -> bytes:
+    """Encode layer dicts as returned by decode_tile into an uncompressed tile."""
+    out = bytearray()
+    for layer in layers:
+        encoded = bytearray()
+        _encode_varint_field(15, 2, encoded)
+        _encode_bytes_field(1, layer["name"].encode(), encoded)
+        for feature in layer["features"]:
+            encoded_feature = bytearray()
+            if feature.get("id") is not None:
+                _encode_varint_field(1, feature["id"], encoded_feature)
+            if feature.get("tags"):
+                _encode_packed_field(2, feature["tags"], encoded_feature)
+            _encode_varint_field(3, feature["type"], encoded_feature)
+            _encode_packed_field(
+                4,
+                encode_geometry(feature["type"], feature["geometry"]),
+                encoded_feature,
+            )
+            _encode_bytes_field(2, bytes(encoded_feature), encoded)
+        for key in layer.get("keys", []):
+            _encode_bytes_field(3, key.encode(), encoded)
+        for value in layer.get("values", []):
+            _encode_bytes_field(4, value, encoded)
+        _encode_varint_field(5, layer.get("extent", 4096), encoded)
+        _encode_bytes_field(3, bytes(encoded), out)
+    return bytes(out)
+
+
+# =====================================================================
+#  Overzoom
+# =====================================================================
+
+
+def _overzoom_feature(
+    feature: bytes,
+    scale: int,
+    offset_x: int,
+    offset_y: int,
+    parent_clip: tuple[float, float, float, float],
+    child_clip: tuple[int, int, int, int],
+) -> Optional[tuple[Optional[int], list[int], int, list[int]]]:
+    """Clip and rescale one feature; None if it does not reach the child tile."""
+    feature_id: Optional[int] = None
+    tag_fields: list[tuple[int, Any]] = []
+    geom_type = GEOM_UNKNOWN
+    commands: list[int] = []
+    pos = 0
+    end = len(feature)
+    while pos < end:
+        key = feature[pos]
+        pos += 1
+        # Inlined parsing of the packed fields, the common encoding
+        if key == 0x22 or key == 0x12:
+            length, pos = _read_varint(feature, pos)
+            value = feature[pos : pos + length]
+            pos += length
+            if key == 0x22:
+                commands.extend(_read_packed(value))
+            else:
+                # Tags are only decoded for features reaching the child tile
+                tag_fields.append((2, value))
+            continue
+        pos -= 1
+        field_key, pos = _read_varint(feature, pos)
+        field, wire_type = field_key >> 3, field_key & 0x7
+        if wire_type == 0:
+            value, pos = _read_varint(feature, pos)
+        elif wire_type == 2:
+            length, pos = _read_varint(feature, pos)
+            value = feature[pos : pos + length]
+            pos += length
+        else:
+            pos += 8 if wire_type == 1 else 4
+            continue
+        if field == 1:
+            feature_id = value
+        elif field == 2:
+            tag_fields.append((wire_type, value))
+        elif field == 3:
+            geom_type = value
+        elif field == 4:
+            commands.append(value)
+
+    if geom_type == GEOM_UNKNOWN or not commands:
+        return None
+    parts = decode_geometry(commands)
+    if not parts:
+        return None
+
+    # Reject features outside the child tile before transforming them
+    fxmin, fymin, fxmax, fymax = _bbox(parts)
+    pxmin, pymin, pxmax, pymax = parent_clip
+    if fxmax < pxmin or fxmin > pxmax or fymax < pymin or fymin > pymax:
+        return None
+
+    parts = [
+        [(x * scale - offset_x, y * scale - offset_y) for x, y in part]
+        for part in parts
+    ]
+    xmin, ymin, xmax, ymax = child_clip
+    inside = pxmin <= fxmin and fxmax <= pxmax and pymin <= fymin and fymax <= pymax
+    if not inside:
+        parts = clip_geometry(geom_type, parts, xmin, ymin, xmax, ymax)
+        parts = [part for part in parts if part]
+        if not parts:
+            return None
+
+    tags: list[int] = []
+    for wire_type, value in tag_fields:
+        if wire_type == 2:
+            tags.extend(_read_packed(value))
+        else:
+            tags.append(value)
+    return feature_id, tags, geom_type, encode_geometry(geom_type, parts)
+
+
+def _overzoom_layer(
+    layer: bytes, dz: int, dx: int, dy: int, buffer: int
+) -> Optional[bytes]:
+    name = b""
+    version = 2
+    extent = 4096
+    keys: list[bytes] = []
+    values: list[bytes] = []
+    features: list[bytes] = []
+    for field, _, value in _iter_fields(layer):
+        if field == 1:
+            name = value
+        elif field == 2:
+            features.append(value)
+        elif field == 3:
+            keys.append(value)
+        elif field == 4:
+            values.append(value)
+        elif field == 5:
+            extent = value
+        elif field == 15:
+            version = value
+
+    scale = 1 << dz
+    offset_x = dx * extent
+    offset_y = dy * extent
+    pad = extent * buffer // 256
+    child_clip = (-pad, -pad, extent + pad, extent + pad)
+    parent_clip = (
+        (child_clip[0] + offset_x) / scale,
+        (child_clip[1] + offset_y) / scale,
+        (child_clip[2] + offset_x) / scale,
+        (child_clip[3] + offset_y) / scale,
+    )
+
+    # Keys and values are re-indexed to the ones still referenced
+    key_index: dict[int, int] = {}
+    value_index: dict[int, int] = {}
+    encoded_features = bytearray()
+    for feature in features:
+        result = _overzoom_feature(
+            feature, scale, offset_x, offset_y, parent_clip, child_clip
+        )
+        if result is None:
+            continue
+        feature_id, tags, geom_type, commands = result
+        new_tags = []
+        for i in range(0, len(tags) - 1, 2):
+            new_tags.append(key_index.setdefault(tags[i], len(key_index)))
+            new_tags.append(value_index.setdefault(tags[i + 1], len(value_index)))
+
+        encoded = bytearray()
+        if feature_id is not None:
+            _encode_varint_field(1, feature_id, encoded)
+        if new_tags:
+            _encode_packed_field(2, new_tags, encoded)
+        _encode_varint_field(3, geom_type, encoded)
+        _encode_packed_field(4, commands, encoded)
+        _encode_bytes_field(2, bytes(encoded), encoded_features)
+
+    if not encoded_features:
+        return None
+
+    out = bytearray()
+    _encode_varint_field(15, version, out)
+    _encode_bytes_field(1, bytes(name), out)
+    out += encoded_features
+    for old_index in key_index:
+        _encode_bytes_field(3, bytes(keys[old_index]), out)
+    for old_index in value_index:
+        _encode_bytes_field(4, bytes(values[old_index]), out)
+    _encode_varint_field(5, extent, out)
+    return bytes(out)
+
+
+def overzoom_tile(
+    data: bytes,
+    parent_z: int,
+    parent_x: int,
+    parent_y: int,
+    target_z: int,
+    target_x: int,
+    target_y: int,
+    buffer: int = DEFAULT_BUFFER,
+    gzipped: bool = False,
+) -> bytes:
+    """Build a descendant tile from a parent tile.
+
+    Features are rescaled to the target zoom and clipped to the target tile
+    plus a buffer, in 1/256 of the tile extent. Layers without features in
+    the target tile are dropped. A gzipped parent is decompressed first.
+
+    Returns:
+        The uncompressed target tile, empty if it has no features
+    """
+    dz = target_z - parent_z
+    if dz < 0 or (target_x >> dz, target_y >> dz) != (parent_x, parent_y):
+        raise ValueError(
+            f"{target_z}/{target_x}/{target_y} is not a descendant of "
+            f"{parent_z}/{parent_x}/{parent_y}"
+        )
+    dx = target_x - (parent_x << dz)
+    dy = target_y - (parent_y << dz)
+    if gzipped:
+        data = gzip.decompress(data)
+
+    out = bytearray()
+    for field, _, value in _iter_fields(data):
+        if field != 3:
+            continue
+        layer = _overzoom_layer(value, dz, dx, dy, buffer)
+        if layer is not None:
+            _encode_bytes_field(3, layer, out)
+    return bytes(out)
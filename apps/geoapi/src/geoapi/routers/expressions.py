@@ -17,8 +17,9 @@ from goatlib.utils.expressions import (
 )
 from pydantic import BaseModel, Field
 
+from geoapi.config import settings
 from geoapi.dependencies import LayerInfoDep
-from geoapi.ducklake_pool import ducklake_pool
+from geoapi.ducklake_pool import PoolOverloadedError, ducklake_pool
 from geoapi.services.layer_service import layer_service
 
 router = APIRouter(prefix="/expressions", tags=["Expressions"])
@@ -235,20 +236,24 @@ async def preview_expression(
         if not metadata:
             raise HTTPException(status_code=404, detail="Collection not found")
 
-        # Use the pool's connection context manager
-        with ducklake_pool.connection() as con:
+        def run_preview(con):
             evaluator = ExpressionEvaluator(
                 con=con,
                 table_name=layer_info.full_table_name,
                 column_names=metadata.column_names,
                 geometry_column=metadata.geometry_column,
             )
-            result = evaluator.preview(
+            return evaluator.preview(
                 expression=request.expression,
                 where_clause=request.where_clause,
                 limit=request.limit,
             )
 
+        # Run on the pool's executor to keep the event loop free
+        result = await ducklake_pool.run_async(
+            run_preview, timeout=settings.QUERY_TIMEOUT
+        )
+
         return PreviewExpressionResponse(
             success=result.success,
             expression=result.expression,
@@ -264,7 +269,7 @@ async def preview_expression(
             column_names=result.column_names,
             error=result.error,
         )
-    except HTTPException:
+    except (HTTPException, PoolOverloadedError):
         raise
     except Exception as e:
         logger.exception("Error previewing expression")
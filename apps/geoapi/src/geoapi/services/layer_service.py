@@ -10,6 +10,7 @@ from uuid import UUID
 
 import asyncpg
 from cachetools import TTLCache
+from goatlib.storage import layer_snapshot_sql
 
 from geoapi.config import settings
 from geoapi.dependencies import LayerInfo
@@ -19,6 +20,11 @@ logger = logging.getLogger(__name__)
 # Cache for layer metadata (5 minute TTL, max 1000 entries)
 _metadata_cache: TTLCache[str, "LayerMetadata"] = TTLCache(maxsize=1000, ttl=300)
 
+# Cache for layer DuckLake snapshot ids (short TTL, bounds the staleness of tile caches)
+_snapshot_cache: TTLCache[str, int] = TTLCache(
+    maxsize=10000, ttl=settings.TILE_SNAPSHOT_CACHE_TTL
+)
+
 
 class LayerMetadata:
     """Layer metadata container."""
@@ -414,6 +420,54 @@ class LayerService:
         else:
             return "string"
 
+    async def get_layer_snapshot(self, layer_info: LayerInfo) -> Optional[int]:
+        """Get the DuckLake snapshot id of the layer's last change.
+
+        The latest snapshot that created the table or added / removed its data
+        files, delete files or columns. Used to version cached tiles, so they
+        are invalidated as soon as the layer changes.
+
+        Args:
+            layer_info: Layer information from URL
+
+        Returns:
+            Snapshot id, or None if the table is not found or the catalog
+            cannot be queried
+        """
+        if not self._pool:
+            raise RuntimeError("LayerService not initialized")
+
+        cache_key = layer_info.layer_id
+        if cache_key in _snapshot_cache:
+            return _snapshot_cache[cache_key]
+
+        catalog = settings.DUCKLAKE_CATALOG_SCHEMA
+        try:
+            row = await self._execute_with_retry(
+                f"""
+                SELECT {layer_snapshot_sql(catalog)} AS snapshot_id
+                FROM {catalog}.ducklake_table t
+                JOIN {catalog}.ducklake_schema s ON s.schema_id = t.schema_id
+                WHERE s.schema_name = $1
+                AND t.table_name = $2
+                AND s.end_snapshot IS NULL
+                AND t.end_snapshot IS NULL
+                """,
+                layer_info.schema_name,
+                layer_info.table_name,
+                fetch_one=True,
+            )
+        except Exception as e:
+            logger.warning("Snapshot lookup failed for %s: %s", cache_key, e)
+            return None
+
+        if not row or row["snapshot_id"] is None:
+            return None
+
+        snapshot_id = int(row["snapshot_id"])
+        _snapshot_cache[cache_key] = snapshot_id
+        return snapshot_id
+
     async def is_layer_in_public_project(self, layer_id: UUID) -> bool:
         """Check if a layer belongs to any published (public) project.
 
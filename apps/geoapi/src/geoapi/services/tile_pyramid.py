@@ -0,0 +1,272 @@
+"""Persistent low-zoom tile pyramids for layers without PMTiles.
+
+Low-zoom dynamic tiles scan most of a layer, so for unfiltered requests the
+tiles of zooms 0 to TILE_PYRAMID_MAX_ZOOM are built once per DuckLake snapshot
+in the background and stored as a PMTiles archive next to the layer:
+
+    {tiles_data_dir}/{schema_name}/{table_name}.s{snapshot_id}.pyramid.pmtiles
+
+Every tile intersecting the layer bounds is written, empty ones as zero-length
+entries, so the archive's max zoom is the highest zoom that was built. A new
+snapshot builds a new archive and removes the ones of older snapshots.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator, Optional
+
+from pmtiles.tile import Compression, TileType, zxy_to_tileid
+from pmtiles.writer import Writer
+
+from geoapi.config import settings
+from geoapi.dependencies import LayerInfo
+
+logger = logging.getLogger(__name__)
+
+PYRAMID_SUFFIX = ".pyramid.pmtiles"
+
+# Tiles generated per batch while building, written in tile id order
+_BUILD_BATCH_SIZE = 64
+
+Bounds = tuple[float, float, float, float]
+
+
+def _lon_to_tile_x(lon: float, n: int) -> int:
+    return min(max(int((lon + 180.0) / 360.0 * n), 0), n - 1)
+
+
+def _lat_to_tile_y(lat: float, n: int) -> int:
+    lat = min(max(lat, -85.0511287798), 85.0511287798)
+    lat_rad = math.radians(lat)
+    y = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+    return min(max(int(y), 0), n - 1)
+
+
+def tile_range(z: int, bounds: Bounds) -> tuple[int, int, int, int]:
+    """Get the (min_x, min_y, max_x, max_y) tiles covering EPSG:4326 bounds."""
+    n = 2**z
+    min_lon, min_lat, max_lon, max_lat = bounds
+    return (
+        _lon_to_tile_x(min_lon, n),
+        _lat_to_tile_y(max_lat, n),
+        _lon_to_tile_x(max_lon, n),
+        _lat_to_tile_y(min_lat, n),
+    )
+
+
+def count_tiles(z: int, bounds: Bounds) -> int:
+    """Number of tiles at zoom z covering the bounds."""
+    min_x, min_y, max_x, max_y = tile_range(z, bounds)
+    return (max_x - min_x + 1) * (max_y - min_y + 1)
+
+
+def iter_tiles(z: int, bounds: Bounds) -> Iterator[tuple[int, int, int]]:
+    """Iterate the tiles at zoom z covering the bounds in PMTiles tile id order."""
+    min_x, min_y, max_x, max_y = tile_range(z, bounds)
+    tiles = [
+        (z, x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)
+    ]
+    tiles.sort(key=lambda tile: zxy_to_tileid(*tile))
+    return iter(tiles)
+
+
+def pyramid_max_zoom(bounds: Bounds, max_zoom: int, max_tiles: int) -> int:
+    """Highest zoom up to max_zoom whose pyramid stays within max_tiles tiles.
+
+    Zoom 0 is always included.
+    """
+    total = 0
+    for z in range(max_zoom + 1):
+        total += count_tiles(z, bounds)
+        if total > max_tiles:
+            return max(z - 1, 0)
+    return max_zoom
+
+
+class TilePyramidStore:
+    """Builds and locates per-snapshot low-zoom tile pyramids."""
+
+    def __init__(
+        self,
+        tiles_data_dir: Path,
+        max_zoom: int = settings.TILE_PYRAMID_MAX_ZOOM,
+        max_tiles: int = settings.TILE_PYRAMID_MAX_TILES,
+        build_concurrency: int = settings.TILE_PYRAMID_BUILD_CONCURRENCY,
+        retry_seconds: float = settings.TILE_PYRAMID_RETRY_SECONDS,
+    ) -> None:
+        self.tiles_data_dir = tiles_data_dir
+        self.max_zoom = max_zoom
+        self.max_tiles = max_tiles
+        self.build_concurrency = build_concurrency
+        self.retry_seconds = retry_seconds
+        # Builds in progress, keyed by pyramid path
+        self._builds: dict[str, asyncio.Task] = {}
+        # Monotonic time of the last failed build, keyed by pyramid path
+        self._failures: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_zoom >= 0
+
+    def covers(self, z: int) -> bool:
+        """Check if zoom z can be served from a pyramid."""
+        return self.enabled and z <= self.max_zoom
+
+    def pyramid_path(self, layer_info: LayerInfo, snapshot_id: int) -> Path:
+        return (
+            self.tiles_data_dir
+            / layer_info.schema_name
+            / f"{layer_info.table_name}.s{snapshot_id}{PYRAMID_SUFFIX}"
+        )
+
+    def is_building(self, layer_info: LayerInfo, snapshot_id: int) -> bool:
+        return str(self.pyramid_path(layer_info, snapshot_id)) in self._builds
+
+    def ensure_build(
+        self,
+        layer_info: LayerInfo,
+        snapshot_id: int,
+        get_bounds: Callable[[], Awaitable[Optional[Bounds]]],
+        generate_tile: Callable[[int, int, int], Awaitable[Optional[bytes]]],
+    ) -> Optional[asyncio.Task]:
+        """Start building the pyramid of a snapshot unless it exists or is building.
+
+        After a failed build, the snapshot is not built again for retry_seconds.
+
+        Args:
+            layer_info: Layer information
+            snapshot_id: DuckLake snapshot id the tiles are generated from
+            get_bounds: Returns the layer bounds in EPSG:4326, None if empty
+            generate_tile: Generates the unfiltered tile z/x/y
+
+        Returns:
+            The build task, or None if no build was started
+        """
+        path = self.pyramid_path(layer_info, snapshot_id)
+        key = str(path)
+        with self._lock:
+            if key in self._builds or path.exists():
+                return None
+            failed_at = self._failures.get(key)
+            if failed_at is not None:
+                if time.monotonic() - failed_at < self.retry_seconds:
+                    return None
+                del self._failures[key]
+            task = asyncio.create_task(
+                self._build(path, layer_info, get_bounds, generate_tile)
+            )
+            self._builds[key] = task
+
+        def _done(finished: asyncio.Task) -> None:
+            failed = not finished.cancelled() and finished.exception() is not None
+            with self._lock:
+                self._builds.pop(key, None)
+                if failed:
+                    self._record_failure(key)
+            if failed:
+                logger.warning(
+                    "Tile pyramid build failed for %s, retrying in %ds: %s",
+                    layer_info.table_name,
+                    self.retry_seconds,
+                    finished.exception(),
+                )
+
+        task.add_done_callback(_done)
+        return task
+
+    def _record_failure(self, key: str) -> None:
+        """Remember a failed build, dropping failures whose backoff is over."""
+        now = time.monotonic()
+        self._failures = {
+            failed_key: failed_at
+            for failed_key, failed_at in self._failures.items()
+            if now - failed_at < self.retry_seconds
+        }
+        self._failures[key] = now
+
+    async def _build(
+        self,
+        path: Path,
+        layer_info: LayerInfo,
+        get_bounds: Callable[[], Awaitable[Optional[Bounds]]],
+        generate_tile: Callable[[int, int, int], Awaitable[Optional[bytes]]],
+    ) -> None:
+        start_time = time.monotonic()
+        bounds = await get_bounds()
+        if bounds is None:
+            # Empty layer: an archive with only the (empty) world tile
+            max_zoom = 0
+            tiles: list[tuple[int, int, int]] = [(0, 0, 0)]
+        else:
+            max_zoom = pyramid_max_zoom(bounds, self.max_zoom, self.max_tiles)
+            tiles = [
+                tile for z in range(max_zoom + 1) for tile in iter_tiles(z, bounds)
+            ]
+
+        semaphore = asyncio.Semaphore(self.build_concurrency)
+
+        async def _generate(z: int, x: int, y: int) -> bytes:
+            if bounds is None:
+                return b""
+            async with semaphore:
+                return await generate_tile(z, x, y) or b""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        num_bytes = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                writer = Writer(f)
+                for i in range(0, len(tiles), _BUILD_BATCH_SIZE):
+                    batch = tiles[i : i + _BUILD_BATCH_SIZE]
+                    results = await asyncio.gather(*(_generate(*t) for t in batch))
+                    for tile, data in zip(batch, results):
+                        writer.write_tile(zxy_to_tileid(*tile), data)
+                        num_bytes += len(data)
+                min_lon, min_lat, max_lon, max_lat = bounds or (-180, -85, 180, 85)
+                header = {
+                    "tile_type": TileType.MVT,
+                    "tile_compression": Compression.NONE,
+                    "min_lon_e7": int(min_lon * 10_000_000),
+                    "min_lat_e7": int(min_lat * 10_000_000),
+                    "max_lon_e7": int(max_lon * 10_000_000),
+                    "max_lat_e7": int(max_lat * 10_000_000),
+                    "center_zoom": 0,
+                    "center_lon_e7": int((min_lon + max_lon) / 2 * 10_000_000),
+                    "center_lat_e7": int((min_lat + max_lat) / 2 * 10_000_000),
+                }
+                await asyncio.to_thread(
+                    writer.finalize,
+                    header,
+                    {"name": layer_info.table_name, "pyramid_max_zoom": max_zoom},
+                )
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        self._remove_stale(path, layer_info)
+        logger.info(
+            "Built tile pyramid %s: z0-%d, %d tiles, %d bytes (%.1fs)",
+            path.name,
+            max_zoom,
+            len(tiles),
+            num_bytes,
+            time.monotonic() - start_time,
+        )
+
+    def _remove_stale(self, current: Path, layer_info: LayerInfo) -> None:
+        """Remove the pyramids of older snapshots of the layer."""
+        pattern = f"{layer_info.table_name}.s*{PYRAMID_SUFFIX}"
+        for stale in current.parent.glob(pattern):
+            if stale != current:
+                try:
+                    stale.unlink()
+                except OSError as e:
+                    logger.debug("Could not remove stale pyramid %s: %s", stale, e)
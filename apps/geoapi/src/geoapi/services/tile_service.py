@@ -3,15 +3,20 @@
 This service generates Mapbox Vector Tiles (MVT) using a hybrid approach:
 1. PMTiles (static) - Pre-generated tiles for fast unfiltered access
 2. Dynamic tiles - On-the-fly generation using DuckDB's ST_AsMVT for filtered requests
+3. Tile pyramids - Low-zoom tiles of layers without PMTiles, built in the
+   background per DuckLake snapshot (see tile_pyramid.py)
 
 The service automatically routes requests to the appropriate source:
 - If PMTiles exist AND no CQL filter is applied → serve from PMTiles
+- If no PMTiles exist, no filter is applied and the zoom is low enough
+  → serve from the layer's tile pyramid once it is built
 - Otherwise → generate dynamically from DuckLake
 
 Variable-depth tile pyramid support:
 PMTiles generated with --generate-variable-depth-tile-pyramid may not have
 tiles at all zoom levels. When a tile is missing, we find the nearest parent
-tile and use tippecanoe-overzoom to generate the requested tile on-the-fly.
+tile and clip / rescale its features to the requested tile in-process
+(see mvt.py).
 
 Caching:
 - Redis cache for distributed deployments (shared across pods)
@@ -19,19 +24,21 @@ Caching:
 """
 
 import asyncio
-import gzip
+import hashlib
 import logging
 import math
-import tempfile
+import multiprocessing
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 from io import BufferedReader
 from pathlib import Path
 from typing import Any, Optional
 
 from cachetools import LRUCache
-from goatlib.storage import build_filters
+from goatlib.storage import PoolOverloadedError, build_filters
 from pmtiles.reader import MmapSource
 from pmtiles.tile import (
     deserialize_directory,
@@ -43,7 +50,17 @@ from pmtiles.tile import (
 from geoapi.config import settings
 from geoapi.dependencies import LayerInfo
 from geoapi.ducklake_pool import ducklake_pool
-from geoapi.tile_cache import cache_tile, get_cached_tile
+from geoapi.mvt import overzoom_tile
+from geoapi.services.layer_service import layer_service
+from geoapi.services.tile_pyramid import TilePyramidStore
+from geoapi.tile_cache import (
+    MemoryTileCache,
+    SingleFlight,
+    cache_tile,
+    dynamic_tile_digest,
+    dynamic_tile_variant,
+    get_cached_tile,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -55,8 +72,20 @@ WEB_MERCATOR_EXTENT = 20037508.342789244
 # Per-file locking in _get_cached_pmtiles_reader prevents contention
 _pmtiles_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="pmtiles")
 
-# Thread pool for dynamic tile generation (DuckDB queries are blocking)
-_dynamic_tile_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="dyntile")
+# Concurrent requests for the same tile share one read / query
+_tile_flight = SingleFlight()
+
+# Worker processes and cache for overzoomed tiles. Decoding, clipping and
+# encoding is pure Python, so threads would serialise on the GIL and slow
+# down the event loop. Spawned workers only import geoapi.mvt. The pool is
+# created on first use and replaced when a worker dies.
+_overzoom_executor: Optional[ProcessPoolExecutor] = None
+_overzoom_executor_lock = threading.Lock()
+_overzoom_cache = MemoryTileCache(
+    max_bytes=settings.OVERZOOM_CACHE_MAX_BYTES, ttl=settings.TILE_CACHE_TTL
+)
+# Buffer kept around overzoomed tiles, in 1/256 of the tile extent
+OVERZOOM_BUFFER = 5
 
 # Maximum leaf directory entries to cache per PMTiles file (~64KB per file)
 _LEAF_CACHE_MAX_SIZE = 1000
@@ -67,6 +96,33 @@ _PATH_CACHE_MAX_SIZE = 2000  # ~400KB max
 _EXISTS_CACHE_MAX_SIZE = 5000  # ~250KB max
 
 
+def _get_overzoom_executor(
+    broken: Optional[ProcessPoolExecutor] = None,
+) -> ProcessPoolExecutor:
+    """Get the overzoom worker pool, replacing it if it is the broken one."""
+    global _overzoom_executor
+    with _overzoom_executor_lock:
+        if _overzoom_executor is not None and _overzoom_executor is broken:
+            logger.warning("Overzoom worker died, recreating the worker pool")
+            _overzoom_executor.shutdown(wait=False, cancel_futures=True)
+            _overzoom_executor = None
+        if _overzoom_executor is None:
+            _overzoom_executor = ProcessPoolExecutor(
+                max_workers=settings.OVERZOOM_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _overzoom_executor
+
+
+def close_overzoom_executor() -> None:
+    """Shut down the overzoom worker processes."""
+    global _overzoom_executor
+    with _overzoom_executor_lock:
+        if _overzoom_executor is not None:
+            _overzoom_executor.shutdown(wait=False, cancel_futures=True)
+            _overzoom_executor = None
+
+
 class CachedPMTilesReader:
     """Optimized PMTiles reader that caches header and root directory.
 
@@ -319,6 +375,8 @@ class TileService:
         self._pmtiles_path_cache: LRUCache[str, Path | None] = LRUCache(
             maxsize=_PATH_CACHE_MAX_SIZE
         )
+        # Low-zoom tile pyramids of layers without PMTiles
+        self.pyramids = TilePyramidStore(self.tiles_data_dir)
 
     def _find_pmtiles_by_layer_id(self, layer_id: str) -> Path | None:
         """Find PMTiles file for a layer using glob search (no schema lookup needed).
@@ -578,8 +636,11 @@ class TileService:
         if pmtiles_path is None:
             return None
 
-        # Step 2: Read tile from PMTiles
-        result = await self._get_tile_from_pmtiles_path(pmtiles_path, z, x, y)
+        # Step 2: Read tile from PMTiles (shared with concurrent requests)
+        result = await _tile_flight.run(
+            ("pmtiles", str(pmtiles_path), z, x, y),
+            lambda: self._get_tile_from_pmtiles_path(pmtiles_path, z, x, y),
+        )
 
         elapsed_ms = (time.monotonic() - start_time) * 1000
         if result is None:
@@ -745,8 +806,7 @@ class TileService:
                     len(overzoomed),
                     overzoom_ms,
                 )
-                # tippecanoe-overzoom outputs gzip-compressed tiles
-                return (overzoomed, True)
+                return (overzoomed, False)
 
             # Overzoom returned empty - this is normal when target tile has no features
             logger.debug(
@@ -769,8 +829,8 @@ class TileService:
         """Get tile data from PMTiles file using pmtiles library.
 
         Supports variable-depth tile pyramids: if the requested tile doesn't
-        exist, finds the nearest parent tile and uses tippecanoe-overzoom to
-        generate the requested tile on-the-fly.
+        exist, finds the nearest parent tile and overzooms it to the
+        requested tile on-the-fly.
 
         Runs in a thread pool since file I/O is blocking.
 
@@ -897,8 +957,7 @@ class TileService:
             )
 
             if overzoomed:
-                # tippecanoe-overzoom outputs gzip-compressed tiles
-                return overzoomed, True
+                return overzoomed, False
 
             return b"", False
 
@@ -915,9 +974,11 @@ class TileService:
         target_y: int,
         is_gzip: bool,
     ) -> Optional[bytes]:
-        """Use tippecanoe-overzoom to generate a tile from its parent.
+        """Generate a tile from its parent by clipping and rescaling its features.
 
-        This is an async method that doesn't block the event loop.
+        Runs on the overzoom worker processes. Children are cached by a
+        digest of the parent tile, so regenerated PMTiles never serve stale
+        children, and concurrent requests for the same child share the work.
 
         Args:
             parent_tile: The parent tile data (MVT, possibly gzipped)
@@ -926,84 +987,59 @@ class TileService:
             is_gzip: Whether parent tile is gzip compressed
 
         Returns:
-            Overzoomed tile data (gzip compressed) or None on error
+            Overzoomed tile data (uncompressed), or None if it has no features
+            or on error
         """
-        try:
-            # tippecanoe-overzoom expects uncompressed input
-            if is_gzip:
-                input_data = gzip.decompress(parent_tile)
-            else:
-                input_data = parent_tile
-
-            with (
-                tempfile.NamedTemporaryFile(suffix=".mvt", delete=True) as in_file,
-                tempfile.NamedTemporaryFile(suffix=".mvt.gz", delete=True) as out_file,
-            ):
-                # Write input file
-                in_file.write(input_data)
-                in_file.flush()
-
-                # Run tippecanoe-overzoom asynchronously (non-blocking)
-                # Format: tippecanoe-overzoom -o out.mvt.gz in.mvt parent_z/x/y target_z/x/y
-                process = await asyncio.create_subprocess_exec(
-                    "tippecanoe-overzoom",
-                    "-o",
-                    out_file.name,
-                    "-b",
-                    "5",  # buffer size
-                    "-d",
-                    "12",  # detail
-                    in_file.name,
-                    f"{parent_z}/{parent_x}/{parent_y}",
-                    f"{target_z}/{target_x}/{target_y}",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-
-                try:
-                    _, stderr = await asyncio.wait_for(
-                        process.communicate(), timeout=10.0
-                    )
-                except asyncio.TimeoutError:
-                    process.kill()
-                    await process.wait()
-                    logger.warning(
-                        "tippecanoe-overzoom timeout for %d/%d/%d",
-                        target_z,
-                        target_x,
-                        target_y,
-                    )
-                    return None
-
-                if process.returncode != 0:
-                    error_msg = stderr.decode().strip() if stderr else "unknown error"
-                    # Don't warn for expected "no features" case - this is normal
-                    if "no features" not in error_msg.lower():
-                        logger.debug(
-                            "tippecanoe-overzoom %d/%d/%d -> %d/%d/%d: %s",
-                            parent_z,
-                            parent_x,
-                            parent_y,
-                            target_z,
-                            target_x,
-                            target_y,
-                            error_msg or "empty output",
-                        )
-                    return None
-
-                # Read the output tile
-                out_file.seek(0)
-                result = out_file.read()
-
-                # tippecanoe-overzoom may produce empty output for tiles with no features
-                if len(result) == 0:
-                    return None
+        digest = hashlib.blake2b(parent_tile, digest_size=16).hexdigest()
+        cache_key = (
+            f"{digest}:{parent_z}/{parent_x}/{parent_y}:"
+            f"{target_z}/{target_x}/{target_y}"
+        )
+        cached = _overzoom_cache.get(cache_key)
+        if cached is not None:
+            return cached[0] or None
+
+        overzoom = partial(
+            overzoom_tile,
+            parent_tile,
+            parent_z,
+            parent_x,
+            parent_y,
+            target_z,
+            target_x,
+            target_y,
+            buffer=OVERZOOM_BUFFER,
+            gzipped=is_gzip,
+        )
 
-                return result
+        async def _run() -> bytes:
+            loop = asyncio.get_event_loop()
+            executor = _get_overzoom_executor()
+            try:
+                result = await loop.run_in_executor(executor, overzoom)
+            except BrokenProcessPool:
+                # A worker died, e.g. killed for running out of memory
+                executor = _get_overzoom_executor(broken=executor)
+                result = await loop.run_in_executor(executor, overzoom)
+            # Empty children are cached too, they are as expensive to find
+            _overzoom_cache.put(cache_key, result, False)
+            return result
 
+        try:
+            result = await _tile_flight.run(("overzoom", cache_key), _run)
         except Exception as e:
-            logger.warning("Overzoom error: %s", e)
+            logger.warning(
+                "Overzoom error %d/%d/%d -> %d/%d/%d: %s",
+                parent_z,
+                parent_x,
+                parent_y,
+                target_z,
+                target_x,
+                target_y,
+                e,
+            )
             return None
+        return result or None
 
     async def get_tile(
         self,
@@ -1034,34 +1070,23 @@ class TileService:
 
         Returns:
             Tuple of (MVT tile bytes, is_gzip_compressed, source) or None if empty
-            source is 'pmtiles' or 'geoparquet'
+            source is 'pmtiles', 'pyramid', 'geoparquet' or 'geoparquet-cached'
         """
         # If CQL filter or bbox is provided, use dynamic GeoParquet generation
         if cql_filter or bbox:
-            # Run in thread pool to avoid blocking the event loop
-            loop = asyncio.get_event_loop()
-            tile_data = await loop.run_in_executor(
-                _dynamic_tile_executor,
-                lambda: self._generate_dynamic_tile(
-                    layer_info=layer_info,
-                    z=z,
-                    x=x,
-                    y=y,
-                    properties=properties,
-                    cql_filter=cql_filter,
-                    bbox=bbox,
-                    limit=limit,
-                    columns=columns,
-                    geometry_column=geometry_column,
-                ),
+            # Dynamic tiles are not gzip compressed
+            return await self._get_dynamic_tile(
+                layer_info=layer_info,
+                z=z,
+                x=x,
+                y=y,
+                properties=properties,
+                cql_filter=cql_filter,
+                bbox=bbox,
+                limit=limit,
+                columns=columns,
+                geometry_column=geometry_column,
             )
-            if tile_data is None:
-                return None
-            return (
-                tile_data,
-                False,
-                "geoparquet",
-            )  # Dynamic tiles are not gzip compressed
 
         # Unfiltered request - try PMTiles first, fallback to GeoParquet
         if not self._pmtiles_exists(layer_info):
@@ -1070,25 +1095,18 @@ class TileService:
                 layer_info.table_name,
             )
             # Fallback to dynamic GeoParquet generation
-            loop = asyncio.get_event_loop()
-            tile_data = await loop.run_in_executor(
-                _dynamic_tile_executor,
-                lambda: self._generate_dynamic_tile(
-                    layer_info=layer_info,
-                    z=z,
-                    x=x,
-                    y=y,
-                    properties=properties,
-                    cql_filter=None,
-                    bbox=None,
-                    limit=limit,
-                    columns=columns,
-                    geometry_column=geometry_column,
-                ),
+            return await self._get_dynamic_tile(
+                layer_info=layer_info,
+                z=z,
+                x=x,
+                y=y,
+                properties=properties,
+                cql_filter=None,
+                bbox=None,
+                limit=limit,
+                columns=columns,
+                geometry_column=geometry_column,
             )
-            if tile_data is None:
-                return None
-            return tile_data, False, "geoparquet"
 
         result = await self._get_tile_from_pmtiles(layer_info, z, x, y)
         if result is not None:
@@ -1105,7 +1123,175 @@ class TileService:
         # Tile not in PMTiles (outside zoom bounds)
         return None
 
-    def _generate_dynamic_tile(
+    async def _get_dynamic_tile(
+        self,
+        layer_info: LayerInfo,
+        z: int,
+        x: int,
+        y: int,
+        properties: Optional[list[str]] = None,
+        cql_filter: Optional[dict] = None,
+        bbox: Optional[list[float]] = None,
+        limit: Optional[int] = None,
+        columns: Optional[list[dict]] = None,
+        geometry_column: str = "geometry",
+    ) -> Optional[tuple[bytes, bool, str]]:
+        """Get a dynamic tile from the cache or generate it.
+
+        Cache keys combine the tile, a canonical hash of filter, bbox,
+        properties and limit, and the layer's DuckLake snapshot id, so cached
+        tiles are invalidated as soon as the layer changes. Concurrent misses
+        for the same key share a single DuckDB query.
+
+        Unfiltered low-zoom requests are read from the snapshot's tile
+        pyramid; while it is not built yet, its build is started in the
+        background and the tile is generated dynamically.
+
+        Returns:
+            Tuple of (MVT tile bytes, False, source) or None if empty
+        """
+        digest = dynamic_tile_digest(
+            cql_filter=cql_filter,
+            bbox=bbox,
+            properties=properties,
+            limit=limit,
+            geometry_column=geometry_column,
+        )
+        try:
+            snapshot_id = await layer_service.get_layer_snapshot(layer_info)
+        except Exception as e:
+            logger.debug("Snapshot lookup failed, not caching tile: %s", e)
+            snapshot_id = None
+        # Without a snapshot id a cached tile could outlive a layer change
+        variant = None
+        if snapshot_id is not None:
+            variant = dynamic_tile_variant(snapshot_id, digest)
+
+        # Unfiltered low-zoom tiles come from the snapshot's tile pyramid
+        if (
+            snapshot_id is not None
+            and not (cql_filter or bbox or properties or limit)
+            and self.pyramids.covers(z)
+        ):
+            pyramid_tile = await self._get_tile_from_pyramid(
+                layer_info, snapshot_id, z, x, y
+            )
+            if pyramid_tile is not None:
+                if not pyramid_tile:
+                    return None
+                return pyramid_tile, False, "pyramid"
+            self._build_pyramid(layer_info, snapshot_id, columns, geometry_column)
+
+        if variant is not None:
+            cached = get_cached_tile(layer_info.layer_id, z, x, y, variant=variant)
+            if cached is not None:
+                return cached[0], False, "geoparquet-cached"
+
+        async def generate() -> Optional[bytes]:
+            # The query runs on the DuckLake pool executor
+            tile_data = await self._generate_dynamic_tile(
+                layer_info=layer_info,
+                z=z,
+                x=x,
+                y=y,
+                properties=properties,
+                cql_filter=cql_filter,
+                bbox=bbox,
+                limit=limit,
+                columns=columns,
+                geometry_column=geometry_column,
+            )
+            if variant is not None and tile_data:
+                cache_tile(
+                    layer_info.layer_id, z, x, y, tile_data, False, variant=variant
+                )
+            return tile_data
+
+        tile_data = await _tile_flight.run(
+            ("dynamic", layer_info.layer_id, z, x, y, digest, snapshot_id), generate
+        )
+        if tile_data is None:
+            return None
+        return tile_data, False, "geoparquet"
+
+    async def _get_tile_from_pyramid(
+        self, layer_info: LayerInfo, snapshot_id: int, z: int, x: int, y: int
+    ) -> Optional[bytes]:
+        """Read a tile from the layer's tile pyramid for a snapshot.
+
+        Returns:
+            Tile bytes (empty if the tile has no features), or None if the
+            pyramid is not built or does not reach zoom z
+        """
+        pyramid_path = self.pyramids.pyramid_path(layer_info, snapshot_id)
+
+        def _read_tile() -> Optional[bytes]:
+            if not pyramid_path.exists():
+                return None
+            try:
+                reader, header, _ = _get_cached_pmtiles_reader(pyramid_path)
+                if z > header.get("max_zoom", 0):
+                    return None
+                # Tiles outside the layer bounds are not stored
+                return reader.get(z, x, y) or b""
+            except Exception as e:
+                logger.warning("Error reading tile pyramid %s: %s", pyramid_path, e)
+                return None
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(_pmtiles_executor, _read_tile)
+
+    def _build_pyramid(
+        self,
+        layer_info: LayerInfo,
+        snapshot_id: int,
+        columns: Optional[list[dict]],
+        geometry_column: str,
+    ) -> None:
+        """Start building the layer's tile pyramid in the background."""
+
+        async def get_bounds() -> Optional[tuple[float, float, float, float]]:
+            return await self._get_layer_bounds(layer_info, geometry_column)
+
+        async def generate_tile(z: int, x: int, y: int) -> Optional[bytes]:
+            return await self._generate_dynamic_tile(
+                layer_info=layer_info,
+                z=z,
+                x=x,
+                y=y,
+                columns=columns,
+                geometry_column=geometry_column,
+            )
+
+        if self.pyramids.ensure_build(
+            layer_info, snapshot_id, get_bounds, generate_tile
+        ):
+            logger.info(
+                "Building tile pyramid for %s at snapshot %d",
+                layer_info.table_name,
+                snapshot_id,
+            )
+
+    async def _get_layer_bounds(
+        self, layer_info: LayerInfo, geometry_column: str = "geometry"
+    ) -> Optional[tuple[float, float, float, float]]:
+        """Get the EPSG:4326 bounds of a layer, or None if it has no geometries."""
+        result = await ducklake_pool.execute_async(
+            f"""
+            SELECT ST_XMin(extent), ST_YMin(extent), ST_XMax(extent), ST_YMax(extent)
+            FROM (
+                SELECT ST_Extent_Agg("{geometry_column}") AS extent
+                FROM {layer_info.full_table_name}
+            )
+            """,
+            fetch_all=False,
+            timeout=settings.QUERY_TIMEOUT,
+        )
+        if not result or result[0] is None:
+            return None
+        return tuple(float(v) for v in result)
+
+    async def _generate_dynamic_tile(
         self,
         layer_info: LayerInfo,
         z: int,
@@ -1120,6 +1306,9 @@ class TileService:
     ) -> Optional[bytes]:
         """Generate MVT tile dynamically using DuckDB.
 
+        The query runs on the DuckLake pool executor; a timeout or cancelled
+        request interrupts it.
+
         Args:
             layer_info: Layer information from URL
             z, x, y: Tile coordinates
@@ -1275,6 +1464,11 @@ class TileService:
         if not has_id_column:
             select_clause += ", rowid"
 
+        # Thin dense tiles by a hash of the feature id instead of random(), so
+        # the same features are kept on every request and a feature kept in a
+        # tile is also kept in its child tiles
+        thin_key = '"id"' if has_id_column else "rowid"
+
         # Check if table has bbox column for fast row group pruning
         # Support both legacy scalar columns ($minx, etc.) and GeoParquet 1.1 struct bbox
         has_scalar_bbox = all(
@@ -1308,8 +1502,6 @@ class TileService:
 
             # Use pre-computed literal bounds everywhere - no ST_TileEnvelope in main query
             # This eliminates redundant geometry computations
-            # Note: Using LIMIT instead of ORDER BY random() - with Hilbert-ordered data,
-            # this gives spatially coherent results and is much faster (no sort needed)
             query = f"""
                 WITH bounds AS (
                     SELECT
@@ -1321,7 +1513,7 @@ class TileService:
                     FROM {table}, bounds
                     WHERE {bbox_filter}
                       AND ST_Intersects("{geom_col}", bounds.bbox4326){extra_where_sql}
-                    QUALIFY ROW_NUMBER() OVER (ORDER BY random()) <= {limit}
+                    QUALIFY ROW_NUMBER() OVER (ORDER BY hash({thin_key})) <= {limit}
                 )
                 SELECT ST_AsMVT(
                     struct_pack({struct_pack_args}),
@@ -1341,7 +1533,7 @@ class TileService:
                     SELECT {select_clause}
                     FROM {table}, bounds
                     WHERE ST_Intersects("{geom_col}", bounds.bbox4326){extra_where_sql}
-                    QUALIFY ROW_NUMBER() OVER (ORDER BY random()) <= {limit}
+                    QUALIFY ROW_NUMBER() OVER (ORDER BY hash({thin_key})) <= {limit}
                 )
                 SELECT ST_AsMVT(
                     struct_pack({struct_pack_args}),
@@ -1351,9 +1543,9 @@ class TileService:
             """
 
         try:
-            # Use pool's execute_with_retry for automatic connection handling
+            # Use pool's execute_async for automatic connection handling
             # Apply query timeout to prevent blocking other requests
-            result = ducklake_pool.execute_with_retry(
+            result = await ducklake_pool.execute_async(
                 query,
                 params=params if params else None,
                 max_retries=3,
@@ -1367,6 +1559,11 @@ class TileService:
         except TimeoutError:
             logger.warning("Tile query timeout: z=%d, x=%d, y=%d", z, x, y)
             raise
+        except PoolOverloadedError:
+            logger.warning(
+                "Tile query rejected, pool overloaded: z=%d, x=%d, y=%d", z, x, y
+            )
+            raise
         except Exception as e:
             logger.error("Tile generation error: %s", e)
             raise
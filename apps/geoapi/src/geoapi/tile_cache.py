@@ -1,25 +1,47 @@
-"""Redis-based tile cache for distributed deployments.
+"""Tiered tile cache for distributed deployments.
 
-This module provides a Redis-backed cache for vector tiles, enabling
-cache sharing across multiple GeoAPI pods in a Kubernetes deployment.
+This module provides a two-tier cache for vector tiles:
+1. In-process LRU (byte-budgeted, per pod) for the hottest tiles
+2. Redis, enabling cache sharing across multiple GeoAPI pods in a
+   Kubernetes deployment
 
 Features:
 - Automatic connection pooling
 - Graceful degradation (cache miss on Redis errors)
 - Configurable TTL
-- Optional gzip flag storage
-- Cache stats for monitoring
+- One Redis key per tile, with the gzip flag stored in the value
+- Single-flight generation: concurrent misses for the same tile share one query
+- Hit/miss/latency counters per tier for monitoring
 """
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Optional
+import threading
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
 
 import redis
+from cachetools import TTLCache
 
 from geoapi.config import settings
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Don't cache empty tiles or very large tiles (>2MB)
+MAX_CACHED_TILE_BYTES = 2 * 1024 * 1024
+
+# Bytes an in-process cache entry counts at least (key, tuple and dict slot),
+# so empty tiles do not escape the byte budget
+MIN_MEMORY_ENTRY_BYTES = 256
+
+# First byte of a Redis tile value, followed by the tile data
+_GZIP_FLAG = b"1"
+_PLAIN_FLAG = b"0"
+
 # Redis connection pool (shared across all requests)
 _redis_pool: Optional[redis.ConnectionPool] = None
 _redis_client: Optional[redis.Redis] = None
@@ -57,53 +79,264 @@ def get_redis_client() -> Optional[redis.Redis]:
         return None
 
 
-def _cache_key(layer_id: str, z: int, x: int, y: int) -> str:
-    """Generate cache key for a tile.
+class TileCacheMetrics:
+    """Thread-safe hit/miss/latency counters per cache tier."""
+
+    TIERS = ("memory", "redis")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = {tier: 0 for tier in self.TIERS}
+            self.misses = {tier: 0 for tier in self.TIERS}
+            self.latency = {tier: 0.0 for tier in self.TIERS}
+            self.generated = 0
+            self.coalesced = 0
+
+    def record_lookup(self, tier: str, hit: bool, latency: float) -> None:
+        with self._lock:
+            if hit:
+                self.hits[tier] += 1
+            else:
+                self.misses[tier] += 1
+            self.latency[tier] += latency
+
+    def record_generation(self, coalesced: bool) -> None:
+        """Record a tile generated by a query, or served by a concurrent one."""
+        with self._lock:
+            if coalesced:
+                self.coalesced += 1
+            else:
+                self.generated += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            tiers = {}
+            for tier in self.TIERS:
+                lookups = self.hits[tier] + self.misses[tier]
+                tiers[tier] = {
+                    "hits": self.hits[tier],
+                    "misses": self.misses[tier],
+                    "hit_ratio": self.hits[tier] / lookups if lookups else 0.0,
+                    "latency_avg_ms": self.latency[tier] / lookups * 1000
+                    if lookups
+                    else 0.0,
+                }
+            return {
+                "tiers": tiers,
+                "generated": self.generated,
+                "coalesced": self.coalesced,
+            }
+
+
+def _entry_size(value: tuple[bytes, bool]) -> int:
+    return max(len(value[0]), MIN_MEMORY_ENTRY_BYTES)
+
+
+class MemoryTileCache:
+    """Byte-budgeted in-process LRU cache of tiles with a TTL.
+
+    Sits in front of Redis, so hot tiles are served without a network
+    round trip. Thread-safe, as tiles are also read from executor threads.
+    """
 
-    Format: tile:{layer_id}:{z}/{x}/{y}
+    def __init__(self, max_bytes: int, ttl: int) -> None:
+        self.max_bytes = max_bytes
+        self._cache: TTLCache[str, tuple[bytes, bool]] = TTLCache(
+            maxsize=max(max_bytes, 1), ttl=ttl, getsizeof=_entry_size
+        )
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[tuple[bytes, bool]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._cache.get(key)
+
+    def put(self, key: str, tile_data: bytes, is_gzip: bool) -> None:
+        if not self.enabled or _entry_size((tile_data, is_gzip)) > self.max_bytes:
+            return
+        with self._lock:
+            self._cache[key] = (tile_data, is_gzip)
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._cache.keys() if key.startswith(prefix)]
+            for key in keys:
+                self._cache.pop(key, None)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    @property
+    def num_bytes(self) -> int:
+        with self._lock:
+            return int(self._cache.currsize)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls with the same key into one execution.
+
+    The first caller starts the work as a task; concurrent callers with the
+    same key await that task instead of starting their own. The task is
+    shielded, so a cancelled requester does not cancel the others.
     """
+
+    def __init__(self) -> None:
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._tasks.get(key)
+        if task is not None:
+            tile_cache_metrics.record_generation(coalesced=True)
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(func())
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        tile_cache_metrics.record_generation(coalesced=False)
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+
+tile_cache_metrics = TileCacheMetrics()
+memory_tile_cache = MemoryTileCache(
+    max_bytes=settings.TILE_MEMORY_CACHE_MAX_BYTES, ttl=settings.TILE_CACHE_TTL
+)
+
+
+def _layer_key_prefix(layer_id: str) -> str:
     # Normalize layer_id (remove hyphens for consistency)
-    layer_id_normalized = layer_id.replace("-", "")
-    return f"tile:{layer_id_normalized}:{z}/{x}/{y}"
+    return f"tile:{layer_id.replace('-', '')}:"
+
+
+def _cache_key(
+    layer_id: str, z: int, x: int, y: int, variant: Optional[str] = None
+) -> str:
+    """Generate cache key for a tile.
+
+    Format: tile:{layer_id}:v2:{z}/{x}/{y}, or
+    tile:{layer_id}:v2:{variant}:{z}/{x}/{y} for tile variants (e.g. filtered tiles).
+    The v2 segment separates single-key values from the legacy
+    data + ":gzip" key pairs, which expire with their TTL.
+    """
+    if variant:
+        return f"{_layer_key_prefix(layer_id)}v2:{variant}:{z}/{x}/{y}"
+    return f"{_layer_key_prefix(layer_id)}v2:{z}/{x}/{y}"
+
+
+def _canonical_filter(cql_filter: Optional[dict]) -> Any:
+    """Normalize a CQL filter, parsing JSON filters so key order does not matter."""
+    if not cql_filter:
+        return None
+    canonical = dict(cql_filter)
+    filter_ = canonical.get("filter")
+    if isinstance(filter_, str) and canonical.get("lang") != "cql2-text":
+        try:
+            canonical["filter"] = json.loads(filter_)
+        except ValueError:
+            pass
+    return canonical
+
+
+def dynamic_tile_digest(
+    cql_filter: Optional[dict] = None,
+    bbox: Optional[list[float]] = None,
+    properties: Optional[list[str]] = None,
+    limit: Optional[int] = None,
+    geometry_column: str = "geometry",
+) -> str:
+    """Canonical hash of everything that shapes a dynamic tile's content."""
+    request = {
+        "filter": _canonical_filter(cql_filter),
+        "bbox": list(bbox) if bbox else None,
+        "properties": sorted(properties) if properties else None,
+        "limit": limit,
+        "geometry_column": geometry_column,
+    }
+    return hashlib.sha256(
+        json.dumps(request, sort_keys=True, separators=(",", ":"), default=str).encode()
+    ).hexdigest()[:16]
+
+
+def dynamic_tile_variant(snapshot_id: int, digest: str) -> str:
+    """Cache key variant of a dynamically generated tile.
+
+    Includes the layer's DuckLake snapshot id, so identical filtered requests
+    share cache entries and a new snapshot never serves stale tiles.
+    """
+    return f"s{snapshot_id}:{digest}"
+
+
+def _encode_value(tile_data: bytes, is_gzip: bool) -> bytes:
+    return (_GZIP_FLAG if is_gzip else _PLAIN_FLAG) + tile_data
+
+
+def _decode_value(value: bytes) -> tuple[bytes, bool]:
+    return value[1:], value[:1] == _GZIP_FLAG
 
 
 def get_cached_tile(
-    layer_id: str, z: int, x: int, y: int
+    layer_id: str, z: int, x: int, y: int, variant: Optional[str] = None
 ) -> Optional[tuple[bytes, bool]]:
-    """Get tile from Redis cache.
+    """Get tile from the in-process cache, falling back to Redis.
+
+    Redis hits are promoted into the in-process cache.
 
     Args:
         layer_id: Layer UUID
         z, x, y: Tile coordinates
+        variant: Optional tile variant, see dynamic_tile_variant
 
     Returns:
         Tuple of (tile_data, is_gzip) or None if not cached
     """
+    key = _cache_key(layer_id, z, x, y, variant)
+
+    if memory_tile_cache.enabled:
+        start_time = time.perf_counter()
+        cached = memory_tile_cache.get(key)
+        tile_cache_metrics.record_lookup(
+            "memory", cached is not None, time.perf_counter() - start_time
+        )
+        if cached is not None:
+            return cached
+
     client = get_redis_client()
     if client is None:
         return None
 
+    start_time = time.perf_counter()
     try:
-        key = _cache_key(layer_id, z, x, y)
-        # Use pipeline for atomic read of data + metadata
-        pipe = client.pipeline()
-        pipe.get(key)
-        pipe.get(f"{key}:gzip")
-        results = pipe.execute()
-
-        tile_data = results[0]
-        if tile_data is None:
-            return None
-
-        # Parse gzip flag (default True for backward compat)
-        is_gzip = results[1] != b"0" if results[1] is not None else True
-
-        return (tile_data, is_gzip)
-
+        value = client.get(key)
     except Exception as e:
         logger.debug("Redis cache get error: %s", e)
+        value = None
+    tile_cache_metrics.record_lookup(
+        "redis", value is not None, time.perf_counter() - start_time
+    )
+    if value is None:
         return None
 
+    tile_data, is_gzip = _decode_value(value)  # type: ignore[arg-type]
+    memory_tile_cache.put(key, tile_data, is_gzip)
+    return (tile_data, is_gzip)
+
 
 def cache_tile(
     layer_id: str,
@@ -113,8 +346,9 @@ def cache_tile(
     tile_data: bytes,
     is_gzip: bool,
     ttl: Optional[int] = None,
+    variant: Optional[str] = None,
 ) -> bool:
-    """Store tile in Redis cache.
+    """Store tile in the in-process cache and Redis.
 
     Args:
         layer_id: Layer UUID
@@ -122,28 +356,25 @@ def cache_tile(
         tile_data: Tile bytes
         is_gzip: Whether tile is gzip compressed
         ttl: Optional TTL override (uses settings.TILE_CACHE_TTL by default)
+        variant: Optional tile variant, see dynamic_tile_variant
 
     Returns:
-        True if cached successfully, False otherwise
+        True if cached in Redis successfully, False otherwise
     """
-    # Don't cache empty tiles or very large tiles (>2MB)
-    if not tile_data or len(tile_data) > 2 * 1024 * 1024:
+    # Don't cache empty tiles or very large tiles
+    if not tile_data or len(tile_data) > MAX_CACHED_TILE_BYTES:
         return False
 
+    key = _cache_key(layer_id, z, x, y, variant)
+    memory_tile_cache.put(key, tile_data, is_gzip)
+
     client = get_redis_client()
     if client is None:
         return False
 
     try:
-        key = _cache_key(layer_id, z, x, y)
         cache_ttl = ttl if ttl is not None else settings.TILE_CACHE_TTL
-
-        # Use pipeline for atomic write
-        pipe = client.pipeline()
-        pipe.setex(key, cache_ttl, tile_data)
-        pipe.setex(f"{key}:gzip", cache_ttl, "1" if is_gzip else "0")
-        pipe.execute()
-
+        client.setex(key, cache_ttl, _encode_value(tile_data, is_gzip))
         return True
 
     except Exception as e:
@@ -160,13 +391,14 @@ def invalidate_layer_cache(layer_id: str) -> int:
     Returns:
         Number of keys deleted
     """
+    memory_tile_cache.invalidate_prefix(_layer_key_prefix(layer_id))
+
     client = get_redis_client()
     if client is None:
         return 0
 
     try:
-        layer_id_normalized = layer_id.replace("-", "")
-        pattern = f"tile:{layer_id_normalized}:*"
+        pattern = f"{_layer_key_prefix(layer_id)}*"
 
         # Use SCAN to find keys (safe for large datasets)
         keys: list = []
@@ -187,11 +419,25 @@ def invalidate_layer_cache(layer_id: str) -> int:
 
 
 def get_cache_stats() -> dict:
-    """Get Redis cache statistics.
+    """Get tile cache statistics.
 
     Returns:
-        Dict with cache stats or empty dict if unavailable
+        Dict with per-tier counters, in-process cache usage and Redis stats
     """
+    return {
+        **tile_cache_metrics.snapshot(),
+        "memory": {
+            "enabled": memory_tile_cache.enabled,
+            "tile_count": len(memory_tile_cache),
+            "used_mb": round(memory_tile_cache.num_bytes / 1024 / 1024, 2),
+            "max_mb": round(memory_tile_cache.max_bytes / 1024 / 1024, 2),
+        },
+        "redis": _get_redis_stats(),
+    }
+
+
+def _get_redis_stats() -> dict:
+    """Get Redis cache statistics."""
     client = get_redis_client()
     if client is None:
         return {"enabled": False, "connected": False}
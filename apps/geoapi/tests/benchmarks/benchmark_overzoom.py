@@ -0,0 +1,156 @@
+"""
+Benchmark of the in-process overzoom, on worker threads and on worker
+processes, against the tippecanoe-overzoom subprocess.
+
+The subprocess path is skipped if tippecanoe-overzoom is not installed.
+
+Run with: python apps/geoapi/tests/benchmarks/benchmark_overzoom.py
+"""
+
+import asyncio
+import gzip
+import multiprocessing
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from geoapi.mvt import GEOM_LINESTRING, GEOM_POINT, GEOM_POLYGON, encode_tile
+from geoapi.mvt import overzoom_tile as overzoom_in_process
+
+
+def make_parent_tile(num_features: int, seed: int = 42) -> bytes:
+    """Build a tile with a mix of points, lines and polygons."""
+    rng = random.Random(seed)
+    features = []
+    for i in range(num_features):
+        x, y = rng.randrange(4096), rng.randrange(4096)
+        kind = i % 3
+        if kind == 0:
+            geometry = [[(x, y)]]
+            geom_type = GEOM_POINT
+        elif kind == 1:
+            geometry = [
+                [(x + rng.randrange(-200, 200), y + rng.randrange(-200, 200)) for _ in range(12)]
+            ]
+            geom_type = GEOM_LINESTRING
+        else:
+            size = rng.randrange(10, 300)
+            geometry = [[(x, y), (x + size, y), (x + size, y + size), (x, y + size)]]
+            geom_type = GEOM_POLYGON
+        features.append(
+            {"id": i, "tags": [0, i % 10], "type": geom_type, "geometry": geometry}
+        )
+    values = [bytes([0x0A, 1]) + str(i).encode() for i in range(10)]
+    return encode_tile(
+        [{"name": "default", "keys": ["class"], "values": values, "features": features}]
+    )
+
+
+async def overzoom_subprocess(parent: bytes, parent_zxy: str, target_zxy: str) -> bytes:
+    """The previous overzoom path: temp files and a tippecanoe-overzoom process."""
+    with (
+        tempfile.NamedTemporaryFile(suffix=".mvt") as in_file,
+        tempfile.NamedTemporaryFile(suffix=".mvt.gz") as out_file,
+    ):
+        in_file.write(parent)
+        in_file.flush()
+        process = await asyncio.create_subprocess_exec(
+            "tippecanoe-overzoom",
+            "-o",
+            out_file.name,
+            "-b",
+            "5",
+            "-d",
+            "12",
+            in_file.name,
+            parent_zxy,
+            target_zxy,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        await process.communicate()
+        out_file.seek(0)
+        return out_file.read()
+
+
+def child_tiles(dz: int) -> list[tuple[int, int, int]]:
+    n = 2**dz
+    return [(10 + dz, 512 * n + x, 340 * n + y) for x in range(n) for y in range(n)]
+
+
+async def run_in_executor(executor: Executor, parent: bytes, children) -> float:
+    loop = asyncio.get_running_loop()
+    start_time = time.perf_counter()
+    await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                executor,
+                partial(
+                    overzoom_in_process, parent, 10, 512, 340, *child, gzipped=True
+                ),
+            )
+            for child in children
+        )
+    )
+    return time.perf_counter() - start_time
+
+
+async def run_in_threads(parent: bytes, children, workers: int) -> float:
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return await run_in_executor(executor, parent, children)
+
+
+async def run_in_processes(parent: bytes, children, workers: int) -> float:
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        # Start the workers outside of the timing, like the long-lived service pool
+        await run_in_executor(executor, parent, children[:workers])
+        return await run_in_executor(executor, parent, children)
+
+
+async def run_subprocess(parent: bytes, children, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    raw = gzip.decompress(parent)
+
+    async def _run(child):
+        async with semaphore:
+            await overzoom_subprocess(raw, "10/512/340", "/".join(map(str, child)))
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(_run(child) for child in children))
+    return time.perf_counter() - start_time
+
+
+async def run_benchmark(num_features: int = 5000, dz: int = 2, workers: int = 4):
+    parent = gzip.compress(make_parent_tile(num_features))
+    children = child_tiles(dz)
+    has_tippecanoe = shutil.which("tippecanoe-overzoom") is not None
+
+    print("=" * 80)
+    print(
+        f"Overzoom benchmark: {num_features} features, {len(parent)} bytes gzipped, "
+        f"{len(children)} children (dz={dz})"
+    )
+    print("=" * 80)
+
+    paths = [("threads", run_in_threads), ("processes", run_in_processes)]
+    if has_tippecanoe:
+        paths.append(("subprocess", run_subprocess))
+    else:
+        print("tippecanoe-overzoom not found, skipping the subprocess path")
+
+    for name, function in paths:
+        latency = await function(parent, children[:1], 1)
+        duration = await function(parent, children, workers)
+        print(
+            f"{name:<12} | latency {latency * 1000:>8.1f} ms | "
+            f"throughput {len(children) / duration:>8.1f} tiles/s ({workers} workers)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -15,6 +15,23 @@ class TestHealthCheck:
         assert data["ping"] == "pong"
 
 
+class TestPoolOverloaded:
+    """Tests for shedding requests when the DuckLake pool is overloaded."""
+
+    async def test_pool_overloaded_returns_503(self):
+        """Test PoolOverloadedError is mapped to 503 with Retry-After."""
+        from geoapi.ducklake_pool import PoolOverloadedError
+        from geoapi.main import pool_overloaded_handler
+
+        request = MagicMock()
+        request.url.path = "/collections/abc/tiles/WebMercatorQuad/1/0/0"
+        response = await pool_overloaded_handler(
+            request, PoolOverloadedError("overloaded")
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+
 class TestLandingPage:
     """Tests for landing page endpoint."""
 
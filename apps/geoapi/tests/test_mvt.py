@@ -0,0 +1,213 @@
+"""Tests for the in-process MVT overzoom."""
+
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from geoapi.mvt import (
+    GEOM_LINESTRING,
+    GEOM_POINT,
+    GEOM_POLYGON,
+    decode_geometry,
+    decode_tile,
+    encode_geometry,
+    encode_tile,
+    overzoom_tile,
+    ring_area,
+)
+from geoapi.services.tile_service import (
+    TileService,
+    _get_overzoom_executor,
+    close_overzoom_executor,
+)
+
+
+def string_value(value: str) -> bytes:
+    """Encode a Value message holding a short string."""
+    data = value.encode()
+    return bytes([0x0A, len(data)]) + data
+
+
+def make_tile(features: list[dict], extent: int = 4096) -> bytes:
+    return encode_tile(
+        [
+            {
+                "name": "default",
+                "extent": extent,
+                "keys": ["name", "kind"],
+                "values": [string_value("a"), string_value("b"), string_value("c")],
+                "features": features,
+            }
+        ]
+    )
+
+
+def square(x0: int, y0: int, x1: int, y1: int) -> list[tuple[int, int]]:
+    """Exterior ring (positive area in tile coordinates)."""
+    return [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+
+
+# =====================================================================
+#  Geometry Encoding Tests
+# =====================================================================
+
+
+def test_geometry_roundtrip() -> None:
+    """Geometry commands decode to the encoded parts."""
+    lines = [[(0, 0), (10, 5), (20, 0)], [(5, 5), (-3, 8)]]
+    assert decode_geometry(encode_geometry(GEOM_LINESTRING, lines)) == lines
+
+    rings = [square(0, 0, 100, 100), list(reversed(square(10, 10, 20, 20)))]
+    assert decode_geometry(encode_geometry(GEOM_POLYGON, rings)) == rings
+    assert ring_area(rings[0]) > 0
+    assert ring_area(rings[1]) < 0
+
+    points = [[(1, 2), (3, 4)]]
+    assert decode_geometry(encode_geometry(GEOM_POINT, points)) == points
+
+
+def test_tile_roundtrip() -> None:
+    """Tiles decode to the encoded layers."""
+    feature = {"id": 7, "tags": [0, 1], "type": GEOM_POINT, "geometry": [[(1, 2)]]}
+    layer = decode_tile(make_tile([feature]))[0]
+    assert layer["name"] == "default"
+    assert layer["keys"] == ["name", "kind"]
+    assert layer["features"] == [feature]
+
+
+# =====================================================================
+#  Overzoom Tests
+# =====================================================================
+
+
+def test_overzoom_points() -> None:
+    """Points are rescaled into the child tile and dropped outside it."""
+    tile = make_tile(
+        [
+            {"id": 1, "tags": [0, 0], "type": GEOM_POINT, "geometry": [[(100, 200)]]},
+            {"id": 2, "tags": [0, 1], "type": GEOM_POINT, "geometry": [[(3000, 100)]]},
+        ]
+    )
+    # Top-left child
+    child = decode_tile(overzoom_tile(tile, 0, 0, 0, 1, 0, 0))[0]
+    assert [f["id"] for f in child["features"]] == [1]
+    assert child["features"][0]["geometry"] == [[(200, 400)]]
+    # Only the referenced value is kept
+    assert child["values"] == [string_value("a")]
+
+    # Top-right child
+    child = decode_tile(overzoom_tile(tile, 0, 0, 0, 1, 1, 0))[0]
+    assert child["features"][0]["geometry"] == [[(6000 - 4096, 200)]]
+    assert child["features"][0]["tags"] == [0, 0]
+    assert child["values"] == [string_value("b")]
+
+
+def test_overzoom_clips_lines() -> None:
+    """Lines are cut at the child tile border plus buffer."""
+    tile = make_tile(
+        [
+            {
+                "id": 1,
+                "type": GEOM_LINESTRING,
+                "geometry": [[(0, 1000), (4096, 1000)]],
+            }
+        ]
+    )
+    child = decode_tile(overzoom_tile(tile, 0, 0, 0, 1, 0, 0, buffer=0))[0]
+    assert child["features"][0]["geometry"] == [[(0, 2000), (4096, 2000)]]
+
+
+def test_overzoom_clips_polygons() -> None:
+    """Polygons are clipped, keeping holes of kept exterior rings."""
+    tile = make_tile(
+        [
+            {
+                "id": 1,
+                "type": GEOM_POLYGON,
+                "geometry": [
+                    square(1000, 1000, 3000, 3000),
+                    list(reversed(square(1500, 1500, 1600, 1600))),
+                ],
+            },
+            {
+                "id": 2,
+                "type": GEOM_POLYGON,
+                "geometry": [
+                    square(3000, 3000, 4000, 4000),
+                    list(reversed(square(3500, 3500, 3600, 3600))),
+                ],
+            },
+        ]
+    )
+    child = decode_tile(overzoom_tile(tile, 0, 0, 0, 1, 0, 0, buffer=0))[0]
+    assert [f["id"] for f in child["features"]] == [1]
+    exterior, hole = child["features"][0]["geometry"]
+    assert sorted(exterior) == sorted(square(2000, 2000, 4096, 4096))
+    assert ring_area(exterior) > 0
+    assert sorted(hole) == sorted(square(3000, 3000, 3200, 3200))
+    assert ring_area(hole) < 0
+
+
+def test_overzoom_multiple_levels() -> None:
+    """Tiles several zooms below the parent are rescaled by 2^dz."""
+    tile = make_tile([{"type": GEOM_POINT, "geometry": [[(2050, 2050)]]}])
+    # z3 tile 4/4 starts at parent coordinate 2048
+    child = decode_tile(overzoom_tile(tile, 0, 0, 0, 3, 4, 4))[0]
+    assert child["features"][0]["geometry"] == [[(16, 16)]]
+    assert overzoom_tile(tile, 0, 0, 0, 3, 0, 0) == b""
+
+
+def test_overzoom_rejects_non_descendant() -> None:
+    with pytest.raises(ValueError):
+        overzoom_tile(make_tile([]), 1, 0, 0, 2, 3, 3)
+
+
+async def test_tile_service_overzoom_caches_children() -> None:
+    """Overzoomed children are cached by parent digest and tile."""
+    service = TileService()
+    tile = make_tile([{"type": GEOM_POINT, "geometry": [[(100, 100)]]}])
+    parent = gzip.compress(tile)
+
+    # Threads instead of worker processes, which cannot run the mock
+    with (
+        patch("geoapi.services.tile_service._overzoom_executor", ThreadPoolExecutor(1)),
+        patch(
+            "geoapi.services.tile_service.overzoom_tile", wraps=overzoom_tile
+        ) as overzoom,
+    ):
+        first = await service._overzoom_tile(parent, 0, 0, 0, 1, 0, 0, True)
+        second = await service._overzoom_tile(parent, 0, 0, 0, 1, 0, 0, True)
+        empty = await service._overzoom_tile(parent, 0, 0, 0, 1, 1, 1, True)
+
+    assert first == second
+    assert decode_tile(first)[0]["features"][0]["geometry"] == [[(200, 200)]]
+    assert empty is None
+    assert overzoom.call_count == 2
+
+
+async def test_tile_service_overzoom_in_worker_process() -> None:
+    service = TileService()
+    tile = make_tile([{"type": GEOM_POINT, "geometry": [[(1024, 1024)]]}])
+
+    child = await service._overzoom_tile(gzip.compress(tile), 0, 0, 0, 2, 1, 1, True)
+
+    assert decode_tile(child)[0]["features"][0]["geometry"] == [[(0, 0)]]
+
+
+async def test_tile_service_overzoom_recovers_from_dead_worker() -> None:
+    service = TileService()
+    tile = make_tile([{"type": GEOM_POINT, "geometry": [[(1024, 1024)]]}])
+
+    # Kill a worker, which breaks the pool for all later calls
+    broken = _get_overzoom_executor()
+    with pytest.raises(Exception):
+        broken.submit(os._exit, 1).result()
+
+    child = await service._overzoom_tile(gzip.compress(tile), 0, 0, 0, 1, 0, 0, True)
+
+    assert decode_tile(child)[0]["features"][0]["geometry"] == [[(2048, 2048)]]
+    assert _get_overzoom_executor() is not broken
+    close_overzoom_executor()
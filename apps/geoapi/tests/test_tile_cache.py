@@ -0,0 +1,194 @@
+"""Tests for the tiered tile cache."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from geoapi import tile_cache
+from geoapi.tile_cache import (
+    MemoryTileCache,
+    SingleFlight,
+    dynamic_tile_digest,
+    dynamic_tile_variant,
+)
+
+LAYER_ID = "abc123de-f456-7890-1234-5678901234ab"
+
+
+@pytest.fixture
+def memory_cache():
+    """Fresh in-process cache and counters for each test."""
+    cache = MemoryTileCache(max_bytes=1024, ttl=60)
+    tile_cache.tile_cache_metrics.reset()
+    with patch.object(tile_cache, "memory_tile_cache", cache):
+        yield cache
+
+
+@pytest.fixture
+def redis_client():
+    """Dict-backed fake Redis client."""
+    store: dict[str, bytes] = {}
+    client = MagicMock()
+    client.get.side_effect = store.get
+    client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+    with patch.object(tile_cache, "get_redis_client", return_value=client):
+        yield store
+
+
+class TestMemoryTileCache:
+    """Tests for the byte-budgeted in-process cache."""
+
+    def test_evicts_least_recently_used_within_budget(self):
+        cache = MemoryTileCache(max_bytes=1000, ttl=60)
+        cache.put("a", b"x" * 400, True)
+        cache.put("b", b"x" * 400, False)
+        assert cache.get("a") is not None
+        cache.put("c", b"x" * 400, False)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == (b"x" * 400, True)
+        assert cache.num_bytes == 800
+
+    def test_skips_tiles_larger_than_budget(self):
+        cache = MemoryTileCache(max_bytes=1000, ttl=60)
+        cache.put("a", b"x" * 2000, False)
+        assert len(cache) == 0
+
+    def test_empty_tiles_count_against_budget(self):
+        cache = MemoryTileCache(max_bytes=1000, ttl=60)
+        for i in range(100):
+            cache.put(str(i), b"", False)
+
+        assert len(cache) == 1000 // tile_cache.MIN_MEMORY_ENTRY_BYTES
+        assert cache.num_bytes <= 1000
+
+
+class TestTieredTileCache:
+    """Tests for the memory tier in front of Redis."""
+
+    def test_single_redis_key_per_tile(self, memory_cache, redis_client):
+        assert tile_cache.cache_tile(LAYER_ID, 1, 2, 3, b"tile", True)
+        assert list(redis_client) == ["tile:abc123def456789012345678901234ab:v2:1/2/3"]
+
+    def test_memory_tier_serves_before_redis(self, memory_cache, redis_client):
+        tile_cache.cache_tile(LAYER_ID, 1, 2, 3, b"tile", False)
+        assert tile_cache.get_cached_tile(LAYER_ID, 1, 2, 3) == (b"tile", False)
+
+        stats = tile_cache.tile_cache_metrics.snapshot()["tiers"]
+        assert stats["memory"]["hits"] == 1
+        assert stats["redis"]["hits"] + stats["redis"]["misses"] == 0
+
+    def test_redis_hit_is_promoted(self, memory_cache, redis_client):
+        tile_cache.cache_tile(LAYER_ID, 1, 2, 3, b"tile", True)
+        memory_cache.clear()
+
+        assert tile_cache.get_cached_tile(LAYER_ID, 1, 2, 3) == (b"tile", True)
+        assert tile_cache.get_cached_tile(LAYER_ID, 1, 2, 3) == (b"tile", True)
+
+        stats = tile_cache.tile_cache_metrics.snapshot()["tiers"]
+        assert (stats["memory"]["hits"], stats["memory"]["misses"]) == (1, 1)
+        assert stats["redis"]["hits"] == 1
+
+    def test_invalidate_layer(self, memory_cache, redis_client):
+        tile_cache.cache_tile(LAYER_ID, 1, 2, 3, b"tile", True)
+        with patch.object(tile_cache, "get_redis_client", return_value=None):
+            tile_cache.invalidate_layer_cache(LAYER_ID)
+        assert len(memory_cache) == 0
+
+
+class TestDynamicTileKeys:
+    """Tests for filter-aware, snapshot-versioned cache keys."""
+
+    def test_digest_ignores_key_and_property_order(self):
+        first = dynamic_tile_digest(
+            cql_filter={
+                "filter": '{"op": "=", "args": [{"property": "name"}, "Berlin"]}',
+                "lang": "cql2-json",
+            },
+            properties=["name", "value"],
+        )
+        second = dynamic_tile_digest(
+            cql_filter={
+                "lang": "cql2-json",
+                "filter": '{"args": [{"property": "name"}, "Berlin"], "op": "="}',
+            },
+            properties=["value", "name"],
+        )
+        assert first == second
+
+    def test_digest_changes_with_request(self):
+        cql_filter = {"filter": "name = 'Berlin'", "lang": "cql2-text"}
+        digest = dynamic_tile_digest(cql_filter=cql_filter)
+        assert digest != dynamic_tile_digest(cql_filter=cql_filter, limit=10)
+        assert digest != dynamic_tile_digest(
+            cql_filter={"filter": "name = 'Munich'", "lang": "cql2-text"}
+        )
+
+    def test_new_snapshot_misses_cache(self, memory_cache, redis_client):
+        digest = dynamic_tile_digest(bbox=[0, 0, 1, 1])
+        tile_cache.cache_tile(
+            LAYER_ID, 1, 2, 3, b"tile", False, variant=dynamic_tile_variant(7, digest)
+        )
+
+        assert tile_cache.get_cached_tile(
+            LAYER_ID, 1, 2, 3, variant=dynamic_tile_variant(7, digest)
+        ) == (b"tile", False)
+        assert (
+            tile_cache.get_cached_tile(
+                LAYER_ID, 1, 2, 3, variant=dynamic_tile_variant(8, digest)
+            )
+            is None
+        )
+        assert tile_cache.get_cached_tile(LAYER_ID, 1, 2, 3) is None
+
+
+class TestSingleFlight:
+    """Tests for request coalescing."""
+
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def generate():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return b"tile"
+
+        results = await asyncio.gather(
+            *(flight.run(("tile", 1, 2, 3), generate) for _ in range(5))
+        )
+        assert results == [b"tile"] * 5
+        assert calls == 1
+        assert len(flight) == 0
+
+        # Later calls run again
+        await flight.run(("tile", 1, 2, 3), generate)
+        assert calls == 2
+
+    async def test_errors_are_shared(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise TimeoutError("query timeout")
+
+        results = await asyncio.gather(
+            *(flight.run("key", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(result, TimeoutError) for result in results)
+
+    async def test_cancelled_requester_does_not_cancel_others(self):
+        flight = SingleFlight()
+
+        async def generate():
+            await asyncio.sleep(0.05)
+            return b"tile"
+
+        first = asyncio.create_task(flight.run("key", generate))
+        second = asyncio.create_task(flight.run("key", generate))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == b"tile"
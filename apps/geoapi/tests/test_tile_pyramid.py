@@ -0,0 +1,207 @@
+"""Tests for the low-zoom tile pyramids of layers without PMTiles."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from geoapi.services.tile_pyramid import (
+    TilePyramidStore,
+    count_tiles,
+    iter_tiles,
+    pyramid_max_zoom,
+    tile_range,
+)
+from geoapi.services.tile_service import TileService
+
+GERMANY = (5.9, 47.3, 15.0, 55.1)
+
+
+def make_layer_info() -> MagicMock:
+    layer_info = MagicMock()
+    layer_info.layer_id = "abc123"
+    layer_info.schema_name = "user_test"
+    layer_info.table_name = "t_abc123"
+    return layer_info
+
+
+# =====================================================================
+#  Tile Math Tests
+# =====================================================================
+
+
+def test_tile_range_world() -> None:
+    """The world at z=1 is covered by all four tiles."""
+    assert tile_range(1, (-180, -85, 180, 85)) == (0, 0, 1, 1)
+    assert count_tiles(0, GERMANY) == 1
+
+
+def test_iter_tiles_in_tile_id_order() -> None:
+    """Tiles are yielded in PMTiles tile id order for the writer."""
+    from pmtiles.tile import zxy_to_tileid
+
+    tiles = list(iter_tiles(6, GERMANY))
+    assert len(tiles) == count_tiles(6, GERMANY)
+    tile_ids = [zxy_to_tileid(*tile) for tile in tiles]
+    assert tile_ids == sorted(tile_ids)
+
+
+def test_pyramid_max_zoom_respects_tile_budget() -> None:
+    """Zooms that would exceed the tile budget are left out."""
+    world = (-180, -85, 180, 85)
+    assert pyramid_max_zoom(GERMANY, max_zoom=8, max_tiles=20000) == 8
+    # 1 + 4 + 16 + 64 tiles for z0-z3
+    assert pyramid_max_zoom(world, max_zoom=8, max_tiles=85) == 3
+    assert pyramid_max_zoom(world, max_zoom=8, max_tiles=1) == 0
+
+
+# =====================================================================
+#  Build and Read Tests
+# =====================================================================
+
+
+async def test_build_and_read_pyramid(tmp_path) -> None:
+    """A built pyramid serves its zooms and leaves higher zooms dynamic."""
+    service = TileService()
+    service.pyramids = TilePyramidStore(tmp_path, max_zoom=5, max_tiles=1000)
+    layer_info = make_layer_info()
+
+    async def get_bounds():
+        return GERMANY
+
+    async def generate_tile(z, x, y):
+        # Only the tiles on the western edge have features
+        min_x = tile_range(z, GERMANY)[0]
+        return f"{z}/{x}/{y}".encode() if x == min_x else None
+
+    task = service.pyramids.ensure_build(layer_info, 7, get_bounds, generate_tile)
+    assert task is not None
+    # A second request does not start another build
+    assert not service.pyramids.ensure_build(
+        layer_info, 7, get_bounds, generate_tile
+    )
+    await task
+
+    path = service.pyramids.pyramid_path(layer_info, 7)
+    assert path.exists()
+    assert not service.pyramids.is_building(layer_info, 7)
+
+    min_x, min_y, max_x, _ = tile_range(5, GERMANY)
+    assert max_x > min_x
+    tile = await service._get_tile_from_pyramid(layer_info, 7, 5, min_x, min_y)
+    assert tile == f"5/{min_x}/{min_y}".encode()
+    # Empty tiles inside and outside the bounds
+    empty = await service._get_tile_from_pyramid(layer_info, 7, 5, max_x, min_y)
+    assert empty == b""
+    assert await service._get_tile_from_pyramid(layer_info, 7, 5, 0, 0) == b""
+    # Zoom above the pyramid and missing snapshot
+    assert await service._get_tile_from_pyramid(layer_info, 7, 6, 33, 21) is None
+    assert await service._get_tile_from_pyramid(layer_info, 8, 0, 0, 0) is None
+
+
+async def test_new_snapshot_replaces_old_pyramid(tmp_path) -> None:
+    """Building the pyramid of a new snapshot removes the old one."""
+    store = TilePyramidStore(tmp_path, max_zoom=1, max_tiles=100)
+    layer_info = make_layer_info()
+    get_bounds = AsyncMock(return_value=GERMANY)
+    generate_tile = AsyncMock(return_value=b"tile")
+
+    await store.ensure_build(layer_info, 1, get_bounds, generate_tile)
+    await store.ensure_build(layer_info, 2, get_bounds, generate_tile)
+
+    assert not store.pyramid_path(layer_info, 1).exists()
+    assert store.pyramid_path(layer_info, 2).exists()
+    assert store.ensure_build(layer_info, 2, get_bounds, generate_tile) is None
+
+
+async def test_empty_layer_pyramid(tmp_path) -> None:
+    """A layer without geometries gets an archive with only an empty z0 tile."""
+    service = TileService()
+    service.pyramids = TilePyramidStore(tmp_path, max_zoom=8, max_tiles=1000)
+    layer_info = make_layer_info()
+    generate_tile = AsyncMock()
+
+    await service.pyramids.ensure_build(
+        layer_info, 1, AsyncMock(return_value=None), generate_tile
+    )
+
+    generate_tile.assert_not_awaited()
+    assert await service._get_tile_from_pyramid(layer_info, 1, 0, 0, 0) == b""
+    assert await service._get_tile_from_pyramid(layer_info, 1, 1, 0, 0) is None
+
+
+async def test_failed_build_backs_off(tmp_path) -> None:
+    """A failed build is not started again until its backoff is over."""
+    store = TilePyramidStore(tmp_path, max_zoom=1, max_tiles=100, retry_seconds=60)
+    layer_info = make_layer_info()
+    get_bounds = AsyncMock(return_value=GERMANY)
+    generate_tile = AsyncMock(side_effect=TimeoutError("tile timed out"))
+
+    with patch("geoapi.services.tile_pyramid.time.monotonic", return_value=1000.0):
+        task = store.ensure_build(layer_info, 1, get_bounds, generate_tile)
+        with pytest.raises(TimeoutError):
+            await task
+        assert store.ensure_build(layer_info, 1, get_bounds, generate_tile) is None
+
+    generate_tile.side_effect = None
+    generate_tile.return_value = b"tile"
+    with patch("geoapi.services.tile_pyramid.time.monotonic", return_value=1061.0):
+        task = store.ensure_build(layer_info, 1, get_bounds, generate_tile)
+        assert task is not None
+        await task
+    assert store.pyramid_path(layer_info, 1).exists()
+
+
+# =====================================================================
+#  Routing Tests
+# =====================================================================
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"cql_filter": {"filter": {}, "lang": "cql2-json"}}, {"limit": 10}],
+)
+async def test_dynamic_tile_uses_pyramid_only_unfiltered(tmp_path, kwargs) -> None:
+    """Only unfiltered low-zoom requests are served from the pyramid."""
+    service = TileService()
+    service.pyramids = TilePyramidStore(tmp_path, max_zoom=8, max_tiles=1000)
+    service._get_tile_from_pyramid = AsyncMock(return_value=b"pyramid")
+    service._generate_dynamic_tile = AsyncMock(return_value=b"dynamic")
+
+    with (
+        patch(
+            "geoapi.services.tile_service.layer_service.get_layer_snapshot",
+            AsyncMock(return_value=3),
+        ),
+        patch("geoapi.services.tile_service.get_cached_tile", return_value=None),
+        patch("geoapi.services.tile_service.cache_tile"),
+    ):
+        result = await service._get_dynamic_tile(make_layer_info(), 2, 1, 1, **kwargs)
+
+    if kwargs:
+        assert result == (b"dynamic", False, "geoparquet")
+        service._get_tile_from_pyramid.assert_not_awaited()
+    else:
+        assert result == (b"pyramid", False, "pyramid")
+
+
+async def test_dynamic_tile_starts_pyramid_build(tmp_path) -> None:
+    """A low-zoom miss starts the pyramid build and falls back to dynamic."""
+    service = TileService()
+    service.pyramids = TilePyramidStore(tmp_path, max_zoom=8, max_tiles=1000)
+    service._generate_dynamic_tile = AsyncMock(return_value=b"dynamic")
+    service._build_pyramid = MagicMock()
+
+    with (
+        patch(
+            "geoapi.services.tile_service.layer_service.get_layer_snapshot",
+            AsyncMock(return_value=3),
+        ),
+        patch("geoapi.services.tile_service.get_cached_tile", return_value=None),
+        patch("geoapi.services.tile_service.cache_tile"),
+    ):
+        result = await service._get_dynamic_tile(make_layer_info(), 2, 1, 1)
+        high_zoom = await service._get_dynamic_tile(make_layer_info(), 12, 1, 1)
+
+    assert result == (b"dynamic", False, "geoparquet")
+    assert high_zoom == (b"dynamic", False, "geoparquet")
+    service._build_pyramid.assert_called_once()
@@ -99,7 +99,8 @@ async def execute_workflow(
     """Execute a workflow via Windmill.
 
     Submits the workflow to the workflow_runner script which executes
-    all tool nodes in topological order with temp_mode enabled.
+    all tool nodes in dependency order with temp_mode enabled, running
+    independent branches in parallel and reusing unchanged node results.
 
     Args:
         workflow_id: UUID of the workflow
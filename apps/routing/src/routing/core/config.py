@@ -27,10 +27,13 @@ class Settings(BaseSettings):
     CACHE_DIR: str = "/tmp/cache"
 
     NETWORK_REGION_TABLE: str = "basic.geofence_active_mobility"
+    NETWORK_MAX_RESIDENT_CELLS: int = 64  # H3_3 cells kept in memory by the API
+    PREPARED_NETWORK_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # 512 MB
     HEATMAP_MATRIX_DATE_SUFFIX: str = "20250210"
 
     CATCHMENT_AREA_CAR_BUFFER_DEFAULT_SPEED: int = 80  # km/h
     CATCHMENT_AREA_HOLE_THRESHOLD_SQM: int = 200000  # 20 hectares, ~450m x 450m
+    ROUTING_ENGINE: str = "csr"  # csr or adjacency_list
 
     BASE_STREET_NETWORK: UUID = UUID("903ecdca-b717-48db-bbce-0219e41439cf")
     DEFAULT_STREET_NETWORK_EDGE_LAYER_PROJECT_ID: int = (
@@ -41,6 +44,7 @@ class Settings(BaseSettings):
     )
 
     DATA_INSERT_BATCH_SIZE: int = 800
+    COPY_BATCH_SIZE: int = 20000  # Rows buffered per binary COPY into a staging table
 
     CELERY_BROKER_URL: str | None = "pyamqp://guest@rabbitmq//"
     REDIS_HOST: str | None = "redis"
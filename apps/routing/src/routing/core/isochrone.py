@@ -5,7 +5,7 @@ import heapq
 import math
 
 import numpy as np
-from numba import njit
+from numba import get_num_threads, njit, prange
 from numba.core import types
 from numba.typed import Dict, List
 from routing.utils import (
@@ -139,6 +139,309 @@ def dijkstra_h3(start_vertices, adj_list, travel_time, use_distance=False):
     return distances_list
 
 
+ROUTING_ENGINE_CSR = "csr"
+ROUTING_ENGINE_ADJACENCY_LIST = "adjacency_list"
+
+
+@njit(cache=True)
+def construct_csr_graph(n, edge_source, edge_target, edge_cost, edge_reverse_cost):
+    """
+    Construct compressed sparse row (CSR) graph from edges
+    :param n: Number of nodes
+    :param edge_source: List of edge source nodes
+    :param edge_target: List of edge target nodes
+    :param edge_cost: List of edge costs
+    :param edge_reverse_cost: List of edge reverse costs
+    :return: Offsets (n + 1), neighbour targets and neighbour costs
+    """
+    offsets = np.zeros(n + 1, np.int64)
+    for i in range(len(edge_source)):
+        if edge_cost[i] >= 0.0:
+            offsets[edge_source[i] + 1] += 1
+        if edge_reverse_cost[i] >= 0.0:
+            offsets[edge_target[i] + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    targets = np.empty(offsets[n], np.int64)
+    costs = np.empty(offsets[n], np.double)
+    cursor = offsets[:-1].copy()
+    # Neighbours are written in edge order, same as construct_adjacency_list_
+    for i in range(len(edge_source)):
+        if edge_cost[i] >= 0.0:
+            u = edge_source[i]
+            targets[cursor[u]] = edge_target[i]
+            costs[cursor[u]] = edge_cost[i]
+            cursor[u] += 1
+        if edge_reverse_cost[i] >= 0.0:
+            u = edge_target[i]
+            targets[cursor[u]] = edge_source[i]
+            costs[cursor[u]] = edge_reverse_cost[i]
+            cursor[u] += 1
+    return offsets, targets, costs
+
+
+@njit(cache=True)
+def heap_push(heap_keys, heap_values, size, key, value):
+    """
+    Push an entry onto an array-backed binary min-heap
+    :return: New heap size
+    """
+    i = size
+    heap_keys[i] = key
+    heap_values[i] = value
+    while i > 0:
+        parent = (i - 1) >> 1
+        if heap_keys[parent] <= heap_keys[i]:
+            break
+        heap_keys[parent], heap_keys[i] = heap_keys[i], heap_keys[parent]
+        heap_values[parent], heap_values[i] = heap_values[i], heap_values[parent]
+        i = parent
+    return size + 1
+
+
+@njit(cache=True)
+def heap_pop(heap_keys, heap_values, size):
+    """
+    Pop the smallest entry from an array-backed binary min-heap
+    :return: Key, value and new heap size
+    """
+    key = heap_keys[0]
+    value = heap_values[0]
+    size -= 1
+    heap_keys[0] = heap_keys[size]
+    heap_values[0] = heap_values[size]
+    i = 0
+    while True:
+        smallest = 2 * i + 1
+        if smallest >= size:
+            break
+        right = smallest + 1
+        if right < size and heap_keys[right] < heap_keys[smallest]:
+            smallest = right
+        if heap_keys[i] <= heap_keys[smallest]:
+            break
+        heap_keys[smallest], heap_keys[i] = heap_keys[i], heap_keys[smallest]
+        heap_values[smallest], heap_values[i] = heap_values[i], heap_values[smallest]
+        i = smallest
+    return key, value, size
+
+
+@njit(cache=True)
+def dijkstra_csr_search(
+    start_vertex,
+    offsets,
+    targets,
+    costs,
+    travel_time,
+    use_distance,
+    distances,
+    visited,
+    heap_keys,
+    heap_values,
+):
+    """
+    Single-origin Dijkstra search on a CSR graph, writing into preallocated buffers
+    :param start_vertex: Start vertex
+    :param offsets: CSR offsets
+    :param targets: CSR neighbour targets
+    :param costs: CSR neighbour costs
+    :param travel_time: Maximum cost of the search
+    :param distances: Distance buffer (updated in place)
+    :param visited: Visited buffer (reset by this function)
+    :param heap_keys: Heap key buffer with capacity len(targets) + 1
+    :param heap_values: Heap value buffer with capacity len(targets) + 1
+    """
+    visited[:] = False
+    distances[start_vertex] = 0.0
+    size = heap_push(heap_keys, heap_values, 0, 0.0, start_vertex)
+    while size > 0:
+        if heap_keys[0] >= travel_time:
+            break
+        _, u, size = heap_pop(heap_keys, heap_values, size)
+        if visited[u]:
+            continue
+        visited[u] = True
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            l = (
+                (costs[k] / 60.0) if not use_distance else costs[k]
+            )  # convert cost to minutes if required
+            if distances[u] + l < distances[v]:
+                distances[v] = distances[u] + l
+                size = heap_push(heap_keys, heap_values, size, distances[v], v)
+
+
+@njit(cache=True, parallel=True)
+def dijkstra_csr(
+    start_vertices,
+    offsets,
+    targets,
+    costs,
+    travel_time,
+    use_distance=False,
+    num_workers=1,
+):
+    """
+    Dijkstra's algorithm one-to-all shortest path search on a CSR graph
+    Start vertices are distributed over num_workers parallel workers, each
+    with its own distance and scratch buffers, which are min-reduced at the end.
+    :param start_vertices: List of start vertices
+    :param offsets: CSR offsets
+    :param targets: CSR neighbour targets
+    :param costs: CSR neighbour costs
+    :param travel_time: Travel time matrix
+    :param num_workers: Number of parallel workers
+    :return: Minimum cost of all start vertices to every node
+    """
+    n = len(offsets) - 1
+    num_workers = max(1, min(num_workers, len(start_vertices)))
+    worker_distances = np.full((num_workers, n), np.inf, np.double)
+    for worker in prange(num_workers):
+        visited = np.empty(n, np.bool_)
+        heap_keys = np.empty(len(targets) + 1, np.double)
+        heap_values = np.empty(len(targets) + 1, np.int64)
+        for i in range(worker, len(start_vertices), num_workers):
+            dijkstra_csr_search(
+                start_vertices[i],
+                offsets,
+                targets,
+                costs,
+                travel_time,
+                use_distance,
+                worker_distances[worker],
+                visited,
+                heap_keys,
+                heap_values,
+            )
+    distances = np.empty(n, np.double)
+    for v in prange(n):
+        distance = worker_distances[0, v]
+        for worker in range(1, num_workers):
+            if worker_distances[worker, v] < distance:
+                distance = worker_distances[worker, v]
+        distances[v] = distance
+    return distances
+
+
+@njit(cache=True, parallel=True)
+def dijkstra_h3_csr(
+    start_vertices,
+    offsets,
+    targets,
+    costs,
+    travel_time,
+    use_distance,
+    distances,
+    num_workers=1,
+):
+    """
+    Dijkstra's algorithm one-to-all shortest path search on a CSR graph, per start vertex
+    Start vertices are distributed over num_workers parallel workers, each
+    reusing its own visited and heap scratch buffers for all of its searches.
+    :param start_vertices: List of start vertices
+    :param offsets: CSR offsets
+    :param targets: CSR neighbour targets
+    :param costs: CSR neighbour costs
+    :param travel_time: Travel time matrix
+    :param distances: Preallocated cost matrix of shape (>= len(start_vertices), n)
+    :param num_workers: Number of parallel workers
+    :return: Cost matrix of shape (len(start_vertices), n)
+    """
+    n = len(offsets) - 1
+    num_workers = max(1, min(num_workers, len(start_vertices)))
+    for worker in prange(num_workers):
+        visited = np.empty(n, np.bool_)
+        heap_keys = np.empty(len(targets) + 1, np.double)
+        heap_values = np.empty(len(targets) + 1, np.int64)
+        for i in range(worker, len(start_vertices), num_workers):
+            distances[i, :] = np.inf
+            dijkstra_csr_search(
+                start_vertices[i],
+                offsets,
+                targets,
+                costs,
+                travel_time,
+                use_distance,
+                distances[i],
+                visited,
+                heap_keys,
+                heap_values,
+            )
+    return distances[: len(start_vertices)]
+
+
+def construct_graph(
+    engine, n, edge_source, edge_target, edge_cost, edge_reverse_cost
+):
+    """
+    Construct the graph representation used by the selected routing engine
+    :param engine: Routing engine (csr or adjacency_list)
+    :param n: Number of nodes
+    :return: CSR arrays or adjacency list
+    """
+    if engine == ROUTING_ENGINE_CSR:
+        return construct_csr_graph(
+            n, edge_source, edge_target, edge_cost, edge_reverse_cost
+        )
+    elif engine == ROUTING_ENGINE_ADJACENCY_LIST:
+        return construct_adjacency_list_(
+            n, edge_source, edge_target, edge_cost, edge_reverse_cost
+        )
+    raise ValueError(f"Invalid routing engine: {engine}")
+
+
+def shortest_paths(
+    engine,
+    graph,
+    start_vertices,
+    travel_time,
+    use_distance=False,
+    per_origin=False,
+    out=None,
+):
+    """
+    Run a one-to-all search on a graph built by construct_graph
+    :param engine: Routing engine (csr or adjacency_list)
+    :param graph: Graph returned by construct_graph
+    :param start_vertices: List of start vertices
+    :param travel_time: Maximum cost of the search
+    :param per_origin: Return one distance array per start vertex
+    :param out: Preallocated (>= len(start_vertices), n) buffer for per-origin results (csr only)
+    :return: Distances (or one distance array per start vertex)
+    """
+    if engine == ROUTING_ENGINE_CSR:
+        offsets, targets, costs = graph
+        num_workers = get_num_threads()
+        if per_origin:
+            if out is None:
+                out = np.empty((len(start_vertices), len(offsets) - 1), np.double)
+            return dijkstra_h3_csr(
+                start_vertices,
+                offsets,
+                targets,
+                costs,
+                travel_time,
+                use_distance,
+                out,
+                num_workers,
+            )
+        return dijkstra_csr(
+            start_vertices,
+            offsets,
+            targets,
+            costs,
+            travel_time,
+            use_distance,
+            num_workers,
+        )
+    elif engine == ROUTING_ENGINE_ADJACENCY_LIST:
+        if per_origin:
+            return dijkstra_h3(start_vertices, graph, travel_time, use_distance)
+        return dijkstra(start_vertices, graph, travel_time, use_distance)
+    raise ValueError(f"Invalid routing engine: {engine}")
+
+
 @njit(cache=True)
 def array_equals(vertex, array):
     pointer = 0
@@ -497,7 +800,12 @@ def prepare_network_isochrone(edge_network_input):
     edges_cost = edge_network["cost"]
     edges_reverse_cost = edge_network["reverse_cost"]
     # time()
-    geom_address, geom_array = get_geom_array(edge_network["geom"])
+    if "geom_address" in edge_network:
+        # Geometry already flattened by the caller
+        geom_address = edge_network["geom_address"]
+        geom_array = edge_network["geom_array"]
+    else:
+        geom_address, geom_array = get_geom_array(edge_network["geom"])
     # time()
     # print(f"Convert geom array time: \t {end_time - start_time} s")
     edges_length = np.array(edge_network["length"])
@@ -678,6 +986,31 @@ def network_to_grid_h3(
     return mapped_cost
 
 
+def get_reached_network(
+    edges_target, geom_address, geom_array, distances, travel_time
+):
+    """
+    Select edges whose target was reached within the travel time
+
+    :param edges_target: Remapped edge targets
+    :param geom_address: Geometry offsets per edge
+    :param geom_array: Flattened edge coordinates
+    :param distances: Cost per node
+    :param travel_time: Travel time or distance limit
+    :return: Dictionary with cost, geom_address and geom_array of reached edges
+    """
+    edge_cost = distances[edges_target]
+    reached = (edge_cost != np.inf) & (edge_cost <= travel_time)
+    counts = np.diff(geom_address)
+    reached_address = np.zeros(int(reached.sum()) + 1, dtype=np.int64)
+    np.cumsum(counts[reached], out=reached_address[1:])
+    return {
+        "cost": edge_cost[reached],
+        "geom_address": reached_address,
+        "geom_array": geom_array[np.repeat(reached, counts)],
+    }
+
+
 def compute_isochrone(
     edge_network_input,
     start_vertices,
@@ -686,6 +1019,7 @@ def compute_isochrone(
     zoom,
     return_network: bool = True,
     is_distance_based: bool = False,
+    engine: str = ROUTING_ENGINE_CSR,
 ):
     """
     Compute isochrone for a given start vertices
@@ -693,7 +1027,8 @@ def compute_isochrone(
     :param edge_network: Edge Network DataFrame
     :param start_vertices: List of start vertices
     :param travel_time: Travel time in minutes
-    :return: R5 Grid
+    :param engine: Routing engine (csr or adjacency_list)
+    :return: R5 Grid and reached network edges
     """
     (
         edges_source,
@@ -709,11 +1044,18 @@ def compute_isochrone(
     ) = prepare_network_isochrone(edge_network_input=edge_network_input)
 
     # run dijkstra
-    adj_list = construct_adjacency_list_(
-        len(unordered_map), edges_source, edges_target, edges_cost, edges_reverse_cost
+    graph = construct_graph(
+        engine,
+        len(unordered_map),
+        edges_source,
+        edges_target,
+        edges_cost,
+        edges_reverse_cost,
     )
     start_vertices_ids = np.array([unordered_map[v] for v in start_vertices])
-    distances = dijkstra(start_vertices_ids, adj_list, travel_time, is_distance_based)
+    distances = shortest_paths(
+        engine, graph, start_vertices_ids, travel_time, is_distance_based
+    )
 
     # convert results to grid
     grid_data = network_to_grid(
@@ -731,27 +1073,11 @@ def compute_isochrone(
         is_distance_based,
     )
 
-    # Convert network to geojson
+    # Collect reached edges, with geometry kept in the flattened buffers
     if return_network is True:
-        edges_length = range(len(edges_source))
-        network = {
-            "type": "FeatureCollection",
-            "features": [
-                {
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": geom_array[
-                            geom_address[idx] : geom_address[idx + 1], :
-                        ].tolist(),
-                    },
-                    "properties": {"cost": distances[edges_target[idx]]},
-                }
-                for idx in edges_length
-                if distances[edges_target[idx]] != np.inf
-                and distances[edges_target[idx]] <= travel_time
-            ],
-        }
+        network = get_reached_network(
+            edges_target, geom_address, geom_array, distances, travel_time
+        )
     else:
         network = None
 
@@ -767,6 +1093,7 @@ def compute_isochrone_h3(
     centroid_y,
     zoom,
     is_distance_based: bool = False,
+    engine: str = ROUTING_ENGINE_CSR,
 ):
     """
     Compute isochrone for a given start vertices
@@ -774,6 +1101,7 @@ def compute_isochrone_h3(
     :param edge_network: Edge Network DataFrame
     :param start_vertices: List of start vertices
     :param travel_time: Travel time in minutes
+    :param engine: Routing engine (csr or adjacency_list)
     :return: R5 Grid
     """
     (
@@ -790,11 +1118,18 @@ def compute_isochrone_h3(
     ) = prepare_network_isochrone(edge_network_input=edge_network_input)
 
     # run dijkstra
-    adj_list = construct_adjacency_list_(
-        len(unordered_map), edges_source, edges_target, edges_cost, edges_reverse_cost
+    graph = construct_graph(
+        engine,
+        len(unordered_map),
+        edges_source,
+        edges_target,
+        edges_cost,
+        edges_reverse_cost,
     )
     start_vertices_ids = np.array([unordered_map[v] for v in start_vertices])
-    distances = dijkstra(start_vertices_ids, adj_list, travel_time, is_distance_based)
+    distances = shortest_paths(
+        engine, graph, start_vertices_ids, travel_time, is_distance_based
+    )
 
     # convert results to grid
     grid_data = network_to_grid_h3(
@@ -323,6 +323,200 @@ def calculate_jsolines(
     return geometries
 
 
+@njit
+def get_cutoff_ranks(surface, width, height, cutoffs):
+    """
+    Classify every pixel once for all (ascending) cutoffs. A pixel is below
+    cutoffs[k] exactly when its rank is <= k. Pixels at the edge of the surface
+    never are, so that isochrones always close.
+    """
+    ranks = np.searchsorted(cutoffs, surface, side="right").astype(np.int32)
+    num_cutoffs = len(cutoffs)
+    for x in range(width):
+        ranks[x] = num_cutoffs
+        ranks[(height - 1) * width + x] = num_cutoffs
+    for y in range(height):
+        ranks[y * width] = num_cutoffs
+        ranks[y * width + width - 1] = num_cutoffs
+    return ranks
+
+
+@njit
+def get_contour_index(ranks, index, width, k):
+    """
+    Marching squares index of the cell with top left pixel index, for cutoff k
+    """
+    idx = 0
+    if ranks[index] <= k:
+        idx |= 1 << 3
+    if ranks[index + 1] <= k:
+        idx |= 1 << 2
+    if ranks[index + width + 1] <= k:
+        idx |= 1 << 1
+    if ranks[index + width] <= k:
+        idx |= 1
+    return idx
+
+
+@njit
+def get_active_cells(ranks, width, height, num_cutoffs):
+    """
+    Bucket cells by the cutoffs a contour line passes through them, in scan
+    order. A cell is crossed by cutoff k if some but not all of its corners are
+    below it, i.e. min(rank) <= k < max(rank).
+    :return: Offsets per cutoff and the active cell indices
+    """
+    cWidth = width - 1
+    num_cells = cWidth * (height - 1)
+    lows = np.empty(num_cells, dtype=np.int32)
+    highs = np.empty(num_cells, dtype=np.int32)
+    counts = np.zeros(num_cutoffs + 1, dtype=np.int64)
+    for y in range(height - 1):
+        for x in range(cWidth):
+            index = y * width + x
+            topLeft = ranks[index]
+            topRight = ranks[index + 1]
+            botLeft = ranks[index + width]
+            botRight = ranks[index + width + 1]
+            low = min(min(topLeft, topRight), min(botLeft, botRight))
+            high = min(max(max(topLeft, topRight), max(botLeft, botRight)), num_cutoffs)
+            cell = y * cWidth + x
+            lows[cell] = low
+            highs[cell] = high
+            for k in range(low, high):
+                counts[k + 1] += 1
+
+    offsets = np.cumsum(counts)
+    cells = np.empty(offsets[-1], dtype=np.int64)
+    fill = offsets[:-1].copy()
+    for cell in range(num_cells):
+        for k in range(lows[cell], highs[cell]):
+            cells[fill[k]] = cell
+            fill[k] += 1
+    return offsets, cells
+
+
+@njit
+def calculate_jsolines_multi(
+    surface,
+    width,
+    height,
+    west,
+    north,
+    zoom,
+    cutoffs,
+    interpolation=True,
+    web_mercator=True,
+):
+    """
+    Same result as calculate_jsolines for ascending cutoffs, but the surface is
+    classified once for all cutoffs and rings are only traced from the cells each
+    cutoff crosses, instead of scanning the whole surface per cutoff.
+    """
+    num_cutoffs = len(cutoffs)
+    ranks = get_cutoff_ranks(surface, width, height, cutoffs)
+    offsets, active_cells = get_active_cells(ranks, width, height, num_cutoffs)
+    cWidth = width - 1
+
+    # Cells are marked as found with the cutoff number + 1, so it needs no reset
+    found = np.zeros((width - 1) * (height - 1), dtype=np.int32)
+
+    geometries = []
+    for k in range(num_cutoffs):
+        cutoff = cutoffs[k]
+        stamp = k + 1
+        warnings = []
+
+        # We'll sort out what shell goes with what hole in a bit.
+        shells = []
+        holes = []
+
+        for j in range(offsets[k], offsets[k + 1]):
+            index = active_cells[j]
+            if found[index] == stamp:
+                continue
+            origx = index % cWidth
+            origy = index // cWidth
+            idx = get_contour_index(ranks, origy * width + origx, width, k)
+
+            # Continue if it's a saddle, as we don't know which way the saddle goes.
+            if idx == 0 or idx == 5 or idx == 10 or idx == 15:
+                continue
+
+            # Follow the line, keeping the filled area to our left
+            pos = [origx, origy]
+            prev = [-1, -1]
+            start = [-1, -1]
+
+            # Track winding direction
+            direction = 0
+            coords = []
+
+            while found[index] != stamp:
+                prev = start
+                start = pos
+                idx = get_contour_index(ranks, pos[1] * width + pos[0], width, k)
+
+                # Mark as found if it's not a saddle because we expect to reach saddles twice.
+                if idx != 5 and idx != 10:
+                    found[index] = stamp
+
+                if idx == 0 or idx >= 15:
+                    warnings.append("Ran off outside of ring")
+                    break
+
+                # Follow the loop
+                pos = followLoop(idx, pos, prev)
+                index = pos[1] * cWidth + pos[0]
+
+                # Keep track of winding direction
+                direction += (pos[0] - start[0]) * (pos[1] + start[1])
+
+                # Shift exact coordinates
+                if interpolation:
+                    coord = interpolate(pos, cutoff, start, surface, width, height)
+                else:
+                    coord = noInterpolate(pos, start)
+
+                if not coord:
+                    warnings.append("Unexpected coordinate shift, discarding ring")
+                    break
+                xy = coordinate_from_pixel(
+                    [coord[0] + west, coord[1] + north],
+                    zoom=zoom,
+                    web_mercator=web_mercator,
+                )
+                coords.append(xy)
+
+                # We're back at the start of the ring
+                if pos[0] == origx and pos[1] == origy:
+                    coords.append(coords[0])  # close the ring
+                    geom = [coords]
+
+                    # Positive winding is counter clockwise, +y is down
+                    if direction > 0:
+                        shells.append(geom)
+                    else:
+                        holes.append(geom)
+                    break
+
+        # Shell game time. Sort out shells and holes.
+        for hole in holes:
+            # Only accept holes that are at least 2-dimensional.
+            if len(hole[0]) >= 3:
+                # Holes are completely contained by a single shell, checking the first coordinate is sufficient
+                holePoint = hole[0][0]
+                containingShell = []
+                for shell in shells:
+                    if pointinpolygon(holePoint[0], holePoint[1], shell[0]):
+                        containingShell.append(shell)
+                if len(containingShell) == 1:
+                    containingShell[0].append(hole[0])
+
+        geometries.append(list(shells))
+    return geometries
+
+
 @njit
 def pointinpolygon(x, y, poly):
     n = len(poly)
@@ -374,9 +568,23 @@ def jsolines(
     :return: A dictionary with full and/or incremental isolines as a geodataframe object.
     """
 
-    isochrone_multipolygon_coordinates = calculate_jsolines(
-        surface, width, height, west, north, zoom, cutoffs, interpolation, web_mercator
+    # Contours of all cutoffs are traced in one pass, which requires ascending cutoffs
+    cutoffs = np.asarray(cutoffs, dtype=np.float64)
+    order = np.argsort(cutoffs, kind="stable")
+    sorted_coordinates = calculate_jsolines_multi(
+        np.asarray(surface, dtype=np.float64),
+        width,
+        height,
+        west,
+        north,
+        zoom,
+        cutoffs[order],
+        interpolation,
+        web_mercator,
     )
+    isochrone_multipolygon_coordinates = [None] * len(cutoffs)
+    for position, cutoff_index in enumerate(order):
+        isochrone_multipolygon_coordinates[cutoff_index] = sorted_coordinates[position]
 
     result = {}
     isochrone_shapes = []
@@ -0,0 +1,205 @@
+"""
+Vectorised conversion of catchment area results into Arrow tables with WKB
+geometry, and chunked Parquet / Arrow IPC serialisation for streaming responses.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import h3
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+
+# Rows per record batch / Parquet row group when streaming results
+RESULT_BATCH_ROWS = 50000
+
+
+def compute_cost_step(
+    cost: np.ndarray, step_size: Union[float, int]
+) -> np.ndarray:
+    """Round costs up to the next step, as in the GeoJSON output."""
+
+    if step_size > 0:
+        return np.ceil(cost / step_size) * step_size
+    return cost
+
+
+def linestrings_to_wkb(geom_address: np.ndarray, geom_array: np.ndarray) -> pa.Array:
+    """Encode edges stored as offsets into a coordinate buffer as WKB linestrings."""
+
+    counts = np.diff(geom_address)
+    geoms = shapely.linestrings(
+        geom_array, indices=np.repeat(np.arange(len(counts)), counts)
+    )
+    return pa.array(shapely.to_wkb(geoms), type=pa.binary())
+
+
+def h3_cells_to_wkb(cells: List[str]) -> pa.Array:
+    """Encode H3 cell boundaries as WKB polygons with lon/lat coordinates."""
+
+    boundaries = [h3.cell_to_boundary(cell) for cell in cells]
+    counts = np.fromiter((len(b) for b in boundaries), dtype=np.int64, count=len(cells))
+    # h3 returns (lat, lon) tuples, swap into (lon, lat)
+    coords = np.array(
+        [point for boundary in boundaries for point in boundary], dtype=np.double
+    ).reshape(-1, 2)[:, ::-1]
+    rings = shapely.linearrings(
+        coords, indices=np.repeat(np.arange(len(cells)), counts)
+    )
+    return pa.array(shapely.to_wkb(shapely.polygons(rings)), type=pa.binary())
+
+
+def polygon_result_table(shapes: Any, step_size: Union[float, int]) -> pa.Table:
+    """Build the result table of a polygon catchment area from jsoline shapes."""
+
+    if shapes is None or len(shapes) == 0:
+        return pa.table(
+            {
+                "geometry": pa.array([], type=pa.binary()),
+                "minute": pa.array([], type=pa.int64()),
+                "cost_step": pa.array([], type=pa.int64()),
+            }
+        )
+
+    geoms = np.asarray(shapes["geometry"], dtype=object)
+    minutes = np.asarray(shapes["minute"], dtype=np.double)
+    # Skip empty geometries
+    valid = ~(shapely.is_missing(geoms) | shapely.is_empty(geoms))
+    geoms, minutes = geoms[valid], minutes[valid]
+    return pa.table(
+        {
+            "geometry": pa.array(shapely.to_wkb(geoms), type=pa.binary()),
+            "minute": np.rint(minutes).astype(np.int64),
+            "cost_step": np.rint(compute_cost_step(minutes, step_size)).astype(
+                np.int64
+            ),
+        }
+    )
+
+
+def network_result_table(
+    network: Optional[Dict[str, np.ndarray]], step_size: Union[float, int]
+) -> pa.Table:
+    """Build the result table of a network catchment area from reached edges."""
+
+    if network is None or len(network["cost"]) == 0:
+        return pa.table(
+            {
+                "geometry": pa.array([], type=pa.binary()),
+                "cost": pa.array([], type=pa.int64()),
+                "cost_step": pa.array([], type=pa.int64()),
+            }
+        )
+
+    cost = network["cost"]
+    return pa.table(
+        {
+            "geometry": linestrings_to_wkb(
+                network["geom_address"], network["geom_array"]
+            ),
+            "cost": np.rint(cost).astype(np.int64),
+            "cost_step": np.rint(compute_cost_step(cost, step_size)).astype(np.int64),
+        }
+    )
+
+
+def grid_result_table(
+    grid_index: Optional[List[str]],
+    grid: Optional[np.ndarray],
+    step_size: Union[float, int],
+) -> pa.Table:
+    """Build the result table of an H3 grid catchment area from reached cells."""
+
+    if grid_index is None or grid is None:
+        return pa.table(
+            {
+                "geometry": pa.array([], type=pa.binary()),
+                "h3_index": pa.array([], type=pa.string()),
+                "cost": pa.array([], type=pa.int64()),
+                "cost_step": pa.array([], type=pa.int64()),
+            }
+        )
+
+    grid = np.asarray(grid, dtype=np.double)
+    reached = np.flatnonzero(~np.isnan(grid))
+    cells = np.asarray(grid_index, dtype=object)[reached].tolist()
+    cost = grid[reached]
+    return pa.table(
+        {
+            "geometry": h3_cells_to_wkb(cells),
+            "h3_index": pa.array(cells, type=pa.string()),
+            "cost": np.rint(cost).astype(np.int64),
+            "cost_step": np.rint(compute_cost_step(cost, step_size)).astype(np.int64),
+        }
+    )
+
+
+class _ChunkSink:
+    """Write-only file collecting bytes until drained, keeping the absolute position.
+
+    Parquet footers record offsets from tell(), so the position must keep counting
+    across drained chunks.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self.position: int = 0
+        self.closed: bool = False
+
+    def write(self, data: Any) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        """Take the bytes written since the last drain."""
+
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def iter_parquet_chunks(
+    table: pa.Table, batch_rows: int = RESULT_BATCH_ROWS
+) -> Iterator[bytes]:
+    """Serialise a table as Parquet, yielding bytes as each row group is written."""
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch, row_group_size=batch_rows)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_arrow_ipc_chunks(
+    table: pa.Table, batch_rows: int = RESULT_BATCH_ROWS
+) -> Iterator[bytes]:
+    """Serialise a table as an Arrow IPC stream, yielding bytes per record batch."""
+
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def write_parquet(table: pa.Table) -> bytes:
+    """Serialise a table as Parquet bytes."""
+
+    return b"".join(iter_parquet_chunks(table))
@@ -0,0 +1,138 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+from routing.core.config import settings
+from routing.utils import print_info
+
+# Edge attributes stored for every prepared network, in the order returned to the caller
+EDGE_ARRAYS = ["id", "source", "target", "cost", "reverse_cost", "length"]
+
+
+class PreparedNetwork:
+    """Costed edges of a sub-network with flattened geometry, ready for routing.
+
+    Geometry is stored as an offsets buffer (geom_address) into an (n, 2)
+    coordinate buffer (geom_array), as used by prepare_network_isochrone.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]) -> None:
+        self.arrays: Dict[str, np.ndarray] = arrays
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the arrays of this network."""
+
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def __len__(self) -> int:
+        return len(self.arrays["id"])
+
+    def _select(self, keep: np.ndarray) -> Dict[str, np.ndarray]:
+        """Copy the edges selected by a boolean mask, along with their geometry."""
+
+        geom_address = self.arrays["geom_address"]
+        point_keep = np.repeat(keep, np.diff(geom_address))
+
+        selected: Dict[str, np.ndarray] = {
+            key: self.arrays[key][keep] for key in EDGE_ARRAYS
+        }
+        selected_address = np.zeros(int(keep.sum()) + 1, dtype=np.int64)
+        np.cumsum(np.diff(geom_address)[keep], out=selected_address[1:])
+        selected["geom_address"] = selected_address
+        selected["geom_array"] = self.arrays["geom_array"][point_keep]
+        return selected
+
+    def to_sub_network(
+        self,
+        segments_to_discard: List[int],
+        extra: Optional["PreparedNetwork"] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Produce the sub-network dictionary for a request.
+
+        Discarded segments are removed from both this network and the extra
+        (scenario and artificial) segments, which are appended at the end. The
+        returned arrays are copies, so the cached network is never modified.
+        """
+
+        discard = np.asarray(segments_to_discard, dtype=self.arrays["id"].dtype)
+        sub_network = self._select(~np.isin(self.arrays["id"], discard))
+        if extra is None or len(extra) == 0:
+            return sub_network
+
+        extra_network = extra._select(~np.isin(extra.arrays["id"], discard))
+        for key in EDGE_ARRAYS:
+            sub_network[key] = np.concatenate([sub_network[key], extra_network[key]])
+        sub_network["geom_address"] = np.concatenate(
+            [
+                sub_network["geom_address"],
+                extra_network["geom_address"][1:] + sub_network["geom_address"][-1],
+            ]
+        )
+        sub_network["geom_array"] = np.concatenate(
+            [sub_network["geom_array"], extra_network["geom_array"]]
+        )
+        return sub_network
+
+
+class PreparedNetworkCache:
+    """In-process LRU of prepared networks, bounded by a memory budget in bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes: int = max_bytes
+        self.nbytes: int = 0
+        self._networks: OrderedDict[Hashable, PreparedNetwork] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def get(self, key: Hashable) -> Optional[PreparedNetwork]:
+        """Get a prepared network, marking it as most recently used."""
+
+        network = self._networks.get(key)
+        if network is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._networks.move_to_end(key)
+        return network
+
+    def put(self, key: Hashable, network: PreparedNetwork) -> None:
+        """Add a prepared network, evicting the least recently used ones to stay within budget."""
+
+        # Networks larger than the whole budget are not worth caching
+        if network.nbytes > self.max_bytes:
+            return
+
+        if key in self._networks:
+            self.nbytes -= self._networks.pop(key).nbytes
+        self._networks[key] = network
+        self.nbytes += network.nbytes
+
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._networks.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+        if settings.ENVIRONMENT == "dev":
+            print_info(f"Prepared networks: {self.stats()}")
+
+    def clear(self) -> None:
+        """Remove all prepared networks."""
+
+        self._networks.clear()
+        self.nbytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size and hit statistics."""
+
+        return {
+            "networks": len(self._networks),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,11 +1,18 @@
+import glob
+import json
 import os
+from typing import Any, BinaryIO, Callable, Optional
 from uuid import UUID
 
 import polars as pl
+import pyarrow as pa
 from polars import DataFrame
 from routing.core.config import settings
 from routing.utils import print_warning
 
+# Bump when the on-disk layout changes, so existing caches are rebuilt
+CACHE_FORMAT_VERSION = "arrow_ipc_v1"
+
 
 class StreetNetworkCache:
     def __init__(self) -> None:
@@ -23,7 +30,7 @@ class StreetNetworkCache:
 
         return os.path.join(
             settings.CACHE_DIR,
-            f"{str(edge_layer_id)}_{str(h3_short)}_edge.parquet",
+            f"{str(edge_layer_id)}_{str(h3_short)}_edge.arrow",
         )
 
     def _get_node_cache_file_name(
@@ -35,8 +42,86 @@ class StreetNetworkCache:
 
         return os.path.join(
             settings.CACHE_DIR,
-            f"{node_layer_id}_{str(h3_short)}_node.parquet",
+            f"{node_layer_id}_{str(h3_short)}_node.arrow",
+        )
+
+    def _get_version_file_name(self, layer_id: UUID) -> str:
+        """Get version stamp file path for the specified layer."""
+
+        return os.path.join(settings.CACHE_DIR, f"{str(layer_id)}_version.json")
+
+    def get_cached_version(self, layer_id: UUID) -> Optional[str]:
+        """Get the version stamp the cache of the specified layer was built from."""
+
+        version_file = self._get_version_file_name(layer_id)
+        if not os.path.exists(version_file):
+            return None
+
+        try:
+            with open(version_file, "r") as file:
+                stamp = json.load(file)
+        except Exception:
+            return None
+
+        if stamp.get("format") != CACHE_FORMAT_VERSION:
+            return None
+        return stamp.get("version")
+
+    def validate_version(self, layer_id: UUID, version: str) -> bool:
+        """Check the cache of the specified layer against its current version.
+
+        Stale cache files are removed and the new version is stamped, so they are
+        rebuilt from the database on the next read. Returns True if the cache was valid.
+        """
+
+        if self.get_cached_version(layer_id) == version:
+            return True
+
+        if settings.ENVIRONMENT == "dev":
+            print_warning(
+                f"Street network cache for layer {layer_id} is stale, rebuilding."
+            )
+
+        for cache_file in glob.glob(
+            os.path.join(settings.CACHE_DIR, f"{str(layer_id)}_*")
+        ):
+            os.remove(cache_file)
+
+        self._write_atomic(
+            self._get_version_file_name(layer_id),
+            lambda file: file.write(
+                json.dumps(
+                    {"format": CACHE_FORMAT_VERSION, "version": version}
+                ).encode()
+            ),
         )
+        return False
+
+    def _write_atomic(
+        self, cache_file: str, write: Callable[[BinaryIO], Any]
+    ) -> None:
+        """Write a cache file via a temporary file, so readers never see partial data."""
+
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, "wb") as file:
+                write(file)
+            os.replace(temp_file, cache_file)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+    def _read_mapped(self, cache_file: str) -> DataFrame:
+        """Memory-map an Arrow IPC cache file.
+
+        Mapping is zero-copy, so frames are not kept by the cache: they are freed
+        with their last reference, e.g. when evicted from a LazyStreetNetwork.
+        """
+
+        # Arrow buffers point into the mapped file, pages are shared between processes
+        with pa.memory_map(cache_file, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        return pl.from_arrow(table, rechunk=False)
 
     def edge_cache_exists(self, edge_layer_id: UUID, h3_short: int) -> bool:
         """Check if edge data for the specified H3_3 cell is cached."""
@@ -62,8 +147,7 @@ class StreetNetworkCache:
         edge_cache_file = self._get_edge_cache_file_name(edge_layer_id, h3_short)
 
         try:
-            with open(edge_cache_file, "rb") as file:
-                edge_df = pl.read_parquet(file)
+            edge_df = self._read_mapped(edge_cache_file)
         except Exception:
             error_msg = f"Failed to read edge data for H3_3 cell {h3_short} from cache."
             raise ValueError(error_msg)
@@ -82,8 +166,7 @@ class StreetNetworkCache:
         node_cache_file = self._get_node_cache_file_name(node_layer_id, h3_short)
 
         try:
-            with open(node_cache_file, "rb") as file:
-                node_df = pl.read_parquet(file)
+            node_df = self._read_mapped(node_cache_file)
         except Exception:
             error_msg = f"Failed to read node data for H3_3 cell {h3_short} from cache."
             raise ValueError(error_msg)
@@ -103,8 +186,11 @@ class StreetNetworkCache:
         try:
             # Only write non-empty edge data into cache
             if not edge_df.is_empty():
-                with open(edge_cache_file, "wb") as file:
-                    edge_df.write_parquet(file)
+                # Uncompressed IPC files can be memory-mapped without decoding
+                self._write_atomic(
+                    edge_cache_file,
+                    lambda file: edge_df.write_ipc(file, compression="uncompressed"),
+                )
             else:
                 if settings.ENVIRONMENT == "dev":
                     print_warning(
@@ -130,8 +216,10 @@ class StreetNetworkCache:
         node_cache_file = self._get_node_cache_file_name(node_layer_id, h3_short)
 
         try:
-            with open(node_cache_file, "wb") as file:
-                node_df.write_parquet(file)
+            self._write_atomic(
+                node_cache_file,
+                lambda file: node_df.write_ipc(file, compression="uncompressed"),
+            )
         except Exception:
             # Clean up cache file if writing fails
             if os.path.exists(node_cache_file):
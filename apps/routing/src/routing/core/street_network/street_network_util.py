@@ -1,5 +1,6 @@
 import time
-from typing import Any, Dict, List, Optional, Tuple  # Import Any
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple  # Import Any
 from uuid import UUID
 
 import polars as pl
@@ -60,6 +61,30 @@ class StreetNetworkUtil:
 
         return user_id
 
+    async def _get_layer_version(self, layer_id: UUID) -> str:
+        """Get a version stamp of the specified layer, used to detect stale caches."""
+
+        try:
+            result = await self.db_connection.execute(
+                text(
+                    f"""SELECT updated_at
+                FROM {settings.CUSTOMER_SCHEMA}.layer
+                WHERE id = '{layer_id}';"""
+                )
+            )
+            fetched_row: Optional[Row[Any]] = result.fetchone()
+        except Exception as e:
+            error_msg = f"Could not fetch version for layer ID {layer_id}. Error: {e}"
+            print_error(error_msg)
+            raise ValueError(error_msg)
+
+        if fetched_row is None:
+            error_msg = f"No version found for layer ID {layer_id}."
+            print_error(error_msg)
+            raise ValueError(error_msg)
+
+        return str(fetched_row[0])
+
     async def _get_street_network_tables(
         self,
         edge_layer_id: Optional[UUID],
@@ -129,6 +154,77 @@ class StreetNetworkUtil:
 
         return h3_3_cells
 
+    def _load_edge_cell(
+        self,
+        street_network_cache: StreetNetworkCache,
+        edge_layer_id: UUID,
+        edge_table: str,
+        h3_short: int,
+    ) -> pl.DataFrame:
+        """Load edge data of a H3_3 cell from cache, or from the database if not cached."""
+
+        if street_network_cache.edge_cache_exists(edge_layer_id, h3_short):
+            edge_df = street_network_cache.read_edge_cache(edge_layer_id, h3_short)
+
+            if edge_df.is_empty():
+                error_msg = f"Edge data for H3_3 cell {h3_short} is empty or corrupted, please re-fetch."
+                raise ValueError(error_msg)
+            return edge_df
+
+        if settings.ENVIRONMENT == "dev":
+            print_info(f"Fetching street network edge data for H3_3 cell {h3_short}")
+
+        edge_df = pl.read_database_uri(
+            query=f"""
+                SELECT
+                    edge_id AS id, length_m, length_3857, class_, impedance_slope, impedance_slope_reverse,
+                    impedance_surface, CAST(coordinates_3857 AS TEXT) AS coordinates_3857, maxspeed_forward,
+                    maxspeed_backward, source, target, h3_3, h3_6
+                FROM {edge_table}
+                WHERE h3_3 = {h3_short}
+                AND layer_id = '{str(edge_layer_id)}'
+            """,
+            uri=settings.POSTGRES_DATABASE_URI,
+            schema_overrides=SEGMENT_DATA_SCHEMA,
+        )
+        edge_df = edge_df.with_columns(
+            pl.col("coordinates_3857").str.json_decode(
+                dtype=pl.List(pl.List(pl.Float64))
+            )
+        )
+
+        street_network_cache.write_edge_cache(edge_layer_id, h3_short, edge_df)
+        return edge_df
+
+    def _load_node_cell(
+        self,
+        street_network_cache: StreetNetworkCache,
+        node_layer_id: UUID,
+        node_table: str,
+        h3_short: int,
+    ) -> pl.DataFrame:
+        """Load node data of a H3_3 cell from cache, or from the database if not cached."""
+
+        if street_network_cache.node_cache_exists(node_layer_id, h3_short):
+            return street_network_cache.read_node_cache(node_layer_id, h3_short)
+
+        if settings.ENVIRONMENT == "dev":
+            print_info(f"Fetching street network node data for H3_3 cell {h3_short}")
+
+        node_df = pl.read_database_uri(
+            query=f"""
+                SELECT node_id AS id, h3_3, h3_6
+                FROM {node_table}
+                WHERE h3_3 = {h3_short}
+                AND layer_id = '{str(node_layer_id)}'
+            """,
+            uri=settings.POSTGRES_DATABASE_URI,
+            schema_overrides=CONNECTOR_DATA_SCHEMA,
+        )
+
+        street_network_cache.write_node_cache(node_layer_id, h3_short, node_df)
+        return node_df
+
     async def fetch(
         self,
         edge_layer_id: Optional[UUID],
@@ -163,76 +259,37 @@ class StreetNetworkUtil:
 
         street_network_cache = StreetNetworkCache()
 
+        # Discard cached cells built from an outdated version of the layers
+        if edge_layer_id is not None:
+            street_network_cache.validate_version(
+                edge_layer_id, await self._get_layer_version(edge_layer_id)
+            )
+        if node_layer_id is not None:
+            street_network_cache.validate_version(
+                node_layer_id, await self._get_layer_version(node_layer_id)
+            )
+
         try:
             for h3_short in street_network_region_h3_3_cells:
                 edge_df: Optional[pl.DataFrame] = None
                 node_df: Optional[pl.DataFrame] = None
 
                 if edge_layer_id is not None and street_network_edge_table is not None:
-                    if street_network_cache.edge_cache_exists(edge_layer_id, h3_short):
-                        edge_df = street_network_cache.read_edge_cache(
-                            edge_layer_id, h3_short
-                        )
-
-                        if edge_df.is_empty():
-                            error_msg = f"Edge data for H3_3 cell {h3_short} is empty or corrupted, please re-fetch."
-                            raise ValueError(error_msg)
-                    else:
-                        if settings.ENVIRONMENT == "dev":
-                            print_info(
-                                f"Fetching street network edge data for H3_3 cell {h3_short}"
-                            )
-
-                        edge_df = pl.read_database_uri(
-                            query=f"""
-                                SELECT
-                                    edge_id AS id, length_m, length_3857, class_, impedance_slope, impedance_slope_reverse,
-                                    impedance_surface, CAST(coordinates_3857 AS TEXT) AS coordinates_3857, maxspeed_forward,
-                                    maxspeed_backward, source, target, h3_3, h3_6
-                                FROM {street_network_edge_table}
-                                WHERE h3_3 = {h3_short}
-                                AND layer_id = '{str(edge_layer_id)}'
-                            """,
-                            uri=settings.POSTGRES_DATABASE_URI,
-                            schema_overrides=SEGMENT_DATA_SCHEMA,
-                        )
-                        edge_df = edge_df.with_columns(
-                            pl.col("coordinates_3857").str.json_decode(
-                                dtype=pl.List(pl.List(pl.Float64))
-                            )
-                        )
-
-                        street_network_cache.write_edge_cache(
-                            edge_layer_id, h3_short, edge_df
-                        )
+                    edge_df = self._load_edge_cell(
+                        street_network_cache,
+                        edge_layer_id,
+                        street_network_edge_table,
+                        h3_short,
+                    )
                     street_network_edge[h3_short] = edge_df
 
                 if node_layer_id is not None and street_network_node_table is not None:
-                    if street_network_cache.node_cache_exists(node_layer_id, h3_short):
-                        node_df = street_network_cache.read_node_cache(
-                            node_layer_id, h3_short
-                        )
-                    else:
-                        if settings.ENVIRONMENT == "dev":
-                            print_info(
-                                f"Fetching street network node data for H3_3 cell {h3_short}"
-                            )
-
-                        node_df = pl.read_database_uri(
-                            query=f"""
-                                SELECT node_id AS id, h3_3, h3_6
-                                FROM {street_network_node_table}
-                                WHERE h3_3 = {h3_short}
-                                AND layer_id = '{str(node_layer_id)}'
-                            """,
-                            uri=settings.POSTGRES_DATABASE_URI,
-                            schema_overrides=CONNECTOR_DATA_SCHEMA,
-                        )
-
-                        street_network_cache.write_node_cache(
-                            node_layer_id, h3_short, node_df
-                        )
-
+                    node_df = self._load_node_cell(
+                        street_network_cache,
+                        node_layer_id,
+                        street_network_node_table,
+                        h3_short,
+                    )
                     street_network_node[h3_short] = node_df
 
                 # Calculate size for both edge and node DFs if they were fetched
@@ -264,3 +321,109 @@ class StreetNetworkUtil:
         print_info(f"Street network in-memory size: {round(street_network_size, 1)} GB")
 
         return street_network_edge, street_network_node
+
+
+class LazyStreetNetwork:
+    """Street network edges loaded on demand per H3_3 cell, bounded by an LRU.
+
+    Can be used in place of the dictionary returned by StreetNetworkUtil.fetch,
+    after awaiting load() for the H3_3 cells a request touches.
+    """
+
+    def __init__(
+        self,
+        db_connection: AsyncSession,
+        edge_layer_id: UUID,
+        region_geofence: str,
+        max_cells: int,
+    ) -> None:
+        self.street_network_util = StreetNetworkUtil(db_connection)
+        self.edge_layer_id: UUID = edge_layer_id
+        self.region_geofence: str = region_geofence
+        self.max_cells: int = max_cells
+
+        self._region_cells: Optional[set[int]] = None
+        self._edge_table: Optional[str] = None
+        self._street_network_cache: Optional[StreetNetworkCache] = None
+        self._cells: OrderedDict[int, pl.DataFrame] = OrderedDict()
+        self.version: Optional[str] = None
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    async def _initialize(self) -> None:
+        """Resolve the region cells, edge table and cache version once."""
+
+        self._region_cells = set(
+            await self.street_network_util._get_street_network_region_h3_3_cells(
+                self.region_geofence
+            )
+        )
+        self._edge_table, _ = await self.street_network_util._get_street_network_tables(
+            self.edge_layer_id, None
+        )
+        self._street_network_cache = StreetNetworkCache()
+        self.version = await self.street_network_util._get_layer_version(
+            self.edge_layer_id
+        )
+        self._street_network_cache.validate_version(self.edge_layer_id, self.version)
+
+    async def load(self, h3_3_cells: Iterable[int]) -> None:
+        """Make the specified H3_3 cells resident, evicting the least recently used ones."""
+
+        if self._region_cells is None:
+            await self._initialize()
+
+        requested: set[int] = set()
+        for h3_short in h3_3_cells:
+            h3_short = int(h3_short)
+            requested.add(h3_short)
+            if h3_short in self._cells:
+                self.hits += 1
+                self._cells.move_to_end(h3_short)
+                continue
+            # Cells outside the network region are left missing for the caller to handle
+            if h3_short not in self._region_cells:  # type: ignore
+                continue
+
+            self.misses += 1
+            try:
+                self._cells[h3_short] = self.street_network_util._load_edge_cell(
+                    self._street_network_cache,  # type: ignore
+                    self.edge_layer_id,
+                    self._edge_table,  # type: ignore
+                    h3_short,
+                )
+            except Exception as e:
+                error_msg = f"Failed to fetch street network data from cache or database, error: {e}"
+                print_error(error_msg)
+                raise RuntimeError(error_msg)
+
+        # Never evict cells required by the current request
+        for h3_short in list(self._cells.keys()):
+            if len(self._cells) <= self.max_cells:
+                break
+            if h3_short in requested:
+                continue
+            del self._cells[h3_short]
+            self.evictions += 1
+
+        if settings.ENVIRONMENT == "dev":
+            print_info(f"Street network cells: {self.stats()}")
+
+    def get(self, h3_short: int) -> Optional[pl.DataFrame]:
+        """Get edge data of a resident H3_3 cell."""
+
+        return self._cells.get(int(h3_short))
+
+    def stats(self) -> Dict[str, int]:
+        """Get residency and eviction statistics."""
+
+        return {
+            "resident_cells": len(self._cells),
+            "max_cells": self.max_cells,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -8,12 +8,27 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 import h3
 import numpy as np
 import polars as pl
+import pyarrow as pa
 from redis import Redis
 from shapely.geometry import mapping
 from routing.core.config import settings
 from routing.core.isochrone import compute_isochrone, compute_isochrone_h3
 from routing.core.jsoline import generate_jsolines
-from routing.core.street_network.street_network_util import StreetNetworkUtil
+from routing.core.result_writer import (
+    compute_cost_step,
+    grid_result_table,
+    iter_arrow_ipc_chunks,
+    linestrings_to_wkb,
+    network_result_table,
+    polygon_result_table,
+    write_parquet,
+)
+from routing.core.street_network.prepared_network_cache import (
+    PreparedNetwork,
+    PreparedNetworkCache,
+)
+from routing.core.street_network.street_network_util import LazyStreetNetwork
+from routing.db.copy_writer import CopyWriter
 from routing.schemas.catchment_area import (
     BICYCLE_SPEED_FOOTWAYS,
     H3_CELL_RESOLUTION,
@@ -41,11 +56,13 @@ class CRUDCatchmentArea:
     def __init__(self, db_connection: AsyncSession, redis: Optional[Redis]) -> None:
         self.db_connection = db_connection
         self.redis = redis
-        self.routing_network: Optional[Dict[Any, pl.DataFrame]] = None
+        self.routing_network: Optional[LazyStreetNetwork] = None
+        self.prepared_network_cache: Optional[PreparedNetworkCache] = None
+        self.read_network_timings: Dict[str, float] = {}
 
     async def read_network(
         self,
-        routing_network: Dict[Any, pl.DataFrame],
+        routing_network: Union[Dict[Any, pl.DataFrame], LazyStreetNetwork],
         obj_in: Union[ICatchmentAreaActiveMobility, ICatchmentAreaCar],
         input_table: str,
         num_points: int,
@@ -85,6 +102,9 @@ class CRUDCatchmentArea:
         else:
             # Type of travel cost is CatchmentAreaDistanceCost
             buffer_dist = obj_in.travel_cost.max_distance
+        # Duration of each stage, for diagnosing slow requests
+        timings: Dict[str, float] = {}
+        stage_start: float = time.time()
         # Identify H3_3 & H3_6 cells relevant to this catchment area calculation
         h3_3_cells: set[str] = set()
         h3_6_cells: set[str] = set()
@@ -114,37 +134,73 @@ class CRUDCatchmentArea:
             h3_3_cells.add(h3_3_cell_data[0])
             for h3_6_cell in h3_3_cell_data[1]:
                 h3_6_cells.add(h3_6_cell)
-        # Get relevant segments & connectors
-        sub_network: pl.DataFrame = pl.DataFrame()
+        timings["cells"] = time.time() - stage_start
+        stage_start = time.time()
+        # Load relevant H3_3 cells if the network is loaded on demand
+        if isinstance(routing_network, LazyStreetNetwork):
+            await routing_network.load(h3_3_cells)
+        timings["load"] = time.time() - stage_start
+        stage_start = time.time()
+        # Get relevant segments & connectors, as a costed network shared by repeat requests
+        sub_dfs: List[pl.DataFrame] = []
         for h3_3 in h3_3_cells:
             sub_df: Optional[pl.DataFrame] = routing_network.get(h3_3)
             if sub_df is None:
                 raise BufferExceedsNetworkError(
                     "Catchment area buffer exceeds available H3_3 network cells."
                 )
-            sub_df = sub_df.filter(
-                pl.col("h3_6").is_in(h3_6_cells)
-                & pl.col("class_").is_in(valid_segment_classes)
+            sub_dfs.append(sub_df)
+        if not sub_dfs:
+            raise BufferExceedsNetworkError(
+                "Catchment area buffer does not cover any H3_3 network cells."
             )
-            # For active mobility routing, consider "primary" edges only if they have appropriate speed limits
-            if type(obj_in) is ICatchmentAreaActiveMobility:
+        prepared_network_key: Optional[Tuple[Any, ...]] = None
+        if self.prepared_network_cache is not None and isinstance(
+            routing_network, LazyStreetNetwork
+        ):
+            prepared_network_key = (
+                routing_network.version,
+                frozenset(h3_6_cells),
+                obj_in.routing_type,
+                type(obj_in.travel_cost).__name__,
+                getattr(obj_in.travel_cost, "speed", None),
+            )
+        prepared_network: Optional[PreparedNetwork] = None
+        if prepared_network_key is not None:
+            prepared_network = self.prepared_network_cache.get(prepared_network_key)  # type: ignore
+        if prepared_network is None:
+            filtered_dfs: List[pl.DataFrame] = []
+            for sub_df in sub_dfs:
                 sub_df = sub_df.filter(
-                    (pl.col("class_") != "primary")
-                    | (
-                        (
-                            pl.col("maxspeed_forward").is_not_null()
-                            & (pl.col("maxspeed_forward") <= 50)
-                        )
+                    pl.col("h3_6").is_in(h3_6_cells)
+                    & pl.col("class_").is_in(valid_segment_classes)
+                )
+                # For active mobility routing, consider "primary" edges only if they have appropriate speed limits
+                if type(obj_in) is ICatchmentAreaActiveMobility:
+                    sub_df = sub_df.filter(
+                        (pl.col("class_") != "primary")
                         | (
-                            pl.col("maxspeed_backward").is_not_null()
-                            & (pl.col("maxspeed_backward") <= 50)
+                            (
+                                pl.col("maxspeed_forward").is_not_null()
+                                & (pl.col("maxspeed_forward") <= 50)
+                            )
+                            | (
+                                pl.col("maxspeed_backward").is_not_null()
+                                & (pl.col("maxspeed_backward") <= 50)
+                            )
                         )
                     )
-                )
-            if sub_network.width > 0:
-                sub_network.extend(sub_df)
-            else:
-                sub_network = sub_df
+                filtered_dfs.append(sub_df)
+            prepared_network = self.prepare_sub_network(
+                pl.concat(filtered_dfs, rechunk=False), obj_in
+            )
+            if prepared_network_key is not None:
+                self.prepared_network_cache.put(prepared_network_key, prepared_network)  # type: ignore
+        timings["prepare"] = time.time() - stage_start
+        stage_start = time.time()
+        # Segments added by the scenario or as artificial segments, and segments they replace
+        extra_network: pl.DataFrame = pl.DataFrame()
+        segments_to_discard: List[int] = []
         # Produce all network modifications required to apply the specified scenario
         network_modifications_table: Optional[str] = None
         if obj_in.scenario_id:
@@ -162,7 +218,6 @@ class CRUDCatchmentArea:
             ).fetchone()[0]
         if network_modifications_table:
             # Apply network modifications to the sub-network
-            segments_to_discard: List[int] = []
             sql_get_network_modifications = text(
                 f"""
                 SELECT edit_type, id, class_, source, target,
@@ -175,46 +230,39 @@ class CRUDCatchmentArea:
             result_modifications = (
                 await self.db_connection.execute(sql_get_network_modifications)
             ).fetchall()
+            new_segments: List[Dict[str, Any]] = []
             for modification in result_modifications:
                 if modification[0] == "d":
                     segments_to_discard.append(modification[1])
                     continue
-                new_segment = pl.DataFrame(
-                    [
-                        {
-                            "id": modification[1],
-                            "length_m": modification[5],
-                            "length_3857": modification[6],
-                            "class_": modification[2],
-                            "impedance_slope": modification[8],
-                            "impedance_slope_reverse": modification[9],
-                            "impedance_surface": modification[10],
-                            "coordinates_3857": modification[7],
-                            "maxspeed_forward": modification[11],
-                            "maxspeed_backward": modification[12],
-                            "source": modification[3],
-                            "target": modification[4],
-                            "h3_3": modification[13],
-                            "h3_6": modification[14],
-                        }
-                    ],
-                    schema_overrides=SEGMENT_DATA_SCHEMA,  # type: ignore
-                )
-                new_segment = new_segment.with_columns(
-                    pl.col("coordinates_3857").str.json_decode(
-                        dtype=pl.List(pl.List(pl.Float64))
-                    )
+                new_segments.append(
+                    {
+                        "id": modification[1],
+                        "length_m": modification[5],
+                        "length_3857": modification[6],
+                        "class_": modification[2],
+                        "impedance_slope": modification[8],
+                        "impedance_slope_reverse": modification[9],
+                        "impedance_surface": modification[10],
+                        "coordinates_3857": modification[7],
+                        "maxspeed_forward": modification[11],
+                        "maxspeed_backward": modification[12],
+                        "source": modification[3],
+                        "target": modification[4],
+                        # The query selects h3_6 before h3_3
+                        "h3_3": modification[14],
+                        "h3_6": modification[13],
+                    }
                 )
-                sub_network.extend(new_segment)
-            # Remove segments which are deleted or modified due to the scenario
-            sub_network = sub_network.filter(~pl.col("id").is_in(segments_to_discard))
+            extra_network = self.extend_sub_network(extra_network, new_segments)
+        timings["modifications"] = time.time() - stage_start
+        stage_start = time.time()
         # Create necessary artifical segments and add them to our sub network
         origin_point_connectors: List[int] = []
         origin_point_cell_index: List[
             str
         ] = []  # H3 index at specified resolution (e.g., H3_10)
         origin_point_h3_3: List[int] = []  # Short H3_3 index
-        segments_to_discard = []
         additional_filters: str = ""
         if type(obj_in) is ICatchmentAreaActiveMobility:
             additional_filters = "AND (class_ != ''primary'' OR s.maxspeed_forward <= 50 OR s.maxspeed_backward <= 50)"
@@ -242,6 +290,7 @@ class CRUDCatchmentArea:
         result_artificial_segments = (
             await self.db_connection.execute(sql_get_artificial_segments)
         ).fetchall()  # TODO Check if artificial segments are even required for car routing
+        artificial_segments: List[Dict[str, Any]] = []
         for a_seg in result_artificial_segments:
             if (
                 a_seg[0] is not None
@@ -250,39 +299,59 @@ class CRUDCatchmentArea:
                 origin_point_cell_index.append(a_seg[16])  # type: ignore
                 origin_point_h3_3.append(a_seg[17])  # type: ignore
                 segments_to_discard.append(a_seg[1])
-            new_df = pl.DataFrame(
-                [
-                    {
-                        "id": a_seg[2],
-                        "length_m": a_seg[3],
-                        "length_3857": a_seg[4],
-                        "class_": a_seg[5],
-                        "impedance_slope": a_seg[6],
-                        "impedance_slope_reverse": a_seg[7],
-                        "impedance_surface": a_seg[8],
-                        "coordinates_3857": a_seg[9],
-                        "maxspeed_forward": a_seg[10],
-                        "maxspeed_backward": a_seg[11],
-                        "source": a_seg[12],
-                        "target": a_seg[13],
-                        "h3_3": a_seg[14],
-                        "h3_6": a_seg[15],
-                    }
-                ],
-                schema_overrides=SEGMENT_DATA_SCHEMA,  # type: ignore
-            )
-            new_df = new_df.with_columns(
-                pl.col("coordinates_3857").str.json_decode(
-                    dtype=pl.List(pl.List(pl.Float64))
-                )
+            artificial_segments.append(
+                {
+                    "id": a_seg[2],
+                    "length_m": a_seg[3],
+                    "length_3857": a_seg[4],
+                    "class_": a_seg[5],
+                    "impedance_slope": a_seg[6],
+                    "impedance_slope_reverse": a_seg[7],
+                    "impedance_surface": a_seg[8],
+                    "coordinates_3857": a_seg[9],
+                    "maxspeed_forward": a_seg[10],
+                    "maxspeed_backward": a_seg[11],
+                    "source": a_seg[12],
+                    "target": a_seg[13],
+                    "h3_3": a_seg[14],
+                    "h3_6": a_seg[15],
+                }
             )
-            sub_network.extend(new_df)
+        extra_network = self.extend_sub_network(extra_network, artificial_segments)
+        timings["artificial_segments"] = time.time() - stage_start
+        stage_start = time.time()
         if len(origin_point_connectors) == 0:
             raise DisconnectedOriginError(
                 "Starting point(s) are disconnected from the street network."
             )
-        # Remove segments which are replaced by artificial segments or modified due to the scenario
-        sub_network = sub_network.filter(~pl.col("id").is_in(segments_to_discard))
+        # Compute cost of the added segments and merge them into the prepared network,
+        # removing segments which are replaced by artificial segments or modified due to the scenario
+        sub_network_dict: Dict[str, np.ndarray] = prepared_network.to_sub_network(
+            segments_to_discard,
+            self.prepare_sub_network(extra_network, obj_in)
+            if extra_network.height > 0
+            else None,
+        )
+        timings["merge"] = time.time() - stage_start
+        self.read_network_timings = timings
+        print(
+            "Network read stages: "
+            + ", ".join(f"{k} {round(v, 3)} sec" for k, v in timings.items())
+        )
+        return (
+            sub_network_dict,
+            network_modifications_table,  # type: ignore
+            origin_point_connectors,
+            origin_point_cell_index,
+            origin_point_h3_3,
+        )
+
+    def prepare_sub_network(
+        self,
+        sub_network: pl.DataFrame,
+        obj_in: Union[ICatchmentAreaActiveMobility, ICatchmentAreaCar],
+    ) -> PreparedNetwork:
+        """Compute segment cost and flatten geometry of the sub-network."""
         # Replace all NULL values in the impedance columns with 0
         sub_network = sub_network.with_columns(pl.col("impedance_surface").fill_null(0))
         # Compute cost for each segment
@@ -307,23 +376,58 @@ class CRUDCatchmentArea:
                 pl.col("length_m").alias("cost"),
                 pl.col("length_m").alias("reverse_cost"),
             )
-        # Select columns required for computing catchment area and convert to dictionary of numpy arrays
-        sub_network_dict: Dict[str, np.ndarray] = {
-            "id": sub_network.get_column("id").to_numpy().copy(),
-            "source": sub_network.get_column("source").to_numpy().copy(),
-            "target": sub_network.get_column("target").to_numpy().copy(),
-            "cost": sub_network.get_column("cost").to_numpy().copy(),
-            "reverse_cost": sub_network.get_column("reverse_cost").to_numpy().copy(),
-            "length": sub_network.get_column("length_3857").to_numpy().copy(),
-            "geom": sub_network.get_column("coordinates_3857").to_numpy().copy(),
-        }
-        return (
-            sub_network_dict,
-            network_modifications_table,  # type: ignore
-            origin_point_connectors,
-            origin_point_cell_index,
-            origin_point_h3_3,
+        # Select columns required for computing catchment area and convert to numpy arrays
+        geom_address, geom_array = self.flatten_geometry(
+            sub_network.get_column("coordinates_3857")
+        )
+        return PreparedNetwork(
+            {
+                "id": sub_network.get_column("id").to_numpy().copy(),
+                "source": sub_network.get_column("source").to_numpy().copy(),
+                "target": sub_network.get_column("target").to_numpy().copy(),
+                "cost": sub_network.get_column("cost").to_numpy().copy(),
+                "reverse_cost": sub_network.get_column("reverse_cost")
+                .to_numpy()
+                .copy(),
+                "length": sub_network.get_column("length_3857").to_numpy().copy(),
+                "geom_address": geom_address,
+                "geom_array": geom_array,
+            }
+        )
+
+    def extend_sub_network(
+        self, sub_network: pl.DataFrame, segments: List[Dict[str, Any]]
+    ) -> pl.DataFrame:
+        """Append segments read from the database to the sub-network in one batch."""
+        if not segments:
+            return sub_network
+        new_df = pl.DataFrame(
+            segments,
+            schema_overrides=SEGMENT_DATA_SCHEMA,  # type: ignore
+        )
+        new_df = new_df.with_columns(
+            pl.col("coordinates_3857").str.json_decode(
+                dtype=pl.List(pl.List(pl.Float64))
+            )
+        )
+        if sub_network.width == 0:
+            return new_df
+        return pl.concat(
+            [sub_network, new_df.select(sub_network.columns)],
+            how="vertical_relaxed",
+            rechunk=False,
+        )
+
+    def flatten_geometry(
+        self, coordinates: pl.Series
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Flatten edge coordinates into an offsets buffer and a (n, 2) coordinate buffer."""
+        geom_address = np.zeros(len(coordinates) + 1, dtype=np.int64)
+        np.cumsum(coordinates.list.len().to_numpy(), out=geom_address[1:])
+        geom_array = (
+            coordinates.explode().explode().to_numpy().astype(np.double).reshape(-1, 2)
         )
+        return geom_address, geom_array
 
     async def create_input_table(
         self, obj_in: Union[ICatchmentAreaActiveMobility, ICatchmentAreaCar]
@@ -583,25 +687,32 @@ class CRUDCatchmentArea:
             return {"type": "FeatureCollection", "features": features}
 
         elif obj_in.catchment_area_type == "network":
-            # Network data is already in GeoJSON-like format
+            # Network data holds reached edges with flattened geometry
             if network is None:
                 return {"type": "FeatureCollection", "features": []}
             # Add step-rounded cost to each feature
-            features = []
-            for feature in network.get("features", []):
-                cost = feature.get("properties", {}).get("cost", 0)
-                rounded_cost = (
-                    math.ceil(cost / step_size) * step_size if step_size > 0 else cost
-                )
-                new_feature = {
+            costs: np.ndarray = network["cost"]
+            cost_steps: np.ndarray = np.rint(
+                compute_cost_step(costs, step_size)
+            ).astype(np.int64)
+            geom_address: np.ndarray = network["geom_address"]
+            geom_array: np.ndarray = network["geom_array"]
+            features = [
+                {
                     "type": "Feature",
-                    "geometry": feature.get("geometry"),
+                    "geometry": {
+                        "type": "LineString",
+                        "coordinates": geom_array[
+                            geom_address[idx] : geom_address[idx + 1], :
+                        ].tolist(),
+                    },
                     "properties": {
-                        **feature.get("properties", {}),
-                        "cost_step": round(rounded_cost),
+                        "cost": float(costs[idx]),
+                        "cost_step": int(cost_steps[idx]),
                     },
                 }
-                features.append(new_feature)
+                for idx in range(len(costs))
+            ]
             return {"type": "FeatureCollection", "features": features}
 
         else:  # rectangular_grid
@@ -638,17 +749,15 @@ class CRUDCatchmentArea:
                 )
             return {"type": "FeatureCollection", "features": features}
 
-    def format_result_parquet(
+    def format_result_table(
         self,
         obj_in: Union[ICatchmentAreaActiveMobility, ICatchmentAreaCar],
         shapes: Any,
         network: Any,
         grid_index: Optional[List[str]],
         grid: Optional[np.ndarray],
-    ) -> bytes:
-        """Format the catchment area result as Parquet bytes."""
-        import io
-
+    ) -> pa.Table:
+        """Format the catchment area result as an Arrow table with WKB geometry."""
         # Compute step size for the catchment area
         step_size: Union[float, int]
         if type(obj_in.travel_cost) in [
@@ -660,101 +769,28 @@ class CRUDCatchmentArea:
             step_size = obj_in.travel_cost.max_distance / obj_in.travel_cost.steps
 
         if obj_in.catchment_area_type == "polygon":
-            if shapes is None:
-                df = pl.DataFrame({"geometry": [], "minute": [], "cost_step": []})
-            else:
-                # Use incremental shapes if polygon_difference is True, otherwise use full
-                shapes_key = "incremental" if obj_in.polygon_difference else "full"
-                shapes_data = shapes[shapes_key]
-                rows = []
-                for i in shapes_data.index:
-                    geom = shapes_data["geometry"][i]
-                    # Skip empty geometries
-                    if geom is None or geom.is_empty:
-                        continue
-                    # Convert Shapely geometry to WKT string
-                    geom_wkt = geom.wkt if hasattr(geom, "wkt") else str(geom)
-                    minute: Union[float, int] = shapes_data["minute"][i]
-                    cost_step = (
-                        math.ceil(minute / step_size) * step_size
-                        if step_size > 0
-                        else minute
-                    )
-                    rows.append(
-                        {
-                            "geometry": geom_wkt,
-                            "minute": round(minute),
-                            "cost_step": round(cost_step),
-                        }
-                    )
-                df = pl.DataFrame(rows)
-
+            # Use incremental shapes if polygon_difference is True, otherwise use full
+            shapes_key = "incremental" if obj_in.polygon_difference else "full"
+            return polygon_result_table(
+                shapes[shapes_key] if shapes is not None else None, step_size
+            )
         elif obj_in.catchment_area_type == "network":
-            if network is None or not network.get("features"):
-                df = pl.DataFrame({"geometry": [], "cost": [], "cost_step": []})
-            else:
-                rows = []
-                for feature in network.get("features", []):
-                    coords = feature.get("geometry", {}).get("coordinates", [])
-                    cost = feature.get("properties", {}).get("cost", 0)
-                    cost_step = (
-                        math.ceil(cost / step_size) * step_size
-                        if step_size > 0
-                        else cost
-                    )
-                    # Convert coordinates to WKT LineString
-                    if coords:
-                        points = ", ".join(f"{c[0]} {c[1]}" for c in coords)
-                        geom_wkt = f"LINESTRING({points})"
-                    else:
-                        geom_wkt = ""
-                    rows.append(
-                        {
-                            "geometry": geom_wkt,
-                            "cost": round(cost),
-                            "cost_step": round(cost_step),
-                        }
-                    )
-                df = pl.DataFrame(rows)
-
+            return network_result_table(network, step_size)
         else:  # rectangular_grid (h3_grid)
-            if grid_index is None or grid is None:
-                df = pl.DataFrame(
-                    {"geometry": [], "h3_index": [], "cost": [], "cost_step": []}
-                )
-            else:
-                rows = []
-                for i, h3_idx in enumerate(grid_index):
-                    if math.isnan(grid[i]):
-                        continue
-                    cost = grid[i]
-                    cost_step = (
-                        math.ceil(cost / step_size) * step_size
-                        if step_size > 0
-                        else cost
-                    )
-                    # Get H3 cell boundary and convert to WKT polygon
-                    boundary = h3.cell_to_boundary(h3_idx)
-                    # h3 returns (lat, lon) tuples, WKT needs lon lat
-                    # Close the ring by repeating the first point
-                    points = [f"{pt[1]} {pt[0]}" for pt in boundary]
-                    points.append(points[0])  # Close the polygon ring
-                    geom_wkt = f"POLYGON(({', '.join(points)}))"
-                    rows.append(
-                        {
-                            "geometry": geom_wkt,
-                            "h3_index": h3_idx,
-                            "cost": round(cost),
-                            "cost_step": round(cost_step),
-                        }
-                    )
-                df = pl.DataFrame(rows)
+            return grid_result_table(grid_index, grid, step_size)
 
-        # Write to bytes buffer
-        buffer = io.BytesIO()
-        df.write_parquet(buffer)
-        buffer.seek(0)
-        return buffer.read()
+    def format_result_parquet(
+        self,
+        obj_in: Union[ICatchmentAreaActiveMobility, ICatchmentAreaCar],
+        shapes: Any,
+        network: Any,
+        grid_index: Optional[List[str]],
+        grid: Optional[np.ndarray],
+    ) -> bytes:
+        """Format the catchment area result as Parquet bytes."""
+        return write_parquet(
+            self.format_result_table(obj_in, shapes, network, grid_index, grid)
+        )
 
     async def save_result(
         self,
@@ -827,101 +863,77 @@ class CRUDCatchmentArea:
                 ) from e
         elif obj_in.catchment_area_type == "network":
             # Save catchment area network data
-            # Assuming network is a dictionary with a 'features' key that points to a list of dicts.
+            # Network holds the cost and flattened geometry of reached edges
             if network is None:
                 raise ValueError(
                     "Network data is required for 'network' catchment area type."
                 )
-            for batch_index in range(
-                0, len(network["features"]), settings.DATA_INSERT_BATCH_SIZE
-            ):
-                insert_string = ""
-                for i in range(
-                    batch_index,
-                    min(
-                        len(network["features"]),
-                        batch_index + settings.DATA_INSERT_BATCH_SIZE,
-                    ),
-                ):
-                    coordinates: List[List[float]] = network["features"][i]["geometry"][
-                        "coordinates"
-                    ]
-                    cost: float = (
-                        math.ceil(
-                            network["features"][i]["properties"]["cost"] / step_size
-                        )
-                        * step_size
-                    )
-                    points_string: str = ""
-                    for pair in coordinates:
-                        points_string += f"ST_MakePoint({pair[0]}, {pair[1]}),"
-                    insert_string += f"""(
-                        '{obj_in.layer_id}',
-                        ST_Transform(ST_SetSRID(ST_MakeLine(ARRAY[{points_string.rstrip(',')}]), 3857), 4326),
-                        {round(cost)}
-                    ),"""
-                # Check if insert_string is not empty before attempting to insert
-                if insert_string:
-                    insert_command = text(
-                        f"""
-                        INSERT INTO {obj_in.result_table} (layer_id, geom, integer_attr1)
-                        VALUES {insert_string.rstrip(",")};
-                    """
-                    )
-                    try:
-                        await self.db_connection.execute(insert_command)
-                        await self.db_connection.commit()
-                    except Exception as e:
-                        raise Exception(
-                            f"Error inserting into table {obj_in.result_table}: {str(e).splitlines()[:5]}"
-                        ) from e
+            writer = CopyWriter(
+                self.db_connection,
+                staging_table="catchment_area_network_staging",
+                staging_columns=[("geom", "bytea"), ("cost", "integer")],
+                insert_sql=f"""
+                    INSERT INTO {obj_in.result_table} (layer_id, geom, integer_attr1)
+                    SELECT '{obj_in.layer_id}', ST_Transform(ST_SetSRID(ST_GeomFromWKB(geom), 3857), 4326), cost
+                    FROM {{staging_table}};
+                """,
+            )
+            geoms: pa.Array = linestrings_to_wkb(
+                network["geom_address"], network["geom_array"]
+            )
+            costs: np.ndarray = np.rint(
+                compute_cost_step(network["cost"], step_size)
+            ).astype(np.int64)
+            try:
+                await writer.write(zip(geoms.to_pylist(), costs.tolist()))
+                await writer.flush()
+            except Exception as e:
+                raise Exception(
+                    f"Error inserting into table {obj_in.result_table}: {str(e).splitlines()[:5]}"
+                ) from e
         else:  # obj_in.catchment_area_type == "rectangular_grid"
             # Save catchment area grid data
             if grid_index is None or grid is None:
                 raise ValueError(
                     "Grid index and grid data are required for 'rectangular_grid' catchment area type."
                 )
-            for batch_index in range(
-                0, len(grid_index), settings.DATA_INSERT_BATCH_SIZE
-            ):
-                insert_string = ""
-                for i in range(
-                    batch_index,
-                    min(len(grid_index), batch_index + settings.DATA_INSERT_BATCH_SIZE),
-                ):
-                    if math.isnan(grid[i]):
-                        continue
-                    cost = math.ceil(grid[i] / step_size) * step_size
-                    insert_string += f"""(
-                        '{obj_in.layer_id}',
-                        ST_SetSRID(h3_cell_to_boundary('{grid_index[i]}'::h3index)::geometry, 4326),
-                        '{grid_index[i]}',
-                        {round(cost)}
-                    ),"""
-                # Insert only if any grid data was added to the query in this batch
-                if insert_string:
-                    insert_command = text(
-                        f"""
-                        INSERT INTO {obj_in.result_table} (layer_id, geom, text_attr1, integer_attr1)
-                        VALUES {insert_string.rstrip(",")};
-                    """
+            writer = CopyWriter(
+                self.db_connection,
+                staging_table="catchment_area_grid_staging",
+                staging_columns=[("h3_index", "text"), ("cost", "integer")],
+                insert_sql=f"""
+                    INSERT INTO {obj_in.result_table} (layer_id, geom, text_attr1, integer_attr1)
+                    SELECT '{obj_in.layer_id}', ST_SetSRID(h3_cell_to_boundary(h3_index::h3index)::geometry, 4326), h3_index, cost
+                    FROM {{staging_table}};
+                """,
+            )
+            grid = np.asarray(grid, dtype=np.double)
+            reached: np.ndarray = np.flatnonzero(~np.isnan(grid))
+            costs = np.rint(compute_cost_step(grid[reached], step_size)).astype(
+                np.int64
+            )
+            try:
+                await writer.write(
+                    zip(
+                        np.asarray(grid_index, dtype=object)[reached].tolist(),
+                        costs.tolist(),
                     )
-                    try:
-                        await self.db_connection.execute(insert_command)
-                        await self.db_connection.commit()
-                    except Exception as e:
-                        raise Exception(
-                            f"Error inserting into table {obj_in.result_table}: {str(e).splitlines()[:5]}"
-                        ) from e
+                )
+                await writer.flush()
+            except Exception as e:
+                raise Exception(
+                    f"Error inserting into table {obj_in.result_table}: {str(e).splitlines()[:5]}"
+                ) from e
 
     async def run(
-        self, obj_in_dict: Dict[str, Any]
-    ) -> Union[Dict[str, Any], bytes, None]:
+        self, obj_in_dict: Dict[str, Any], as_table: bool = False
+    ) -> Union[Dict[str, Any], bytes, pa.Table, None]:
         """Compute catchment areas for the given request parameters.
 
         Returns:
             - Dict[str, Any]: GeoJSON result if output_format is 'geojson'
-            - bytes: Parquet bytes if output_format is 'parquet'
+            - bytes: Parquet bytes if output_format is 'parquet', Arrow IPC stream bytes if 'arrow'
+            - pa.Table: Arrow table for 'parquet' or 'arrow' if as_table is True, for streaming
             - None: If there's an error
         """
         obj_in: Union[ICatchmentAreaActiveMobility, ICatchmentAreaCar]
@@ -929,14 +941,20 @@ class CRUDCatchmentArea:
             obj_in = ICatchmentAreaActiveMobility(**obj_in_dict)
         else:
             obj_in = ICatchmentAreaCar(**obj_in_dict)
-        # Fetch routing network (processed segments) and load into memory
+        # Routing network (processed segments) is loaded into memory per H3_3 cell on demand
         if self.routing_network is None:
-            self.routing_network, _ = await StreetNetworkUtil(self.db_connection).fetch(
+            self.routing_network = LazyStreetNetwork(
+                self.db_connection,
                 edge_layer_id=settings.BASE_STREET_NETWORK,
-                node_layer_id=None,
                 region_geofence=f"SELECT * FROM {settings.NETWORK_REGION_TABLE}",
+                max_cells=settings.NETWORK_MAX_RESIDENT_CELLS,
+            )
+        routing_network: LazyStreetNetwork = self.routing_network
+        # Costed sub-networks are reused by requests covering the same cells with the same mode
+        if self.prepared_network_cache is None:
+            self.prepared_network_cache = PreparedNetworkCache(
+                max_bytes=settings.PREPARED_NETWORK_CACHE_MAX_BYTES
             )
-        routing_network: Dict[Any, pl.DataFrame] = self.routing_network
         total_start: float = time.time()
         # Read & process routing network to extract relevant sub-network
         start_time: float = time.time()
@@ -1018,6 +1036,7 @@ class CRUDCatchmentArea:
                     speed=speed,
                     zoom=zoom,
                     is_distance_based=(not is_travel_time_catchment_area),
+                    engine=settings.ROUTING_ENGINE,
                 )
             else:
                 (
@@ -1042,6 +1061,7 @@ class CRUDCatchmentArea:
                     centroid_y=h3_centroid_y,
                     zoom=zoom,
                     is_distance_based=(not is_travel_time_catchment_area),
+                    engine=settings.ROUTING_ENGINE,
                 )
             print("Computed catchment area grid & network.")
             if obj_in.catchment_area_type == "polygon":
@@ -1070,16 +1090,22 @@ class CRUDCatchmentArea:
         )
         # Format and return results based on output_format
         start_time = time.time()
-        result: Union[Dict[str, Any], bytes, None] = None
+        result: Union[Dict[str, Any], bytes, pa.Table, None] = None
         try:
-            if obj_in.output_format == OutputFormat.parquet:
-                result = self.format_result_parquet(
+            if obj_in.output_format in [OutputFormat.parquet, OutputFormat.arrow]:
+                result = self.format_result_table(
                     obj_in,
                     catchment_area_shapes,
                     catchment_area_network,
                     catchment_area_grid_index,
                     catchment_area_grid,
                 )
+                if not as_table:
+                    result = (
+                        write_parquet(result)
+                        if obj_in.output_format == OutputFormat.parquet
+                        else b"".join(iter_arrow_ipc_chunks(result))
+                    )
             else:
                 # Default to GeoJSON format
                 result = self.format_result(
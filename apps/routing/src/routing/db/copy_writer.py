@@ -0,0 +1,110 @@
+import time
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from routing.core.config import settings
+from routing.utils import print_info
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class CopyWriter:
+    """Bulk writer loading rows into a staging table via binary COPY.
+
+    Rows are buffered until the batch size is reached, then copied into a
+    temporary staging table and moved into the target table with a single
+    INSERT ... SELECT, so no SQL is generated per row.
+    """
+
+    def __init__(
+        self,
+        db_connection: AsyncSession,
+        staging_table: str,
+        staging_columns: Sequence[Tuple[str, str]],
+        insert_sql: str,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        """Initialize the writer.
+
+        :param db_connection: Session the rows are written with.
+        :param staging_table: Name of the temporary staging table.
+        :param staging_columns: Column names and Postgres types of the staging table.
+        :param insert_sql: Statement moving staged rows into the target table, where
+            the {staging_table} placeholder is replaced by the staging table name.
+        :param batch_size: Rows buffered before they are written, defaults to COPY_BATCH_SIZE.
+        """
+
+        self.db_connection: AsyncSession = db_connection
+        self.staging_table: str = staging_table
+        self.staging_columns: Sequence[Tuple[str, str]] = staging_columns
+        self.insert_sql: str = insert_sql
+        self.batch_size: int = batch_size or settings.COPY_BATCH_SIZE
+
+        self.rows: List[Tuple[Any, ...]] = []
+        self.rows_written: int = 0
+        self.write_time: float = 0.0
+
+    @property
+    def num_rows_queued(self) -> int:
+        return len(self.rows)
+
+    @property
+    def throughput(self) -> float:
+        """Rows written per second spent writing."""
+
+        if self.write_time == 0:
+            return 0.0
+        return self.rows_written / self.write_time
+
+    async def write(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        """Queue rows, writing full batches to the database."""
+
+        self.rows.extend(rows)
+        if len(self.rows) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write all queued rows to the database and commit."""
+
+        if not self.rows:
+            return
+
+        start_time = time.time()
+        column_definitions = ", ".join(
+            f"{name} {type_}" for name, type_ in self.staging_columns
+        )
+        await self.db_connection.execute(
+            text(
+                f"""
+                CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} (
+                    {column_definitions}
+                ) ON COMMIT DELETE ROWS;
+            """
+            )
+        )
+
+        # Use the driver connection of the session's current transaction for COPY
+        connection = await self.db_connection.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection: Any = raw_connection.driver_connection
+        column_names = ", ".join(name for name, _ in self.staging_columns)
+        async with driver_connection.cursor() as cursor:
+            async with cursor.copy(
+                f"COPY {self.staging_table} ({column_names}) FROM STDIN (FORMAT BINARY)"
+            ) as copy:
+                copy.set_types([type_ for _, type_ in self.staging_columns])
+                for row in self.rows:
+                    await copy.write_row(row)
+
+        await self.db_connection.execute(
+            text(self.insert_sql.replace("{staging_table}", self.staging_table))
+        )
+        await self.db_connection.commit()
+
+        self.rows_written += len(self.rows)
+        self.rows = []
+        self.write_time += time.time() - start_time
+
+        if settings.ENVIRONMENT == "dev":
+            print_info(
+                f"Wrote {self.rows_written} rows into {self.staging_table}, {round(self.throughput)} rows/sec"
+            )
@@ -1,8 +1,9 @@
 import json
 
 from fastapi import APIRouter, Body
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from routing.core.config import settings
+from routing.core.result_writer import iter_arrow_ipc_chunks, iter_parquet_chunks
 from routing.crud.crud_catchment_area import CRUDCatchmentArea
 from routing.db.session import async_session
 from routing.schemas.catchment_area import (
@@ -70,7 +71,9 @@ async def compute_catchment_area(
     try:
         crud = get_crud_catchment_area()
         params_dict = json.loads(params.model_dump_json())
-        result = await crud.run(params_dict)
+        # Binary results are kept as an Arrow table and serialised while streaming
+        stream_result = params.output_format in [OutputFormat.parquet, OutputFormat.arrow]
+        result = await crud.run(params_dict, as_table=stream_result)
 
         if result is None:
             return JSONResponse(
@@ -81,14 +84,23 @@ async def compute_catchment_area(
             )
 
         if params.output_format == OutputFormat.parquet:
-            # Return Parquet bytes
-            return Response(
-                content=result,
+            # Stream Parquet row groups
+            return StreamingResponse(
+                iter_parquet_chunks(result),
                 media_type="application/octet-stream",
                 headers={
                     "Content-Disposition": "attachment; filename=catchment_area.parquet"
                 },
             )
+        elif params.output_format == OutputFormat.arrow:
+            # Stream Arrow IPC record batches
+            return StreamingResponse(
+                iter_arrow_ipc_chunks(result),
+                media_type="application/vnd.apache.arrow.stream",
+                headers={
+                    "Content-Disposition": "attachment; filename=catchment_area.arrows"
+                },
+            )
         else:
             # Return GeoJSON
             return JSONResponse(
@@ -1,14 +1,20 @@
-from concurrent.futures import ProcessPoolExecutor
-from typing import List, Tuple
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Set, Tuple, Union
 
+import numba
 import psycopg
 from routing.core.config import settings
+from routing.core.street_network.street_network_util import StreetNetworkUtil
+from routing.db.session import async_engine, async_session
 from routing.preparation.heatmap_matrix_process import HeatmapMatrixProcess
 from routing.schemas.catchment_area import (
     CatchmentAreaRoutingTypeActiveMobility,
     CatchmentAreaRoutingTypeCar,
 )
-from routing.utils import print_info
+from routing.utils import print_error, print_info
 
 """
     Instructions for use:
@@ -21,8 +27,101 @@ from routing.utils import print_info
     7. Run the preparation script via the pre-defined launch config.
 
     Note: Each process currently takes a long time to process its first H3_6 cell, subsequent cells are much faster.
+
+    Cells are handed out to worker processes one at a time, and each completed cell is recorded
+    in a progress table next to the matrix table. An interrupted run is resumed by running the
+    script again with REPLACE_EXISTING_TABLE set to False.
 """
 
+# Heatmap matrix process of the current worker, set up once per worker process
+_worker_process: Optional[HeatmapMatrixProcess] = None
+
+
+def _initialize_worker(
+    region_geofence: str,
+    routing_type: Union[
+        CatchmentAreaRoutingTypeActiveMobility, CatchmentAreaRoutingTypeCar
+    ],
+    num_workers: int,
+) -> None:
+    """Set up the heatmap matrix process of a worker."""
+
+    global _worker_process
+
+    # Forked workers must not reuse pooled connections of the parent's engine
+    async_engine.sync_engine.dispose(close=False)
+
+    # Share the available cores between processes for the parallel searches
+    numba.set_num_threads(max(1, (os.cpu_count() or 1) // num_workers))
+    _worker_process = HeatmapMatrixProcess(
+        thread_id=os.getpid(),
+        chunk=[],
+        region_geofence=region_geofence,
+        routing_type=routing_type,
+    )
+    _worker_process.setup()
+
+
+def _process_cell(h3_6_index: str) -> Tuple[str, int, float, Optional[str]]:
+    """Process a single H3_6 cell in a worker, returning its outcome instead of raising."""
+
+    start_time = time.time()
+    try:
+        num_rows = _worker_process.process_cell(h3_6_index)  # type: ignore
+        return h3_6_index, num_rows, time.time() - start_time, None
+    except Exception as e:
+        _worker_process.event_loop.run_until_complete(  # type: ignore
+            _worker_process.db_connection.rollback()  # type: ignore
+        )
+        return h3_6_index, 0, time.time() - start_time, str(e)
+
+
+class HeatmapMatrixProgress:
+    """Progress and throughput of the cells of a region."""
+
+    def __init__(self, region: str, num_cells: int) -> None:
+        self.region: str = region
+        self.num_cells: int = num_cells
+        self.num_completed: int = 0
+        self.num_rows: int = 0
+        self.failed_cells: List[str] = []
+        self.start_time: float = time.time()
+
+    @property
+    def num_processed(self) -> int:
+        return self.num_completed + len(self.failed_cells)
+
+    def update(
+        self, h3_6_index: str, num_rows: int, error: Optional[str]
+    ) -> None:
+        """Record the outcome of a cell."""
+
+        if error is not None:
+            self.failed_cells.append(h3_6_index)
+            print_error(f"Error processing {h3_6_index}: {error}")
+            return
+        self.num_completed += 1
+        self.num_rows += num_rows
+
+    def report(self) -> None:
+        """Print cells processed, throughput and estimated time remaining."""
+
+        elapsed = max(time.time() - self.start_time, 1e-9)
+        num_processed = self.num_processed
+        cells_per_minute = num_processed / elapsed * 60
+        remaining_minutes = (
+            (self.num_cells - num_processed) / cells_per_minute
+            if cells_per_minute > 0
+            else float("inf")
+        )
+        print_info(
+            f"Region {self.region}: {num_processed}/{self.num_cells} cells "
+            f"({len(self.failed_cells)} failed), "
+            f"{round(cells_per_minute, 1)} cells/min, "
+            f"{round(self.num_rows / elapsed)} rows/sec, "
+            f"ETA {round(remaining_minutes, 1)} min"
+        )
+
 
 class HeatmapMatrixPreparation:
     def __init__(self) -> None:
@@ -32,6 +131,7 @@ class HeatmapMatrixPreparation:
         ) = CatchmentAreaRoutingTypeActiveMobility.walking
         self.NUM_THREADS: int = 4
         self.REPLACE_EXISTING_TABLE: bool = False
+        self.PROGRESS_REPORT_INTERVAL: int = 10  # Cells between progress reports
 
         # Current heamtap matrix regions deployed in GOAT
         self.TRAVELTIME_MATRIX_REGIONS: List[str] = [
@@ -73,26 +173,53 @@ class HeatmapMatrixPreparation:
 
         return cells_to_process
 
-    def split_cells_into_chunks(
-        self, cells_to_process: List[str], region_geofence: str
-    ) -> List[Tuple[int, List[str], str]]:
-        """Split cells to process into NUM_THREADS chunks."""
+    def get_progress_table(self) -> str:
+        """Get the table tracking which H3_6 cells of the matrix are complete."""
+
+        return f"basic.traveltime_matrix_{self.ROUTING_TYPE.value}_{settings.HEATMAP_MATRIX_DATE_SUFFIX}_progress"
+
+    def initialize_progress_table(
+        self, db_cursor: psycopg.Cursor, db_connection: psycopg.Connection
+    ) -> None:
+        """Create table to track completed H3_6 cells, if it does not exist yet."""
+
+        db_cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.get_progress_table()} (
+                h3_6 h3index PRIMARY KEY,
+                num_rows int NOT NULL,
+                completed_at timestamptz NOT NULL DEFAULT now()
+            );
+        """
+        )
+        db_connection.commit()
 
-        # Calculate chunk size and remainder
-        chunk_size = len(cells_to_process) // self.NUM_THREADS
-        remainder = len(cells_to_process) % self.NUM_THREADS
+    def get_completed_cells(self, db_cursor: psycopg.Cursor) -> Set[str]:
+        """Get H3_6 cells which were completed by a previous run."""
 
-        # Split cells to process into thunks of size chunk_size + remainder
-        chunks: List[Tuple[int, List[str], str]] = []
-        start = 0
-        for i in range(self.NUM_THREADS):
-            end = (
-                start + chunk_size + (1 if i < remainder else 0)
-            )  # Use 1 if i < remainder else 0 for boolean to int conversion
-            chunks.append((i, cells_to_process[start:end], region_geofence))
-            start = end
+        db_cursor.execute(f"SELECT h3_6::text FROM {self.get_progress_table()};")
+        return {row[0] for row in db_cursor.fetchall()}
 
-        return chunks
+    def prepare_street_network(self, region_geofence: str) -> None:
+        """Populate the street network cache of the region once, before workers start.
+
+        Workers then memory-map the cached cells instead of each fetching the network.
+        """
+
+        async def fetch() -> None:
+            db_connection = async_session()
+            try:
+                await StreetNetworkUtil(db_connection).fetch(
+                    edge_layer_id=settings.BASE_STREET_NETWORK,
+                    node_layer_id=None,
+                    region_geofence=region_geofence,
+                )
+            finally:
+                await db_connection.close()
+                # Close the pooled connections before the worker processes are forked
+                await async_engine.dispose()
+
+        asyncio.run(fetch())
 
     def initialize_traveltime_matrix_table(
         self, db_cursor: psycopg.Cursor, db_connection: psycopg.Connection
@@ -101,9 +228,10 @@ class HeatmapMatrixPreparation:
 
         traveltime_matrix_table = f"basic.traveltime_matrix_{self.ROUTING_TYPE.value}_{settings.HEATMAP_MATRIX_DATE_SUFFIX}"
 
-        # Drop table if it already exists
+        # Drop table and its progress if they already exist
         sql_drop_table = f"""
             DROP TABLE IF EXISTS {traveltime_matrix_table};
+            DROP TABLE IF EXISTS {self.get_progress_table()};
         """
         db_cursor.execute(sql_drop_table)
 
@@ -133,13 +261,54 @@ class HeatmapMatrixPreparation:
 
         print_info(f"Initialized traveltime matrix table: {traveltime_matrix_table}")
 
-    def process_chunk(self, chunk: Tuple[int, List[str], str]) -> None:
-        HeatmapMatrixProcess(
-            thread_id=chunk[0],
-            chunk=chunk[1],
-            region_geofence=chunk[2],
-            routing_type=self.ROUTING_TYPE,
-        ).run()
+    def process_region(self, region_index: int, db_cursor: psycopg.Cursor) -> None:
+        """Process all pending H3_6 cells of a region with a pool of workers."""
+
+        region_geofence = self.TRAVELTIME_MATRIX_REGIONS[region_index]
+
+        # Get full list of parent H3_6 cells within our region of interest
+        cells_to_process: List[str] = self.get_cells_to_process(
+            db_cursor=db_cursor,
+            region_geofence=region_geofence,
+        )
+
+        # Skip cells completed by a previous run
+        completed_cells: Set[str] = self.get_completed_cells(db_cursor)
+        pending_cells: List[str] = [
+            cell for cell in cells_to_process if cell not in completed_cells
+        ]
+        print_info(
+            f"{len(cells_to_process) - len(pending_cells)} H3_6 cells already complete, {len(pending_cells)} pending."
+        )
+        if not pending_cells:
+            return
+
+        self.prepare_street_network(region_geofence)
+
+        progress = HeatmapMatrixProgress(
+            region=f"{region_index + 1}/{len(self.TRAVELTIME_MATRIX_REGIONS)}",
+            num_cells=len(pending_cells),
+        )
+        # Cells are queued individually, so idle workers always pick up the next pending cell
+        with ProcessPoolExecutor(
+            max_workers=self.NUM_THREADS,
+            initializer=_initialize_worker,
+            initargs=(region_geofence, self.ROUTING_TYPE, self.NUM_THREADS),
+        ) as process_pool:
+            futures = [
+                process_pool.submit(_process_cell, cell) for cell in pending_cells
+            ]
+            for future in as_completed(futures):
+                h3_6_index, num_rows, _, error = future.result()
+                progress.update(h3_6_index, num_rows, error)
+                if progress.num_processed % self.PROGRESS_REPORT_INTERVAL == 0:
+                    progress.report()
+
+        progress.report()
+        if progress.failed_cells:
+            print_error(
+                f"{len(progress.failed_cells)} H3_6 cells failed and will be retried on the next run."
+            )
 
     def run(self) -> None:
         # Connect to database
@@ -151,35 +320,19 @@ class HeatmapMatrixPreparation:
         # Initialize traveltime matrix table
         if self.REPLACE_EXISTING_TABLE:
             self.initialize_traveltime_matrix_table(db_cursor, db_connection)
+        self.initialize_progress_table(db_cursor, db_connection)
 
         for index in range(len(self.TRAVELTIME_MATRIX_REGIONS)):
             print_info(
                 f"Processing region {index + 1} of {len(self.TRAVELTIME_MATRIX_REGIONS)}"
             )
 
-            # Get full list of parent H3_6 cells within our region of interest
-            cells_to_process: List[str] = self.get_cells_to_process(
-                db_cursor=db_cursor,
-                region_geofence=self.TRAVELTIME_MATRIX_REGIONS[index],
-            )
-
-            # Split cells to process into NUM_THREADS chunks to be processed in parallel
-            chunks: List[Tuple[int, List[str], str]] = self.split_cells_into_chunks(
-                cells_to_process=cells_to_process,
-                region_geofence=self.TRAVELTIME_MATRIX_REGIONS[index],
-            )
-
             try:
-                # Spawn NUM_THREADS processes to compute matrix in parallel
-                with ProcessPoolExecutor(max_workers=self.NUM_THREADS) as process_pool:
-                    # process_pool.map expects a callable that takes a single argument,
-                    # and chunks is already a list of tuples, so it works directly.
-                    process_pool.map(self.process_chunk, chunks)
+                self.process_region(index, db_cursor)
             except Exception as e:
-                print(e)
+                print_error(str(e))
                 break
 
-            # Await user confirmation before proceeding to next region
             print_info(
                 f"Region {index + 1} of {len(self.TRAVELTIME_MATRIX_REGIONS)} processed."
             )
@@ -1,19 +1,20 @@
 # type: ignore
 
 import asyncio
-import math
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from routing.core.config import settings
 from routing.core.isochrone import (  # type: ignore
-    construct_adjacency_list_,
-    dijkstra_h3,
+    ROUTING_ENGINE_CSR,
+    construct_graph,
     network_to_grid_h3,
     prepare_network_isochrone,
+    shortest_paths,
 )
-from routing.core.street_network.street_network_util import StreetNetworkUtil
+from routing.core.street_network.street_network_util import LazyStreetNetwork
 from routing.crud.crud_catchment_area import CRUDCatchmentArea
+from routing.db.copy_writer import CopyWriter
 from routing.db.session import async_session
 from routing.schemas.catchment_area import (
     CatchmentAreaRoutingTypeActiveMobility,
@@ -46,13 +47,14 @@ class HeatmapMatrixProcess:
         ],
     ) -> None:
         self.thread_id: int = thread_id
-        self.routing_network: Optional[Dict[str, Any]] = None  # TODO: Replace Any with more specific type
+        self.routing_network: Optional[LazyStreetNetwork] = None
         self.chunk: List[str] = chunk
         self.region_geofence: str = region_geofence
         self.routing_type: Union[
             CatchmentAreaRoutingTypeActiveMobility, CatchmentAreaRoutingTypeCar
         ] = routing_type
-        self.INSERT_BATCH_SIZE: int = 800
+        self.INSERT_BATCH_SIZE: int = settings.COPY_BATCH_SIZE
+        self.ORIGIN_BATCH_SIZE: int = 1000
         self.matrix_resolution: int = MATRIX_RESOLUTION_CONFIG[routing_type.value]
         max_traveltime: float = ROUTING_COST_CONFIG[routing_type.value].max_traveltime
         if isinstance(routing_type, CatchmentAreaRoutingTypeActiveMobility):
@@ -64,8 +66,9 @@ class HeatmapMatrixProcess:
                 (settings.CATCHMENT_AREA_CAR_BUFFER_DEFAULT_SPEED * 1000) / 60
             )
         self.db_connection: Optional[AsyncSession] = None
-        self.insert_string: str = ""
-        self.num_rows_queued: int = 0
+        self.event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.crud_catchment_area: Optional[CRUDCatchmentArea] = None
+        self.matrix_writer: Optional[CopyWriter] = None
 
     async def generate_multi_catchment_area_request(
         self, h3_6_index: str
@@ -161,221 +164,292 @@ class HeatmapMatrixProcess:
 
         return h3_index, x_centroids, y_centroids
 
-    def add_to_insert_string(
-        self, orig_id: str, dest_id: List[str], costs: np.ndarray, orig_h3_3: str
-    ) -> None:
-        """Append latest results to the current insert batch."""
-        cost_map: Dict[int, List[str]] = {}
-
-        for i in range(len(dest_id)):
-            if math.isnan(costs[i]) or int(costs[i]) == 0:
-                continue
-            cost: int = int(costs[i])
-            if cost not in cost_map:
-                cost_map[cost] = []
-            cost_map[cost].append(dest_id[i])
-
-        if 1 not in cost_map:
-            cost_map[1] = [orig_id]
-        elif orig_id not in cost_map[1]:
-            cost_map[1].append(orig_id)
-
-        for traveltime in cost_map:
-            self.insert_string += f"""(
-                '{orig_id}'::h3index,
-                ARRAY{cost_map[traveltime]}::h3index[],
-                {traveltime},
-                '{orig_h3_3}'
-            ),"""
-            self.num_rows_queued += 1
-
-    async def write_to_db(self) -> None:
-        """Write the current insert batch to the database."""
+    def get_matrix_rows(
+        self, orig_id: str, dest_id: np.ndarray, costs: np.ndarray, orig_h3_3: int
+    ) -> List[Tuple[str, List[str], int, int]]:
+        """Group reached destinations of an origin by travel time into matrix rows."""
+        reached: np.ndarray = ~np.isnan(costs)
+        traveltimes: np.ndarray = np.zeros(len(costs), dtype=np.int64)
+        traveltimes[reached] = costs[reached].astype(np.int64)
+        reached &= traveltimes != 0
+
+        order: np.ndarray = np.argsort(traveltimes[reached], kind="stable")
+        reached_traveltimes: np.ndarray = traveltimes[reached][order]
+        reached_dest_id: np.ndarray = dest_id[reached][order]
+        unique_traveltimes, group_start = np.unique(
+            reached_traveltimes, return_index=True
+        )
+        groups: Dict[int, List[str]] = {
+            int(traveltime): dest_group.tolist()
+            for traveltime, dest_group in zip(
+                unique_traveltimes, np.split(reached_dest_id, group_start[1:])
+            )
+        }
+
+        # The origin is always reachable within one minute
+        if 1 not in groups:
+            groups[1] = [orig_id]
+        elif orig_id not in groups[1]:
+            groups[1].append(orig_id)
+
+        return [
+            (orig_id, dest_group, traveltime, orig_h3_3)
+            for traveltime, dest_group in groups.items()
+        ]
+
+    def create_matrix_writer(self) -> CopyWriter:
+        """Create a writer copying matrix rows into the traveltime matrix table."""
         if self.db_connection is None:
             raise ValueError("Database connection is not initialized")
 
-        sql_insert_into_table: Executable = text(f"""
-            INSERT INTO basic.traveltime_matrix_{self.routing_type.value}_{settings.HEATMAP_MATRIX_DATE_SUFFIX} (
-                orig_id, dest_id, traveltime, h3_3
-            )
-            VALUES {self.insert_string.rstrip(",")}
-            ON CONFLICT (orig_id, traveltime, h3_3)
-            DO UPDATE SET dest_id = EXCLUDED.dest_id;
-        """)
-        await self.db_connection.execute(sql_insert_into_table)
+        return CopyWriter(
+            self.db_connection,
+            staging_table=f"traveltime_matrix_staging_{self.thread_id}",
+            staging_columns=[
+                ("orig_id", "text"),
+                ("dest_id", "text[]"),
+                ("traveltime", "integer"),
+                ("h3_3", "integer"),
+            ],
+            insert_sql=f"""
+                INSERT INTO basic.traveltime_matrix_{self.routing_type.value}_{settings.HEATMAP_MATRIX_DATE_SUFFIX} (
+                    orig_id, dest_id, traveltime, h3_3
+                )
+                SELECT orig_id::h3index, dest_id::h3index[], traveltime, h3_3
+                FROM {{staging_table}}
+                ON CONFLICT (orig_id, traveltime, h3_3)
+                DO UPDATE SET dest_id = EXCLUDED.dest_id;
+            """,
+            batch_size=self.INSERT_BATCH_SIZE,
+        )
+
+    def get_progress_table(self) -> str:
+        """Get the table tracking which H3_6 cells of the matrix are complete."""
+        return f"basic.traveltime_matrix_{self.routing_type.value}_{settings.HEATMAP_MATRIX_DATE_SUFFIX}_progress"
+
+    async def mark_cell_complete(self, h3_6_index: str, num_rows: int) -> None:
+        """Record an H3_6 cell as complete, so it is skipped when resuming."""
+        if self.db_connection is None:
+            raise ValueError("Database connection is not initialized")
+
+        await self.db_connection.execute(text(f"""
+            INSERT INTO {self.get_progress_table()} (h3_6, num_rows)
+            VALUES ('{h3_6_index}'::h3index, {num_rows})
+            ON CONFLICT (h3_6) DO UPDATE
+            SET num_rows = EXCLUDED.num_rows, completed_at = now();
+        """))
         await self.db_connection.commit()
 
-    def run(self) -> None:
-        event_loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
-        asyncio.set_event_loop(event_loop)
+    def setup(self) -> None:
+        """Open the database session and the street network used for all cells."""
+        self.event_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.event_loop)
 
         self.db_connection = async_session()
-        crud_catchment_area: CRUDCatchmentArea = CRUDCatchmentArea(
+        self.crud_catchment_area = CRUDCatchmentArea(
             db_connection=self.db_connection,
             redis=None,
         )
 
+        # Cells are memory-mapped from the street network cache, shared with other workers
         if self.routing_network is None:
-            self.routing_network, _ = event_loop.run_until_complete(
-                StreetNetworkUtil(self.db_connection).fetch(
-                    edge_layer_id=settings.BASE_STREET_NETWORK,
-                    node_layer_id=None,
-                    region_geofence=self.region_geofence,
-                )
+            self.routing_network = LazyStreetNetwork(
+                self.db_connection,
+                edge_layer_id=settings.BASE_STREET_NETWORK,
+                region_geofence=self.region_geofence,
+                max_cells=settings.NETWORK_MAX_RESIDENT_CELLS,
             )
 
-        for index in tqdm(
-            range(len(self.chunk)), desc=f"Thread {self.thread_id}", unit=" cell"
-        ):
-            h3_6_index: str = self.chunk[index]
+    def teardown(self) -> None:
+        """Close the database session and event loop."""
+        self.event_loop.run_until_complete(self.db_connection.close())  # type: ignore
+        self.event_loop.close()  # type: ignore
 
-            catchment_area_request: Union[ICatchmentAreaActiveMobility, ICatchmentAreaCar] = event_loop.run_until_complete(
-                self.generate_multi_catchment_area_request(h3_6_index)
-            )
+    def process_cell(self, h3_6_index: str) -> int:
+        """Compute and write the matrix rows of all origins within an H3_6 cell.
 
-            input_table: Optional[str] = None
-            sub_routing_network: Optional[Any] = None  # TODO: Replace with more specific type
-            origin_connector_ids: Optional[List[int]] = None
-            origin_point_cell_index: Optional[List[str]] = None
-            origin_point_h3_3: Optional[List[str]] = None
-            network_modifications_table: Optional[str] = None
+        Returns the number of rows written. Cells which can't be routed from are
+        marked complete without rows, other errors are raised to the caller.
+        """
+        if self.event_loop is None or self.crud_catchment_area is None:
+            raise ValueError("Heatmap matrix process is not set up")
+        event_loop: asyncio.AbstractEventLoop = self.event_loop
+        crud_catchment_area: CRUDCatchmentArea = self.crud_catchment_area
 
-            try:
-                input_table, num_points = event_loop.run_until_complete(
-                    crud_catchment_area.create_input_table(catchment_area_request)
-                )
-                (
-                    sub_routing_network,
-                    network_modifications_table,
-                    origin_connector_ids,
-                    origin_point_cell_index,
-                    origin_point_h3_3,
-                ) = event_loop.run_until_complete(
-                    crud_catchment_area.read_network(
-                        self.routing_network,  # type: ignore  # Known to be initialized now
-                        catchment_area_request,
-                        input_table,
-                        num_points,
-                        self.matrix_resolution,
-                    )
+        catchment_area_request: Union[ICatchmentAreaActiveMobility, ICatchmentAreaCar] = event_loop.run_until_complete(
+            self.generate_multi_catchment_area_request(h3_6_index)
+        )
+
+        input_table: Optional[str] = None
+        sub_routing_network: Optional[Any] = None  # TODO: Replace with more specific type
+        origin_connector_ids: Optional[List[int]] = None
+        origin_point_cell_index: Optional[List[str]] = None
+        origin_point_h3_3: Optional[List[str]] = None
+        network_modifications_table: Optional[str] = None
+
+        try:
+            input_table, num_points = event_loop.run_until_complete(
+                crud_catchment_area.create_input_table(catchment_area_request)
+            )
+            (
+                sub_routing_network,
+                network_modifications_table,
+                origin_connector_ids,
+                origin_point_cell_index,
+                origin_point_h3_3,
+            ) = event_loop.run_until_complete(
+                crud_catchment_area.read_network(
+                    self.routing_network,  # type: ignore  # Known to be initialized now
+                    catchment_area_request,
+                    input_table,
+                    num_points,
+                    self.matrix_resolution,
                 )
-                event_loop.run_until_complete(
-                    crud_catchment_area.drop_temp_tables(
-                        input_table, network_modifications_table
-                    )
+            )
+            event_loop.run_until_complete(
+                crud_catchment_area.drop_temp_tables(
+                    input_table, network_modifications_table
                 )
-            except Exception as e:
-                event_loop.run_until_complete(self.db_connection.rollback())  # type: ignore
-                if isinstance(e, DisconnectedOriginError):
-                    print_error(
-                        f"Thread {self.thread_id}: Skipping {h3_6_index} due to disconnected origin. Starting points table: {input_table}"
-                    )
-                    continue
-                elif isinstance(e, BufferExceedsNetworkError):
-                    print_error(
-                        f"Thread {self.thread_id}: Skipping {h3_6_index} due to buffer exceeding network. Starting points table: {input_table}"
-                    )
-                    continue
-                else:
-                    print_error(str(e))
-                    print_error(
-                        f"Thread {self.thread_id}: Error processing {h3_6_index}, exiting."
-                    )
-                    break
+            )
+        except (DisconnectedOriginError, BufferExceedsNetworkError) as e:
+            event_loop.run_until_complete(self.db_connection.rollback())  # type: ignore
+            reason: str = (
+                "disconnected origin"
+                if isinstance(e, DisconnectedOriginError)
+                else "buffer exceeding network"
+            )
+            print_error(
+                f"Thread {self.thread_id}: Skipping {h3_6_index} due to {reason}. Starting points table: {input_table}"
+            )
+            event_loop.run_until_complete(self.mark_cell_complete(h3_6_index, 0))
+            return 0
 
-            if sub_routing_network is None or origin_connector_ids is None or origin_point_cell_index is None or origin_point_h3_3 is None:
-                continue
+        if sub_routing_network is None or origin_connector_ids is None or origin_point_cell_index is None or origin_point_h3_3 is None:
+            event_loop.run_until_complete(self.mark_cell_complete(h3_6_index, 0))
+            return 0
 
-            speed: Optional[float] = None
-            if isinstance(catchment_area_request, ICatchmentAreaActiveMobility):
-                speed = catchment_area_request.travel_cost.speed / 3.6
+        speed: Optional[float] = None
+        if isinstance(catchment_area_request, ICatchmentAreaActiveMobility):
+            speed = catchment_area_request.travel_cost.speed / 3.6
 
-            zoom: int
-            if isinstance(catchment_area_request, ICatchmentAreaActiveMobility):
-                zoom = 12
-            else:
-                zoom = 10
+        zoom: int
+        if isinstance(catchment_area_request, ICatchmentAreaActiveMobility):
+            zoom = 12
+        else:
+            zoom = 10
+
+        (
+            edges_source,
+            edges_target,
+            edges_cost,
+            edges_reverse_cost,
+            edges_length,
+            unordered_map,
+            node_coords,
+            extent,
+            geom_address,
+            geom_array,
+        ) = prepare_network_isochrone(edge_network_input=sub_routing_network)
+
+        graph: Any = construct_graph(
+            settings.ROUTING_ENGINE,
+            len(unordered_map),
+            edges_source,
+            edges_target,
+            edges_cost,
+            edges_reverse_cost,
+        )
 
-            try:
+        start_vertices_ids: np.ndarray = np.array(
+            [unordered_map[v] for v in origin_connector_ids], dtype=np.int64
+        )
+
+        (h3_index, h3_centroid_x, h3_centroid_y) = event_loop.run_until_complete(
+            self.get_cell_grid(h3_6_index)
+        )
+
+        self.matrix_writer = self.create_matrix_writer()
+        dest_id: np.ndarray = np.asarray(h3_index, dtype=object)
+
+        # Search origins in batches, reusing one preallocated result buffer
+        distances_buffer: Optional[np.ndarray] = None
+        if settings.ROUTING_ENGINE == ROUTING_ENGINE_CSR:
+            distances_buffer = np.empty(
                 (
-                    edges_source,
-                    edges_target,
-                    edges_cost,
-                    edges_reverse_cost,
-                    edges_length,
-                    unordered_map,
-                    node_coords,
-                    extent,
-                    geom_address,
-                    geom_array,
-                ) = prepare_network_isochrone(edge_network_input=sub_routing_network)
-
-                adj_list: Dict[int, List[Tuple[int, float]]] = construct_adjacency_list_(
+                    min(self.ORIGIN_BATCH_SIZE, len(start_vertices_ids)),
                     len(unordered_map),
-                    edges_source,
-                    edges_target,
-                    edges_cost,
-                    edges_reverse_cost,
-                )
+                ),
+                dtype=np.double,
+            )
 
-                start_vertices_ids: np.ndarray = np.array(
-                    [unordered_map[v] for v in origin_connector_ids], dtype=np.int64
-                )
+        for batch_start in range(
+            0, len(origin_point_cell_index), self.ORIGIN_BATCH_SIZE
+        ):
+            batch_end: int = min(
+                batch_start + self.ORIGIN_BATCH_SIZE,
+                len(origin_point_cell_index),
+            )
+            distances_list: List[np.ndarray] = shortest_paths(
+                settings.ROUTING_ENGINE,
+                graph,
+                start_vertices_ids[batch_start:batch_end],
+                catchment_area_request.travel_cost.max_traveltime,
+                False,
+                per_origin=True,
+                out=distances_buffer,
+            )
 
-                distances_list: List[np.ndarray] = dijkstra_h3(
-                    start_vertices_ids,
-                    adj_list,
-                    catchment_area_request.travel_cost.max_traveltime,
-                    False,
+            for i in range(batch_start, batch_end):
+                mapped_cost: np.ndarray = network_to_grid_h3(
+                    extent=extent,
+                    zoom=zoom,
+                    edges_source=edges_source,
+                    edges_target=edges_target,
+                    edges_length=edges_length,
+                    geom_address=geom_address,
+                    geom_array=geom_array,
+                    distances=distances_list[i - batch_start],
+                    node_coords=node_coords,
+                    speed=speed,
+                    max_traveltime=catchment_area_request.travel_cost.max_traveltime,
+                    centroid_x=h3_centroid_x,
+                    centroid_y=h3_centroid_y,
+                    is_distance_based=False,
                 )
 
-                (h3_index, h3_centroid_x, h3_centroid_y) = event_loop.run_until_complete(
-                    self.get_cell_grid(h3_6_index)
+                event_loop.run_until_complete(
+                    self.matrix_writer.write(
+                        self.get_matrix_rows(
+                            orig_id=str(origin_point_cell_index[i]),
+                            dest_id=dest_id,
+                            costs=mapped_cost,
+                            orig_h3_3=int(origin_point_h3_3[i]),
+                        )
+                    )
                 )
 
-                self.insert_string = ""
-                self.num_rows_queued = 0
-
-                for i in range(len(origin_point_cell_index)):
-                    mapped_cost: np.ndarray = network_to_grid_h3(
-                        extent=extent,
-                        zoom=zoom,
-                        edges_source=edges_source,
-                        edges_target=edges_target,
-                        edges_length=edges_length,
-                        geom_address=geom_address,
-                        geom_array=geom_array,
-                        distances=distances_list[i],
-                        node_coords=node_coords,
-                        speed=speed,
-                        max_traveltime=catchment_area_request.travel_cost.max_traveltime,
-                        centroid_x=h3_centroid_x,
-                        centroid_y=h3_centroid_y,
-                        is_distance_based=False,
-                    )
+        event_loop.run_until_complete(self.matrix_writer.flush())
+        # Rows are upserted, so a cell interrupted before this point is safely recomputed
+        event_loop.run_until_complete(
+            self.mark_cell_complete(h3_6_index, self.matrix_writer.rows_written)
+        )
+        return self.matrix_writer.rows_written
 
-                    self.add_to_insert_string(
-                        orig_id=str(origin_point_cell_index[i]),
-                        dest_id=h3_index,
-                        costs=mapped_cost,
-                        orig_h3_3=str(origin_point_h3_3[i]),
-                    )
+    def run(self) -> None:
+        """Process all cells of the chunk, continuing past cells which fail."""
+        self.setup()
 
-                    if (
-                        self.num_rows_queued >= self.INSERT_BATCH_SIZE
-                        or i == len(origin_point_cell_index) - 1
-                    ):
-                        event_loop.run_until_complete(self.write_to_db())
-                        self.insert_string = ""
-                        self.num_rows_queued = 0
+        for h3_6_index in tqdm(
+            self.chunk, desc=f"Thread {self.thread_id}", unit=" cell"
+        ):
+            try:
+                self.process_cell(h3_6_index)
             except Exception as e:
-                event_loop.run_until_complete(self.db_connection.rollback())  # type: ignore
+                self.event_loop.run_until_complete(self.db_connection.rollback())  # type: ignore
                 print_error(str(e))
                 print_error(
-                    f"Thread {self.thread_id}: Error processing {h3_6_index}, exiting."
+                    f"Thread {self.thread_id}: Error processing {h3_6_index}, skipping."
                 )
-                break
 
-        event_loop.run_until_complete(self.db_connection.close())  # type: ignore
-        event_loop.close()
+        self.teardown()
         print_info(f"Thread {self.thread_id} finished.")
@@ -113,6 +113,7 @@ class OutputFormat(str, Enum):
 
     geojson = "geojson"
     parquet = "parquet"
+    arrow = "arrow"
 
 
 class CatchmentAreaStartingPoints(BaseModel):
@@ -334,7 +335,7 @@ class ICatchmentAreaActiveMobility(BaseModel):
     output_format: OutputFormat = Field(
         default=OutputFormat.geojson,
         title="Output Format",
-        description="The output format for the catchment area results (geojson or parquet).",
+        description="The output format for the catchment area results (geojson, parquet or arrow IPC stream).",
     )
     result_table: str | None = Field(
         default=None,
@@ -421,7 +422,7 @@ class ICatchmentAreaCar(BaseModel):
     output_format: OutputFormat = Field(
         default=OutputFormat.geojson,
         title="Output Format",
-        description="The output format for the catchment area results (geojson or parquet).",
+        description="The output format for the catchment area results (geojson, parquet or arrow IPC stream).",
     )
     result_table: str | None = Field(
         default=None,
@@ -0,0 +1,72 @@
+"""
+Benchmark of the CSR routing engine against the adjacency list engine.
+
+Run with: python apps/routing/tests/benchmarks/benchmark_dijkstra.py
+"""
+
+import time
+
+import numpy as np
+from numba import get_num_threads
+from routing.core.isochrone import (
+    ROUTING_ENGINE_ADJACENCY_LIST,
+    ROUTING_ENGINE_CSR,
+    construct_graph,
+    shortest_paths,
+)
+
+
+def make_grid_network(size: int, seed: int = 42):
+    """Build a square grid network with random walking costs (seconds)."""
+    rng = np.random.default_rng(seed)
+    nodes = np.arange(size * size, dtype=np.int64).reshape(size, size)
+    source = np.concatenate((nodes[:, :-1].ravel(), nodes[:-1, :].ravel()))
+    target = np.concatenate((nodes[:, 1:].ravel(), nodes[1:, :].ravel()))
+    cost = rng.uniform(10.0, 120.0, len(source))
+    return size * size, source, target, cost, cost.copy()
+
+
+def run_engine(engine, network, start_vertices, travel_time, per_origin):
+    n, source, target, cost, reverse_cost = network
+    start_time = time.perf_counter()
+    graph = construct_graph(engine, n, source, target, cost, reverse_cost)
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    shortest_paths(
+        engine, graph, start_vertices, travel_time, per_origin=per_origin
+    )
+    search_time = time.perf_counter() - start_time
+    return build_time, search_time
+
+
+def run_benchmark(
+    grid_size: int = 300,
+    num_origins: int = 2000,
+    travel_time: float = 15.0,
+    per_origin: bool = True,
+):
+    network = make_grid_network(grid_size)
+    rng = np.random.default_rng(0)
+    start_vertices = rng.integers(0, network[0], num_origins).astype(np.int64)
+
+    print("=" * 80)
+    print(
+        f"Dijkstra benchmark: {network[0]} nodes, {len(network[1])} edges, "
+        f"{num_origins} origins, per_origin={per_origin}, threads={get_num_threads()}"
+    )
+    print("=" * 80)
+
+    for engine in [ROUTING_ENGINE_ADJACENCY_LIST, ROUTING_ENGINE_CSR]:
+        # Warm up JIT compilation
+        run_engine(engine, make_grid_network(5), start_vertices[:1] % 25, 1.0, per_origin)
+        build_time, search_time = run_engine(
+            engine, network, start_vertices, travel_time, per_origin
+        )
+        print(
+            f"{engine:<16} | build: {build_time:>7.3f} s | search: {search_time:>7.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
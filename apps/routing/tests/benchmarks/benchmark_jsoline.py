@@ -0,0 +1,52 @@
+"""
+Benchmark of the multi-threshold jsoline generation against the loop over cutoffs.
+
+Run with: python apps/routing/tests/benchmarks/benchmark_jsoline.py
+"""
+
+import time
+
+import numpy as np
+from routing.core.jsoline import calculate_jsolines, calculate_jsolines_multi
+
+
+def make_surface(width: int, height: int, seed: int = 42):
+    """Build a travel time surface (minutes) spreading from a few origins."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    surface = np.full((height, width), np.inf)
+    for origin_x, origin_y in rng.uniform(0.2, 0.8, (5, 2)):
+        # Roughly 250 pixels per hour at zoom 13 (~19 m pixels, ~15 km/h)
+        distance = np.hypot(x - origin_x * width, y - origin_y * height) / 250 * 60
+        surface = np.minimum(surface, distance + rng.uniform(0, 10))
+    surface += rng.uniform(0, 2, (height, width))
+    return surface.ravel()
+
+
+def run_function(function, surface, width, height, cutoffs):
+    start_time = time.perf_counter()
+    result = function(surface, width, height, 4390, 2685, 13, cutoffs)
+    return time.perf_counter() - start_time, sum(len(shells) for shells in result)
+
+
+def run_benchmark(size: int = 2000, travel_time: int = 60, steps: int = 60):
+    surface = make_surface(size, size)
+    cutoffs = np.arange(0, travel_time + 1, travel_time / steps)
+
+    print("=" * 80)
+    print(
+        f"Jsoline benchmark: zoom 13, {size}x{size} pixels, {len(cutoffs)} cutoffs"
+    )
+    print("=" * 80)
+
+    for function in [calculate_jsolines, calculate_jsolines_multi]:
+        # Warm up JIT compilation
+        run_function(function, make_surface(10, 10), 10, 10, cutoffs[:2])
+        duration, num_shells = run_function(function, surface, size, size, cutoffs)
+        print(
+            f"{function.__name__:<26} | {duration:>7.3f} s | {num_shells} shells"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
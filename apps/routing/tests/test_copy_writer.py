@@ -0,0 +1,102 @@
+"""
+Tests for bulk COPY persistence of catchment area results and heatmap matrices.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from routing.db.copy_writer import CopyWriter
+from routing.preparation.heatmap_matrix_process import HeatmapMatrixProcess
+from routing.schemas.catchment_area import CatchmentAreaRoutingTypeActiveMobility
+
+
+def make_session():
+    """Mock session whose driver connection records the copied rows."""
+    copied_rows = []
+
+    copy = MagicMock()
+    copy.write_row = AsyncMock(side_effect=copied_rows.append)
+    copy_context = MagicMock()
+    copy_context.__aenter__ = AsyncMock(return_value=copy)
+    copy_context.__aexit__ = AsyncMock(return_value=False)
+
+    cursor = MagicMock()
+    cursor.copy = MagicMock(return_value=copy_context)
+    cursor_context = MagicMock()
+    cursor_context.__aenter__ = AsyncMock(return_value=cursor)
+    cursor_context.__aexit__ = AsyncMock(return_value=False)
+
+    raw_connection = MagicMock()
+    raw_connection.driver_connection.cursor = MagicMock(return_value=cursor_context)
+    connection = MagicMock()
+    connection.get_raw_connection = AsyncMock(return_value=raw_connection)
+
+    session = MagicMock()
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+    session.connection = AsyncMock(return_value=connection)
+    return session, cursor, copied_rows
+
+
+class TestCopyWriter:
+    @pytest.mark.asyncio
+    async def test_writes_full_batches(self):
+        session, cursor, copied_rows = make_session()
+        writer = CopyWriter(
+            session,
+            staging_table="staging",
+            staging_columns=[("id", "integer"), ("name", "text")],
+            insert_sql="INSERT INTO target SELECT * FROM {staging_table};",
+            batch_size=3,
+        )
+
+        await writer.write([(1, "a"), (2, "b")])
+        assert copied_rows == []
+        assert writer.num_rows_queued == 2
+
+        await writer.write([(3, "c"), (4, "d")])
+        assert len(copied_rows) == 4
+        assert writer.num_rows_queued == 0
+        assert writer.rows_written == 4
+        assert writer.throughput > 0
+        cursor.copy.assert_called_once_with(
+            "COPY staging (id, name) FROM STDIN (FORMAT BINARY)"
+        )
+        insert_sql = str(session.execute.call_args_list[-1].args[0])
+        assert "FROM staging;" in insert_sql
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_flush_without_rows(self):
+        session, _, _ = make_session()
+        writer = CopyWriter(
+            session,
+            staging_table="staging",
+            staging_columns=[("id", "integer")],
+            insert_sql="INSERT INTO target SELECT * FROM {staging_table};",
+        )
+        await writer.flush()
+        session.execute.assert_not_awaited()
+
+
+class TestHeatmapMatrixRows:
+    def test_groups_destinations_by_traveltime(self):
+        process = HeatmapMatrixProcess(
+            thread_id=0,
+            chunk=[],
+            region_geofence="",
+            routing_type=CatchmentAreaRoutingTypeActiveMobility.walking,
+        )
+        rows = process.get_matrix_rows(
+            orig_id="a",
+            dest_id=np.array(["a", "b", "c", "d", "e"], dtype=object),
+            costs=np.array([0.4, 2.5, np.nan, 2.0, 3.0]),
+            orig_h3_3=7,
+        )
+        assert sorted(rows) == [
+            ("a", ["a"], 1, 7),
+            ("a", ["b", "d"], 2, 7),
+            ("a", ["e"], 3, 7),
+        ]
@@ -0,0 +1,68 @@
+"""
+Tests for scheduling and resuming the heatmap matrix preparation.
+"""
+
+from unittest.mock import MagicMock, patch
+
+from routing.preparation.heatmap_matrix import (
+    HeatmapMatrixPreparation,
+    HeatmapMatrixProgress,
+)
+
+
+class TestHeatmapMatrixProgress:
+    def test_tracks_completed_and_failed_cells(self):
+        progress = HeatmapMatrixProgress(region="1/1", num_cells=3)
+        progress.update("a", 10, None)
+        progress.update("b", 5, None)
+        progress.update("c", 0, "error")
+
+        assert progress.num_processed == 3
+        assert progress.num_completed == 2
+        assert progress.num_rows == 15
+        assert progress.failed_cells == ["c"]
+        progress.report()
+
+
+class TestHeatmapMatrixPreparation:
+    def test_skips_completed_cells(self):
+        preparation = HeatmapMatrixPreparation()
+        preparation.get_cells_to_process = MagicMock(return_value=["a", "b"])
+        preparation.get_completed_cells = MagicMock(return_value={"a", "b"})
+        preparation.prepare_street_network = MagicMock()
+
+        with patch(
+            "routing.preparation.heatmap_matrix.ProcessPoolExecutor"
+        ) as process_pool:
+            preparation.process_region(0, MagicMock())
+
+        preparation.prepare_street_network.assert_not_called()
+        process_pool.assert_not_called()
+
+    def test_submits_only_pending_cells(self):
+        preparation = HeatmapMatrixPreparation()
+        preparation.get_cells_to_process = MagicMock(return_value=["a", "b", "c"])
+        preparation.get_completed_cells = MagicMock(return_value={"b"})
+        preparation.prepare_street_network = MagicMock()
+
+        submitted = []
+
+        def submit(function, cell):
+            submitted.append(cell)
+            future = MagicMock()
+            future.result.return_value = (cell, 1, 0.1, None)
+            return future
+
+        with patch(
+            "routing.preparation.heatmap_matrix.ProcessPoolExecutor"
+        ) as process_pool, patch(
+            "routing.preparation.heatmap_matrix.as_completed",
+            side_effect=lambda futures: futures,
+        ):
+            process_pool.return_value.__enter__.return_value.submit.side_effect = (
+                submit
+            )
+            preparation.process_region(0, MagicMock())
+
+        assert submitted == ["a", "c"]
+        preparation.prepare_street_network.assert_called_once()
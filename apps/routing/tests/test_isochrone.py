@@ -0,0 +1,188 @@
+"""
+Tests for the routing engines used by the isochrone computation.
+"""
+
+import numpy as np
+import polars as pl
+import pytest
+
+from routing.core.isochrone import (
+    ROUTING_ENGINE_ADJACENCY_LIST,
+    ROUTING_ENGINE_CSR,
+    construct_csr_graph,
+    construct_graph,
+    dijkstra_csr,
+    dijkstra_h3_csr,
+    get_geom_array,
+    prepare_network_isochrone,
+    shortest_paths,
+)
+from routing.crud.crud_catchment_area import CRUDCatchmentArea
+
+
+def make_grid_network(size: int, seed: int = 42):
+    """Build a square grid network with random costs and some one-way edges."""
+    rng = np.random.default_rng(seed)
+    source, target = [], []
+    for row in range(size):
+        for col in range(size):
+            node = row * size + col
+            if col + 1 < size:
+                source.append(node)
+                target.append(node + 1)
+            if row + 1 < size:
+                source.append(node)
+                target.append(node + size)
+    source = np.array(source, dtype=np.int64)
+    target = np.array(target, dtype=np.int64)
+    cost = rng.uniform(10.0, 120.0, len(source))
+    reverse_cost = cost.copy()
+    reverse_cost[rng.random(len(source)) < 0.1] = -1.0
+    return size * size, source, target, cost, reverse_cost
+
+
+class TestRoutingEngines:
+    """Tests for CSR engine parity with the adjacency list engine."""
+
+    @pytest.mark.parametrize("use_distance", [False, True])
+    def test_csr_matches_adjacency_list(self, use_distance: bool):
+        n, source, target, cost, reverse_cost = make_grid_network(30)
+        start_vertices = np.array([0, 455, 899], dtype=np.int64)
+        travel_time = 2000.0 if use_distance else 15.0
+
+        expected = shortest_paths(
+            ROUTING_ENGINE_ADJACENCY_LIST,
+            construct_graph(
+                ROUTING_ENGINE_ADJACENCY_LIST, n, source, target, cost, reverse_cost
+            ),
+            start_vertices,
+            travel_time,
+            use_distance,
+        )
+        result = shortest_paths(
+            ROUTING_ENGINE_CSR,
+            construct_graph(ROUTING_ENGINE_CSR, n, source, target, cost, reverse_cost),
+            start_vertices,
+            travel_time,
+            use_distance,
+        )
+        np.testing.assert_array_equal(result, expected)
+
+    def test_csr_matches_adjacency_list_per_origin(self):
+        n, source, target, cost, reverse_cost = make_grid_network(25)
+        start_vertices = np.array([3, 312, 600], dtype=np.int64)
+
+        expected = shortest_paths(
+            ROUTING_ENGINE_ADJACENCY_LIST,
+            construct_graph(
+                ROUTING_ENGINE_ADJACENCY_LIST, n, source, target, cost, reverse_cost
+            ),
+            start_vertices,
+            10.0,
+            per_origin=True,
+        )
+        result = shortest_paths(
+            ROUTING_ENGINE_CSR,
+            construct_graph(ROUTING_ENGINE_CSR, n, source, target, cost, reverse_cost),
+            start_vertices,
+            10.0,
+            per_origin=True,
+        )
+        assert result.shape == (len(start_vertices), n)
+        for i in range(len(start_vertices)):
+            np.testing.assert_array_equal(result[i], expected[i])
+
+    def test_csr_parallel_workers(self):
+        n, source, target, cost, reverse_cost = make_grid_network(30)
+        offsets, targets, costs = construct_csr_graph(
+            n, source, target, cost, reverse_cost
+        )
+        start_vertices = np.array([0, 17, 455, 460, 899, 640], dtype=np.int64)
+        travel_time = 15.0
+
+        expected = dijkstra_csr(
+            start_vertices, offsets, targets, costs, travel_time, False, 1
+        )
+        result = dijkstra_csr(
+            start_vertices, offsets, targets, costs, travel_time, False, 4
+        )
+        # Costs within the cutoff are exact regardless of the number of workers
+        reached = expected < travel_time
+        np.testing.assert_array_equal(reached, result < travel_time)
+        np.testing.assert_array_equal(result[reached], expected[reached])
+
+        expected_per_origin = dijkstra_h3_csr(
+            start_vertices,
+            offsets,
+            targets,
+            costs,
+            travel_time,
+            False,
+            np.empty((len(start_vertices), n)),
+            1,
+        )
+        # Buffer larger than the batch is reused and trimmed to the batch size
+        result_per_origin = dijkstra_h3_csr(
+            start_vertices,
+            offsets,
+            targets,
+            costs,
+            travel_time,
+            False,
+            np.zeros((len(start_vertices) + 2, n)),
+            4,
+        )
+        np.testing.assert_array_equal(result_per_origin, expected_per_origin)
+
+    def test_invalid_engine(self):
+        n, source, target, cost, reverse_cost = make_grid_network(3)
+        with pytest.raises(ValueError):
+            construct_graph("invalid", n, source, target, cost, reverse_cost)
+
+
+class TestGeometryBuffer:
+    def test_flatten_geometry_matches_get_geom_array(self):
+        coordinates = [
+            [[0.0, 0.0], [1.0, 1.0]],
+            [[1.0, 1.0], [2.0, 1.0], [3.0, 2.0]],
+            [[3.0, 2.0], [3.0, 3.0]],
+        ]
+        crud = CRUDCatchmentArea(None, None)
+        geom_address, geom_array = crud.flatten_geometry(
+            pl.Series(coordinates, dtype=pl.List(pl.List(pl.Float64)))
+        )
+        expected_address, expected_array = get_geom_array(
+            [np.array(geom) for geom in coordinates]
+        )
+        np.testing.assert_array_equal(geom_address, expected_address)
+        np.testing.assert_array_equal(geom_array, expected_array)
+
+    def test_prepare_network_with_flattened_geometry(self):
+        coordinates = [
+            [[0.0, 0.0], [100.0, 0.0]],
+            [[100.0, 0.0], [100.0, 100.0], [200.0, 100.0]],
+        ]
+
+        def network():
+            # Edges are remapped in place, so each call gets its own arrays
+            return {
+                "source": np.array([1, 2]),
+                "target": np.array([2, 3]),
+                "cost": np.array([10.0, 20.0]),
+                "reverse_cost": np.array([10.0, 20.0]),
+                "length": np.array([100.0, 200.0]),
+            }
+
+        geom_address, geom_array = CRUDCatchmentArea(None, None).flatten_geometry(
+            pl.Series(coordinates, dtype=pl.List(pl.List(pl.Float64)))
+        )
+        flattened = prepare_network_isochrone(
+            {**network(), "geom_address": geom_address, "geom_array": geom_array}
+        )
+        nested = prepare_network_isochrone(
+            {**network(), "geom": [np.array(geom) for geom in coordinates]}
+        )
+        # Remapped edges, lengths, extent and geometry buffers
+        for index in (0, 1, 2, 3, 4, 7, 8, 9):
+            np.testing.assert_array_equal(flattened[index], nested[index])
+        assert dict(flattened[5]) == dict(nested[5])
@@ -0,0 +1,53 @@
+"""
+Tests for the multi-threshold jsoline generation.
+"""
+
+import numpy as np
+
+from routing.core.jsoline import (
+    calculate_jsolines,
+    calculate_jsolines_multi,
+    jsolines,
+)
+
+ZOOM = 13
+WEST = 4390
+NORTH = 2685
+
+
+def make_surface(width, height, seed=0):
+    """Travel time surface growing from two origins, with noise and unreached pixels."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    first = np.hypot(x - width * 0.3, y - height * 0.4)
+    second = np.hypot(x - width * 0.7, y - height * 0.6) + 5
+    surface = np.minimum(first, second) + rng.uniform(0, 4, (height, width))
+    surface[rng.random((height, width)) < 0.02] = np.inf
+    return surface.ravel().astype(np.float64)
+
+
+class TestJsolines:
+    def test_matches_per_cutoff_contours(self):
+        width, height = 80, 60
+        surface = make_surface(width, height)
+        cutoffs = np.arange(0, 41, 5, dtype=np.float64)
+
+        for interpolation in [True, False]:
+            expected = calculate_jsolines(
+                surface, width, height, WEST, NORTH, ZOOM, cutoffs, interpolation
+            )
+            result = calculate_jsolines_multi(
+                surface, width, height, WEST, NORTH, ZOOM, cutoffs, interpolation
+            )
+            assert any(len(shells) > 0 for shells in expected)
+            assert result == expected
+
+    def test_unsorted_cutoffs(self):
+        width, height = 40, 30
+        surface = make_surface(width, height, seed=1)
+        cutoffs = np.array([20.0, 5.0, 10.0])
+
+        result = jsolines(surface, width, height, WEST, NORTH, ZOOM, cutoffs)["full"]
+        assert list(result["minute"]) == [20.0, 5.0, 10.0]
+        assert result.geometry[1].area < result.geometry[2].area
+        assert result.geometry[2].area < result.geometry[0].area
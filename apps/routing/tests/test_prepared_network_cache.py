@@ -0,0 +1,86 @@
+"""
+Tests for the prepared sub-network cache.
+"""
+
+import numpy as np
+
+from routing.core.street_network.prepared_network_cache import (
+    PreparedNetwork,
+    PreparedNetworkCache,
+)
+
+
+def make_network(ids, num_points=2):
+    """Build a prepared network where every edge has the given number of points."""
+    ids = np.array(ids, dtype=np.int64)
+    geom_array = np.arange(len(ids) * num_points * 2, dtype=np.double).reshape(-1, 2)
+    return PreparedNetwork(
+        {
+            "id": ids,
+            "source": ids * 10,
+            "target": ids * 10 + 1,
+            "cost": ids.astype(np.double),
+            "reverse_cost": ids.astype(np.double),
+            "length": ids.astype(np.double),
+            "geom_address": np.arange(len(ids) + 1, dtype=np.int64) * num_points,
+            "geom_array": geom_array,
+        }
+    )
+
+
+class TestPreparedNetwork:
+    def test_discards_segments_and_appends_extra(self):
+        network = make_network([1, 2, 3])
+        extra = make_network([4, 5], num_points=3)
+        sub_network = network.to_sub_network([2, 5], extra)
+
+        np.testing.assert_array_equal(sub_network["id"], [1, 3, 4])
+        np.testing.assert_array_equal(sub_network["geom_address"], [0, 2, 4, 7])
+        np.testing.assert_array_equal(
+            sub_network["geom_array"],
+            np.concatenate(
+                [
+                    network.arrays["geom_array"][0:2],
+                    network.arrays["geom_array"][4:6],
+                    extra.arrays["geom_array"][0:3],
+                ]
+            ),
+        )
+
+    def test_sub_network_does_not_modify_cache(self):
+        network = make_network([1, 2])
+        sub_network = network.to_sub_network([])
+        sub_network["source"][:] = -1
+        np.testing.assert_array_equal(network.arrays["source"], [10, 20])
+
+
+class TestPreparedNetworkCache:
+    def test_get_put(self):
+        cache = PreparedNetworkCache(max_bytes=10**6)
+        network = make_network([1, 2])
+        assert cache.get("a") is None
+        cache.put("a", network)
+        assert cache.get("a") is network
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used_within_budget(self):
+        network_size = make_network([1, 2]).nbytes
+        cache = PreparedNetworkCache(max_bytes=2 * network_size)
+        cache.put("a", make_network([1, 2]))
+        cache.put("b", make_network([1, 2]))
+        cache.get("a")
+        cache.put("c", make_network([1, 2]))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.nbytes == 2 * network_size
+        assert cache.stats()["evictions"] == 1
+
+    def test_skips_networks_larger_than_budget(self):
+        network = make_network([1, 2])
+        cache = PreparedNetworkCache(max_bytes=network.nbytes - 1)
+        cache.put("a", network)
+        assert cache.get("a") is None
+        assert cache.nbytes == 0
@@ -0,0 +1,88 @@
+"""
+Tests for the vectorised catchment area result writer.
+"""
+
+import io
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+from geopandas import GeoDataFrame
+from shapely.geometry import LineString, Polygon
+
+from routing.core.isochrone import get_reached_network
+from routing.core.result_writer import (
+    grid_result_table,
+    iter_arrow_ipc_chunks,
+    iter_parquet_chunks,
+    network_result_table,
+    polygon_result_table,
+)
+
+
+def make_network():
+    """Three edges, the last one not reached within the travel time."""
+    geom_array = np.array(
+        [[0, 0], [1, 0], [1, 0], [2, 0], [2, 1], [2, 1], [3, 1]], dtype=np.double
+    )
+    geom_address = np.array([0, 2, 5, 7], dtype=np.int64)
+    edges_target = np.array([1, 2, 3])
+    distances = np.array([0.0, 4.2, 7.6, np.inf])
+    return get_reached_network(
+        edges_target, geom_address, geom_array, distances, travel_time=10
+    )
+
+
+class TestResultWriter:
+    def test_reached_network(self):
+        network = make_network()
+        np.testing.assert_array_equal(network["cost"], [4.2, 7.6])
+        np.testing.assert_array_equal(network["geom_address"], [0, 2, 5])
+        assert network["geom_array"].shape == (5, 2)
+
+    def test_network_table(self):
+        table = network_result_table(make_network(), step_size=5)
+        assert table.column("cost").to_pylist() == [4, 8]
+        assert table.column("cost_step").to_pylist() == [5, 10]
+        geoms = shapely.from_wkb(table.column("geometry").to_pylist())
+        assert geoms[1].equals(LineString([(1, 0), (2, 0), (2, 1)]))
+
+    def test_polygon_table_skips_empty_geometries(self):
+        shapes = GeoDataFrame(
+            {
+                "geometry": [Polygon([(0, 0), (1, 0), (1, 1)]), Polygon()],
+                "minute": [3.0, 6.0],
+            }
+        )
+        table = polygon_result_table(shapes, step_size=5)
+        assert table.num_rows == 1
+        assert table.column("minute").to_pylist() == [3]
+        assert table.column("cost_step").to_pylist() == [5]
+
+    def test_grid_table_skips_unreached_cells(self):
+        table = grid_result_table(
+            ["8a1f1d4a5b4ffff", "8a1f1d4a5b47fff"],
+            np.array([3.0, np.nan]),
+            step_size=5,
+        )
+        assert table.column("h3_index").to_pylist() == ["8a1f1d4a5b4ffff"]
+        polygon = shapely.from_wkb(table.column("geometry")[0].as_py())
+        # Coordinates are lon / lat
+        assert 13 < polygon.centroid.x < 14
+        assert 52 < polygon.centroid.y < 53
+
+    def test_empty_results(self):
+        assert network_result_table(None, step_size=5).num_rows == 0
+        assert grid_result_table(None, None, step_size=5).num_rows == 0
+        assert polygon_result_table(None, step_size=5).num_rows == 0
+
+    def test_streamed_chunks_roundtrip(self):
+        table = network_result_table(make_network(), step_size=5)
+
+        parquet_chunks = list(iter_parquet_chunks(table, batch_rows=1))
+        assert len(parquet_chunks) > 2
+        assert pq.read_table(io.BytesIO(b"".join(parquet_chunks))).equals(table)
+
+        arrow_chunks = b"".join(iter_arrow_ipc_chunks(table, batch_rows=1))
+        assert pa.ipc.open_stream(arrow_chunks).read_all().equals(table)
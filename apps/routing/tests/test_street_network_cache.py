@@ -0,0 +1,69 @@
+"""
+Tests for the memory-mapped, versioned street network cache.
+"""
+
+import os
+from uuid import uuid4
+
+import polars as pl
+import pytest
+
+from routing.core.config import settings
+from routing.core.street_network.street_network_cache import StreetNetworkCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch) -> StreetNetworkCache:
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path))
+    return StreetNetworkCache()
+
+
+def make_edge_df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "id": [1, 2],
+            "source": [10, 11],
+            "target": [11, 12],
+            "coordinates_3857": [[[0.0, 0.0], [1.0, 1.0]], [[1.0, 1.0], [2.0, 2.0]]],
+        }
+    )
+
+
+class TestStreetNetworkCache:
+    def test_write_and_read_edge_cache(self, cache: StreetNetworkCache):
+        layer_id = uuid4()
+        edge_df = make_edge_df()
+        cache.write_edge_cache(layer_id, 123, edge_df)
+
+        assert cache.edge_cache_exists(layer_id, 123)
+        result = cache.read_edge_cache(layer_id, 123)
+        assert result.equals(edge_df)
+        # Frames are not kept by the cache, each read maps the file again
+        assert cache.read_edge_cache(layer_id, 123) is not result
+
+    def test_empty_edge_data_is_not_cached(self, cache: StreetNetworkCache):
+        layer_id = uuid4()
+        cache.write_edge_cache(layer_id, 123, make_edge_df().clear())
+        assert not cache.edge_cache_exists(layer_id, 123)
+
+    def test_stale_version_invalidates_cache(self, cache: StreetNetworkCache):
+        layer_id = uuid4()
+        other_layer_id = uuid4()
+
+        assert cache.validate_version(layer_id, "v1") is False
+        cache.write_edge_cache(layer_id, 123, make_edge_df())
+        cache.write_edge_cache(other_layer_id, 123, make_edge_df())
+
+        assert cache.validate_version(layer_id, "v1") is True
+        assert cache.edge_cache_exists(layer_id, 123)
+
+        assert cache.validate_version(layer_id, "v2") is False
+        assert not cache.edge_cache_exists(layer_id, 123)
+        assert cache.edge_cache_exists(other_layer_id, 123)
+        assert cache.get_cached_version(layer_id) == "v2"
+
+    def test_no_temporary_files_left(self, cache: StreetNetworkCache):
+        layer_id = uuid4()
+        cache.validate_version(layer_id, "v1")
+        cache.write_edge_cache(layer_id, 123, make_edge_df())
+        assert not [f for f in os.listdir(settings.CACHE_DIR) if f.endswith(".tmp")]
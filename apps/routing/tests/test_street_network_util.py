@@ -0,0 +1,73 @@
+"""
+Tests for on-demand street network loading.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import polars as pl
+import pytest
+
+from routing.core.street_network.street_network_util import LazyStreetNetwork
+
+
+@pytest.fixture
+def network():
+    network = LazyStreetNetwork(
+        MagicMock(),
+        edge_layer_id=uuid4(),
+        region_geofence="SELECT 1",
+        max_cells=2,
+    )
+    util = network.street_network_util
+    util._get_street_network_region_h3_3_cells = AsyncMock(return_value=[1, 2, 3, 4])
+    util._get_street_network_tables = AsyncMock(return_value=("edges", None))
+    util._get_layer_version = AsyncMock(return_value="v1")
+    util._load_edge_cell = MagicMock(
+        side_effect=lambda cache, layer_id, table, h3_short: pl.DataFrame(
+            {"h3_3": [h3_short]}
+        )
+    )
+    with patch(
+        "routing.core.street_network.street_network_util.StreetNetworkCache"
+    ):
+        yield network
+
+
+class TestLazyStreetNetwork:
+    @pytest.mark.asyncio
+    async def test_loads_only_requested_cells(self, network: LazyStreetNetwork):
+        await network.load([1, 2])
+        assert network.get(1) is not None
+        assert network.get(2) is not None
+        assert network.get(3) is None
+        assert network.street_network_util._load_edge_cell.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cells_outside_region_are_missing(self, network: LazyStreetNetwork):
+        await network.load([5])
+        assert network.get(5) is None
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_cells_are_evicted(
+        self, network: LazyStreetNetwork
+    ):
+        await network.load([1, 2])
+        await network.load([1])
+        await network.load([3])
+        # Cell 2 was least recently used
+        assert network.get(2) is None
+        assert network.get(1) is not None
+        assert network.get(3) is not None
+        assert network.stats() == {
+            "resident_cells": 2,
+            "max_cells": 2,
+            "hits": 1,
+            "misses": 3,
+            "evictions": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_requested_cells_are_not_evicted(self, network: LazyStreetNetwork):
+        await network.load([1, 2, 3])
+        assert all(network.get(h3_short) is not None for h3_short in [1, 2, 3])
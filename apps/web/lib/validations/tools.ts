@@ -420,7 +420,7 @@ export type PostHeatmapConnectivity = z.infer<typeof heatmapConnectivitySchema>;
 export const maxFeatureCnt = {
   area_statistics: 100000,
   join: 100000,
-  catchment_area_active_mobility: 1000,
+  catchment_area_active_mobility: 10000,
   catchment_area_pt: 5,
   catchment_area_car: 50,
   catchment_area_nearby_station_access: 1000,
@@ -4,9 +4,11 @@ This module contains tools for accessibility/heatmap analysis:
 - HeatmapGravityTool: Gravity-based accessibility analysis
 - HeatmapConnectivityTool: Connectivity heatmap (reachable area)
 - HeatmapClosestAverageTool: Average distance to N closest destinations
+- HeatmapMultiMeasureTool: Several heatmap measures in one OD matrix scan
 - OevGueteklasseTool: Public Transport Quality Classes (ÖV-Güteklassen)
 - TripCountStationTool: Public Transport Trip Count per station
 - CatchmentAreaTool: Catchment area / isochrone generation (unified tool)
+- partition_od_matrix: Write OD matrices partitioned for heatmap filtering
 """
 
 # Re-export schemas from the schemas module for backwards compatibility
@@ -30,5 +32,7 @@ from .catchment_area import (
 from .closest_average import HeatmapClosestAverageTool
 from .connectivity import HeatmapConnectivityTool
 from .gravity import HeatmapGravityTool
+from .multi_measure import HeatmapMultiMeasureTool
+from .od_matrix import ODMatrixManifest, partition_od_matrix
 from .oev_gueteklasse import OevGueteklasseTool
 from .trip_count import TripCountStationTool
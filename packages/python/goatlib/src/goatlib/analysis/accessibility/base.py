@@ -4,8 +4,14 @@ import unicodedata
 from pathlib import Path
 from typing import Self
 
+from goatlib.analysis.accessibility.od_matrix import ODMatrixManifest, partition_files
 from goatlib.analysis.core.base import AnalysisTool
 from goatlib.analysis.schemas.base import PTTimeWindow
+from goatlib.analysis.schemas.heatmap import (
+    ImpedanceFunction,
+    OpportunityGravity,
+    PotentialType,
+)
 from goatlib.io.parquet import write_optimized_parquet
 
 logger = logging.getLogger(__name__)
@@ -108,13 +114,56 @@ def sanitize_sql_name(name: str, fallback_idx: int = 0) -> str:
     return safe_name
 
 
+def impedance_weight_sql(
+    which: ImpedanceFunction,
+    max_sens: float,
+    max_cost_col: str,
+    sens_col: str,
+    cost_col: str = "m.cost",
+) -> str:
+    """SQL expression for the distance decay weight of a travel cost.
+
+    Args:
+        which: Impedance function
+        max_sens: Maximum sensitivity used for normalization
+        max_cost_col: Column or value holding the travel time limit
+        sens_col: Column or value holding the sensitivity
+        cost_col: Column holding the travel cost
+    """
+    if which == ImpedanceFunction.gaussian:
+        return f"""
+                EXP(
+                    (((({cost_col} / {max_cost_col}) * ({cost_col} / {max_cost_col})) * -1)
+                    / ({sens_col} / {max_sens}))
+                )
+        """
+    elif which == ImpedanceFunction.linear:
+        return f"(1 - ({cost_col} / {max_cost_col}))"
+    elif which == ImpedanceFunction.exponential:
+        return f"""
+                EXP(
+                    ((({sens_col} / {max_sens}) * -1) * ({cost_col} / {max_cost_col}))
+                )
+        """
+    elif which == ImpedanceFunction.power:
+        return f"""
+                POW(
+                    ({cost_col} / {max_cost_col}),
+                    (({sens_col} / {max_sens}) * -1)
+                )
+        """
+    else:
+        raise ValueError(f"Unknown impedance function: {which}")
+
+
 class HeatmapToolBase(AnalysisTool):
     """Base class for heatmap analysis tools."""
 
     def __init__(self: Self) -> None:
         super().__init__()
         self._setup_heatmap_extensions()
-        # Additional initialization for heatmap tools can go here
+        # Partitioned OD matrices by view name: (root path, manifest)
+        self._od_manifests: dict[str, tuple[str, ODMatrixManifest]] = {}
 
     def _setup_heatmap_extensions(self: Self) -> None:
         """Install required extensions and register helper functions."""
@@ -200,9 +249,18 @@ class HeatmapToolBase(AnalysisTool):
         Register OD matrix source as a DuckDB VIEW and detect H3 resolution.
         Supports custom column mapping: keys = ["orig_id", "dest_id", "cost"]
         Returns (view_name, h3_resolution)
+
+        Directories written by ``partition_od_matrix`` carry a manifest, which
+        provides the resolution and lets ``_filter_od_matrix`` prune partitions.
         """
         view_name = od_matrix_view_name
 
+        manifest = ODMatrixManifest.load(od_matrix_path)
+        if manifest is not None:
+            return self._prepare_partitioned_od_matrix(
+                od_matrix_path, manifest, view_name
+            )
+
         # Normalize path for glob pattern (handle directories)
         path = od_matrix_path.rstrip("/")
         if not path.endswith(".parquet") and "*" not in path:
@@ -270,22 +328,61 @@ class HeatmapToolBase(AnalysisTool):
 
         raise ValueError("Could not detect H3 resolution from OD matrix")
 
+    def _prepare_partitioned_od_matrix(
+        self: Self,
+        od_matrix_path: str,
+        manifest: ODMatrixManifest,
+        view_name: str,
+    ) -> tuple[str, int]:
+        """Register a partitioned OD matrix, already in canonical columns.
+
+        Only the partitions listed in the manifest are read, other files in
+        the directory are ignored.
+        """
+        root = od_matrix_path.rstrip("/")
+        files = partition_files(root, manifest.partitions)
+        try:
+            self.con.execute(f"""
+                CREATE OR REPLACE TEMP VIEW {view_name} AS
+                SELECT orig_id, dest_id, cost
+                FROM read_parquet({files}, hive_partitioning = false)
+            """)
+        except Exception as e:
+            raise ValueError(
+                f"Failed to register OD matrix from '{od_matrix_path}': {e}"
+            )
+
+        self._od_manifests[view_name] = (root, manifest)
+        logger.info(
+            "Registered partitioned OD matrix view '%s' at H3 resolution %d "
+            "(%d partitions)",
+            view_name,
+            manifest.h3_resolution,
+            len(manifest.partitions),
+        )
+        return view_name, manifest.h3_resolution
+
     def _filter_od_matrix(
         self: Self,
         od_table: str,
         *,
-        origin_ids: list[int] = None,
-        destination_ids: list[int] = None,
+        origin_ids: list[int] | str | None = None,
+        destination_ids: list[int] | str | None = None,
         max_cost: float = None,
         min_cost: float = None,
     ) -> str:
         """
         Efficiently filter the OD matrix by various criteria.
 
+        Origins and destinations are matched by a semi-join against id
+        tables, so the query size does not grow with the number of ids.
+        For partitioned matrices only partitions that can hold matching
+        rows are read.
+
         Args:
             od_table: Name of the OD matrix table
-            origin_ids: List of origin H3 IDs to filter by
-            destination_ids: List of destination H3 IDs to filter by
+            origin_ids: Origin H3 IDs, or an id table from ``_create_h3_id_table``
+            destination_ids: Destination H3 IDs, or an id table
             max_cost: Maximum cost to include
             min_cost: Minimum cost to include
 
@@ -302,28 +399,41 @@ class HeatmapToolBase(AnalysisTool):
         ):
             raise ValueError("At least one filtering criterion must be provided.")
 
-        conditions = []
+        origin_table = (
+            self._create_h3_id_table(origin_ids, "od_origin_ids") if origin_ids else None
+        )
+        destination_table = (
+            self._create_h3_id_table(destination_ids, "od_destination_ids")
+            if destination_ids
+            else None
+        )
 
-        if origin_ids:
-            origin_ids_sql = ", ".join(map(str, origin_ids))
-            conditions.append(f"orig_id IN ({origin_ids_sql})")
+        source = od_table
+        if od_table in self._od_manifests:
+            source = self._od_partition_source(
+                od_table, origin_table, destination_table, max_cost, min_cost
+            )
 
-        if destination_ids:
-            dest_ids_sql = ", ".join(map(str, destination_ids))
-            conditions.append(f"dest_id IN ({dest_ids_sql})")
+        joins = []
+        if origin_table:
+            joins.append(f"SEMI JOIN {origin_table} o ON m.orig_id = o.id")
+        if destination_table:
+            joins.append(f"SEMI JOIN {destination_table} d ON m.dest_id = d.id")
 
+        conditions = []
         if max_cost is not None:
-            conditions.append(f"cost <= {max_cost}")
+            conditions.append(f"m.cost <= {max_cost}")
 
         if min_cost is not None:
-            conditions.append(f"cost >= {min_cost}")
+            conditions.append(f"m.cost >= {min_cost}")
 
         where_clause = " AND ".join(conditions) if conditions else "1=1"
 
         query = f"""
             CREATE OR REPLACE TEMP TABLE {filtered_table} AS
-            SELECT orig_id, dest_id, cost
-            FROM {od_table}
+            SELECT m.orig_id, m.dest_id, m.cost
+            FROM {source} m
+            {' '.join(joins)}
             WHERE {where_clause}
         """
 
@@ -331,10 +441,10 @@ class HeatmapToolBase(AnalysisTool):
         count = self.con.execute(f"SELECT COUNT(*) FROM {filtered_table}").fetchone()[0]
 
         filter_desc = []
-        if origin_ids:
-            filter_desc.append(f"{len(origin_ids)} origins")
-        if destination_ids:
-            filter_desc.append(f"{len(destination_ids)} destinations")
+        if origin_table:
+            filter_desc.append(f"{self._count_rows(origin_table)} origins")
+        if destination_table:
+            filter_desc.append(f"{self._count_rows(destination_table)} destinations")
         if max_cost is not None:
             filter_desc.append(f"max_cost={max_cost}")
         if min_cost is not None:
@@ -347,6 +457,246 @@ class HeatmapToolBase(AnalysisTool):
         )
         return filtered_table
 
+    def _od_partition_source(
+        self: Self,
+        od_table: str,
+        origin_table: str | None,
+        destination_table: str | None,
+        max_cost: float | None,
+        min_cost: float | None,
+    ) -> str:
+        """SQL source reading only the partitions relevant to a filter."""
+        root, manifest = self._od_manifests[od_table]
+
+        parents = None
+        if destination_table:
+            rows = self.con.execute(f"""
+                SELECT DISTINCT h3_cell_to_parent(id, {manifest.partition_resolution})
+                FROM {destination_table}
+            """).fetchall()
+            parents = {row[0] for row in rows}
+
+        orig_range = None
+        if origin_table:
+            orig_range = self.con.execute(
+                f"SELECT MIN(id), MAX(id) FROM {origin_table}"
+            ).fetchone()
+
+        partitions = manifest.select(
+            parents=parents,
+            orig_range=orig_range,
+            max_cost=max_cost,
+            min_cost=min_cost,
+        )
+        logger.info(
+            "Reading %d of %d OD matrix partitions",
+            len(partitions),
+            len(manifest.partitions),
+        )
+        if not partitions:
+            return f"(SELECT * FROM {od_table} LIMIT 0)"
+
+        return f"""(
+            SELECT orig_id, dest_id, cost
+            FROM read_parquet({partition_files(root, partitions)}, hive_partitioning = false)
+        )"""
+
+    def _create_h3_id_table(
+        self: Self,
+        ids: list[int] | str,
+        id_table: str,
+    ) -> str:
+        """Materialize H3 ids into a temp table with a single ``id`` column.
+
+        Args:
+            ids: List of ids, or the name of an existing id table
+            id_table: Name of the temp table to create from a list
+
+        Returns:
+            Name of the id table
+        """
+        if isinstance(ids, str):
+            return ids
+        self.con.execute(
+            f"CREATE OR REPLACE TEMP TABLE {id_table} AS "
+            "SELECT DISTINCT UNNEST(?::BIGINT[]) AS id",
+            [list(ids)],
+        )
+        return id_table
+
+    def _register_h3_ids(
+        self: Self,
+        table: str,
+        column_name: str,
+        id_table: str,
+    ) -> int:
+        """Collect the distinct H3 ids of a table column into an id table.
+
+        Returns:
+            Number of distinct ids
+        """
+        self.con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE {id_table} AS
+            SELECT DISTINCT {column_name} AS id
+            FROM {table}
+            WHERE {column_name} IS NOT NULL
+        """)
+        return self._count_rows(id_table)
+
+    def _count_rows(self: Self, table: str) -> int:
+        return self.con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def _get_potential_sql(
+        self: Self, opp: OpportunityGravity, wgs84_geom_sql: str, geom_type: str
+    ) -> str:
+        """
+        Determines the SQL expression for potential.
+
+        Priority:
+        1. potential_expression
+        2. potential_constant
+        3. potential_field
+        4. defaults to 1.0
+
+        Special rule:
+        - 'area' and 'perimeter' expressions are only valid for Polygon/MultiPolygon geometries.
+        """
+        geom_type_lower = (geom_type or "").lower()
+
+        # --- Handle potential_expression first ---
+        if opp.potential_expression:
+            expr = opp.potential_expression.lower().strip()
+
+            if expr in ("$area", "area"):
+                if "polygon" not in geom_type_lower:
+                    raise ValueError(
+                        f"Invalid potential_expression='{expr}' for geometry type '{geom_type}'. "
+                        "Area is only valid for Polygon or MultiPolygon geometries."
+                    )
+                return f"ST_Area_Spheroid({wgs84_geom_sql})"
+
+            if expr in ("$perimeter", "perimeter"):
+                if "polygon" not in geom_type_lower:
+                    raise ValueError(
+                        f"Invalid potential_expression='{expr}' for geometry type '{geom_type}'. "
+                        "Perimeter is only valid for Polygon or MultiPolygon geometries."
+                    )
+                return f"ST_Perimeter_Spheroid({wgs84_geom_sql})"
+
+            # Custom user expression (use as-is)
+            return expr
+
+        # --- Constant potential ---
+        if opp.potential_type ==PotentialType.constant:
+            return str(float(opp.potential_constant))
+
+        # --- Field-based potential ---
+        if opp.potential_field:
+            return f'"{opp.potential_field}"'
+
+        # --- Default constant ---
+        return "1.0"
+
+    def _process_demand(
+        self: Self, demand_path: str, demand_field: str, h3_resolution: int
+    ) -> str:
+        """
+        Imports and standardizes the demand dataset.
+        Returns the standardized demand table name with schema: dest_id, demand_value
+        """
+        try:
+            table_name = "demand_input"
+            meta, table_name = self.import_input(demand_path, table_name=table_name)
+            geom_col = meta.geometry_column or "geom"
+            geom_type = (meta.geometry_type or "").lower()
+            output_table = f"{table_name}_std"
+
+            transform_to_4326 = geom_col
+            if meta.crs and meta.crs.to_epsg() != 4326:
+                source_crs = meta.crs.to_string()
+                transform_to_4326 = (
+                    f"ST_Transform({geom_col}, '{source_crs}', 'EPSG:4326')"
+                )
+        except Exception:
+            pass
+
+        
+        if "point" in geom_type:
+            query = f"""
+            CREATE OR REPLACE TEMP TABLE {output_table} AS
+            WITH features AS (
+                SELECT
+                    {demand_field}::DOUBLE AS demand_value,
+                    {transform_to_4326} AS geom
+                FROM {table_name}
+                WHERE {geom_col} IS NOT NULL
+            ),
+            exploded AS (
+                SELECT
+                    demand_value,
+                    (UNNEST(ST_Dump(geom))).geom AS simple_geom
+                FROM features
+            )
+            SELECT
+                h3_latlng_to_cell(ST_Y(simple_geom), ST_X(simple_geom), {h3_resolution}) AS orig_id,
+                SUM(demand_value) AS demand_value
+            FROM exploded
+            WHERE simple_geom IS NOT NULL
+            GROUP BY orig_id
+            """
+        elif "polygon" in geom_type or "multipolygon" in geom_type:
+            # Optimized: Use ROW_NUMBER and pre-computed cell counts to avoid correlated subquery
+            query = f"""
+            CREATE OR REPLACE TEMP TABLE {output_table} AS
+            WITH features AS (
+                SELECT
+                    ROW_NUMBER() OVER () AS row_id,
+                    {demand_field}::DOUBLE AS demand_value,
+                    {transform_to_4326} AS geom
+                FROM {table_name}
+                WHERE {geom_col} IS NOT NULL
+            ),
+            polygons AS (
+                SELECT
+                    row_id,
+                    demand_value,
+                    (UNNEST(ST_Dump(ST_Force2D(geom)))).geom AS simple_geom
+                FROM features
+            ),
+            h3_cells_raw AS (
+                SELECT
+                    row_id,
+                    demand_value,
+                    UNNEST(h3_polygon_wkt_to_cells_experimental(ST_AsText(simple_geom), {h3_resolution}, 'CONTAINMENT_OVERLAPPING')) AS orig_id
+                FROM polygons
+                WHERE simple_geom IS NOT NULL
+            ),
+            h3_cells_unique AS (
+                SELECT DISTINCT row_id, demand_value, orig_id
+                FROM h3_cells_raw
+            ),
+            h3_counts AS (
+                SELECT
+                    row_id,
+                    COUNT(*) AS num_cells,
+                    demand_value
+                FROM h3_cells_unique
+                GROUP BY row_id, demand_value
+            )
+            SELECT
+                u.orig_id,
+                SUM(u.demand_value / hc.num_cells) AS demand_value
+            FROM h3_cells_unique u
+            JOIN h3_counts hc ON u.row_id = hc.row_id
+            WHERE u.orig_id IS NOT NULL
+            GROUP BY u.orig_id
+            """
+        else:
+            raise ValueError(f"Unsupported geometry type: '{geom_type}'")
+
+        self.con.execute(query)
+        return output_table
+
     def _extract_h3_ids(
         self: Self, table: str, column_name: str = "dest_id"
     ) -> list[int]:
@@ -22,6 +22,8 @@ from typing import Any, Self, Sequence
 import duckdb
 import httpx
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from geopandas import GeoDataFrame
 from numba import njit
 from numpy.typing import NDArray
@@ -371,54 +373,60 @@ def compute_r5_surface(
 # =============================================================================
 
 
-@njit
-def get_contour(
-    surface: NDArray[np.float64], width: int, height: int, cutoff: float
+@njit(cache=True)
+def get_contours(
+    surface: NDArray[np.float64], width: int, height: int, cutoffs: NDArray[np.float64]
 ) -> NDArray[np.int8]:
     """
-    Get a contouring grid using marching squares lookup.
+    Get the contouring grids of all cutoffs using marching squares lookup.
 
-    Creates a grid where each cell is assigned an index (0-15) based on which
-    corners are inside the isochrone (below the cutoff value).
+    Creates one grid per cutoff where each cell is assigned an index (0-15) based
+    on which corners are inside the isochrone (below the cutoff value). The surface
+    is scanned once in memory order and the corners of a cell are compared against
+    every cutoff.
     """
-    contour = np.zeros((width - 1) * (height - 1), dtype=np.int8)
-
-    # compute contour values for each cell
-    for x in range(width - 1):
-        for y in range(height - 1):
+    c_width = width - 1
+    c_height = height - 1
+    n_cutoffs = len(cutoffs)
+    contours = np.zeros((n_cutoffs, c_width * c_height), dtype=np.int8)
+    if n_cutoffs == 0:
+        return contours
+    max_cutoff = cutoffs.max()
+
+    # Pixels at the edge of the area are never inside, so that isochrones always
+    # close even when they actually extend beyond the edges of the surface
+    values = np.full(width * height, np.inf)
+    for y in range(1, height - 1):
+        for x in range(1, width - 1):
+            values[y * width + x] = surface[y * width + x]
+
+    for y in range(c_height):
+        for x in range(c_width):
             index = y * width + x
-            top_left = surface[index] < cutoff
-            top_right = surface[index + 1] < cutoff
-            bot_left = surface[index + width] < cutoff
-            bot_right = surface[index + width + 1] < cutoff
-
-            # if we're at the edge of the area, set the outer sides to false, so that
-            # isochrones always close even when they actually extend beyond the edges
-            # of the surface
-
-            if x == 0:
-                top_left = bot_left = False
-            if x == width - 2:
-                top_right = bot_right = False
-            if y == 0:
-                top_left = top_right = False
-            if y == height - 2:
-                bot_right = bot_left = False
-
-            idx = 0
-
-            if top_left:
-                idx |= 1 << 3
-            if top_right:
-                idx |= 1 << 2
-            if bot_right:
-                idx |= 1 << 1
-            if bot_left:
-                idx |= 1
-
-            contour[y * (width - 1) + x] = idx
-
-    return contour
+            top_left = values[index]
+            top_right = values[index + 1]
+            bot_left = values[index + width]
+            bot_right = values[index + width + 1]
+
+            # Most of the surface is out of reach of every cutoff
+            if min(top_left, top_right, bot_left, bot_right) >= max_cutoff:
+                continue
+
+            cell = y * c_width + x
+            for i in range(n_cutoffs):
+                cutoff = cutoffs[i]
+                idx = 0
+                if top_left < cutoff:
+                    idx |= 1 << 3
+                if top_right < cutoff:
+                    idx |= 1 << 2
+                if bot_right < cutoff:
+                    idx |= 1 << 1
+                if bot_left < cutoff:
+                    idx |= 1
+                contours[i, cell] = idx
+
+    return contours
 
 
 @njit
@@ -567,8 +575,10 @@ def calculate_jsolines(
     that are below each cutoff value.
     """
     geometries = []
-    for _, cutoff in np.ndenumerate(cutoffs):
-        contour = get_contour(surface, width, height, cutoff)
+    contours = get_contours(surface, width, height, cutoffs)
+    for i in range(len(cutoffs)):
+        cutoff = cutoffs[i]
+        contour = contours[i]
         c_width = width - 1
         # Store warnings
         warnings = []
@@ -884,6 +894,11 @@ class CatchmentAreaTool(AnalysisTool):
     DEFAULT_TIMEOUT = 300.0
     DEFAULT_RETRIES = 60
     DEFAULT_RETRY_INTERVAL = 2
+    # Polling of 202 responses starts fast and backs off exponentially
+    INITIAL_RETRY_INTERVAL = 0.25
+    # Starting points per GOAT Routing request and requests in flight
+    DEFAULT_BATCH_SIZE = 1000
+    DEFAULT_MAX_CONCURRENT_REQUESTS = 4
 
     def __init__(
         self: Self,
@@ -923,6 +938,14 @@ class CatchmentAreaTool(AnalysisTool):
         self._retry_interval = getattr(
             settings.routing, "request_retry_interval", self.DEFAULT_RETRY_INTERVAL
         )
+        self._batch_size = getattr(
+            settings.routing, "request_batch_size", self.DEFAULT_BATCH_SIZE
+        )
+        self._max_concurrent_requests = getattr(
+            settings.routing,
+            "request_max_concurrency",
+            self.DEFAULT_MAX_CONCURRENT_REQUESTS,
+        )
 
     def _get_routing_url(self: Self, params: CatchmentAreaToolParams) -> str:
         """Get routing URL from params or defaults."""
@@ -969,25 +992,35 @@ class CatchmentAreaTool(AnalysisTool):
             result_gdf = loop.run_until_complete(self._compute_pt_catchment(params))
             path = self._save_geodataframe(result_gdf, params.output_path)
             return [(path, metadata)]
-        elif routing_mode == "car":
-            result_bytes = loop.run_until_complete(self._compute_car_catchment(params))
-            path = self._save_bytes(result_bytes, params.output_path)
-            return [(path, metadata)]
+        # GOAT Routing results are streamed into a raw parquet file first
+        raw_path = Path(params.output_path).with_suffix(".tmp.parquet")
+        if routing_mode == "car":
+            num_batches = loop.run_until_complete(
+                self._compute_car_catchment(params, raw_path)
+            )
         else:
             # Active mobility modes (walking, bicycle, pedelec, wheelchair)
-            result_bytes = loop.run_until_complete(
-                self._compute_active_mobility_catchment(params)
+            num_batches = loop.run_until_complete(
+                self._compute_active_mobility_catchment(params, raw_path)
             )
-            path = self._save_bytes(result_bytes, params.output_path)
-            return [(path, metadata)]
+
+        merge_sql = None
+        if num_batches > 1:
+            merge_sql = self._merge_batches_sql(
+                f"read_parquet('{raw_path}')",
+                params.catchment_area_type,
+                bool(params.polygon_difference),
+            )
+        path = self._save_routing_parquet(raw_path, params.output_path, merge_sql)
+        return [(path, metadata)]
 
     # =========================================================================
     # GOAT Routing: Active Mobility
     # =========================================================================
 
     async def _compute_active_mobility_catchment(
-        self: Self, params: CatchmentAreaToolParams
-    ) -> bytes:
+        self: Self, params: CatchmentAreaToolParams, output_path: Path
+    ) -> int:
         """Compute catchment area for active mobility modes via GOAT Routing."""
         routing_url = self._get_routing_url(params)
         authorization = self._get_authorization(params)
@@ -1064,16 +1097,22 @@ class CatchmentAreaTool(AnalysisTool):
             payload["scenario_id"] = params.scenario_id
             payload["street_network"] = params.street_network
 
-        logger.info(payload)
-        return await self._post_with_retry(url, payload, authorization)
+        logger.info(
+            "Active mobility catchment request for %d starting points: %s",
+            len(lat_list),
+            {k: v for k, v in payload.items() if k != "starting_points"},
+        )
+        return await self._post_batched(
+            url, payload, authorization, lat_list, lon_list, output_path
+        )
 
     # =========================================================================
     # GOAT Routing: Car
     # =========================================================================
 
     async def _compute_car_catchment(
-        self: Self, params: CatchmentAreaToolParams
-    ) -> bytes:
+        self: Self, params: CatchmentAreaToolParams, output_path: Path
+    ) -> int:
         """Compute catchment area for car mode via GOAT Routing."""
         routing_url = self._get_routing_url(params)
         authorization = self._get_authorization(params)
@@ -1142,7 +1181,9 @@ class CatchmentAreaTool(AnalysisTool):
             payload["scenario_id"] = params.scenario_id
             payload["street_network"] = params.street_network
 
-        return await self._post_with_retry(url, payload, authorization)
+        return await self._post_batched(
+            url, payload, authorization, lat_list, lon_list, output_path
+        )
 
     # =========================================================================
     # R5: Public Transport
@@ -1325,37 +1366,203 @@ class CatchmentAreaTool(AnalysisTool):
     # HTTP Helper
     # =========================================================================
 
+    def _create_client(self: Self) -> httpx.AsyncClient:
+        """Keep-alive client pooling connections for concurrent requests."""
+        return httpx.AsyncClient(
+            timeout=self._timeout,
+            limits=httpx.Limits(
+                max_connections=self._max_concurrent_requests,
+                max_keepalive_connections=self._max_concurrent_requests,
+            ),
+        )
+
     async def _post_with_retry(
         self: Self,
         url: str,
         payload: dict,
         authorization: str | None,
+        client: httpx.AsyncClient | None = None,
     ) -> bytes:
-        """Make POST request with retry logic for 202 responses."""
+        """Make POST request with retry logic for 202 responses.
+
+        202 responses are polled with exponential backoff, starting at
+        INITIAL_RETRY_INTERVAL and capped at the configured retry interval,
+        until retries * retry interval seconds were spent waiting.
+        """
+        if client is None:
+            async with self._create_client() as client:
+                return await self._post_with_retry(
+                    url, payload, authorization, client
+                )
+
         headers = {}
         if authorization:
             headers["Authorization"] = authorization
 
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            for i in range(self._retries):
-                response = await client.post(url, json=payload, headers=headers)
+        budget = self._retries * self._retry_interval
+        waited = 0.0
+        attempt = 0
+        while True:
+            response = await client.post(url, json=payload, headers=headers)
 
-                if response.status_code == 202:
-                    # Still processing, retry
-                    if i == self._retries - 1:
-                        raise RuntimeError(
-                            f"Routing endpoint took too long to process request: {url}"
-                        )
-                    await asyncio.sleep(self._retry_interval)
-                    continue
-                elif response.status_code in (200, 201):
-                    return response.content
-                else:
+            if response.status_code == 202:
+                # Still processing, retry
+                if waited >= budget:
                     raise RuntimeError(
-                        f"Routing error ({response.status_code}): {response.text}"
+                        f"Routing endpoint took too long to process request: {url}"
                     )
+                delay = min(
+                    self.INITIAL_RETRY_INTERVAL * 2**attempt,
+                    self._retry_interval,
+                    budget - waited,
+                )
+                await asyncio.sleep(delay)
+                waited += delay
+                attempt += 1
+                continue
+            elif response.status_code in (200, 201):
+                return response.content
+            else:
+                raise RuntimeError(
+                    f"Routing error ({response.status_code}): {response.text}"
+                )
+
+    async def _post_batched(
+        self: Self,
+        url: str,
+        payload: dict,
+        authorization: str | None,
+        latitudes: list[float],
+        longitudes: list[float],
+        output_path: Path,
+    ) -> int:
+        """Request a catchment area in batches of starting points.
+
+        Starting points are split into batches of the configured size, which
+        are sent concurrently over one pooled client. The parquet responses
+        are appended to output_path as they arrive.
+
+        Returns:
+            Number of batches. Results of several batches overlap and are
+            merged with _merge_batches_sql.
+        """
+        batches = [
+            (latitudes[i : i + self._batch_size], longitudes[i : i + self._batch_size])
+            for i in range(0, len(latitudes), self._batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self._max_concurrent_requests)
+
+        async def post_batch(
+            client: httpx.AsyncClient, batch_lat: list[float], batch_lon: list[float]
+        ) -> bytes:
+            batch_payload = {
+                **payload,
+                "starting_points": {"latitude": batch_lat, "longitude": batch_lon},
+            }
+            async with semaphore:
+                return await self._post_with_retry(
+                    url, batch_payload, authorization, client
+                )
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        writer: pq.ParquetWriter | None = None
+        async with self._create_client() as client:
+            tasks = [
+                asyncio.ensure_future(post_batch(client, batch_lat, batch_lon))
+                for batch_lat, batch_lon in batches
+            ]
+            try:
+                for done in asyncio.as_completed(tasks):
+                    table = pq.read_table(pa.BufferReader(await done))
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_path, table.schema)
+                    elif table.schema != writer.schema:
+                        table = table.cast(writer.schema)
+                    writer.write_table(table)
+            finally:
+                # Stop outstanding batches if one failed
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if writer is not None:
+                    writer.close()
+
+        logger.info(
+            "Received catchment area for %d starting points in %d batches",
+            len(latitudes),
+            len(batches),
+        )
+        return len(batches)
+
+    def _merge_batches_sql(
+        self: Self,
+        source: str,
+        catchment_area_type: CatchmentAreaType | str,
+        polygon_difference: bool,
+    ) -> str:
+        """SQL merging the results of several batches into a single result.
+
+        Keeps the schema of the routing response (WKB geometry). Network
+        edges and grid cells keep their lowest cost over all batches.
+        Polygons are unioned per step. With polygon_difference each step is
+        then cut by the union of all lower steps again.
+        """
+        area_type = (
+            catchment_area_type.value
+            if isinstance(catchment_area_type, CatchmentAreaType)
+            else catchment_area_type
+        )
 
-        raise RuntimeError(f"Failed to get response from {url}")
+        if area_type == CatchmentAreaType.network:
+            return f"""
+                SELECT geometry, MIN(cost) AS cost, MIN(cost_step) AS cost_step
+                FROM {source}
+                GROUP BY geometry
+            """
+        elif area_type == CatchmentAreaType.rectangular_grid:
+            return f"""
+                SELECT
+                    ANY_VALUE(geometry) AS geometry,
+                    h3_index,
+                    MIN(cost) AS cost,
+                    MIN(cost_step) AS cost_step
+                FROM {source}
+                GROUP BY h3_index
+            """
+
+        step_geometry = "geom"
+        if polygon_difference:
+            step_geometry = (
+                "CASE WHEN prev_geom IS NULL THEN geom "
+                "ELSE ST_Difference(geom, prev_geom) END"
+            )
+        # The union of all rows up to a step covers the full area of the
+        # step, whether rows hold full or incremental polygons
+        return f"""
+            WITH raw AS (
+                SELECT minute, cost_step, ST_GeomFromWKB(geometry) AS geom
+                FROM {source}
+            ),
+            steps AS (
+                SELECT DISTINCT minute, cost_step FROM raw
+            ),
+            cumulative AS (
+                SELECT s.minute, s.cost_step, ST_Union_Agg(r.geom) AS geom
+                FROM steps s
+                JOIN raw r ON r.minute <= s.minute
+                GROUP BY s.minute, s.cost_step
+            ),
+            ordered AS (
+                SELECT *, LAG(geom) OVER (ORDER BY minute) AS prev_geom
+                FROM cumulative
+            )
+            SELECT
+                ST_AsWKB({step_geometry}) AS geometry,
+                minute,
+                cost_step
+            FROM ordered
+            ORDER BY minute
+        """
 
     # =========================================================================
     # Output Helpers
@@ -1402,27 +1609,39 @@ class CatchmentAreaTool(AnalysisTool):
         logger.info("Saved catchment area to: %s", path)
         return path
 
-    def _save_bytes(self: Self, data: bytes, output_path: str) -> Path:
-        """Save raw bytes to output path, converting WKT geometry to proper GEOMETRY."""
+    def _save_routing_parquet(
+        self: Self,
+        temp_path: Path,
+        output_path: str,
+        merge_sql: str | None = None,
+    ) -> Path:
+        """Save a routing response parquet to output path, converting WKT/WKB geometry to proper GEOMETRY.
+
+        If merge_sql is given, it replaces the raw response rows (see
+        _merge_batches_sql).
+        """
         path = Path(output_path)
         path.parent.mkdir(parents=True, exist_ok=True)
 
-        # First write bytes to temp file
-        temp_path = path.with_suffix(".tmp.parquet")
-        with open(temp_path, "wb") as f:
-            f.write(data)
-
-        # Use DuckDB to convert WKT string geometry to proper GEOMETRY type
+        # Use DuckDB to convert WKT string / WKB binary geometry to proper GEOMETRY type
         con = duckdb.connect()
         con.execute("INSTALL spatial; LOAD spatial;")
 
         try:
-            # Check if geometry column exists and is string type (WKT)
+            if merge_sql:
+                merged_path = temp_path.with_suffix(".merged.parquet")
+                con.execute(f"COPY ({merge_sql}) TO '{merged_path}' (FORMAT PARQUET)")
+                merged_path.replace(temp_path)
+
+            # Check if geometry column exists and is string (WKT) or binary (WKB) type
             schema = con.execute(f"DESCRIBE SELECT * FROM '{temp_path}'").fetchall()
             col_info = {row[0]: row[1] for row in schema}
+            geom_parser = {"VARCHAR": "ST_GeomFromText", "BLOB": "ST_GeomFromWKB"}.get(
+                col_info.get("geometry", "").upper()
+            )
 
-            if "geometry" in col_info and "VARCHAR" in col_info["geometry"].upper():
-                # Geometry is WKT string - convert to proper GEOMETRY
+            if geom_parser:
+                # Geometry is WKT string or WKB - convert to proper GEOMETRY
                 non_geom_cols = [c for c in col_info.keys() if c != "geometry"]
                 if "minute" in non_geom_cols:
                     # remove minutes as not adapted to distance
@@ -1432,7 +1651,7 @@ class CatchmentAreaTool(AnalysisTool):
                     select_cols += ", "
 
                 query = f"""
-                    SELECT {select_cols}ST_GeomFromText(geometry) AS geometry
+                    SELECT {select_cols}{geom_parser}(geometry) AS geometry
                     FROM '{temp_path}'
                 """
                 write_optimized_parquet(
@@ -1441,13 +1660,13 @@ class CatchmentAreaTool(AnalysisTool):
                     path,
                     geometry_column="geometry",
                 )
-                logger.info("Converted WKT geometry to GEOMETRY and saved to: %s", path)
+                logger.info("Converted geometry to GEOMETRY and saved to: %s", path)
             else:
                 # Geometry is already proper format, just copy
                 import shutil
 
                 shutil.move(str(temp_path), str(path))
-                logger.info("Saved catchment area to: %s (%d bytes)", path, len(data))
+                logger.info("Saved catchment area to: %s", path)
         finally:
             con.close()
             # Clean up temp file if it still exists
@@ -40,15 +40,17 @@ class HeatmapClosestAverageTool(HeatmapToolBase):
         logger.info("Unified opportunity table created: %s", unified_table)
 
         # Extract unique DESTINATION H3 IDs from opportunities
-        destination_ids = self._extract_h3_ids(unified_table,column_name='dest_id')
-        if not destination_ids:
+        num_destinations = self._register_h3_ids(
+            unified_table, "dest_id", "destination_ids"
+        )
+        if not num_destinations:
             raise ValueError("No destination IDs found in opportunity data")
 
-        logger.info("Found %d unique destination IDs across ", len(destination_ids))
+        logger.info("Found %d unique destination IDs across ", num_destinations)
 
         # Filter OD matrix to only relevant destinations
         filtered_matrix = self._filter_od_matrix(
-            od_table, destination_ids=destination_ids
+            od_table, destination_ids="destination_ids"
         )
 
         # Compute closest-average accessibility
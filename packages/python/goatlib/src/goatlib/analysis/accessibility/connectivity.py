@@ -37,14 +37,16 @@ class HeatmapConnectivityTool(HeatmapToolBase):
             reference_table, meta, h3_resolution, "reference_area_h3", "dest_id"
         )
 
-        dest_ids = self._extract_h3_ids(reference_table_h3, column_name='dest_id')
-        if not dest_ids:
+        num_destinations = self._register_h3_ids(
+            reference_table_h3, "dest_id", "destination_ids"
+        )
+        if not num_destinations:
             raise ValueError("No destination IDs found in opportunity data")
 
         # --- Filter OD matrix: include all reachable destinations for calculation ---
         filtered_matrix = self._filter_od_matrix(
             od_table,
-            destination_ids=dest_ids,
+            destination_ids="destination_ids",
             max_cost=params.max_cost,
         )
 
@@ -1,13 +1,20 @@
+import glob
+import hashlib
+import json
 import logging
 from pathlib import Path
 from typing import Self
 
-from goatlib.analysis.accessibility.base import HeatmapToolBase, sanitize_sql_name
+from goatlib.analysis.accessibility.base import (
+    HeatmapToolBase,
+    impedance_weight_sql,
+    sanitize_sql_name,
+)
+from goatlib.analysis.accessibility.od_matrix import OD_MANIFEST_FILENAME
 from goatlib.analysis.schemas.heatmap import (
     HeatmapGravityParams,
     ImpedanceFunction,
     OpportunityGravity,
-    PotentialType
 )
 from goatlib.io.utils import Metadata
 from goatlib.models.io import DatasetMetadata
@@ -39,32 +46,29 @@ class HeatmapGravityTool(HeatmapToolBase):
             "OD matrix ready: table=%s, h3_resolution=%s", od_table, h3_resolution
         )
 
-        # Process and standardize opportunities using detected resolution
-        standardized_tables = self._process_opportunities(
-            params.opportunities, h3_resolution
-        )
-
-        # Combine all standardized opportunity tables
-        unified_table = self._combine_opportunities(standardized_tables)
-        logger.info("Unified opportunity table created: %s", unified_table)
-
-        destination_ids = self._extract_h3_ids(unified_table, column_name='dest_id')
-        if not destination_ids:
-            raise ValueError("No destination IDs found in opportunity data")
+        if params.partials_path:
+            gravity_results = self._compute_incremental_accessibility(
+                od_table, h3_resolution, params
+            )
+        else:
+            # Process and standardize opportunities using detected resolution
+            standardized_tables = self._process_opportunities(
+                params.opportunities, h3_resolution
+            )
 
-        logger.info("Found %d unique destination IDs across ", len(destination_ids))
+            # Combine all standardized opportunity tables
+            unified_table = self._combine_opportunities(standardized_tables)
+            logger.info("Unified opportunity table created: %s", unified_table)
 
-        filtered_matrix = self._filter_od_matrix(
-            od_table, destination_ids=destination_ids
-        )
+            filtered_matrix = self._filter_opportunity_matrix(od_table, unified_table)
 
-        gravity_results = self._compute_gravity_accessibility(
-            filtered_matrix,
-            unified_table,
-            standardized_tables,
-            params.impedance,
-            params.max_sensitivity,
-        )
+            gravity_results = self._compute_gravity_accessibility(
+                filtered_matrix,
+                unified_table,
+                standardized_tables,
+                params.impedance,
+                params.max_sensitivity,
+            )
 
         logger.info("Heatmap gravity analysis completed successfully")
 
@@ -81,16 +85,24 @@ class HeatmapGravityTool(HeatmapToolBase):
         return [(output_path, metadata)]
 
     def _process_opportunities(
-        self: Self, opportunities: list[OpportunityGravity], h3_resolution: int
+        self: Self,
+        opportunities: list[OpportunityGravity],
+        h3_resolution: int,
+        indices: list[int] | None = None,
     ) -> list[tuple[str, str]]:
         """
         Imports and standardizes all opportunity datasets into the canonical schema:
         dest_id, potential, max_cost, sensitivity
         Returns a list of (table_name, display_name).
+
+        If indices are given, only the opportunities at these positions are
+        processed, keeping their position in the table names.
         """
         opportunity_tables = []
 
         for idx, opp in enumerate(opportunities):
+            if indices is not None and idx not in indices:
+                continue
             # Use simple table name (internal), keep display name separate
             table_name = f"opp_{idx}"
             display_name = opp.name or Path(opp.input_path).stem
@@ -229,57 +241,6 @@ class HeatmapGravityTool(HeatmapToolBase):
         self.con.execute(query)
         return output_table
 
-    def _get_potential_sql(
-        self: Self, opp: OpportunityGravity, wgs84_geom_sql: str, geom_type: str
-    ) -> str:
-        """
-        Determines the SQL expression for potential.
-
-        Priority:
-        1. potential_expression
-        2. potential_constant
-        3. potential_field
-        4. defaults to 1.0
-
-        Special rule:
-        - 'area' and 'perimeter' expressions are only valid for Polygon/MultiPolygon geometries.
-        """
-        geom_type_lower = (geom_type or "").lower()
-
-        # --- Handle potential_expression first ---
-        if opp.potential_expression:
-            expr = opp.potential_expression.lower().strip()
-
-            if expr in ("$area", "area"):
-                if "polygon" not in geom_type_lower:
-                    raise ValueError(
-                        f"Invalid potential_expression='{expr}' for geometry type '{geom_type}'. "
-                        "Area is only valid for Polygon or MultiPolygon geometries."
-                    )
-                return f"ST_Area_Spheroid({wgs84_geom_sql})"
-
-            if expr in ("$perimeter", "perimeter"):
-                if "polygon" not in geom_type_lower:
-                    raise ValueError(
-                        f"Invalid potential_expression='{expr}' for geometry type '{geom_type}'. "
-                        "Perimeter is only valid for Polygon or MultiPolygon geometries."
-                    )
-                return f"ST_Perimeter_Spheroid({wgs84_geom_sql})"
-
-            # Custom user expression (use as-is)
-            return expr
-
-        # --- Constant potential ---
-        if opp.potential_type ==PotentialType.constant:
-            return str(float(opp.potential_constant))
-
-        # --- Field-based potential ---
-        if opp.potential_field:
-            return f'"{opp.potential_field}"'
-
-        # --- Default constant ---
-        return "1.0"
-
     def _combine_opportunities(
         self: Self, standardized_tables: list[tuple[str, str]]
     ) -> str:
@@ -337,72 +298,72 @@ class HeatmapGravityTool(HeatmapToolBase):
         Updated to use pivoted column names.
         """
         # Reference the pivoted column names
-        potential_col = f"o.{opportunity_name}_potential"
-        max_cost_col = f"o.{opportunity_name}_max_cost"
-        sens_col = f"o.{opportunity_name}_sens"
-
-        if which == ImpedanceFunction.gaussian:
-            return f"""
-                SUM(
-                    EXP(
-                        ((((m.cost / {max_cost_col}) * (m.cost / {max_cost_col})) * -1)
-                        / ({sens_col} / {max_sens}))
-                    ) * {potential_col}
-                )
-            """
-        elif which == ImpedanceFunction.linear:
-            return f"SUM( (1 - (m.cost / {max_cost_col})) * {potential_col} )"
-        elif which == ImpedanceFunction.exponential:
-            return f"""
-                SUM(
-                    EXP(
-                        ((({sens_col} / {max_sens}) * -1) * (m.cost / {max_cost_col}))
-                    ) * {potential_col}
-                )
-            """
-        elif which == ImpedanceFunction.power:
-            return f"""
-                SUM(
-                    POW(
-                        (m.cost / {max_cost_col}),
-                        (({sens_col} / {max_sens}) * -1)
-                    ) * {potential_col}
-                )
-            """
-        else:
-            raise ValueError(f"Unknown impedance function: {which}")
+        weight = impedance_weight_sql(
+            which,
+            max_sens,
+            f"o.{opportunity_name}_max_cost",
+            f"o.{opportunity_name}_sens",
+        )
+        return f"SUM({weight} * o.{opportunity_name}_potential)"
 
-    def _compute_gravity_accessibility(
+    def _filter_opportunity_matrix(self: Self, od_table: str, unified_table: str) -> str:
+        """Filter the OD matrix to the destinations of the unified opportunities."""
+        num_destinations = self._register_h3_ids(
+            unified_table, "dest_id", "destination_ids"
+        )
+        if not num_destinations:
+            raise ValueError("No destination IDs found in opportunity data")
+
+        logger.info("Found %d unique destination IDs across ", num_destinations)
+
+        return self._filter_od_matrix(od_table, destination_ids="destination_ids")
+
+    def _opportunity_columns(
         self: Self,
-        filtered_matrix: str,
-        opportunities_table: str,
         standardized_tables: list[tuple[str, str]],
         impedance_func: ImpedanceFunction,
         max_sensitivity: float,
-    ) -> str:
-        """Compute gravity-based accessibility scores per destination with individual opportunity columns."""
-        gravity_table = "gravity_scores"
-
-        # Build individual opportunity accessibility columns
+    ) -> list[str]:
+        """
+        Accessibility column per opportunity. Each column only counts destinations
+        within the travel time limit of its own opportunity, so the score of an
+        opportunity does not depend on the other opportunities of the run.
+        """
         opportunity_columns = []
-        sum_expressions = []
-        safe_names = []
-
-        for idx, (std_table, opp_name) in enumerate(standardized_tables):
+        for idx, (_, opp_name) in enumerate(standardized_tables):
             safe_name = sanitize_sql_name(opp_name, idx)
-
-            safe_names.append(safe_name)
             impedance_sql = self._impedance_sql(
                 impedance_func, max_sensitivity, safe_name
             )
-
             opportunity_columns.append(f"""
-                {impedance_sql} AS {safe_name}_accessibility
+                {impedance_sql} FILTER (WHERE m.cost <= o.{safe_name}_max_cost)
+                    AS {safe_name}_accessibility
             """)
-            sum_expressions.append(f"{safe_name}_accessibility")
+        return opportunity_columns
+
+    def _compute_gravity_accessibility(
+        self: Self,
+        filtered_matrix: str,
+        opportunities_table: str,
+        standardized_tables: list[tuple[str, str]],
+        impedance_func: ImpedanceFunction,
+        max_sensitivity: float,
+    ) -> str:
+        """Compute gravity-based accessibility scores per destination with individual opportunity columns."""
+        gravity_table = "gravity_scores"
+
+        safe_names = [
+            sanitize_sql_name(opp_name, idx)
+            for idx, (_, opp_name) in enumerate(standardized_tables)
+        ]
+        sum_expressions = [f"{safe_name}_accessibility" for safe_name in safe_names]
 
         # Build the main query with individual opportunity accessibilities
-        individual_columns_sql = ",\n            ".join(opportunity_columns)
+        individual_columns_sql = ",\n            ".join(
+            self._opportunity_columns(
+                standardized_tables, impedance_func, max_sensitivity
+            )
+        )
 
         query = f"""
             CREATE OR REPLACE TEMP TABLE {gravity_table} AS
@@ -410,14 +371,16 @@ class HeatmapGravityTool(HeatmapToolBase):
                 m.orig_id AS h3_index,
                 {individual_columns_sql},
                 -- Total accessibility as sum of all individual accessibilities
-                ({' + '.join(sum_expressions)}) AS total_accessibility
+                ({' + '.join(f"COALESCE({e}, 0)" for e in sum_expressions)})
+                    AS total_accessibility
             FROM {filtered_matrix} AS m
             JOIN {opportunities_table} AS o ON m.dest_id = o.dest_id
             WHERE (
                 {' OR '.join([f"m.cost <= o.{safe_name}_max_cost" for safe_name in safe_names])}
             )
             GROUP BY m.orig_id
-            HAVING total_accessibility IS NOT NULL
+            -- Keep origins reaching any of the opportunities
+            HAVING COALESCE({', '.join(sum_expressions)}) IS NOT NULL
         """
 
         self.con.execute(query)
@@ -431,3 +394,237 @@ class HeatmapGravityTool(HeatmapToolBase):
         )
 
         return gravity_table
+
+    # ------------------------------------------------------------------
+    # Incremental recomputation from per-opportunity partial results
+    # ------------------------------------------------------------------
+
+    def _compute_incremental_accessibility(
+        self: Self,
+        od_table: str,
+        h3_resolution: int,
+        params: HeatmapGravityParams,
+    ) -> str:
+        """
+        Computes gravity accessibility from per-opportunity partial results.
+
+        Partials are stored in params.partials_path keyed by the opportunity
+        source version, its parameters, the impedance and the OD matrix
+        version. Only opportunities without a stored partial are imported and
+        scored, in one scan of the matrix filtered to their destinations.
+        The result is recombined from all partials.
+        """
+        partials_dir = Path(params.partials_path)
+        partials_dir.mkdir(parents=True, exist_ok=True)
+
+        od_version = self._od_matrix_version(params.od_matrix_path)
+        if od_version is None:
+            logger.info("OD matrix version unknown, partial results are not persisted")
+
+        sources: dict[int, str] = {}
+        pending: dict[int, Path | None] = {}
+        for idx, opp in enumerate(params.opportunities):
+            key = self._partial_key(opp, params, od_version, h3_resolution)
+            partial_path = partials_dir / f"{key}.parquet" if key else None
+            if partial_path and partial_path.exists():
+                sources[idx] = f"read_parquet('{partial_path}')"
+            else:
+                pending[idx] = partial_path
+
+        logger.info(
+            "Reusing %d of %d opportunity partials, computing %d",
+            len(sources),
+            len(params.opportunities),
+            len(pending),
+        )
+
+        if pending:
+            sources.update(
+                self._compute_partials(od_table, h3_resolution, params, pending)
+            )
+        if not sources:
+            raise ValueError("No destination IDs found in opportunity data")
+
+        return self._recombine_partials(params.opportunities, sources)
+
+    def _compute_partials(
+        self: Self,
+        od_table: str,
+        h3_resolution: int,
+        params: HeatmapGravityParams,
+        pending: dict[int, Path | None],
+    ) -> dict[int, str]:
+        """
+        Scores the pending opportunities and stores a partial per opportunity.
+        Returns the partial source (parquet or temp table) per opportunity index.
+        """
+        indices: list[int] = []
+        standardized_tables: list[tuple[str, str]] = []
+        for idx in pending:
+            tables = self._process_opportunities(
+                params.opportunities, h3_resolution, indices=[idx]
+            )
+            if tables:
+                indices.append(idx)
+                standardized_tables.extend(tables)
+        if not standardized_tables:
+            return {}
+
+        unified_table = self._combine_opportunities(standardized_tables)
+        filtered_matrix = self._filter_opportunity_matrix(od_table, unified_table)
+
+        scores_table = "gravity_partial_scores"
+        columns = self._opportunity_columns(
+            standardized_tables, params.impedance, params.max_sensitivity
+        )
+        self.con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE {scores_table} AS
+            SELECT
+                m.orig_id AS h3_index,
+                {", ".join(columns)}
+            FROM {filtered_matrix} AS m
+            JOIN {unified_table} AS o ON m.dest_id = o.dest_id
+            GROUP BY m.orig_id
+        """)
+
+        sources: dict[int, str] = {}
+        for local_idx, (idx, (_, opp_name)) in enumerate(
+            zip(indices, standardized_tables)
+        ):
+            column = f"{sanitize_sql_name(opp_name, local_idx)}_accessibility"
+            partial_table = f"gravity_partial_{idx}"
+            self.con.execute(f"""
+                CREATE OR REPLACE TEMP TABLE {partial_table} AS
+                SELECT h3_index, {column} AS accessibility
+                FROM {scores_table}
+                WHERE {column} IS NOT NULL
+            """)
+
+            partial_path = pending[idx]
+            if partial_path is None:
+                sources[idx] = partial_table
+                continue
+
+            # Write next to the final path and rename, so readers never see
+            # a partially written file
+            tmp_path = partial_path.with_suffix(".parquet.tmp")
+            self.con.execute(
+                f"COPY {partial_table} TO '{tmp_path}' (FORMAT PARQUET)"
+            )
+            tmp_path.replace(partial_path)
+            sources[idx] = partial_table
+            logger.info(
+                "Stored partial result for opportunity %d: %s", idx, partial_path
+            )
+
+        return sources
+
+    def _recombine_partials(
+        self: Self,
+        opportunities: list[OpportunityGravity],
+        sources: dict[int, str],
+    ) -> str:
+        """Join the partials into one column per opportunity and re-sum the total."""
+        gravity_table = "gravity_scores"
+
+        safe_names = {
+            idx: sanitize_sql_name(opp.name or Path(opp.input_path).stem, idx)
+            for idx, opp in enumerate(opportunities)
+            if idx in sources
+        }
+        origins = " UNION ".join(
+            f"SELECT h3_index FROM {source}" for source in sources.values()
+        )
+        columns = ", ".join(
+            f"p{idx}.accessibility AS {safe_name}_accessibility"
+            for idx, safe_name in safe_names.items()
+        )
+        joins = "\n".join(
+            f"LEFT JOIN {sources[idx]} AS p{idx} ON p{idx}.h3_index = ids.h3_index"
+            for idx in safe_names
+        )
+        accessibilities = [
+            f"{safe_name}_accessibility" for safe_name in safe_names.values()
+        ]
+        total = " + ".join(f"COALESCE({column}, 0)" for column in accessibilities)
+
+        self.con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE {gravity_table} AS
+            SELECT * FROM (
+                SELECT
+                    ids.h3_index,
+                    {columns},
+                    ({total}) AS total_accessibility
+                FROM ({origins}) AS ids
+                {joins}
+            )
+            WHERE COALESCE({", ".join(accessibilities)}) IS NOT NULL
+        """)
+        logger.info(
+            "Recombined gravity scores for %d origins from %d partials",
+            self._count_rows(gravity_table),
+            len(sources),
+        )
+        return gravity_table
+
+    def _partial_key(
+        self: Self,
+        opp: OpportunityGravity,
+        params: HeatmapGravityParams,
+        od_version: str | None,
+        h3_resolution: int,
+    ) -> str | None:
+        """Key of an opportunity partial, None if its inputs cannot be versioned."""
+        source_version = opp.source_version or _file_version(opp.input_path)
+        if source_version is None or od_version is None:
+            return None
+
+        payload = {
+            "opportunity": opp.model_dump(
+                mode="json", exclude={"name", "input_path", "source_version"}
+            ),
+            "source": source_version,
+            "impedance": params.impedance.value,
+            "max_sensitivity": params.max_sensitivity,
+            "od_matrix": od_version,
+            "od_column_map": params.od_column_map,
+            "h3_resolution": h3_resolution,
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True).encode()
+        ).hexdigest()
+
+    def _od_matrix_version(self: Self, od_matrix_path: str) -> str | None:
+        """Version of a local OD matrix from the size and mtime of its files."""
+        if "://" in od_matrix_path:
+            return None
+
+        path = od_matrix_path.rstrip("/")
+        if "*" in path:
+            files = glob.glob(path, recursive=True)
+        elif Path(path).is_dir():
+            files = [
+                str(f)
+                for f in Path(path).rglob("*")
+                if f.suffix == ".parquet" or f.name == OD_MANIFEST_FILENAME
+            ]
+        else:
+            files = [path]
+
+        versions = [_file_version(f) for f in sorted(files)]
+        if not versions or None in versions:
+            return None
+        return hashlib.sha256("\n".join(versions).encode()).hexdigest()
+
+
+def _file_version(path: str) -> str | None:
+    """Version of a local file from its path, size and mtime."""
+    if "://" in path:
+        return None
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    if not Path(path).is_file():
+        return None
+    return f"{Path(path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
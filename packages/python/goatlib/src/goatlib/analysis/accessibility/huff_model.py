@@ -67,20 +67,27 @@ class HuffmodelTool(HeatmapToolBase):
         demand_table_filtered = f"{demand_table}_filtered"
 
         # Extract unique H3 IDs from filtered tables using base methods
-        opportunity_ids = self._extract_h3_ids(opportunity_table_filtered, column_name="dest_id")
-        demand_ids = self._extract_h3_ids(demand_table_filtered, column_name="orig_id")
+        num_opportunities = self._register_h3_ids(
+            opportunity_table_filtered, "dest_id", "opportunity_ids"
+        )
+        num_demand = self._register_h3_ids(
+            demand_table_filtered, "orig_id", "demand_ids"
+        )
 
-        if not opportunity_ids:
+        if not num_opportunities:
             raise ValueError("No opportunity IDs found in opportunity data within study area")
-        if not demand_ids:
+        if not num_demand:
             raise ValueError("No demand IDs found in demand data within study area")
 
-        logger.info("Found %d unique opportunity IDs in study area", len(opportunity_ids))
-        logger.info("Found %d unique demand IDs in study area", len(demand_ids))
+        logger.info("Found %d unique opportunity IDs in study area", num_opportunities)
+        logger.info("Found %d unique demand IDs in study area", num_demand)
 
         # Filter OD matrix using base method
         filtered_matrix = self._filter_od_matrix(
-            od_table, origin_ids=demand_ids, destination_ids=opportunity_ids, max_cost=params.max_cost
+            od_table,
+            origin_ids="demand_ids",
+            destination_ids="opportunity_ids",
+            max_cost=params.max_cost,
         )
 
         # Compute Huff model using filtered tables
@@ -0,0 +1,445 @@
+import logging
+from pathlib import Path
+from typing import Self
+
+from goatlib.analysis.accessibility.base import (
+    impedance_weight_sql,
+    sanitize_sql_name,
+)
+from goatlib.analysis.accessibility.gravity import HeatmapGravityTool
+from goatlib.analysis.schemas.heatmap import (
+    HeatmapMeasure,
+    HeatmapMultiMeasureParams,
+    ImpedanceFunction,
+    OpportunityMultiMeasure,
+    TwoSFCAType,
+)
+from goatlib.io.utils import Metadata
+from goatlib.models.io import DatasetMetadata
+
+logger = logging.getLogger(__name__)
+
+
+class HeatmapMultiMeasureTool(HeatmapGravityTool):
+    """
+    Computes several accessibility measures in one heatmap run.
+
+    The OD matrix is registered, the opportunities standardized and the
+    matrix filtered once for all measures. Measures are then computed in
+    one scan of the filtered matrix grouped by origin, only 2SFCA needs an
+    extra pass over the destinations for its capacity ratios.
+
+    Output columns are named {opportunity}_{measure} with a total_{measure}
+    column per measure:
+      - gravity: impedance weighted sum of potentials, total is the sum
+      - closest_average: mean cost to the n closest destinations, total is
+        the mean of the opportunity averages
+      - connectivity: area of the reachable opportunity cells in m², total
+        is the area reachable within any opportunity's travel time limit
+      - two_sfca: sum of capacity ratios (weighted for e2sfca/m2sfca),
+        total is the sum
+    """
+
+    def _run_implementation(
+        self: Self, params: HeatmapMultiMeasureParams
+    ) -> list[tuple[Path, DatasetMetadata]]:
+        logger.info(
+            "Starting Heatmap Multi-Measure Analysis: %s",
+            ", ".join(params.measures),
+        )
+
+        # Register OD matrix and detect H3 resolution
+        od_table, h3_resolution = self._prepare_od_matrix(
+            params.od_matrix_path, params.od_column_map
+        )
+        logger.info(
+            "OD matrix ready: table=%s, h3_resolution=%s", od_table, h3_resolution
+        )
+
+        # Standardize opportunities once for all measures
+        standardized_tables = self._process_opportunities(
+            params.opportunities, h3_resolution
+        )
+        unified_table = self._combine_opportunities(standardized_tables)
+        logger.info("Unified opportunity table created: %s", unified_table)
+
+        num_destinations = self._register_h3_ids(
+            unified_table, "dest_id", "destination_ids"
+        )
+        if not num_destinations:
+            raise ValueError("No destination IDs found in opportunity data")
+        logger.info("Found %d unique destination IDs", num_destinations)
+
+        filtered_matrix = self._filter_od_matrix(
+            od_table,
+            destination_ids="destination_ids",
+            max_cost=max(opp.max_cost for opp in params.opportunities),
+        )
+
+        ratios_table = None
+        if HeatmapMeasure.two_sfca in params.measures:
+            demand_table = self._process_demand(
+                params.demand_path, params.demand_field, h3_resolution
+            )
+            ratios_table = self._compute_capacity_ratios(
+                filtered_matrix,
+                unified_table,
+                standardized_tables,
+                demand_table,
+                params,
+            )
+
+        result_table = self._compute_measures(
+            filtered_matrix, unified_table, standardized_tables, ratios_table, params
+        )
+
+        logger.info("Heatmap multi-measure analysis completed successfully")
+
+        output_path = self._export_h3_results(result_table, params.output_path)
+
+        metadata = DatasetMetadata(
+            path=str(output_path),
+            source_type="vector",
+            format="geoparquet",
+            geometry_type="Polygon",
+            geometry_column="geometry",
+        )
+        return [(output_path, metadata)]
+
+    def _prepare_opportunity_table(
+        self: Self,
+        table_name: str,
+        meta: Metadata,
+        opp: OpportunityMultiMeasure,
+        h3_resolution: int,
+    ) -> str:
+        """
+        Converts an imported opportunity dataset into the canonical schema:
+        dest_id, potential, capacity, max_cost, sensitivity, n_destinations.
+
+        Potential and capacity are split over the H3 cells of a feature like
+        in the gravity tool. Capacity is NULL without a capacity field.
+        """
+        geom_type = (meta.geometry_type or "").lower()
+        geom_col = meta.geometry_column or "geom"
+        output_table = f"{table_name}_std"
+
+        transform_to_4326 = geom_col
+        try:
+            if meta.crs and meta.crs.to_epsg() != 4326:
+                source_crs = meta.crs.to_string()
+                transform_to_4326 = (
+                    f"ST_Transform({geom_col}, '{source_crs}', 'EPSG:4326')"
+                )
+        except Exception:
+            pass
+
+        potential_sql = self._get_potential_sql(opp, transform_to_4326, geom_type)
+        capacity_sql = f'"{opp.capacity_field}"' if opp.capacity_field else "NULL"
+        constants_sql = f"""
+                {opp.max_cost}::DOUBLE AS max_cost,
+                {opp.sensitivity}::DOUBLE AS sensitivity,
+                {opp.n_destinations}::INTEGER AS n_destinations"""
+
+        if "point" in geom_type:
+            query = f"""
+            CREATE OR REPLACE TEMP TABLE {output_table} AS
+            WITH features AS (
+                SELECT
+                    {potential_sql}::DOUBLE AS total_potential,
+                    {capacity_sql}::DOUBLE AS total_capacity,
+                    {transform_to_4326} AS geom
+                FROM {table_name}
+                WHERE {geom_col} IS NOT NULL
+            ),
+            exploded AS (
+                SELECT
+                    total_potential,
+                    total_capacity,
+                    ST_NumGeometries(geom) AS num_parts,
+                    (UNNEST(ST_Dump(geom))).geom AS simple_geom
+                FROM features
+            )
+            SELECT
+                h3_latlng_to_cell(ST_Y(simple_geom), ST_X(simple_geom), {h3_resolution}) AS dest_id,
+                SUM(total_potential / num_parts) AS potential,
+                SUM(total_capacity / num_parts) AS capacity,
+                {constants_sql}
+            FROM exploded
+            WHERE simple_geom IS NOT NULL
+            GROUP BY dest_id
+            """
+        elif "polygon" in geom_type:
+            query = f"""
+            CREATE OR REPLACE TEMP TABLE {output_table} AS
+            WITH features AS (
+                SELECT
+                    {potential_sql}::DOUBLE AS total_potential,
+                    {capacity_sql}::DOUBLE AS total_capacity,
+                    {transform_to_4326} AS geom
+                FROM {table_name}
+                WHERE {geom_col} IS NOT NULL
+            ),
+            polygons AS (
+                SELECT
+                    ROW_NUMBER() OVER () AS row_id,
+                    total_potential,
+                    total_capacity,
+                    (UNNEST(ST_Dump(ST_Force2D(geom))).geom) AS simple_geom
+                FROM features
+            ),
+            h3_cells_unique AS (
+                SELECT DISTINCT
+                    row_id,
+                    total_potential,
+                    total_capacity,
+                    UNNEST(h3_polygon_wkt_to_cells_experimental(ST_AsText(simple_geom), {h3_resolution}, 'CONTAINMENT_OVERLAPPING')) AS dest_id
+                FROM polygons
+            ),
+            h3_counts AS (
+                SELECT row_id, COUNT(*) AS num_cells
+                FROM h3_cells_unique
+                GROUP BY row_id
+            )
+            SELECT
+                u.dest_id,
+                SUM(u.total_potential / hc.num_cells) AS potential,
+                SUM(u.total_capacity / hc.num_cells) AS capacity,
+                {constants_sql}
+            FROM h3_cells_unique u
+            JOIN h3_counts hc ON u.row_id = hc.row_id
+            GROUP BY u.dest_id
+            """
+        else:
+            raise ValueError(f"Unsupported geometry type: '{geom_type}'")
+
+        self.con.execute(query)
+        return output_table
+
+    def _combine_opportunities(
+        self: Self, standardized_tables: list[tuple[str, str]]
+    ) -> str:
+        """
+        Combine standardized opportunity tables using PIVOT.
+        Creates columns: {name}_potential, {name}_capacity, {name}_max_cost,
+        {name}_sens and {name}_n_dest
+        """
+        if not standardized_tables:
+            raise ValueError("No standardized opportunity tables provided")
+
+        union_parts = []
+        for idx, (std_table, name) in enumerate(standardized_tables):
+            safe_name = sanitize_sql_name(name, idx)
+            union_parts.append(f"""
+                SELECT
+                    dest_id,
+                    '{safe_name}' AS opportunity_type,
+                    potential,
+                    capacity,
+                    max_cost,
+                    sensitivity,
+                    n_destinations
+                FROM {std_table}
+                WHERE dest_id IS NOT NULL
+            """)
+
+        union_query = "\nUNION ALL\n".join(union_parts)
+        unified_table = "opportunity_measures_unified"
+
+        query = f"""
+            CREATE OR REPLACE TEMP TABLE {unified_table} AS
+            PIVOT (
+                {union_query}
+            )
+            ON opportunity_type
+            USING
+                FIRST(potential) AS potential,
+                FIRST(capacity) AS capacity,
+                FIRST(max_cost) AS max_cost,
+                FIRST(sensitivity) AS sens,
+                FIRST(n_destinations) AS n_dest
+        """
+
+        self.con.execute(query)
+        logger.info(
+            "Unified opportunity table '%s' created with %d layers",
+            unified_table,
+            len(standardized_tables),
+        )
+        return unified_table
+
+    def _weight_sql(
+        self: Self, impedance: ImpedanceFunction, max_sens: float, safe_name: str
+    ) -> str:
+        return impedance_weight_sql(
+            impedance, max_sens, f"o.{safe_name}_max_cost", f"o.{safe_name}_sens"
+        )
+
+    def _compute_capacity_ratios(
+        self: Self,
+        filtered_matrix: str,
+        unified_table: str,
+        standardized_tables: list[tuple[str, str]],
+        demand_table: str,
+        params: HeatmapMultiMeasureParams,
+    ) -> str:
+        """
+        2SFCA step 1: capacity / demand within the catchment of each destination.
+        Returns a table with dest_id and a {name}_ratio column per opportunity.
+        """
+        ratios_table = "multi_measure_capacity_ratios"
+        weighted = params.two_sfca_type in (TwoSFCAType.e2sfca, TwoSFCAType.m2sfca)
+
+        demand_sums = []
+        ratios = []
+        for idx, (_, name) in enumerate(standardized_tables):
+            sn = sanitize_sql_name(name, idx)
+            demand = "d.demand_value"
+            if weighted:
+                weight = self._weight_sql(params.impedance, params.max_sensitivity, sn)
+                demand = f"d.demand_value * {weight}"
+            demand_sums.append(
+                f"SUM({demand}) FILTER (WHERE m.cost <= o.{sn}_max_cost) AS {sn}_demand"
+            )
+            ratios.append(
+                f"o.{sn}_capacity / NULLIF(s.{sn}_demand, 0) AS {sn}_ratio"
+            )
+
+        query = f"""
+            CREATE OR REPLACE TEMP TABLE {ratios_table} AS
+            WITH demand_sums AS (
+                SELECT
+                    m.dest_id,
+                    {', '.join(demand_sums)}
+                FROM {filtered_matrix} m
+                JOIN {unified_table} o ON m.dest_id = o.dest_id
+                JOIN {demand_table} d ON m.orig_id = d.orig_id
+                GROUP BY m.dest_id
+            )
+            SELECT
+                o.dest_id,
+                {', '.join(ratios)}
+            FROM {unified_table} o
+            JOIN demand_sums s ON o.dest_id = s.dest_id
+        """
+        self.con.execute(query)
+        logger.info(
+            "Computed 2SFCA capacity ratios for %d destinations",
+            self._count_rows(ratios_table),
+        )
+        return ratios_table
+
+    def _measure_sql(
+        self: Self,
+        measure: HeatmapMeasure,
+        safe_name: str,
+        params: HeatmapMultiMeasureParams,
+    ) -> str:
+        """Aggregate of one measure for one opportunity, grouped by origin."""
+        reachable = f"FILTER (WHERE m.cost <= o.{safe_name}_max_cost)"
+
+        if measure == HeatmapMeasure.gravity:
+            weight = self._weight_sql(
+                params.impedance, params.max_sensitivity, safe_name
+            )
+            return f"SUM({weight} * o.{safe_name}_potential) {reachable}"
+        elif measure == HeatmapMeasure.closest_average:
+            return f"""list_avg(list_slice(
+                    list_sort(LIST(m.cost) {reachable}),
+                    1,
+                    ANY_VALUE(o.{safe_name}_n_dest)
+                ))"""
+        elif measure == HeatmapMeasure.connectivity:
+            return f"SUM(h3_cell_area(m.dest_id, 'm^2')) {reachable}"
+        elif measure == HeatmapMeasure.two_sfca:
+            ratio = f"r.{safe_name}_ratio"
+            if params.two_sfca_type == TwoSFCAType.twosfca:
+                return f"SUM({ratio}) {reachable}"
+            weight = self._weight_sql(
+                params.impedance, params.max_sensitivity, safe_name
+            )
+            if params.two_sfca_type == TwoSFCAType.m2sfca:
+                return f"SUM({ratio} * {weight} * {weight}) {reachable}"
+            return f"SUM({ratio} * {weight}) {reachable}"
+        raise ValueError(f"Unknown heatmap measure: {measure}")
+
+    def _compute_measures(
+        self: Self,
+        filtered_matrix: str,
+        unified_table: str,
+        standardized_tables: list[tuple[str, str]],
+        ratios_table: str | None,
+        params: HeatmapMultiMeasureParams,
+    ) -> str:
+        """Compute all requested measures in one scan grouped by origin."""
+        result_table = "multi_measure_scores"
+        safe_names = [
+            sanitize_sql_name(name, idx)
+            for idx, (_, name) in enumerate(standardized_tables)
+        ]
+
+        measure_columns = []
+        output_columns = []
+        total_columns = []
+        for measure in params.measures:
+            columns = [f"{sn}_{measure}" for sn in safe_names]
+            for sn, column in zip(safe_names, columns):
+                measure_columns.append(
+                    f"{self._measure_sql(measure, sn, params)} AS {column}"
+                )
+            output_columns.extend(columns)
+
+            if measure == HeatmapMeasure.closest_average:
+                total_columns.append(
+                    f"list_avg([{', '.join(columns)}]) AS total_{measure}"
+                )
+            elif measure == HeatmapMeasure.connectivity:
+                # Cells shared by several opportunities only count once
+                any_reachable = " OR ".join(
+                    f"m.cost <= o.{sn}_max_cost" for sn in safe_names
+                )
+                measure_columns.append(
+                    f"SUM(h3_cell_area(m.dest_id, 'm^2')) "
+                    f"FILTER (WHERE {any_reachable}) AS total_{measure}"
+                )
+                total_columns.append(f"total_{measure}")
+            else:
+                total_columns.append(
+                    f"list_sum([{', '.join(columns)}]) AS total_{measure}"
+                )
+
+        ratios_join = ""
+        if ratios_table:
+            ratios_join = f"LEFT JOIN {ratios_table} r ON m.dest_id = r.dest_id"
+
+        query = f"""
+            CREATE OR REPLACE TEMP TABLE {result_table} AS
+            WITH scores AS (
+                SELECT
+                    m.orig_id AS h3_index,
+                    {", ".join(measure_columns)}
+                FROM {filtered_matrix} m
+                JOIN {unified_table} o ON m.dest_id = o.dest_id
+                {ratios_join}
+                GROUP BY m.orig_id
+            )
+            SELECT
+                h3_index,
+                {", ".join(output_columns)},
+                {", ".join(total_columns)}
+            FROM scores
+        """
+        self.con.execute(query)
+
+        # Drop origins without any reachable opportunity
+        totals = ", ".join(f"total_{measure}" for measure in params.measures)
+        self.con.execute(
+            f"DELETE FROM {result_table} WHERE COALESCE({totals}) IS NULL"
+        )
+        logger.info(
+            "Computed %d measures for %d origins with %d opportunity columns",
+            len(params.measures),
+            self._count_rows(result_table),
+            len(safe_names),
+        )
+        return result_table
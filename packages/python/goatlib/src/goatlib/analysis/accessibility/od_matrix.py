@@ -0,0 +1,200 @@
+"""Spatially partitioned OD matrix store.
+
+Large OD matrices are written as Hive partitions keyed by a coarse H3 parent
+of the destination cell, next to a manifest recording the bounds of every
+partition:
+
+    od_matrix/
+    ├── _manifest.json
+    ├── h3_parent=599686042433355775/data_0.parquet
+    └── h3_parent=599686043507097599/data_0.parquet
+
+Heatmap tools read the manifest to only scan partitions that can contain
+the requested destinations, origins and costs. Rows are sorted by origin
+within a partition so origin filters also prune row groups.
+"""
+
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Self
+
+from pydantic import BaseModel, Field
+
+from goatlib.io.config import PARQUET_COMPRESSION, PARQUET_ROW_GROUP_SIZE
+
+if TYPE_CHECKING:
+    import duckdb
+
+logger = logging.getLogger(__name__)
+
+OD_MANIFEST_FILENAME = "_manifest.json"
+PARTITION_COLUMN = "h3_parent"
+
+# Resolution 5 cells cover ~250 km², a country splits into a few thousand
+DEFAULT_PARTITION_RESOLUTION = 5
+
+
+class ODPartition(BaseModel):
+    """Bounds of one OD matrix partition."""
+
+    h3_parent: int = Field(..., description="H3 parent cell of the destinations")
+    path: str = Field(..., description="Partition directory, relative to the root")
+    num_rows: int
+    min_cost: float
+    max_cost: float
+    min_orig_id: int
+    max_orig_id: int
+
+
+class ODMatrixManifest(BaseModel):
+    """Manifest of a partitioned OD matrix."""
+
+    h3_resolution: int = Field(..., description="H3 resolution of origins/destinations")
+    partition_resolution: int = Field(
+        ..., description="H3 resolution of the destination parent partitions"
+    )
+    partitions: list[ODPartition] = Field(default_factory=list)
+
+    @classmethod
+    def load(cls: type[Self], od_matrix_path: str) -> Self | None:
+        """Load the manifest of an OD matrix directory, if it has one."""
+        path = od_matrix_path.rstrip("/")
+        if "*" in path or path.endswith(".parquet") or "://" in path:
+            return None
+        manifest_path = Path(path) / OD_MANIFEST_FILENAME
+        if not manifest_path.exists():
+            return None
+        return cls.model_validate_json(manifest_path.read_text())
+
+    def save(self: Self, od_matrix_path: str | Path) -> Path:
+        manifest_path = Path(od_matrix_path) / OD_MANIFEST_FILENAME
+        manifest_path.write_text(self.model_dump_json(indent=2))
+        return manifest_path
+
+    def select(
+        self: Self,
+        parents: set[int] | None = None,
+        orig_range: tuple[int, int] | None = None,
+        max_cost: float | None = None,
+        min_cost: float | None = None,
+    ) -> list[ODPartition]:
+        """Partitions that can hold rows matching the given filters.
+
+        Args:
+            parents: Destination parent cells at the partition resolution
+            orig_range: Smallest and largest requested origin id
+            max_cost: Maximum cost to include
+            min_cost: Minimum cost to include
+        """
+        selected = []
+        for partition in self.partitions:
+            if parents is not None and partition.h3_parent not in parents:
+                continue
+            if orig_range is not None and (
+                partition.max_orig_id < orig_range[0]
+                or partition.min_orig_id > orig_range[1]
+            ):
+                continue
+            if max_cost is not None and partition.min_cost > max_cost:
+                continue
+            if min_cost is not None and partition.max_cost < min_cost:
+                continue
+            selected.append(partition)
+        return selected
+
+
+def partition_od_matrix(
+    con: "duckdb.DuckDBPyConnection",
+    source_path: str,
+    output_path: str | Path,
+    partition_resolution: int = DEFAULT_PARTITION_RESOLUTION,
+    od_column_map: dict[str, str] | None = None,
+) -> ODMatrixManifest:
+    """Rewrite an OD matrix as destination-parent partitions with a manifest.
+
+    Requires the DuckDB h3 extension to be loaded on ``con``.
+
+    Args:
+        con: DuckDB connection
+        source_path: Parquet file, directory or glob of the source matrix
+        output_path: Directory of the partitioned matrix
+        partition_resolution: H3 resolution of the partition parents
+        od_column_map: Source column names for orig_id, dest_id and cost
+
+    Returns:
+        The written manifest
+    """
+    mapping = od_column_map or {"orig_id": "orig_id", "dest_id": "dest_id", "cost": "cost"}
+
+    path = source_path.rstrip("/")
+    if not path.endswith(".parquet") and "*" not in path:
+        path = f"{path}/**/*.parquet"
+
+    output_dir = Path(output_path)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # OVERWRITE clears the directory, so partitions of a previous run go away
+    con.execute(f"""
+        COPY (
+            SELECT
+                "{mapping['orig_id']}" AS orig_id,
+                "{mapping['dest_id']}" AS dest_id,
+                "{mapping['cost']}" AS cost,
+                h3_cell_to_parent("{mapping['dest_id']}", {partition_resolution})
+                    AS {PARTITION_COLUMN}
+            FROM read_parquet('{path}', hive_partitioning = false)
+            ORDER BY {PARTITION_COLUMN}, orig_id
+        )
+        TO '{output_dir}'
+        (FORMAT PARQUET, PARTITION_BY ({PARTITION_COLUMN}), OVERWRITE,
+         COMPRESSION {PARQUET_COMPRESSION}, ROW_GROUP_SIZE {PARQUET_ROW_GROUP_SIZE},
+         PARQUET_VERSION V2)
+    """)
+
+    rows = con.execute(f"""
+        SELECT
+            {PARTITION_COLUMN},
+            COUNT(*),
+            MIN(cost),
+            MAX(cost),
+            MIN(orig_id),
+            MAX(orig_id),
+            ANY_VALUE(h3_get_resolution(dest_id))
+        FROM read_parquet('{output_dir}/**/*.parquet', hive_partitioning = true)
+        GROUP BY {PARTITION_COLUMN}
+        ORDER BY {PARTITION_COLUMN}
+    """).fetchall()
+
+    if not rows:
+        raise ValueError(f"OD matrix '{source_path}' has no rows")
+
+    manifest = ODMatrixManifest(
+        h3_resolution=rows[0][6],
+        partition_resolution=partition_resolution,
+        partitions=[
+            ODPartition(
+                h3_parent=parent,
+                path=f"{PARTITION_COLUMN}={parent}",
+                num_rows=num_rows,
+                min_cost=min_cost,
+                max_cost=max_cost,
+                min_orig_id=min_orig,
+                max_orig_id=max_orig,
+            )
+            for parent, num_rows, min_cost, max_cost, min_orig, max_orig, _ in rows
+        ],
+    )
+    manifest.save(output_dir)
+    logger.info(
+        "Partitioned OD matrix '%s' into %d partitions at H3 resolution %d",
+        source_path,
+        len(manifest.partitions),
+        partition_resolution,
+    )
+    return manifest
+
+
+def partition_files(od_matrix_path: str, partitions: list[ODPartition]) -> str:
+    """SQL list of parquet globs for the given partitions."""
+    root = od_matrix_path.rstrip("/")
+    return "[" + ", ".join(f"'{root}/{p.path}/*.parquet'" for p in partitions) + "]"
@@ -3,7 +3,11 @@ import uuid
 from pathlib import Path
 from typing import Self
 
-from goatlib.analysis.accessibility.base import HeatmapToolBase, sanitize_sql_name
+from goatlib.analysis.accessibility.base import (
+    HeatmapToolBase,
+    impedance_weight_sql,
+    sanitize_sql_name,
+)
 from goatlib.analysis.schemas.heatmap import (
     Heatmap2SFCAParams,
     Opportunity2SFCA,
@@ -48,19 +52,21 @@ class Heatmap2SFCATool(HeatmapToolBase):
         logger.info("Demand table created: %s", demand_table)
 
         # Extract unique H3 IDs from opportunities and demand
-        opportunity_ids = self._extract_h3_ids(unified_table, column_name="dest_id")
-        demand_ids = self._extract_h3_ids(demand_table, column_name="orig_id")
-        if not opportunity_ids:
+        num_opportunities = self._register_h3_ids(
+            unified_table, "dest_id", "opportunity_ids"
+        )
+        num_demand = self._register_h3_ids(demand_table, "orig_id", "demand_ids")
+        if not num_opportunities:
             raise ValueError("No opportunity IDs found in opportunity data")
-        if not demand_ids:
+        if not num_demand:
             raise ValueError("No demand IDs found in demand data")
 
-        logger.info("Found %d unique opportunity IDs", len(opportunity_ids))
-        logger.info("Found %d unique demand IDs", len(demand_ids))
+        logger.info("Found %d unique opportunity IDs", num_opportunities)
+        logger.info("Found %d unique demand IDs", num_demand)
 
         # Step 1: Compute capacity ratios per opportunity
         filtered_matrix = self._filter_od_matrix(
-            od_table, destination_ids=opportunity_ids
+            od_table, destination_ids="opportunity_ids"
         )
         logger.info("Filtered OD matrix for Step 1")
         capacity_ratios_table, safe_names = self._compute_capacity_ratios(
@@ -287,106 +293,6 @@ class Heatmap2SFCATool(HeatmapToolBase):
 
         return unified_table
 
-    def _process_demand(
-        self: Self, demand_path: str, demand_field: str, h3_resolution: int
-    ) -> str:
-        """
-        Imports and standardizes the demand dataset.
-        Returns the standardized demand table name with schema: dest_id, demand_value
-        """
-        try:
-            table_name = "demand_input"
-            meta, table_name = self.import_input(demand_path, table_name=table_name)
-            geom_col = meta.geometry_column or "geom"
-            geom_type = (meta.geometry_type or "").lower()
-            output_table = f"{table_name}_std"
-
-            transform_to_4326 = geom_col
-            if meta.crs and meta.crs.to_epsg() != 4326:
-                source_crs = meta.crs.to_string()
-                transform_to_4326 = (
-                    f"ST_Transform({geom_col}, '{source_crs}', 'EPSG:4326')"
-                )
-        except Exception:
-            pass
-
-        
-        if "point" in geom_type:
-            query = f"""
-            CREATE OR REPLACE TEMP TABLE {output_table} AS
-            WITH features AS (
-                SELECT
-                    {demand_field}::DOUBLE AS demand_value,
-                    {transform_to_4326} AS geom
-                FROM {table_name}
-                WHERE {geom_col} IS NOT NULL
-            ),
-            exploded AS (
-                SELECT
-                    demand_value,
-                    (UNNEST(ST_Dump(geom))).geom AS simple_geom
-                FROM features
-            )
-            SELECT
-                h3_latlng_to_cell(ST_Y(simple_geom), ST_X(simple_geom), {h3_resolution}) AS orig_id,
-                SUM(demand_value) AS demand_value
-            FROM exploded
-            WHERE simple_geom IS NOT NULL
-            GROUP BY orig_id
-            """
-        elif "polygon" in geom_type or "multipolygon" in geom_type:
-            # Optimized: Use ROW_NUMBER and pre-computed cell counts to avoid correlated subquery
-            query = f"""
-            CREATE OR REPLACE TEMP TABLE {output_table} AS
-            WITH features AS (
-                SELECT
-                    ROW_NUMBER() OVER () AS row_id,
-                    {demand_field}::DOUBLE AS demand_value,
-                    {transform_to_4326} AS geom
-                FROM {table_name}
-                WHERE {geom_col} IS NOT NULL
-            ),
-            polygons AS (
-                SELECT
-                    row_id,
-                    demand_value,
-                    (UNNEST(ST_Dump(ST_Force2D(geom)))).geom AS simple_geom
-                FROM features
-            ),
-            h3_cells_raw AS (
-                SELECT
-                    row_id,
-                    demand_value,
-                    UNNEST(h3_polygon_wkt_to_cells_experimental(ST_AsText(simple_geom), {h3_resolution}, 'CONTAINMENT_OVERLAPPING')) AS orig_id
-                FROM polygons
-                WHERE simple_geom IS NOT NULL
-            ),
-            h3_cells_unique AS (
-                SELECT DISTINCT row_id, demand_value, orig_id
-                FROM h3_cells_raw
-            ),
-            h3_counts AS (
-                SELECT
-                    row_id,
-                    COUNT(*) AS num_cells,
-                    demand_value
-                FROM h3_cells_unique
-                GROUP BY row_id, demand_value
-            )
-            SELECT
-                u.orig_id,
-                SUM(u.demand_value / hc.num_cells) AS demand_value
-            FROM h3_cells_unique u
-            JOIN h3_counts hc ON u.row_id = hc.row_id
-            WHERE u.orig_id IS NOT NULL
-            GROUP BY u.orig_id
-            """
-        else:
-            raise ValueError(f"Unsupported geometry type: '{geom_type}'")
-
-        self.con.execute(query)
-        return output_table
-
     def _compute_capacity_ratios(
         self: Self,
         filtered_matrix: str,
@@ -475,33 +381,12 @@ class Heatmap2SFCATool(HeatmapToolBase):
         Updated to use pivoted column names.
         """
         # Reference the pivoted column names
-        max_cost_col = f"o.{opportunity_name}_max_cost"
-        sens_col = f"o.{opportunity_name}_sens"
-
-        if which == ImpedanceFunction.gaussian:
-            return f"""
-                    EXP(
-                        ((((m.cost / {max_cost_col}) * (m.cost / {max_cost_col})) * -1)
-                        / ({sens_col} / {max_sens}))
-                    ) 
-            """
-        elif which == ImpedanceFunction.linear:
-            return f"(1 - (m.cost / {max_cost_col}))"
-        elif which == ImpedanceFunction.exponential:
-            return f"""
-                    EXP(
-                        ((({sens_col} / {max_sens}) * -1) * (m.cost / {max_cost_col}))
-                    )
-            """
-        elif which == ImpedanceFunction.power:
-            return f"""
-                    POW(
-                        (m.cost / {max_cost_col}),
-                        (({sens_col} / {max_sens}) * -1)
-                    ) 
-            """
-        else:
-            raise ValueError(f"Unknown impedance function: {which}")
+        return impedance_weight_sql(
+            which,
+            max_sens,
+            f"o.{opportunity_name}_max_cost",
+            f"o.{opportunity_name}_sens",
+        )
 
     def _compute_cumulative_accessibility(
         self: Self,
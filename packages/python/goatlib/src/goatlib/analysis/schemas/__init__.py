@@ -53,10 +53,13 @@ from .heatmap import (
     HeatmapClosestAverageParams,
     HeatmapConnectivityParams,
     HeatmapGravityParams,
+    HeatmapMeasure,
+    HeatmapMultiMeasureParams,
     HeatmapRoutingMode,
     ImpedanceFunction,
     OpportunityClosestAverage,
     OpportunityGravity,
+    OpportunityMultiMeasure,
     RoutingMode,
 )
 from .oev_gueteklasse import (
@@ -168,8 +171,11 @@ __all__ = [
     "HeatmapGravityParams",
     "HeatmapConnectivityParams",
     "HeatmapClosestAverageParams",
+    "HeatmapMultiMeasureParams",
+    "HeatmapMeasure",
     "OpportunityGravity",
     "OpportunityClosestAverage",
+    "OpportunityMultiMeasure",
     "ImpedanceFunction",
     "RoutingMode",
     # Statistics schemas
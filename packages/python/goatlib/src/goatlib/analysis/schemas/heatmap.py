@@ -320,6 +320,18 @@ class OpportunityGravity(OpportunityBase):
             visible_when={"input_path": {"$ne": None}, "potential_type": "expression"},
         ),
     )
+    source_version: str | None = Field(
+        None,
+        description=(
+            "Version of the opportunity source, e.g. layer id and snapshot. "
+            "Used to reuse persisted partial results while the source is unchanged."
+        ),
+        json_schema_extra=ui_field(
+            section="opportunities",
+            field_order=11,
+            hidden=True,
+        ),
+    )
 
     @model_validator(mode="after")
     def validate_potential_fields(self: Self) -> Self:
@@ -370,6 +382,19 @@ class HeatmapGravityParams(HeatmapCommon):
             min_items=1,
         ),
     )
+    partials_path: str | None = Field(
+        None,
+        description=(
+            "Directory for per-opportunity partial results. When set, only "
+            "opportunities whose source, impedance or OD matrix changed are "
+            "recomputed and the totals are recombined from the stored partials."
+        ),
+        json_schema_extra=ui_field(
+            section="configuration",
+            field_order=98,
+            hidden=True,  # Internal field
+        ),
+    )
 
 
 class OpportunityClosestAverage(OpportunityBase):
@@ -537,6 +562,148 @@ class Heatmap2SFCAParams(HeatmapCommon):
     )
 
 
+class HeatmapMeasure(StrEnum):
+    """Accessibility measures that can be combined in one heatmap run."""
+
+    gravity = "gravity"
+    closest_average = "closest_average"
+    connectivity = "connectivity"
+    two_sfca = "two_sfca"
+
+
+class OpportunityMultiMeasure(OpportunityGravity):
+    """Opportunity dataset parameters for multi-measure heatmaps."""
+
+    n_destinations: Literal[1, 2, 3, 4, 5, 6, 7, 8, 9, 10] = Field(
+        1,
+        description="Number of closest destinations to average",
+        json_schema_extra=ui_field(
+            section="opportunities",
+            field_order=8,
+            visible_when={"input_path": {"$ne": None}},
+        ),
+    )
+    capacity_field: str | None = Field(
+        None,
+        description="Field from the opportunity layer that contains the capacity value (e.g., number of beds, seats).",
+        json_schema_extra=ui_field(
+            section="opportunities",
+            field_order=9,
+            label_key="capacity_field",
+            widget="field-selector",
+            widget_options={"source_layer": "input_path", "field_types": ["number"]},
+            visible_when={"input_path": {"$ne": None}},
+        ),
+    )
+
+
+class HeatmapMultiMeasureParams(HeatmapCommon):
+    """Parameters for heatmaps computing several measures in one run.
+
+    The OD matrix, opportunities and filtered matrix are shared between the
+    measures, and the result holds a column per measure and opportunity.
+    """
+
+    measures: list[HeatmapMeasure] = Field(
+        ...,
+        min_length=1,
+        description="Accessibility measures to compute.",
+        json_schema_extra=ui_field(
+            section="configuration",
+            field_order=1,
+        ),
+    )
+    impedance: ImpedanceFunction = Field(
+        default=ImpedanceFunction.gaussian,
+        description="Impedance function used by the gravity and enhanced 2SFCA measures.",
+        json_schema_extra=ui_field(
+            section="configuration",
+            field_order=2,
+        ),
+    )
+    max_sensitivity: float = Field(
+        1000000,
+        gt=0.0,
+        description="Max sensitivity used for normalization.",
+        json_schema_extra=ui_field(
+            section="configuration",
+            field_order=3,
+            hidden=True,  # Internal normalization constant
+        ),
+    )
+    two_sfca_type: TwoSFCAType = Field(
+        default=TwoSFCAType.twosfca,
+        description="Type of 2SFCA method to use.",
+        json_schema_extra=ui_field(
+            section="configuration",
+            field_order=4,
+            enum_labels=TwoSFCAType_LABELS,
+        ),
+    )
+    demand_path: str | None = Field(
+        None,
+        description="Path to demand layer dataset, required for 2SFCA.",
+        json_schema_extra=ui_field(
+            section="demand",
+            field_order=1,
+            label_key="demand_path",
+            widget="layer-selector",
+        ),
+    )
+    demand_field: str | None = Field(
+        None,
+        description="Field from the demand layer that contains the demand value (e.g., population).",
+        json_schema_extra=ui_field(
+            section="demand",
+            field_order=2,
+            label_key="demand_field",
+            widget="field-selector",
+            widget_options={
+                "source_layer": "demand_path",
+                "field_types": ["number"],
+            },
+            visible_when={"demand_path": {"$ne": None}},
+        ),
+    )
+    opportunities: list[OpportunityMultiMeasure] = Field(
+        ...,
+        json_schema_extra=ui_field(
+            section="opportunities",
+            repeatable=True,
+            min_items=1,
+        ),
+    )
+
+    @field_validator("measures")
+    @classmethod
+    def unique_measures(
+        cls: type[Self], measures: list[HeatmapMeasure]
+    ) -> list[HeatmapMeasure]:
+        """Drop repeated measures, keeping the requested order."""
+        return list(dict.fromkeys(measures))
+
+    @model_validator(mode="after")
+    def validate_two_sfca_inputs(self: Self) -> Self:
+        """2SFCA needs a demand layer and a capacity field per opportunity."""
+        if HeatmapMeasure.two_sfca not in self.measures:
+            return self
+        if not self.demand_path or not self.demand_field:
+            raise ValueError(
+                "demand_path and demand_field must be set for the 'two_sfca' measure."
+            )
+        missing = [
+            opp.name or opp.input_path
+            for opp in self.opportunities
+            if not opp.capacity_field
+        ]
+        if missing:
+            raise ValueError(
+                "capacity_field must be set on all opportunities for the 'two_sfca' "
+                f"measure, missing for: {', '.join(missing)}"
+            )
+        return self
+
+
 class HuffmodelParams(HeatmapCommon):
     """Parameters for Huff heatmaps."""
 
@@ -38,3 +38,6 @@ class RoutingSettings(BaseSettingsModel):
     request_timeout: int = 60
     request_retries: int = 10
     request_retry_interval: float = 2.0
+    # Starting points per catchment area request, and requests in flight
+    request_batch_size: int = 1000
+    request_max_concurrency: int = 4
@@ -5,7 +5,8 @@ from DuckLake tables. PMTiles enable fast tile serving without dynamic
 generation overhead.
 
 The generation pipeline:
-    1. Export geometry data to GeoJSON (intermediate format)
+    1. Stream the features as newline-delimited GeoJSON built by DuckDB
+       directly into tippecanoe's stdin (no intermediate file)
     2. Use tippecanoe to generate PMTiles with optimal settings
     3. Store PMTiles in a separate tiles directory (cache/derived data)
     4. Embed DuckLake snapshot_id in PMTiles metadata for sync tracking
@@ -23,22 +24,28 @@ Usage:
     )
 """
 
+import itertools
 import json
 import logging
 import shutil
 import subprocess
 import tempfile
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Self
+from typing import Iterator, Self
 
 import duckdb
+import shapely
 from pmtiles.reader import MmapSource
 from pmtiles.reader import Reader as PMTilesReader
 
 logger = logging.getLogger(__name__)
 
+# Features fetched from DuckDB and written to tippecanoe at a time
+STREAM_BATCH_ROWS = 10_000
+
 
 @dataclass
 class PMTilesConfig:
@@ -55,12 +62,71 @@ class PMTilesConfig:
             Note: With variable-depth, most tiles will stop earlier if
             sufficient detail is already present.
         layer_name: Name for the MVT layer (default: "default")
+        incremental_split_zoom: Zoom from which incremental updates re-render
+            the tiles around changed rows; lower zooms are patched (default: 8)
+        incremental_max_changes: Changed rows above which an incremental
+            update falls back to a full generation (default: 10000)
+        incremental_max_tiles: Re-rendered tiles at incremental_split_zoom
+            above which an incremental update falls back to a full
+            generation (default: 256)
     """
 
     enabled: bool = True
     min_zoom: int = 0
     max_zoom: int = 14
     layer_name: str = "default"
+    incremental_split_zoom: int = 8
+    incremental_max_changes: int = 10_000
+    incremental_max_tiles: int = 256
+
+
+@dataclass
+class PMTilesGenerationStats:
+    """Timing per stage of a PMTiles generation.
+
+    Export and write overlap with tiling while features are streamed, so
+    export_seconds is the time spent fetching features from DuckDB,
+    write_seconds the time blocked writing them to tippecanoe and
+    tile_seconds the time tippecanoe needed after the last feature.
+
+    Attributes:
+        detect_seconds: Geometry type detection
+        export_seconds: Fetching features from DuckDB
+        write_seconds: Writing features to tippecanoe's stdin
+        tile_seconds: Tiling after all features were written
+        total_seconds: Whole generation
+        num_features: Features streamed to tippecanoe
+        bytes_streamed: GeoJSON bytes streamed to tippecanoe
+        incremental: Whether an existing archive was updated incrementally
+        changed_rows: Removed plus added rows of an incremental update
+        updated_tiles: Tiles replaced or patched by an incremental update
+    """
+
+    detect_seconds: float = 0.0
+    export_seconds: float = 0.0
+    write_seconds: float = 0.0
+    tile_seconds: float = 0.0
+    total_seconds: float = 0.0
+    num_features: int = 0
+    bytes_streamed: int = 0
+    incremental: bool = False
+    changed_rows: int = 0
+    updated_tiles: int = 0
+
+    def to_dict(self: Self) -> dict:
+        """Convert to dictionary with rounded timings."""
+        return {
+            "detect_seconds": round(self.detect_seconds, 3),
+            "export_seconds": round(self.export_seconds, 3),
+            "write_seconds": round(self.write_seconds, 3),
+            "tile_seconds": round(self.tile_seconds, 3),
+            "total_seconds": round(self.total_seconds, 3),
+            "num_features": self.num_features,
+            "bytes_streamed": self.bytes_streamed,
+            "incremental": self.incremental,
+            "changed_rows": self.changed_rows,
+            "updated_tiles": self.updated_tiles,
+        }
 
 
 class PMTilesGenerator:
@@ -224,22 +290,62 @@ class PMTilesGenerator:
         """
         # First check embedded metadata
         stored_snapshot = self.get_pmtiles_snapshot_id(pmtiles_path)
-        if stored_snapshot is not None:
-            return stored_snapshot == current_snapshot_id
+        if stored_snapshot is None:
+            # Fall back to sidecar file for backwards compatibility
+            stored_snapshot = self._read_sidecar_snapshot_id(pmtiles_path)
+
+        # No snapshot info found - not in sync
+        return stored_snapshot is not None and stored_snapshot == current_snapshot_id
+
+    def read_pmtiles_state(
+        self: Self, pmtiles_path: Path | str
+    ) -> tuple[bool, int | None]:
+        """Validate a PMTiles file and read its snapshot_id in a single open.
+
+        Equivalent to is_pmtiles_valid() followed by get_pmtiles_snapshot_id()
+        with the sidecar fallback of is_pmtiles_in_sync(), for scanning many
+        files without opening each of them several times.
+
+        Args:
+            pmtiles_path: Path to PMTiles file
+
+        Returns:
+            Tuple of (is_valid, snapshot_id). snapshot_id is None if the file
+            is invalid or carries no snapshot information.
+        """
+        try:
+            with open(pmtiles_path, "rb") as f:
+                reader = PMTilesReader(MmapSource(f))
+                reader.header()
+                try:
+                    description = reader.metadata().get("description", "")
+                except Exception:
+                    description = ""
+        except Exception as e:
+            logger.warning(f"Invalid PMTiles {pmtiles_path}: {e}")
+            return False, None
+
+        snapshot_id = None
+        if description.startswith("{"):
+            try:
+                snapshot_id = json.loads(description).get("snapshot_id")
+            except json.JSONDecodeError:
+                pass
+        if snapshot_id is None:
+            snapshot_id = self._read_sidecar_snapshot_id(pmtiles_path)
+        return True, snapshot_id
 
-        # Fall back to sidecar file for backwards compatibility
+    @staticmethod
+    def _read_sidecar_snapshot_id(pmtiles_path: Path | str) -> int | None:
+        """Read the snapshot_id from the legacy .meta.json sidecar file."""
         try:
             meta_path = Path(pmtiles_path).with_suffix(".pmtiles.meta.json")
             if meta_path.exists():
                 with open(meta_path) as f:
-                    meta = json.load(f)
-                    stored_snapshot = meta.get("snapshot_id")
-                    return stored_snapshot == current_snapshot_id
+                    return json.load(f).get("snapshot_id")
         except Exception:
             pass
-
-        # No snapshot info found - not in sync
-        return False
+        return None
 
     def generate_from_table(
         self: Self,
@@ -251,11 +357,13 @@ class PMTilesGenerator:
         exclude_columns: list[str] | None = None,
         snapshot_id: int | None = None,
         show_progress: bool = True,
+        stats: PMTilesGenerationStats | None = None,
     ) -> Path | None:
         """Generate PMTiles from a DuckLake table.
 
-        Exports the table to GeoJSON (intermediate), then uses tippecanoe
-        to generate PMTiles with optimal settings.
+        Streams the table as newline-delimited GeoJSON into tippecanoe's
+        stdin, so no intermediate file is written and memory stays bounded
+        by STREAM_BATCH_ROWS features.
 
         Args:
             duckdb_con: DuckDB connection with DuckLake attached
@@ -267,6 +375,7 @@ class PMTilesGenerator:
             snapshot_id: DuckLake snapshot ID for sync tracking. If provided,
                 will be embedded in PMTiles metadata.
             show_progress: If True, stream tippecanoe progress to stdout
+            stats: If provided, filled with the timing per stage
 
         Returns:
             Path to generated PMTiles file, or None if generation failed
@@ -275,6 +384,8 @@ class PMTilesGenerator:
             logger.debug("PMTiles generation is disabled")
             return None
 
+        stats = stats if stats is not None else PMTilesGenerationStats()
+        start_time = time.perf_counter()
         exclude_columns = exclude_columns or ["bbox"]
         pmtiles_path = self.get_pmtiles_path(user_id, layer_id)
 
@@ -287,6 +398,7 @@ class PMTilesGenerator:
         geometry_type = self._detect_geometry_type(
             duckdb_con, table_name, geometry_column
         )
+        stats.detect_seconds = time.perf_counter() - start_time
 
         # Use a temp file for the PMTiles output, then atomically rename
         # This prevents corrupted files if the process is interrupted
@@ -296,46 +408,332 @@ class PMTilesGenerator:
         temp_pmtiles_path = pmtiles_path.parent / f".tmp_{pmtiles_path.name}"
 
         try:
-            with tempfile.NamedTemporaryFile(
-                suffix=".geojson", delete=True, prefix="pmtiles_"
-            ) as tmp_geojson:
-                # Step 1: Export to GeoJSON (preserves attribute types)
-                # Note: FlatGeobuf is faster but tippecanoe converts integers to strings
-                self._export_to_geojson(
-                    duckdb_con=duckdb_con,
-                    table_name=table_name,
-                    output_path=tmp_geojson.name,
-                    geometry_column=geometry_column,
-                    exclude_columns=exclude_columns,
-                )
+            # Columns are recorded in the metadata for incremental updates
+            columns, _ = self._get_export_columns(
+                duckdb_con, table_name, geometry_column, exclude_columns
+            )
 
-                # Step 2: Generate PMTiles with tippecanoe to temp file
-                # snapshot_id is embedded in PMTiles metadata via --description flag
-                self._run_tippecanoe(
-                    input_path=tmp_geojson.name,
-                    output_path=str(temp_pmtiles_path),
-                    geometry_type=geometry_type,
-                    snapshot_id=snapshot_id,
-                    show_progress=show_progress,
-                )
+            # Step 1 + 2: Stream features into tippecanoe
+            # snapshot_id is embedded in PMTiles metadata via --description flag
+            features = self._iter_geojson_features(
+                duckdb_con=duckdb_con,
+                table_name=table_name,
+                geometry_column=geometry_column,
+                exclude_columns=exclude_columns,
+                stats=stats,
+            )
+            self._run_tippecanoe_streaming(
+                features=features,
+                output_path=str(temp_pmtiles_path),
+                geometry_type=geometry_type,
+                snapshot_id=snapshot_id,
+                show_progress=show_progress,
+                stats=stats,
+                columns=columns,
+            )
 
             # Step 3: Atomically rename temp file to final path
             # This ensures we never have a half-written final file
             temp_pmtiles_path.rename(pmtiles_path)
+            stats.total_seconds = time.perf_counter() - start_time
 
             logger.info(
                 f"PMTiles generated successfully: {pmtiles_path} "
-                f"({pmtiles_path.stat().st_size / 1024 / 1024:.1f} MB)"
+                f"({pmtiles_path.stat().st_size / 1024 / 1024:.1f} MB, "
+                f"{stats.num_features} features, {stats.total_seconds:.1f}s: "
+                f"export {stats.export_seconds:.1f}s, "
+                f"write {stats.write_seconds:.1f}s, tile {stats.tile_seconds:.1f}s)"
             )
             return pmtiles_path
 
         except Exception as e:
             logger.error(f"PMTiles generation failed: {e}")
+            stats.total_seconds = time.perf_counter() - start_time
             # Clean up temp file if it exists
             if temp_pmtiles_path.exists():
                 temp_pmtiles_path.unlink()
             return None
 
+    def update_from_table(
+        self: Self,
+        duckdb_con: duckdb.DuckDBPyConnection,
+        table_name: str,
+        user_id: str,
+        layer_id: str,
+        geometry_column: str = "geometry",
+        exclude_columns: list[str] | None = None,
+        snapshot_id: int | None = None,
+        show_progress: bool = True,
+        stats: PMTilesGenerationStats | None = None,
+    ) -> Path | None:
+        """Update PMTiles from the rows changed since they were generated.
+
+        Only the tiles around rows that differ from the snapshot stored in
+        the existing archive are re-rendered and spliced into a new archive,
+        see goatlib.io.pmtiles_incremental. Falls back to generate_from_table
+        if there is no archive with a known snapshot, the exported columns or
+        geometry type changed, or the changes exceed the incremental limits
+        of the config.
+
+        Args:
+            duckdb_con: DuckDB connection with DuckLake attached
+            table_name: Full table path (e.g., "lake.user_xxx.t_yyy")
+            user_id: User UUID
+            layer_id: Layer UUID
+            geometry_column: Name of the geometry column
+            exclude_columns: Columns to exclude from tiles (e.g., ["bbox"])
+            snapshot_id: Current DuckLake snapshot ID of the table
+            show_progress: If True, stream tippecanoe progress to stdout
+            stats: If provided, filled with the timing per stage
+
+        Returns:
+            Path to the PMTiles file, or None if generation failed
+        """
+        if not self.config.enabled:
+            logger.debug("PMTiles generation is disabled")
+            return None
+
+        stats = stats if stats is not None else PMTilesGenerationStats()
+        incremental_stats = PMTilesGenerationStats(incremental=True)
+        try:
+            output = self._update_incremental(
+                duckdb_con=duckdb_con,
+                table_name=table_name,
+                user_id=user_id,
+                layer_id=layer_id,
+                geometry_column=geometry_column,
+                exclude_columns=exclude_columns or ["bbox"],
+                snapshot_id=snapshot_id,
+                show_progress=show_progress,
+                stats=incremental_stats,
+            )
+        except Exception as e:
+            logger.warning(f"Incremental PMTiles update failed, regenerating: {e}")
+            output = None
+
+        if output is not None:
+            vars(stats).update(vars(incremental_stats))
+            return output
+        return self.generate_from_table(
+            duckdb_con=duckdb_con,
+            table_name=table_name,
+            user_id=user_id,
+            layer_id=layer_id,
+            geometry_column=geometry_column,
+            exclude_columns=exclude_columns,
+            snapshot_id=snapshot_id,
+            show_progress=show_progress,
+            stats=stats,
+        )
+
+    def _update_incremental(
+        self: Self,
+        duckdb_con: duckdb.DuckDBPyConnection,
+        table_name: str,
+        user_id: str,
+        layer_id: str,
+        geometry_column: str,
+        exclude_columns: list[str],
+        snapshot_id: int | None,
+        show_progress: bool,
+        stats: PMTilesGenerationStats,
+    ) -> Path | None:
+        """Splice re-rendered tiles into the existing archive.
+
+        Returns:
+            Path to the updated PMTiles, or None if a full generation is needed
+        """
+        from goatlib.io.pmtiles_incremental import (
+            TILE_BUFFER,
+            find_table_changes,
+            splice_archive,
+            tile_bounds,
+            tiles_for_bbox,
+        )
+
+        start_time = time.perf_counter()
+        pmtiles_path = self.get_pmtiles_path(user_id, layer_id)
+        if snapshot_id is None or not pmtiles_path.exists():
+            return None
+
+        with open(pmtiles_path, "rb") as f:
+            metadata = PMTilesReader(MmapSource(f)).metadata()
+        try:
+            description = json.loads(metadata.get("description", ""))
+        except json.JSONDecodeError:
+            description = {}
+        old_snapshot = description.get("snapshot_id")
+        if old_snapshot is None:
+            logger.info("No snapshot in existing PMTiles, regenerating")
+            return None
+        if old_snapshot == snapshot_id:
+            return pmtiles_path
+
+        geometry_type = self._detect_geometry_type(
+            duckdb_con, table_name, geometry_column
+        )
+        columns, has_id_column = self._get_export_columns(
+            duckdb_con, table_name, geometry_column, exclude_columns
+        )
+        if (
+            description.get("columns") != columns
+            or description.get("geometry_type") != geometry_type
+        ):
+            logger.info("Columns or geometry type changed, regenerating PMTiles")
+            return None
+        stats.detect_seconds = time.perf_counter() - start_time
+
+        changes_table = f"_pmtiles_changes_{layer_id.replace('-', '')}"
+        try:
+            changes = find_table_changes(
+                duckdb_con,
+                table_name,
+                geometry_column,
+                old_snapshot,
+                has_id_column,
+                changes_table,
+                self.config.incremental_max_changes,
+            )
+            if changes is None:
+                logger.info("Too many changed rows, regenerating PMTiles")
+                return None
+
+            min_zoom, max_zoom = self.config.min_zoom, self.config.max_zoom
+            split_zoom = max(min_zoom, min(self.config.incremental_split_zoom, max_zoom))
+            region: set[tuple[int, int]] = set()
+            patched: set[tuple[int, int, int]] = set()
+            for bbox in changes.bboxes:
+                region.update(tiles_for_bbox(bbox, split_zoom))
+                for z in range(min_zoom, split_zoom):
+                    patched.update((z, x, y) for x, y in tiles_for_bbox(bbox, z))
+            if len(region) > self.config.incremental_max_tiles:
+                logger.info(
+                    f"Changes touch {len(region)} tiles at z{split_zoom}, "
+                    "regenerating PMTiles"
+                )
+                return None
+            stats.export_seconds += time.perf_counter() - start_time
+            stats.changed_rows = changes.num_rows
+
+            with tempfile.TemporaryDirectory(dir=pmtiles_path.parent) as tmp_dir:
+                high_zoom_path = Path(tmp_dir) / "high.pmtiles"
+                low_zoom_path = Path(tmp_dir) / "low.pmtiles"
+                geom = '"' + geometry_column.replace('"', '""') + '"'
+                if region:
+                    area = shapely.union_all(
+                        [
+                            shapely.box(*tile_bounds(split_zoom, x, y, TILE_BUFFER))
+                            for x, y in region
+                        ]
+                    )
+                    # All features around the changes, for the high zooms
+                    self._render_features(
+                        duckdb_con,
+                        table_name,
+                        geometry_column,
+                        exclude_columns,
+                        f"ST_Intersects({geom}, ST_GeomFromText('{area.wkt}'))",
+                        high_zoom_path,
+                        geometry_type,
+                        (split_zoom, max_zoom),
+                        True,
+                        show_progress,
+                        stats,
+                    )
+                if patched:
+                    # Only the added features, appended to the low zoom tiles
+                    fid = '"id"' if has_id_column else "rowid"
+                    self._render_features(
+                        duckdb_con,
+                        table_name,
+                        geometry_column,
+                        exclude_columns,
+                        f"{fid} IN (SELECT fid FROM {changes_table} "
+                        "WHERE change = 'added')",
+                        low_zoom_path,
+                        geometry_type,
+                        (min_zoom, split_zoom - 1),
+                        False,
+                        show_progress,
+                        stats,
+                    )
+
+                new_description = self._build_description(
+                    snapshot_id, columns, geometry_type
+                )
+                new_description["incremental_from"] = old_snapshot
+                metadata["description"] = json.dumps(new_description)
+                bounds = None
+                if changes.bboxes:
+                    bounds = (
+                        min(b[0] for b in changes.bboxes),
+                        min(b[1] for b in changes.bboxes),
+                        max(b[2] for b in changes.bboxes),
+                        max(b[3] for b in changes.bboxes),
+                    )
+                write_start = time.perf_counter()
+                stats.updated_tiles = splice_archive(
+                    old_path=pmtiles_path,
+                    output_path=pmtiles_path,
+                    split_zoom=split_zoom,
+                    region=region,
+                    patched_tiles=patched,
+                    removed_ids=changes.removed_ids,
+                    high_zoom_path=high_zoom_path,
+                    low_zoom_path=low_zoom_path,
+                    metadata=metadata,
+                    bounds=bounds,
+                )
+                stats.write_seconds += time.perf_counter() - write_start
+        finally:
+            duckdb_con.execute(f"DROP TABLE IF EXISTS {changes_table}")
+
+        stats.total_seconds = time.perf_counter() - start_time
+        logger.info(
+            f"PMTiles updated incrementally: {pmtiles_path} "
+            f"(snapshot {old_snapshot} -> {snapshot_id}, "
+            f"{stats.changed_rows} changed rows, {stats.updated_tiles} tiles, "
+            f"{stats.total_seconds:.1f}s)"
+        )
+        return pmtiles_path
+
+    def _render_features(
+        self: Self,
+        duckdb_con: duckdb.DuckDBPyConnection,
+        table_name: str,
+        geometry_column: str,
+        exclude_columns: list[str],
+        where: str,
+        output_path: Path,
+        geometry_type: str | None,
+        zoom_range: tuple[int, int],
+        variable_depth: bool,
+        show_progress: bool,
+        stats: PMTilesGenerationStats,
+    ) -> None:
+        """Tile the rows matching where, writing nothing if there are none."""
+        features = self._iter_geojson_features(
+            duckdb_con=duckdb_con,
+            table_name=table_name,
+            geometry_column=geometry_column,
+            exclude_columns=exclude_columns,
+            stats=stats,
+            where=where,
+        )
+        # tippecanoe fails without any input features
+        first = next(features, None)
+        if first is None:
+            return
+        self._run_tippecanoe_streaming(
+            features=itertools.chain([first], features),
+            output_path=str(output_path),
+            geometry_type=geometry_type,
+            show_progress=show_progress,
+            stats=stats,
+            zoom_range=zoom_range,
+            variable_depth=variable_depth,
+        )
+
     def _detect_geometry_type(
         self: Self,
         duckdb_con: duckdb.DuckDBPyConnection,
@@ -371,123 +769,188 @@ class PMTilesGenerator:
             logger.warning(f"Could not detect geometry type: {e}")
         return None
 
-    def _export_to_geojson(
+    def _get_export_columns(
         self: Self,
         duckdb_con: duckdb.DuckDBPyConnection,
         table_name: str,
-        output_path: str,
         geometry_column: str = "geometry",
         exclude_columns: list[str] | None = None,
-    ) -> None:
-        """Export a DuckLake table to GeoJSON format.
+    ) -> tuple[list[str], bool]:
+        """Get the attribute columns exported to tiles.
 
-        GeoJSON is used as an intermediate format because:
-        - tippecanoe reads it natively
-        - GeoJSON preserves attribute types (integers stay integers)
-        - DuckDB can write it directly via GDAL driver
-
-        Note: We use GeoJSON instead of FlatGeobuf because tippecanoe
-        converts FlatGeobuf attributes to strings, breaking numeric styles.
+        Complex types (struct, map, list, union, arrays) are excluded, as
+        tippecanoe cannot handle them.
 
         Args:
             duckdb_con: DuckDB connection
             table_name: Full table path
-            output_path: Output GeoJSON file path
             geometry_column: Name of geometry column
             exclude_columns: Columns to exclude (e.g., bbox struct)
+
+        Returns:
+            Tuple of (attribute column names, whether an 'id' column exists)
         """
-        exclude_columns = exclude_columns or []
+        columns_to_exclude: set[str] = set(exclude_columns or [])
+        columns_to_exclude.add(geometry_column)
 
         # Types that are not supported by GeoJSON/tippecanoe
         unsupported_type_prefixes = ("struct", "map", "list", "union")
 
-        # Get actual columns and their types from the table
-        columns_to_exclude: set[str] = set(exclude_columns)
+        # Use SELECT LIMIT 0 to get column info without fetching data
+        # This works better with DuckLake than DESCRIBE
+        result = duckdb_con.execute(f"SELECT * FROM {table_name} LIMIT 0").description
+
+        columns = []
         has_id_column = False
-        try:
-            # Use SELECT LIMIT 0 to get column info without fetching data
-            # This works better with DuckLake than DESCRIBE
-            result = duckdb_con.execute(
-                f"SELECT * FROM {table_name} LIMIT 0"
-            ).description
-
-            for col_info in result:
-                col_name = col_info[0]
-                col_type = col_info[1] if len(col_info) > 1 else ""
-
-                # Check if table has an 'id' column
-                if col_name.lower() == "id":
-                    has_id_column = True
-
-                col_type_lower = str(col_type).lower()
-                # Exclude complex types that GeoJSON/tippecanoe can't handle
-                if col_type_lower.startswith(unsupported_type_prefixes):
-                    columns_to_exclude.add(col_name)
-                    logger.debug(
-                        f"Excluding column '{col_name}' with unsupported type: {col_type}"
-                    )
-                # Also exclude array types (e.g., VARCHAR[], INTEGER[])
-                elif col_type_lower.endswith("[]"):
-                    columns_to_exclude.add(col_name)
-                    logger.debug(f"Excluding array column '{col_name}': {col_type}")
+        for col_info in result:
+            col_name = col_info[0]
+            col_type = col_info[1] if len(col_info) > 1 else ""
+
+            # Check if table has an 'id' column
+            if col_name.lower() == "id":
+                has_id_column = True
+
+            col_type_lower = str(col_type).lower()
+            if col_name in columns_to_exclude:
+                continue
+            # Exclude complex types that GeoJSON/tippecanoe can't handle
+            if col_type_lower.startswith(unsupported_type_prefixes):
+                logger.debug(
+                    f"Excluding column '{col_name}' with unsupported type: {col_type}"
+                )
+                continue
+            # Also exclude array types (e.g., VARCHAR[], INTEGER[])
+            if col_type_lower.endswith("[]"):
+                logger.debug(f"Excluding array column '{col_name}': {col_type}")
+                continue
+            columns.append(col_name)
 
-            actual_columns = {col_info[0] for col_info in result}
-            # Only keep exclusions for columns that actually exist
-            columns_to_exclude = columns_to_exclude & actual_columns
+        return columns, has_id_column
 
-        except Exception as e:
-            logger.warning(f"Could not get column list for {table_name}: {e}")
-            columns_to_exclude = set()
+    def _build_feature_query(
+        self: Self,
+        table_name: str,
+        columns: list[str],
+        has_id_column: bool,
+        geometry_column: str = "geometry",
+        where: str | None = None,
+    ) -> str:
+        """Build the query returning one GeoJSON Feature string per row.
 
-        # Build exclusion clause for columns that exist
-        exclude_clause = ""
-        if columns_to_exclude:
-            exclude_clause = f"EXCLUDE({', '.join(sorted(columns_to_exclude))})"
-            logger.debug(f"Excluding columns from GeoJSON export: {columns_to_exclude}")
+        Properties are serialized with to_json, so integers and floats keep
+        their types in the tiles. where optionally restricts the rows.
+        """
 
+        def quote(name: str) -> str:
+            return '"' + name.replace('"', '""') + '"'
+
+        fields = [f"{quote(col)} := {quote(col)}" for col in columns]
         # If no 'id' column exists, generate one from rowid for feature highlighting
-        id_select = ""
         if not has_id_column:
-            id_select = "rowid AS id, "
-            logger.debug("Adding synthetic 'id' column from rowid for highlighting")
-
-        sql = f"""
-            COPY (
-                SELECT {id_select}* {exclude_clause}
-                FROM {table_name}
-            ) TO '{output_path}' WITH (FORMAT GDAL, DRIVER 'GeoJSON')
+            fields.insert(0, '"id" := rowid')
+        properties = (
+            f"CAST(to_json(struct_pack({', '.join(fields)})) AS VARCHAR)"
+            if fields
+            else "'{}'"
+        )
+        geom = quote(geometry_column)
+        condition = f" AND ({where})" if where else ""
+        return f"""
+            SELECT '{{"type":"Feature","properties":' || {properties}
+                || ',"geometry":' || CAST(ST_AsGeoJSON({geom}) AS VARCHAR) || '}}'
+            FROM {table_name}
+            WHERE {geom} IS NOT NULL{condition}
         """
 
-        logger.debug(f"Exporting to GeoJSON: {sql}")
-        duckdb_con.execute(sql)
+    def _iter_geojson_features(
+        self: Self,
+        duckdb_con: duckdb.DuckDBPyConnection,
+        table_name: str,
+        geometry_column: str = "geometry",
+        exclude_columns: list[str] | None = None,
+        stats: PMTilesGenerationStats | None = None,
+        batch_rows: int = STREAM_BATCH_ROWS,
+        where: str | None = None,
+    ) -> Iterator[bytes]:
+        """Stream a DuckLake table as newline-delimited GeoJSON.
 
-    def _run_tippecanoe(
+        Features are fetched as Arrow record batches, so at most batch_rows
+        features are held in memory.
+
+        Args:
+            duckdb_con: DuckDB connection
+            table_name: Full table path
+            geometry_column: Name of geometry column
+            exclude_columns: Columns to exclude (e.g., bbox struct)
+            stats: If provided, export time and feature counts are added
+            batch_rows: Features per yielded chunk
+            where: SQL condition restricting the exported rows
+
+        Yields:
+            Chunks of newline-terminated GeoJSON Feature lines
+        """
+        start_time = time.perf_counter()
+        columns, has_id_column = self._get_export_columns(
+            duckdb_con, table_name, geometry_column, exclude_columns
+        )
+        if not has_id_column:
+            logger.debug("Adding synthetic 'id' column from rowid for highlighting")
+        sql = self._build_feature_query(
+            table_name, columns, has_id_column, geometry_column, where
+        )
+        logger.debug(f"Streaming GeoJSON features: {sql}")
+
+        reader = duckdb_con.execute(sql).fetch_record_batch(batch_rows)
+        while True:
+            try:
+                batch = reader.read_next_batch()
+            except StopIteration:
+                break
+            features = batch.column(0).to_pylist()
+            chunk = ("\n".join(features) + "\n").encode()
+            if stats is not None:
+                stats.export_seconds += time.perf_counter() - start_time
+                stats.num_features += len(features)
+                stats.bytes_streamed += len(chunk)
+            yield chunk
+            start_time = time.perf_counter()
+        if stats is not None:
+            stats.export_seconds += time.perf_counter() - start_time
+
+    def _build_tippecanoe_command(
         self: Self,
-        input_path: str,
+        input_path: str | None,
         output_path: str,
         geometry_type: str | None = None,
         snapshot_id: int | None = None,
-        show_progress: bool = True,
-    ) -> None:
-        """Run tippecanoe to generate PMTiles.
+        columns: list[str] | None = None,
+        zoom_range: tuple[int, int] | None = None,
+        variable_depth: bool = True,
+    ) -> list[str]:
+        """Build the tippecanoe command generating PMTiles.
 
         Uses different settings based on geometry type:
         - Points: Use drop-fraction for even distribution at low zooms
         - Polygons/Lines: Use drop-densest to preserve shapes
 
         Args:
-            input_path: Input FlatGeobuf file path
+            input_path: Input GeoJSON file path, None to read from stdin
             output_path: Output PMTiles file path
             geometry_type: Geometry type (e.g., "POINT", "POLYGON")
             snapshot_id: DuckLake snapshot ID to embed in PMTiles metadata
-            show_progress: If True, stream tippecanoe progress to stdout
+            columns: Exported attribute columns to embed in PMTiles metadata
+            zoom_range: (min, max) zoom overriding the configured zooms
+            variable_depth: If False, generate every tile of the zoom range
+                and do not extend zooms (for partial incremental renders)
 
-        Raises:
-            subprocess.CalledProcessError: If tippecanoe fails
+        Returns:
+            Command arguments
         """
         # Use defaults if config values are None (safety check)
         min_zoom = self.config.min_zoom if self.config.min_zoom is not None else 0
         max_zoom = self.config.max_zoom if self.config.max_zoom is not None else 14
+        if zoom_range is not None:
+            min_zoom, max_zoom = zoom_range
 
         # Detect geometry type category
         geom_upper = geometry_type.upper() if geometry_type else ""
@@ -498,7 +961,6 @@ class PMTilesGenerator:
             "tippecanoe",
             "-o",
             output_path,
-            input_path,
             "--force",
             "-l",
             self.config.layer_name,
@@ -509,13 +971,15 @@ class PMTilesGenerator:
             # Note: Don't use --use-attribute-for-id as it removes id from properties
             # The frontend filter uses ["in", "id", ...] which needs properties.id
         ]
+        # Without input files tippecanoe reads GeoJSON from stdin
+        if input_path is not None:
+            cmd.insert(3, input_path)
 
         # Embed snapshot_id in PMTiles metadata via description field
         if snapshot_id is not None:
-            description_data = {
-                "snapshot_id": snapshot_id,
-                "generated_at": datetime.now(timezone.utc).isoformat(),
-            }
+            description_data = self._build_description(
+                snapshot_id, columns, geometry_type
+            )
             cmd.extend(["--description", json.dumps(description_data)])
 
         if is_point_layer:
@@ -574,6 +1038,63 @@ class PMTilesGenerator:
             )
             logger.debug("Using polygon-optimized tippecanoe settings")
 
+        if not variable_depth:
+            cmd = [
+                arg
+                for arg in cmd
+                if arg
+                not in (
+                    "--generate-variable-depth-tile-pyramid",
+                    "--extend-zooms-if-still-dropping",
+                )
+            ]
+        return cmd
+
+    @staticmethod
+    def _build_description(
+        snapshot_id: int,
+        columns: list[str] | None = None,
+        geometry_type: str | None = None,
+    ) -> dict:
+        """Build the JSON stored in the PMTiles description metadata.
+
+        Columns and geometry type let an incremental update check that the
+        existing tiles were rendered with the current table schema.
+        """
+        description: dict = {
+            "snapshot_id": snapshot_id,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if columns is not None:
+            description["columns"] = columns
+        if geometry_type is not None:
+            description["geometry_type"] = geometry_type
+        return description
+
+    def _run_tippecanoe(
+        self: Self,
+        input_path: str,
+        output_path: str,
+        geometry_type: str | None = None,
+        snapshot_id: int | None = None,
+        show_progress: bool = True,
+    ) -> None:
+        """Run tippecanoe on a GeoJSON file to generate PMTiles.
+
+        Args:
+            input_path: Input GeoJSON file path
+            output_path: Output PMTiles file path
+            geometry_type: Geometry type (e.g., "POINT", "POLYGON")
+            snapshot_id: DuckLake snapshot ID to embed in PMTiles metadata
+            show_progress: If True, stream tippecanoe progress to stdout
+
+        Raises:
+            subprocess.CalledProcessError: If tippecanoe fails
+        """
+        cmd = self._build_tippecanoe_command(
+            input_path, output_path, geometry_type, snapshot_id
+        )
+
         logger.debug(f"Running tippecanoe: {' '.join(cmd)}")
 
         if show_progress:
@@ -600,6 +1121,91 @@ class PMTilesGenerator:
                     if line.strip():
                         logger.debug(f"tippecanoe: {line}")
 
+    def _run_tippecanoe_streaming(
+        self: Self,
+        features: Iterator[bytes],
+        output_path: str,
+        geometry_type: str | None = None,
+        snapshot_id: int | None = None,
+        show_progress: bool = True,
+        stats: PMTilesGenerationStats | None = None,
+        columns: list[str] | None = None,
+        zoom_range: tuple[int, int] | None = None,
+        variable_depth: bool = True,
+    ) -> None:
+        """Run tippecanoe reading newline-delimited GeoJSON from stdin.
+
+        Writing blocks while tippecanoe is busy, so features are only fetched
+        as fast as they are consumed. stderr goes to a temp file rather than
+        a pipe, which could fill up and deadlock the writes.
+
+        Args:
+            features: Chunks of newline-delimited GeoJSON Features
+            output_path: Output PMTiles file path
+            geometry_type: Geometry type (e.g., "POINT", "POLYGON")
+            snapshot_id: DuckLake snapshot ID to embed in PMTiles metadata
+            show_progress: If True, stream tippecanoe progress to stdout
+            stats: If provided, write and tile times are added
+            columns: Exported attribute columns to embed in PMTiles metadata
+            zoom_range: (min, max) zoom overriding the configured zooms
+            variable_depth: If False, generate every tile of the zoom range
+
+        Raises:
+            subprocess.CalledProcessError: If tippecanoe fails
+        """
+        cmd = self._build_tippecanoe_command(
+            None,
+            output_path,
+            geometry_type,
+            snapshot_id,
+            columns=columns,
+            zoom_range=zoom_range,
+            variable_depth=variable_depth,
+        )
+        logger.debug(f"Running tippecanoe on stdin: {' '.join(cmd)}")
+
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=None if show_progress else subprocess.DEVNULL,
+                stderr=None if show_progress else stderr_file,
+            )
+            write_seconds = 0.0
+            try:
+                assert process.stdin is not None
+                for chunk in features:
+                    write_start = time.perf_counter()
+                    process.stdin.write(chunk)
+                    write_seconds += time.perf_counter() - write_start
+                process.stdin.close()
+            except BrokenPipeError:
+                # tippecanoe exited early, its exit code tells why
+                pass
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+
+            tile_start = time.perf_counter()
+            returncode = process.wait()
+            if stats is not None:
+                stats.write_seconds += write_seconds
+                stats.tile_seconds += time.perf_counter() - tile_start
+
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors="replace").strip()
+
+        if returncode != 0:
+            logger.error(
+                f"tippecanoe failed (exit {returncode}): "
+                f"{stderr or 'No error message'}\nCommand: {' '.join(cmd)}"
+            )
+            raise subprocess.CalledProcessError(returncode, cmd, None, stderr)
+        for line in stderr.split("\n"):
+            if line.strip():
+                logger.debug(f"tippecanoe: {line}")
+
     def delete_pmtiles(self: Self, user_id: str, layer_id: str) -> bool:
         """Delete PMTiles file and its metadata for a layer.
 
@@ -0,0 +1,511 @@
+"""Incremental PMTiles updates for small edits of large layers.
+
+Instead of re-tiling a whole layer, an existing archive is updated with the
+rows that changed since the DuckLake snapshot it was generated from:
+
+    1. Diff the table against its previous snapshot (time travel) to get
+       the bounding boxes and feature ids of removed and added rows
+    2. Tiles at zooms >= split_zoom inside the region around the changes
+       are re-rendered by tippecanoe from all features of that region
+    3. The few tiles at zooms < split_zoom touching the changes are patched:
+       removed features are dropped by id and the added features, tiled on
+       their own, are appended (or written as new tiles where there were none)
+    4. All other tiles are copied from the old archive into the new one
+
+Usage:
+    from goatlib.io.pmtiles import PMTilesGenerator
+
+    generator = PMTilesGenerator(tiles_data_dir="/app/data/tiles")
+    pmtiles_path = generator.update_from_table(
+        duckdb_con=con,
+        table_name="lake.user_xxx.t_yyy",
+        user_id="xxx",
+        layer_id="yyy",
+        snapshot_id=1235,
+    )
+"""
+
+import gzip
+import heapq
+import logging
+import math
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+import duckdb
+from pmtiles.reader import MmapSource, all_tiles
+from pmtiles.reader import Reader as PMTilesReader
+from pmtiles.tile import Compression, zxy_to_tileid
+from pmtiles.writer import Writer
+
+logger = logging.getLogger(__name__)
+
+# Buffer of tippecanoe tiles in 1/256 of the tile size (tippecanoe -b default)
+TILE_BUFFER = 5 / 256
+
+_MAX_LAT = 85.0511287798066
+
+# =====================================================================
+#  Tile Math
+# =====================================================================
+
+
+def _lon_to_tile_x(lon: float, n: int) -> float:
+    return (lon + 180.0) / 360.0 * n
+
+
+def _lat_to_tile_y(lat: float, n: int) -> float:
+    lat = max(-_MAX_LAT, min(_MAX_LAT, lat))
+    return (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+
+
+def _tile_y_to_lat(y: float, n: int) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1.0 - 2.0 * y / n))))
+
+
+def tile_bounds(
+    z: int, x: int, y: int, buffer: float = 0.0
+) -> tuple[float, float, float, float]:
+    """Lon/lat bounds of a tile, grown by buffer tile sizes on each side."""
+    n = 2**z
+    return (
+        (x - buffer) / n * 360.0 - 180.0,
+        _tile_y_to_lat(y + 1 + buffer, n),
+        (x + 1 + buffer) / n * 360.0 - 180.0,
+        _tile_y_to_lat(y - buffer, n),
+    )
+
+
+def tiles_for_bbox(
+    bbox: tuple[float, float, float, float], z: int, buffer: float = TILE_BUFFER
+) -> Iterator[tuple[int, int]]:
+    """Tiles at zoom z whose buffered area intersects a lon/lat bbox."""
+    n = 2**z
+    min_x = max(0, math.floor(_lon_to_tile_x(bbox[0], n) - buffer))
+    max_x = min(n - 1, math.floor(_lon_to_tile_x(bbox[2], n) + buffer))
+    min_y = max(0, math.floor(_lat_to_tile_y(bbox[3], n) - buffer))
+    max_y = min(n - 1, math.floor(_lat_to_tile_y(bbox[1], n) + buffer))
+    for x in range(min_x, max_x + 1):
+        for y in range(min_y, max_y + 1):
+            yield x, y
+
+
+# =====================================================================
+#  Change Detection
+# =====================================================================
+
+
+@dataclass
+class TableChanges:
+    """Rows of a table that differ between two snapshots.
+
+    Updated rows show up as a removed old and an added new version.
+
+    Attributes:
+        bboxes: Lon/lat bounding boxes of removed and added rows
+        removed_ids: Feature ids (tile 'id' property) of removed rows
+        num_rows: Number of removed plus added rows
+    """
+
+    bboxes: list[tuple[float, float, float, float]] = field(default_factory=list)
+    removed_ids: set = field(default_factory=set)
+    num_rows: int = 0
+
+
+def find_table_changes(
+    duckdb_con: duckdb.DuckDBPyConnection,
+    table_name: str,
+    geometry_column: str,
+    from_snapshot: int,
+    has_id_column: bool,
+    changes_table: str,
+    max_rows: int,
+) -> TableChanges | None:
+    """Diff a DuckLake table against its state at an earlier snapshot.
+
+    Compares whole rows rather than reading DuckLake's change feed, so it
+    also works for tables that were dropped and re-created with new data. The removed and added rows are kept in the temp table
+    changes_table (columns: change, fid) for selecting the added features.
+
+    Args:
+        duckdb_con: DuckDB connection with DuckLake attached
+        table_name: Full table path (e.g., "lake.user_xxx.t_yyy")
+        geometry_column: Name of the geometry column
+        from_snapshot: Snapshot the existing tiles were generated from
+        has_id_column: Whether the table has an 'id' column, otherwise the
+            rowid is the feature id
+        changes_table: Name of the temp table to create
+        max_rows: Give up above this number of changed rows
+
+    Returns:
+        The changes, or None if there are more than max_rows
+    """
+    geom = '"' + geometry_column.replace('"', '""') + '"'
+    # Without an 'id' column the rowid is rendered as id, so it is compared too
+    fid = '"id"' if has_id_column else "__rowid"
+    rowid = "" if has_id_column else "rowid AS __rowid, "
+    duckdb_con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE {changes_table} AS
+        WITH old_rows AS (
+            SELECT {rowid}* REPLACE (ST_AsWKB({geom}) AS {geom})
+            FROM {table_name} AT (VERSION => {int(from_snapshot)})
+        ),
+        new_rows AS (
+            SELECT {rowid}* REPLACE (ST_AsWKB({geom}) AS {geom})
+            FROM {table_name}
+        )
+        SELECT 'removed' AS change, {fid} AS fid, {geom} AS wkb
+        FROM (SELECT * FROM old_rows EXCEPT ALL SELECT * FROM new_rows)
+        UNION ALL
+        SELECT 'added' AS change, {fid} AS fid, {geom} AS wkb
+        FROM (SELECT * FROM new_rows EXCEPT ALL SELECT * FROM old_rows)
+    """)
+    (num_rows,) = duckdb_con.execute(f"SELECT count(*) FROM {changes_table}").fetchone()
+    if num_rows > max_rows:
+        return None
+
+    changes = TableChanges(num_rows=num_rows)
+    rows = duckdb_con.execute(f"""
+        SELECT change, fid, ST_XMin(g), ST_YMin(g), ST_XMax(g), ST_YMax(g)
+        FROM (SELECT change, fid, ST_GeomFromWKB(wkb) AS g FROM {changes_table})
+    """).fetchall()
+    for change, feature_id, min_x, min_y, max_x, max_y in rows:
+        if change == "removed" and feature_id is not None:
+            changes.removed_ids.add(_normalize_id(feature_id))
+        if min_x is not None:
+            changes.bboxes.append((min_x, min_y, max_x, max_y))
+    return changes
+
+
+def _normalize_id(value: object) -> int | str:
+    """Feature id as compared between DuckDB rows and tile properties."""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return str(value)
+
+
+# =====================================================================
+#  Vector Tile Patching
+# =====================================================================
+# Features are handled as encoded protobuf messages; only their tags are
+# decoded to read the 'id' property and re-indexed into the merged layer.
+
+_VARINT, _FIXED64, _BYTES, _FIXED32 = 0, 1, 2, 5
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _iter_fields(data: bytes) -> Iterator[tuple[int, int, int | bytes]]:
+    """Yield (field number, wire type, value) of a protobuf message."""
+    pos = 0
+    end = len(data)
+    while pos < end:
+        key, pos = _read_varint(data, pos)
+        number, wire_type = key >> 3, key & 0x07
+        if wire_type == _VARINT:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == _BYTES:
+            length, pos = _read_varint(data, pos)
+            value = data[pos : pos + length]
+            pos += length
+        elif wire_type == _FIXED64:
+            value = data[pos : pos + 8]
+            pos += 8
+        elif wire_type == _FIXED32:
+            value = data[pos : pos + 4]
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+        yield number, wire_type, value
+
+
+def _encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _encode_field(number: int, wire_type: int, value: int | bytes) -> bytes:
+    key = _encode_varint((number << 3) | wire_type)
+    if wire_type == _VARINT:
+        return key + _encode_varint(value)
+    if wire_type == _BYTES:
+        return key + _encode_varint(len(value)) + value
+    return key + value
+
+
+def _decode_value(data: bytes) -> object:
+    """Decode a vector tile Value message."""
+    for number, _, value in _iter_fields(data):
+        if number == 1:
+            return value.decode()
+        if number == 2:
+            return struct.unpack("<f", value)[0]
+        if number == 3:
+            return struct.unpack("<d", value)[0]
+        if number == 4:
+            return value - (1 << 64) if value >= 1 << 63 else value
+        if number == 5:
+            return value
+        if number == 6:
+            return (value >> 1) ^ -(value & 1)
+        if number == 7:
+            return bool(value)
+    return None
+
+
+def _decode_layers(data: bytes) -> list[dict]:
+    """Split a tile into layers of encoded features, keys and values."""
+    layers = []
+    for number, _, layer_data in _iter_fields(data):
+        if number != 3:
+            continue
+        layer: dict = {"fields": [], "keys": [], "values": [], "features": []}
+        for field_number, wire_type, value in _iter_fields(layer_data):
+            if field_number == 1:
+                layer["name"] = value
+            elif field_number == 2:
+                layer["features"].append(value)
+            elif field_number == 3:
+                layer["keys"].append(value)
+            elif field_number == 4:
+                layer["values"].append(value)
+            else:
+                layer["fields"].append((field_number, wire_type, value))
+        layers.append(layer)
+    return layers
+
+
+def _feature_tags(feature: bytes) -> list[int]:
+    for number, wire_type, value in _iter_fields(feature):
+        if number == 2 and wire_type == _BYTES:
+            tags = []
+            pos = 0
+            while pos < len(value):
+                tag, pos = _read_varint(value, pos)
+                tags.append(tag)
+            return tags
+    return []
+
+
+def _with_tags(feature: bytes, tags: list[int]) -> bytes:
+    """Re-encode a feature with new tags, keeping its other fields."""
+    out = bytearray()
+    for number, wire_type, value in _iter_fields(feature):
+        if number != 2:
+            out += _encode_field(number, wire_type, value)
+    packed = b"".join(_encode_varint(tag) for tag in tags)
+    out += _encode_field(2, _BYTES, packed)
+    return bytes(out)
+
+
+def patch_tile(data: bytes, addition: bytes | None, removed_ids: set) -> bytes:
+    """Drop removed features from a tile and append the features of another.
+
+    Args:
+        data: Uncompressed old tile
+        addition: Uncompressed tile of the added features, if any
+        removed_ids: Normalized 'id' property values of features to drop
+
+    Returns:
+        Uncompressed patched tile
+    """
+    layers = _decode_layers(data)
+    additions = {layer["name"]: layer for layer in _decode_layers(addition or b"")}
+    by_name = {layer["name"]: layer for layer in layers}
+    for name, layer in additions.items():
+        if name not in by_name:
+            layers.append({**layer, "features": [], "keys": [], "values": []})
+            by_name[name] = layers[-1]
+
+    out = bytearray()
+    for layer in layers:
+        keys: list[bytes] = []
+        values: list[bytes] = []
+        key_index: dict[bytes, int] = {}
+        value_index: dict[bytes, int] = {}
+        features: list[bytes] = []
+
+        def add(source: dict, feature: bytes, skip_removed: bool) -> None:
+            tags = _feature_tags(feature)
+            new_tags = []
+            for i in range(0, len(tags) - 1, 2):
+                key = source["keys"][tags[i]]
+                value = source["values"][tags[i + 1]]
+                if skip_removed and key == b"id" and removed_ids:
+                    if _normalize_id(_decode_value(value)) in removed_ids:
+                        return
+                if key not in key_index:
+                    key_index[key] = len(keys)
+                    keys.append(key)
+                if value not in value_index:
+                    value_index[value] = len(values)
+                    values.append(value)
+                new_tags += [key_index[key], value_index[value]]
+            features.append(_with_tags(feature, new_tags))
+
+        for feature in layer["features"]:
+            add(layer, feature, skip_removed=True)
+        added = additions.get(layer["name"])
+        if added is not None:
+            for feature in added["features"]:
+                add(added, feature, skip_removed=False)
+
+        message = bytearray(_encode_field(1, _BYTES, layer["name"]))
+        for feature in features:
+            message += _encode_field(2, _BYTES, feature)
+        for key in keys:
+            message += _encode_field(3, _BYTES, key)
+        for value in values:
+            message += _encode_field(4, _BYTES, value)
+        for number, wire_type, value in layer["fields"]:
+            message += _encode_field(number, wire_type, value)
+        out += _encode_field(3, _BYTES, bytes(message))
+    return bytes(out)
+
+
+# =====================================================================
+#  Archive Splicing
+# =====================================================================
+
+
+def _decompress(data: bytes, compression: Compression) -> bytes:
+    return gzip.decompress(data) if compression == Compression.GZIP else data
+
+
+def _compress(data: bytes, compression: Compression) -> bytes:
+    return gzip.compress(data, mtime=0) if compression == Compression.GZIP else data
+
+
+def _read_tiles(path: Path | None) -> Iterator[tuple[int, int, int, int, bytes]]:
+    """Yield (tile_id, z, x, y, data) of an archive in tile id order."""
+    if path is None or not path.exists():
+        return
+    with open(path, "rb") as f:
+        for (z, x, y), data in all_tiles(MmapSource(f)):
+            yield zxy_to_tileid(z, x, y), z, x, y, data
+
+
+def splice_archive(
+    old_path: Path,
+    output_path: Path,
+    split_zoom: int,
+    region: set[tuple[int, int]],
+    patched_tiles: set[tuple[int, int, int]],
+    removed_ids: set,
+    high_zoom_path: Path | None,
+    low_zoom_path: Path | None,
+    metadata: dict,
+    bounds: tuple[float, float, float, float] | None = None,
+) -> int:
+    """Write a new archive from an old one and re-rendered tiles.
+
+    Args:
+        old_path: Archive to update
+        output_path: New archive
+        split_zoom: Zoom from which tiles in region are replaced
+        region: Tiles (x, y) at split_zoom whose area is re-rendered
+        patched_tiles: Tiles (z, x, y) below split_zoom to patch
+        removed_ids: Feature ids dropped from patched tiles
+        high_zoom_path: Tiles of all features in region, zooms >= split_zoom
+        low_zoom_path: Tiles of the added features, zooms < split_zoom
+        metadata: Metadata of the new archive
+        bounds: Lon/lat bounds to include in the header bounds
+
+    Returns:
+        Number of tiles replaced or patched
+    """
+
+    def in_region(z: int, x: int, y: int) -> bool:
+        shift = z - split_zoom
+        return shift >= 0 and (x >> shift, y >> shift) in region
+
+    additions = {
+        (z, x, y): data
+        for _, z, x, y, data in _read_tiles(low_zoom_path)
+        if z < split_zoom and (z, x, y) in patched_tiles
+    }
+
+    with open(old_path, "rb") as f:
+        reader = PMTilesReader(MmapSource(f))
+        header = reader.header()
+        # Additions in areas without any feature before have no tile to patch
+        missing = sorted(
+            (zxy_to_tileid(z, x, y), (z, x, y))
+            for z, x, y in additions
+            if reader.get(z, x, y) is None
+        )
+    compression = header["tile_compression"]
+
+    replaced = 0
+
+    def old_tiles() -> Iterator[tuple[int, bytes]]:
+        nonlocal replaced
+        for tile_id, z, x, y, data in _read_tiles(old_path):
+            if in_region(z, x, y):
+                continue
+            if (z, x, y) in patched_tiles:
+                addition = additions.get((z, x, y))
+                data = _compress(
+                    patch_tile(
+                        _decompress(data, compression),
+                        _decompress(addition, compression) if addition else None,
+                        removed_ids,
+                    ),
+                    compression,
+                )
+                replaced += 1
+            yield tile_id, data
+
+    def added_tiles() -> Iterator[tuple[int, bytes]]:
+        nonlocal replaced
+        for tile_id, key in missing:
+            data = patch_tile(b"", _decompress(additions[key], compression), set())
+            replaced += 1
+            yield tile_id, _compress(data, compression)
+
+    def new_tiles() -> Iterator[tuple[int, bytes]]:
+        nonlocal replaced
+        for tile_id, z, x, y, data in _read_tiles(high_zoom_path):
+            if in_region(z, x, y):
+                replaced += 1
+                yield tile_id, data
+
+    tmp_path = output_path.with_name(f".tmp_{output_path.name}")
+    try:
+        with open(tmp_path, "wb") as f:
+            writer = Writer(f)
+            for tile_id, data in heapq.merge(
+                old_tiles(), added_tiles(), new_tiles(), key=lambda t: t[0]
+            ):
+                writer.write_tile(tile_id, data)
+            if bounds is not None:
+                header["min_lon_e7"] = min(header["min_lon_e7"], int(bounds[0] * 1e7))
+                header["min_lat_e7"] = min(header["min_lat_e7"], int(bounds[1] * 1e7))
+                header["max_lon_e7"] = max(header["max_lon_e7"], int(bounds[2] * 1e7))
+                header["max_lat_e7"] = max(header["max_lat_e7"], int(bounds[3] * 1e7))
+            writer.finalize(header, metadata)
+        tmp_path.replace(output_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return replaced
@@ -15,9 +15,12 @@ from goatlib.storage.ducklake import (
     POSTGRES_KEEPALIVE_PARAMS,
     BaseDuckLakeManager,
     DuckLakePool,
+    DuckLakePoolMetrics,
+    PoolOverloadedError,
     execute_query_with_retry,
     execute_with_retry,
     is_connection_error,
+    layer_snapshot_sql,
 )
 from goatlib.storage.query_builder import (
     QueryFilters,
@@ -32,11 +35,14 @@ __all__ = [
     # DuckLake
     "BaseDuckLakeManager",
     "DuckLakePool",
+    "DuckLakePoolMetrics",
+    "PoolOverloadedError",
     "CONNECTION_ERROR_PATTERNS",
     "POSTGRES_KEEPALIVE_PARAMS",
     "is_connection_error",
     "execute_with_retry",
     "execute_query_with_retry",
+    "layer_snapshot_sql",
     # CQL Evaluator
     "DuckDBCQLEvaluator",
     "cql2_to_duckdb_sql",
@@ -1,22 +1,28 @@
 """Base DuckLake connection manager.
 
-Single connection with lock for thread-safety, plus a connection pool variant.
+Single connection with lock for thread-safety, plus a connection pool variant
+that either holds independent databases or cursors of one shared database.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import queue
 import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Any, Generator, Protocol
+from typing import Any, Callable, Generator, Protocol, TypeVar
 from urllib.parse import unquote, urlparse
 
 import duckdb
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 # Connection error patterns that should trigger a retry/reconnect
 CONNECTION_ERROR_PATTERNS = [
     "ssl syscall error",
@@ -38,6 +44,25 @@ POSTGRES_KEEPALIVE_PARAMS = {
 }
 
 
+def layer_snapshot_sql(catalog: str, table_alias: str = "t") -> str:
+    """SQL expression of the latest DuckLake snapshot that changed a table.
+
+    Covers the table's creation and the data files, delete files and columns
+    added or removed since, so any edit of the table yields a new snapshot.
+    Expects the table of the DuckLake catalog schema as table_alias.
+    """
+    terms = ", ".join(
+        f"""(SELECT MAX(GREATEST(x.begin_snapshot, COALESCE(x.end_snapshot, 0)))
+         FROM {catalog}.{catalog_table} x WHERE x.table_id = {table_alias}.table_id)"""
+        for catalog_table in (
+            "ducklake_data_file",
+            "ducklake_delete_file",
+            "ducklake_column",
+        )
+    )
+    return f"GREATEST({table_alias}.begin_snapshot, {terms})"
+
+
 def is_connection_error(error: Exception) -> bool:
     """Check if an error indicates a broken connection that should be retried."""
     error_str = str(error).lower()
@@ -119,6 +144,10 @@ def execute_query_with_retry(
     return result
 
 
+class PoolOverloadedError(RuntimeError):
+    """Raised when too many queries are already waiting for a pooled connection."""
+
+
 class DuckLakeSettings(Protocol):
     """Protocol for settings objects that configure DuckLake."""
 
@@ -191,6 +220,8 @@ class BaseDuckLakeManager:
         s3_endpoint: str | None = None,
         s3_access_key: str | None = None,
         s3_secret_key: str | None = None,
+        memory_limit: str | None = None,
+        threads: int | None = None,
     ) -> None:
         """Initialize DuckLake with explicit parameters."""
         self._postgres_uri = postgres_uri
@@ -199,6 +230,8 @@ class BaseDuckLakeManager:
         self._s3_endpoint = s3_endpoint
         self._s3_access_key = s3_access_key
         self._s3_secret_key = s3_secret_key
+        self._memory_limit = memory_limit
+        self._threads = threads
 
         if not storage_path.startswith("s3://") and not os.path.exists(storage_path):
             os.makedirs(storage_path, exist_ok=True)
@@ -422,6 +455,118 @@ class BaseDuckLakeManager:
         logger.info("DuckLake catalog attached (%s)", mode)
 
 
+class DuckLakePoolMetrics:
+    """Thread-safe counters of pool checkouts and connection recreations."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.checkout_duration_total = 0.0
+        self.checkout_duration_max = 0.0
+        self.recreations = 0
+        self.background_recreations = 0
+        self.connection_errors = 0
+        self.rejections = 0
+
+    def record_checkout(self, wait_time: float) -> None:
+        """Record the time a request waited for a connection."""
+        with self._lock:
+            self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+    def record_release(self, duration: float) -> None:
+        """Record how long a connection was checked out."""
+        with self._lock:
+            self.checkout_duration_total += duration
+            self.checkout_duration_max = max(self.checkout_duration_max, duration)
+
+    def record_recreation(self, background: bool) -> None:
+        """Record a connection (or shared database) being recreated."""
+        with self._lock:
+            if background:
+                self.background_recreations += 1
+            else:
+                self.recreations += 1
+
+    def record_connection_error(self) -> None:
+        with self._lock:
+            self.connection_errors += 1
+
+    def record_rejection(self) -> None:
+        """Record an async query shed because the queue was full."""
+        with self._lock:
+            self.rejections += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the current counters, with times in milliseconds."""
+        with self._lock:
+            checkouts = max(self.checkouts, 1)
+            return {
+                "checkouts": self.checkouts,
+                "wait_time_avg_ms": self.wait_time_total / checkouts * 1000,
+                "wait_time_max_ms": self.wait_time_max * 1000,
+                "checkout_duration_avg_ms": self.checkout_duration_total
+                / checkouts
+                * 1000,
+                "checkout_duration_max_ms": self.checkout_duration_max * 1000,
+                "recreations": self.recreations,
+                "background_recreations": self.background_recreations,
+                "connection_errors": self.connection_errors,
+                "rejections": self.rejections,
+            }
+
+
+class _SharedDatabase:
+    """One DuckDB database instance whose cursors are handed out by the pool.
+
+    Closing the root connection closes all of its cursors, so a retired
+    database is only closed once the last cursor has been released.
+    """
+
+    def __init__(self, root: duckdb.DuckDBPyConnection, created_at: float) -> None:
+        self.root = root
+        self.created_at = created_at
+        self.open_cursors = 0
+        self.retired = False
+        self._lock = threading.Lock()
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        with self._lock:
+            self.open_cursors += 1
+        return self.root.cursor()
+
+    def release(self, cursor: duckdb.DuckDBPyConnection) -> None:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+        with self._lock:
+            self.open_cursors -= 1
+            close_root = self.retired and self.open_cursors == 0
+        if close_root:
+            self._close_root()
+
+    def retire(self) -> None:
+        with self._lock:
+            self.retired = True
+            close_root = self.open_cursors == 0
+        if close_root:
+            self._close_root()
+
+    def _close_root(self) -> None:
+        try:
+            self.root.close()
+        except Exception:
+            pass
+
+
+# Pool item: connection, its creation time and the shared database it is a cursor of
+PoolItem = tuple[duckdb.DuckDBPyConnection, float, "_SharedDatabase | None"]
+
+
 class DuckLakePool:
     """Pool of read-only DuckDB connections for concurrent queries.
 
@@ -431,16 +576,30 @@ class DuckLakePool:
     This is useful for high-concurrency read scenarios like tile serving,
     where a single-connection-with-lock model would be a bottleneck.
 
-    Connection health is validated before returning from the pool, and
-    stale connections are automatically recreated.
+    With shared_database=True the pool holds cursors of a single DuckDB
+    database instead of independent in-memory databases, so extensions,
+    the catalog attach, the Parquet metadata / object cache and the memory
+    limit are shared by all connections.
+
+    Connections are recreated when they exceed MAX_CONNECTION_AGE_SECONDS.
+    With background_refresh=True (default) replacements are pre-warmed by a
+    background thread shortly before connections age out, keeping the
+    recreation off the request path. Checkout wait times, checkout durations
+    and recreations are recorded in metrics.
+
+    Async callers use run_async() / execute_async(), which run on a bounded
+    per-pool executor, interrupt the query on timeout or cancellation and
+    raise PoolOverloadedError once max_queue_depth queries are pending.
 
     Example:
-        pool = DuckLakePool(pool_size=4)
+        pool = DuckLakePool(pool_size=4, shared_database=True)
         pool.init(settings)
 
         with pool.connection() as con:
             result = con.execute("SELECT * FROM lake.schema.table").fetchall()
 
+        result = await pool.execute_async("SELECT 1", timeout=10)
+
         pool.close()
     """
 
@@ -450,14 +609,32 @@ class DuckLakePool:
     # This helps prevent stale PostgreSQL connections inside DuckLake
     MAX_CONNECTION_AGE_SECONDS = 300  # 5 minutes
 
-    def __init__(self, pool_size: int = 2) -> None:
+    # Interval of the background refresh; connections aging out within the
+    # next interval get a pre-warmed replacement
+    REFRESH_INTERVAL_SECONDS = 60
+
+    def __init__(
+        self,
+        pool_size: int = 2,
+        shared_database: bool = False,
+        background_refresh: bool = True,
+        max_queue_depth: int = 64,
+        max_workers: int | None = None,
+    ) -> None:
         """Initialize connection pool.
 
         Args:
             pool_size: Number of connections to maintain in the pool.
+            shared_database: Hand out cursors of one shared database instead
+                of creating an independent database per connection.
+            background_refresh: Replace aging connections from a background
+                thread instead of synchronously on checkout.
+            max_queue_depth: Async queries running or waiting before new ones
+                are rejected with PoolOverloadedError.
+            max_workers: Threads of the async executor, defaults to pool_size.
         """
         self._pool_size = pool_size
-        self._pool: queue.Queue[tuple[duckdb.DuckDBPyConnection, float]] = queue.Queue()
+        self._pool: queue.Queue[PoolItem] = queue.Queue()
         self._initialized = False
         self._init_lock = threading.Lock()
         self._postgres_uri: str | None = None
@@ -470,6 +647,29 @@ class DuckLakePool:
         self._memory_limit: str | None = None
         self._threads: int | None = None
 
+        self._shared_database_mode = shared_database
+        self._database: _SharedDatabase | None = None
+        self._database_lock = threading.Lock()
+
+        self._background_refresh = background_refresh
+        self._spares: queue.Queue[PoolItem] = queue.Queue()
+        self._refresh_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._refresh_thread: threading.Thread | None = None
+        # Creation times of the live independent connections, by id, and the
+        # ids of those still waiting in _spares
+        self._connection_times: dict[int, float] = {}
+        self._spare_ids: set[int] = set()
+        self._connection_times_lock = threading.Lock()
+
+        self._max_queue_depth = max_queue_depth
+        self._max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        self.metrics = DuckLakePoolMetrics()
+
     def init(self, settings: DuckLakeSettings) -> None:
         """Initialize the connection pool from settings."""
         with self._init_lock:
@@ -496,18 +696,32 @@ class DuckLakePool:
                     self._storage_path = os.path.join(base_dir, "ducklake")
 
             # Create pool connections with retry for transient connection errors
-            import time
-
+            if self._shared_database_mode:
+                self._database = self._create_database()
             for i in range(self._pool_size):
-                con = self._create_connection_with_retry()
-                # Store connection with its creation timestamp
-                self._pool.put((con, time.time()))
+                self._pool.put(self._create_pool_item())
                 logger.debug("Created pool connection %d/%d", i + 1, self._pool_size)
 
+            # More threads than connections would only wait for a connection
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers or self._pool_size,
+                thread_name_prefix="ducklake-pool",
+            )
+
+            if self._background_refresh:
+                self._stop_event.clear()
+                self._refresh_thread = threading.Thread(
+                    target=self._refresh_loop, name="ducklake-pool-refresh", daemon=True
+                )
+                self._refresh_thread.start()
+
             self._initialized = True
             logger.info(
-                "DuckLake pool initialized: %d connections, catalog=%s",
+                "DuckLake pool initialized: %d %s, catalog=%s",
                 self._pool_size,
+                "cursors of a shared database"
+                if self._shared_database_mode
+                else "connections",
                 self._catalog_schema,
             )
 
@@ -534,8 +748,6 @@ class DuckLakePool:
         self, max_retries: int = 3, retry_delay: float = 1.0
     ) -> duckdb.DuckDBPyConnection:
         """Create connection with retry on transient errors."""
-        import time
-
         last_error = None
         for attempt in range(max_retries):
             try:
@@ -604,76 +816,358 @@ class DuckLakePool:
 
         return con
 
-    def _get_healthy_connection(self) -> tuple[duckdb.DuckDBPyConnection, float]:
-        """Get a connection from the pool, recreating if too old.
+    def _create_database(self, max_retries: int = 3) -> _SharedDatabase:
+        """Create the shared database; its root connection is never handed out."""
+        root = self._create_connection_with_retry(max_retries=max_retries)
+        return _SharedDatabase(root, time.time())
+
+    def _create_pool_item(self, max_retries: int = 3) -> PoolItem:
+        """Create a pool connection, a cursor of the current shared database if enabled."""
+        database = self._database
+        if database is not None:
+            return database.cursor(), database.created_at, database
+
+        con = self._create_connection_with_retry(max_retries=max_retries)
+        created_at = time.time()
+        with self._connection_times_lock:
+            self._connection_times[id(con)] = created_at
+        return con, created_at, None
+
+    def _discard_pool_item(self, item: PoolItem) -> None:
+        """Close a pool connection (releasing the cursor of a shared database)."""
+        con, _, database = item
+        if database is not None:
+            database.release(con)
+            return
 
-        Only checks connection age - actual connection health is validated
-        by the retry logic when queries fail.
+        with self._connection_times_lock:
+            self._connection_times.pop(id(con), None)
+            self._spare_ids.discard(id(con))
+        try:
+            con.close()
+        except Exception:
+            pass
+
+    def _replace_database(self, expected: _SharedDatabase, background: bool) -> None:
+        """Swap in a new shared database unless another thread already did.
 
-        Returns a tuple of (connection, creation_time).
+        Idle cursors of the old database are swapped right away, cursors in use
+        are swapped when returned, after which the old database is closed.
         """
-        import time
+        with self._database_lock:
+            if self._database is not expected:
+                return
+            self._database = self._create_database(max_retries=5)
+            expected.retire()
+        self.metrics.record_recreation(background=background)
 
-        con, created_at = self._pool.get()  # Blocks until available
+        for _ in range(self._pool.qsize()):
+            try:
+                item = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            if item[2] is not self._database:
+                self._discard_pool_item(item)
+                item = self._create_pool_item()
+            self._pool.put(item)
+
+    def _is_aged(self, created_at: float, current_time: float) -> bool:
+        return current_time - created_at > self.MAX_CONNECTION_AGE_SECONDS
+
+    def _get_healthy_connection(self) -> PoolItem:
+        """Get a connection from the pool, replacing it if too old.
+
+        Only checks connection age - actual connection health is validated
+        by the retry logic when queries fail. Aged connections are swapped for
+        a pre-warmed replacement when one is ready; otherwise they are kept
+        until the background refresh provides one, or recreated right away
+        when background refresh is disabled.
+
+        Returns a tuple of (connection, creation_time, shared_database).
+        """
+        item = self._pool.get()  # Blocks until available
+        con, created_at, database = item
         current_time = time.time()
-        connection_age = current_time - created_at
-
-        # Only recreate if connection is too old
-        # Don't do active validation - let the query retry handle failures
-        if connection_age > self.MAX_CONNECTION_AGE_SECONDS:
-            logger.debug(
-                "Connection aged out (%.0fs > %ds), recreating",
-                connection_age,
-                self.MAX_CONNECTION_AGE_SECONDS,
-            )
+
+        if database is not None:
+            # Cursor of a replaced database, switch to the current one (cheap)
+            if database is not self._database:
+                self._discard_pool_item(item)
+                return self._create_pool_item()
+            if self._is_aged(created_at, current_time):
+                if self._background_refresh:
+                    self._refresh_event.set()
+                else:
+                    self._discard_pool_item(item)
+                    self._replace_database(database, background=False)
+                    return self._create_pool_item()
+            return item
+
+        if not self._is_aged(created_at, current_time):
+            return item
+
+        logger.debug(
+            "Connection aged out (%.0fs > %ds), replacing",
+            current_time - created_at,
+            self.MAX_CONNECTION_AGE_SECONDS,
+        )
+        spare = self._take_spare(current_time)
+        if spare is not None:
+            self._discard_pool_item(item)
+            return spare
+        if self._background_refresh:
+            # Keep using the aged connection until a replacement is pre-warmed
+            self._refresh_event.set()
+            return item
+
+        self._discard_pool_item(item)
+        self.metrics.record_recreation(background=False)
+        return self._create_pool_item()
+
+    def _take_spare(self, current_time: float) -> PoolItem | None:
+        """Take a pre-warmed replacement, discarding spares that aged out themselves."""
+        while True:
             try:
-                con.close()
-            except Exception:
-                pass
-            con = self._create_connection_with_retry()
-            created_at = current_time
+                spare = self._spares.get_nowait()
+            except queue.Empty:
+                return None
+            if self._is_aged(spare[1], current_time):
+                self._discard_pool_item(spare)
+                continue
+            with self._connection_times_lock:
+                self._spare_ids.discard(id(spare[0]))
+            return spare
+
+    def _refresh_loop(self) -> None:
+        """Background thread pre-warming replacements of aging connections."""
+        while not self._stop_event.is_set():
+            self._refresh_event.wait(timeout=self.REFRESH_INTERVAL_SECONDS)
+            self._refresh_event.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                self._refresh()
+            except Exception as e:
+                logger.warning("Background connection refresh failed: %s", e)
+
+    def _refresh(self) -> None:
+        """Prepare replacements for connections aging out before the next refresh."""
+        due_before = time.time() - (
+            self.MAX_CONNECTION_AGE_SECONDS - self.REFRESH_INTERVAL_SECONDS
+        )
+
+        database = self._database
+        if database is not None:
+            if database.created_at <= due_before:
+                self._replace_database(database, background=True)
+            return
 
-        return con, created_at
+        # Spares aging out before the next refresh are no replacement either
+        for _ in range(self._spares.qsize()):
+            try:
+                spare = self._spares.get_nowait()
+            except queue.Empty:
+                break
+            if spare[1] <= due_before:
+                self._discard_pool_item(spare)
+            else:
+                self._spares.put(spare)
+
+        # Only pooled connections need a replacement, never more than the pool
+        with self._connection_times_lock:
+            num_due = sum(
+                1
+                for con_id, created_at in self._connection_times.items()
+                if con_id not in self._spare_ids and created_at <= due_before
+            )
+        num_due = min(num_due, self._pool_size)
+        while self._spares.qsize() < num_due and not self._stop_event.is_set():
+            spare = self._create_pool_item()
+            with self._connection_times_lock:
+                self._spare_ids.add(id(spare[0]))
+            self._spares.put(spare)
+            self.metrics.record_recreation(background=True)
 
     @contextmanager
     def connection(self) -> Generator[duckdb.DuckDBPyConnection, None, None]:
         """Get a connection from the pool.
 
-        Validates the connection before returning it.
-        On connection errors during use, recreates the connection.
-        Returns the connection to the pool when done.
+        Replaces the connection before returning it if it aged out.
+        On connection errors during use, recreates the connection (or the
+        shared database). Returns the connection to the pool when done.
         """
-        import time
-
         if not self._initialized:
             raise RuntimeError("DuckLakePool not initialized")
 
-        con, created_at = self._get_healthy_connection()
+        wait_start = time.perf_counter()
+        item = self._get_healthy_connection()
+        checkout_start = time.perf_counter()
+        self.metrics.record_checkout(checkout_start - wait_start)
+
         connection_failed = False
         try:
-            yield con
+            yield item[0]
         except Exception as e:
             # On connection errors, mark for recreation
             if is_connection_error(e):
                 logger.warning("Connection error during query, will recreate: %s", e)
+                self.metrics.record_connection_error()
                 connection_failed = True
-                try:
-                    con.close()
-                except Exception:
-                    pass
             raise
         finally:
             # Only recreate if connection failed during use
             if connection_failed:
+                self._discard_pool_item(item)
+                database = item[2]
                 try:
-                    con = self._create_connection_with_retry()
-                    created_at = time.time()
+                    if database is not None:
+                        # The catalog connection is shared, replace the database
+                        self._replace_database(database, background=False)
+                    else:
+                        self.metrics.record_recreation(background=False)
+                    item = self._create_pool_item()
                 except Exception as create_err:
                     logger.error("Failed to recreate connection: %s", create_err)
                     # Retry with more attempts
-                    con = self._create_connection_with_retry(max_retries=5)
-                    created_at = time.time()
-            self._pool.put((con, created_at))
+                    item = self._create_pool_item(max_retries=5)
+            elif item[2] is not None and item[2] is not self._database:
+                # Cursor of a replaced database, release it so the database can close
+                self._discard_pool_item(item)
+                item = self._create_pool_item() if self._database is not None else None
+            self.metrics.record_release(time.perf_counter() - checkout_start)
+            if item is not None:
+                self._pool.put(item)
+
+    async def run_async(
+        self,
+        func: Callable[[duckdb.DuckDBPyConnection], T],
+        timeout: float | None = None,
+    ) -> T:
+        """Run func(connection) on the pool's executor and await the result.
+
+        The connection is only held while func runs. If the timeout is
+        exceeded or the awaiting task is cancelled, the running query is
+        interrupted via con.interrupt() (a query still waiting for a
+        connection never starts).
+
+        Args:
+            func: Callable receiving a pooled connection
+            timeout: Optional timeout in seconds, raising TimeoutError
+
+        Raises:
+            PoolOverloadedError: If max_queue_depth queries are already pending.
+        """
+        if not self._initialized or self._executor is None:
+            raise RuntimeError("DuckLakePool not initialized")
+
+        with self._pending_lock:
+            if self._pending >= self._max_queue_depth:
+                self.metrics.record_rejection()
+                raise PoolOverloadedError(
+                    f"DuckLake pool overloaded: {self._pending} queries pending"
+                )
+            self._pending += 1
+
+        state_lock = threading.Lock()
+        state: dict[str, Any] = {"connection": None, "cancelled": False}
+
+        def run() -> T:
+            if state["cancelled"]:
+                raise TimeoutError("Query cancelled before it started")
+            with self.connection() as con:
+                with state_lock:
+                    if state["cancelled"]:
+                        raise TimeoutError("Query cancelled before it started")
+                    state["connection"] = con
+                try:
+                    return func(con)
+                finally:
+                    with state_lock:
+                        state["connection"] = None
+
+        try:
+            future: Future[T] = self._executor.submit(run)
+        except BaseException:
+            self._release_pending(None)
+            raise
+        # Released when the query finishes or is cancelled before it starts
+        future.add_done_callback(self._release_pending)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with state_lock:
+                state["cancelled"] = True
+                con = state["connection"]
+            if con is not None:
+                con.interrupt()
+            if isinstance(e, asyncio.TimeoutError):
+                logger.warning("Query timeout (%.1fs) exceeded, interrupting", timeout)
+                raise TimeoutError(
+                    f"Query exceeded {timeout}s timeout and was interrupted"
+                ) from e
+            raise
+
+    def _release_pending(self, _: Future | None) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+    async def execute_async(
+        self,
+        query: str,
+        params: list | tuple | None = None,
+        max_retries: int = 2,
+        fetch_all: bool = True,
+        timeout: float | None = None,
+    ) -> Any:
+        """Async counterpart of execute_with_retry.
+
+        Runs on the pool's executor instead of a thread per timed query, and
+        retries with a fresh connection on connection errors.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+            max_retries: Number of retry attempts
+            fetch_all: If True, fetchall(); if False, fetchone()
+            timeout: Optional query timeout in seconds. If exceeded, the query
+                     is interrupted via conn.interrupt() and TimeoutError is raised.
+
+        Returns:
+            Query result (fetchall or fetchone)
+        """
+
+        def run_query(con: duckdb.DuckDBPyConnection) -> Any:
+            if params:
+                cursor = con.execute(query, params)
+            else:
+                cursor = con.execute(query)
+            return cursor.fetchall() if fetch_all else cursor.fetchone()
+
+        for attempt in range(max_retries):
+            try:
+                return await self.run_async(run_query, timeout=timeout)
+            except Exception as e:
+                if is_connection_error(e) and attempt < max_retries - 1:
+                    logger.warning(
+                        "Query failed (attempt %d/%d), will retry: %s",
+                        attempt + 1,
+                        max_retries,
+                        e,
+                    )
+                    continue
+                raise
+
+    def stats(self) -> dict[str, Any]:
+        """Return pool metrics together with the current pool state."""
+        return {
+            **self.metrics.snapshot(),
+            "pool_size": self._pool_size,
+            "idle_connections": self._pool.qsize(),
+            "spare_connections": self._spares.qsize(),
+            "queue_depth": self._pending,
+            "shared_database": self._shared_database_mode,
+        }
 
     def execute_with_retry(
         self,
@@ -777,55 +1271,50 @@ class DuckLakePool:
 
         return result_container.get("result")
 
+    def _drain(self, pool: queue.Queue[PoolItem]) -> None:
+        """Close all idle connections of a queue."""
+        while not pool.empty():
+            try:
+                item = pool.get_nowait()
+            except queue.Empty:
+                break
+            self._discard_pool_item(item)
+
     def reconnect(self) -> None:
         """Reconnect all connections in the pool.
 
-        Drains pool, closes old connections, creates new ones.
+        Drains pool, closes old connections (or replaces the shared database),
+        creates new ones.
         """
-        import time
-
         with self._init_lock:
-            # Drain and close all connections
-            connections = []
-            while not self._pool.empty():
-                try:
-                    item = self._pool.get_nowait()
-                    # Handle both old format (just connection) and new format (tuple)
-                    if isinstance(item, tuple):
-                        con, _ = item
-                    else:
-                        con = item
-                    connections.append(con)
-                except queue.Empty:
-                    break
+            self._drain(self._pool)
+            self._drain(self._spares)
 
-            for con in connections:
-                try:
-                    con.close()
-                except Exception:
-                    pass
+            database = self._database
+            if database is not None:
+                self._replace_database(database, background=False)
 
-            # Create new connections with timestamps
-            current_time = time.time()
             for i in range(self._pool_size):
-                con = self._create_connection()
-                self._pool.put((con, current_time))
+                self._pool.put(self._create_pool_item())
                 logger.debug("Recreated pool connection %d/%d", i + 1, self._pool_size)
 
             logger.info("DuckLake pool reconnected: %d connections", self._pool_size)
 
     def close(self) -> None:
         """Close all connections in the pool."""
-        while not self._pool.empty():
-            try:
-                item = self._pool.get_nowait()
-                # Handle both old format (just connection) and new format (tuple)
-                if isinstance(item, tuple):
-                    con, _ = item
-                else:
-                    con = item
-                con.close()
-            except queue.Empty:
-                break
+        self._stop_event.set()
+        self._refresh_event.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout=5.0)
+            self._refresh_thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+        self._drain(self._pool)
+        self._drain(self._spares)
+        if self._database is not None:
+            self._database.retire()
+            self._database = None
         self._initialized = False
         logger.info("DuckLake pool closed")
@@ -5,7 +5,7 @@ Windmill jobs or triggered maintenance operations. These are NOT
 user-facing analytics tools.
 
 Tasks include:
-- PMTiles synchronization (sync_pmtiles) - sequential processing
+- PMTiles synchronization (sync_pmtiles) - parallel, resumable processing
 - Queue PMTiles sync (queue_pmtiles_sync) - queues parallel jobs
 - Sync single PMTile (sync_single_pmtile) - processes one layer
 - Future: Thumbnail generation
@@ -16,7 +16,7 @@ Usage:
     python -m goatlib.tasks.sync_windmill --dry-run
     python -m goatlib.tasks.sync_windmill --token xxx
 
-    # Run task locally (sequential)
+    # Run task locally
     python -m goatlib.tasks.sync_pmtiles --dry-run
 
     # Queue parallel jobs (via Windmill)
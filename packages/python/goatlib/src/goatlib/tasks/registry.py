@@ -54,7 +54,7 @@ TASK_REGISTRY: tuple[TaskDefinition, ...] = (
     TaskDefinition(
         name="sync_pmtiles",
         display_name="Sync PMTiles",
-        description="Synchronize PMTiles for all DuckLake geometry layers (sequential)",
+        description="Synchronize PMTiles for all DuckLake geometry layers",
         module_path="goatlib.tasks.sync_pmtiles",
         params_class_name="PMTilesSyncParams",
         windmill_path="f/goat/tasks/sync_pmtiles",
@@ -16,18 +16,37 @@ Usage as library:
     task = PMTilesSyncTask()
     task.init_from_env()
     results = task.run(PMTilesSyncParams(limit=100, dry_run=True))
+
+Scheduling:
+- Layers are generated in a process pool; each worker process holds its own
+  DuckLake connection. The pool size follows the available CPUs and memory.
+- Every finished layer is appended to a progress journal in the tiles
+  directory, so an interrupted run can be resumed with resume=True.
 """
 
+import atexit
+import json
 import logging
-from dataclasses import dataclass
-from typing import TYPE_CHECKING, Self
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Self
 
 from pydantic import BaseModel, Field
 
 if TYPE_CHECKING:
     import duckdb
 
-from goatlib.io.pmtiles import PMTilesConfig, PMTilesGenerator
+from goatlib.io.pmtiles import (
+    PMTilesConfig,
+    PMTilesGenerationStats,
+    PMTilesGenerator,
+)
 from goatlib.storage import BaseDuckLakeManager
 from goatlib.tools.base import ToolSettings
 
@@ -61,6 +80,39 @@ class PMTilesSyncParams(BaseModel):
         default=True,
         description="Process smaller layers first (default: True)",
     )
+    largest_first: bool = Field(
+        default=False,
+        description=(
+            "Process the largest layers first so that long generations start "
+            "early and small layers fill the remaining workers (overrides "
+            "small_first)"
+        ),
+    )
+    max_workers: int | None = Field(
+        default=None,
+        description=(
+            "Maximum number of parallel worker processes "
+            "(default: derived from available CPUs and memory)"
+        ),
+    )
+    worker_memory_mb: int = Field(
+        default=2048,
+        description="Memory budget per worker process in MB (DuckDB + tippecanoe)",
+    )
+    incremental: bool = Field(
+        default=True,
+        description=(
+            "Update stale PMTiles by re-rendering only the tiles around rows "
+            "changed since their snapshot (ignored with force)"
+        ),
+    )
+    resume: bool = Field(
+        default=False,
+        description=(
+            "Skip layers recorded in the progress journal of a previous run "
+            "at the same snapshot"
+        ),
+    )
     show_progress: bool = Field(
         default=True,
         description="Show tippecanoe progress during tile generation",
@@ -69,6 +121,54 @@ class PMTilesSyncParams(BaseModel):
 
 __all__ = ["PMTilesSyncParams", "PMTilesSyncTask", "main"]
 
+# Progress journal in the tiles directory, one JSON line per finished layer
+JOURNAL_FILENAME = ".pmtiles_sync_journal.jsonl"
+# Journaled statuses a resumed run skips, all others are retried
+JOURNAL_DONE_STATUSES = ("generated", "in_sync")
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def available_memory_bytes() -> int | None:
+    """Memory available for new processes, None if it cannot be determined."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def get_worker_count(
+    num_layers: int,
+    worker_memory_mb: int,
+    max_workers: int | None = None,
+) -> int:
+    """Number of worker processes for a sync run.
+
+    Bounded by the available CPUs, by how many workers fit into the available
+    memory with worker_memory_mb each, by max_workers and by the number of
+    layers to process.
+    """
+    workers = available_cpus()
+    memory = available_memory_bytes()
+    if memory is not None and worker_memory_mb > 0:
+        workers = min(workers, memory // (worker_memory_mb * 1024 * 1024))
+    if max_workers is not None:
+        workers = min(workers, max_workers)
+    return max(1, min(workers, num_layers))
+
 
 @dataclass
 class LayerInfo:
@@ -95,6 +195,57 @@ class SyncResult:
     layer_id: str
     status: str  # "generated", "in_sync", "skipped", "error", "failed"
     message: str = ""
+    # Timing per generation stage, see PMTilesGenerationStats
+    timings: dict = field(default_factory=dict)
+
+
+class SyncJournal:
+    """Append-only progress journal of a sync run.
+
+    Each finished layer is written as one JSON line, flushed immediately, so
+    the journal survives the run being killed. A resumed run skips layers
+    successfully journaled at their current snapshot without opening their
+    PMTiles.
+    """
+
+    def __init__(self: Self, path: Path | str) -> None:
+        self.path = Path(path)
+
+    def load(self: Self) -> dict[str, int]:
+        """Return the snapshot_id per layer_id of successfully journaled layers."""
+        entries: dict[str, int] = {}
+        if not self.path.exists():
+            return entries
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    if entry.get("status") in JOURNAL_DONE_STATUSES:
+                        entries[entry["layer_id"]] = entry["snapshot_id"]
+                    else:
+                        entries.pop(entry["layer_id"], None)
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    # Partially written last line of a killed run
+                    continue
+        return entries
+
+    def reset(self: Self) -> None:
+        """Start a new journal."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text("")
+
+    def record(self: Self, layer: LayerInfo, result: SyncResult) -> None:
+        """Append the result of a layer."""
+        entry = {
+            "layer_id": layer.layer_id,
+            "snapshot_id": layer.snapshot_id,
+            "status": result.status,
+            "seconds": result.timings.get("total_seconds"),
+            "finished_at": time.time(),
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
 
 
 @dataclass
@@ -109,6 +260,31 @@ class SyncStats:
     errors: int = 0
     skipped: int = 0
     failed: int = 0
+    resumed: int = 0
+    workers: int = 1
+    # Seconds per generation stage summed over all layers
+    timings: dict = field(default_factory=dict)
+    start_time: float = field(default_factory=time.time)
+
+    @property
+    def processed(self: Self) -> int:
+        """Layers for which generation was attempted."""
+        return self.generated + self.errors + self.failed
+
+    def elapsed_seconds(self: Self) -> float:
+        """Seconds since the run started."""
+        return time.time() - self.start_time
+
+    def layers_per_hour(self: Self) -> float:
+        """Throughput of processed layers."""
+        elapsed = self.elapsed_seconds()
+        return self.processed * 3600 / elapsed if elapsed > 0 else 0.0
+
+    def add_timings(self: Self, timings: dict) -> None:
+        """Add the stage timings of a layer to the totals."""
+        for stage, seconds in timings.items():
+            if stage.endswith("_seconds"):
+                self.timings[stage] = round(self.timings.get(stage, 0.0) + seconds, 3)
 
     def to_dict(self: Self) -> dict:
         """Convert to dictionary for Windmill output."""
@@ -121,6 +297,11 @@ class SyncStats:
             "errors": self.errors,
             "skipped": self.skipped,
             "failed": self.failed,
+            "resumed": self.resumed,
+            "workers": self.workers,
+            "timings": self.timings,
+            "elapsed_seconds": round(self.elapsed_seconds(), 1),
+            "layers_per_hour": round(self.layers_per_hour(), 1),
         }
 
 
@@ -147,6 +328,9 @@ class PMTilesSyncTask:
     def __init__(self: Self) -> None:
         """Initialize the PMTiles sync task."""
         self.settings: ToolSettings | None = None
+        # DuckDB limits of the DuckLake connection, set in worker processes
+        self.duckdb_memory_limit: str | None = None
+        self.duckdb_threads: int | None = None
         self._manager: BaseDuckLakeManager | None = None
         self._generator: PMTilesGenerator | None = None
 
@@ -183,6 +367,8 @@ class PMTilesSyncTask:
                 postgres_uri=self.settings.ducklake_postgres_uri,
                 storage_path=self.settings.ducklake_data_dir,
                 catalog_schema=self.settings.ducklake_catalog_schema,
+                memory_limit=self.duckdb_memory_limit,
+                threads=self.duckdb_threads,
             )
         return self._manager
 
@@ -194,7 +380,6 @@ class PMTilesSyncTask:
             config = PMTilesConfig(enabled=True)
             self._generator = PMTilesGenerator(self.settings.tiles_data_dir, config)
         return self._generator
-        return self._generator
 
     def close(self: Self) -> None:
         """Close connections and cleanup resources."""
@@ -227,6 +412,7 @@ class PMTilesSyncTask:
         user_id: str | None = None,
         limit: int | None = None,
         order_by_size: bool = False,
+        largest_first: bool = False,
     ) -> list[LayerInfo]:
         """Get all DuckLake tables with geometry columns.
 
@@ -237,6 +423,7 @@ class PMTilesSyncTask:
             user_id: Filter to specific user (UUID format with dashes)
             limit: Maximum number of layers to return
             order_by_size: If True, order by size ascending (smallest first)
+            largest_first: If True, order by size descending (largest first)
 
         Returns:
             List of LayerInfo for each geometry layer
@@ -247,11 +434,12 @@ class PMTilesSyncTask:
             user_filter = f"AND s.schema_name = '{user_schema}'"
 
         limit_clause = f"LIMIT {limit}" if limit else ""
-        order_clause = (
-            "ORDER BY COALESCE(stats.total_size, 0) ASC"
-            if order_by_size
-            else "ORDER BY data_snapshot DESC"
-        )
+        if largest_first:
+            order_clause = "ORDER BY COALESCE(stats.total_size, 0) DESC"
+        elif order_by_size:
+            order_clause = "ORDER BY COALESCE(stats.total_size, 0) ASC"
+        else:
+            order_clause = "ORDER BY data_snapshot DESC"
 
         if not self.settings:
             raise RuntimeError("Call init_from_env() before running task")
@@ -374,8 +562,13 @@ class PMTilesSyncTask:
         force: bool = False,
         dry_run: bool = False,
         show_progress: bool = True,
+        incremental: bool = False,
     ) -> SyncResult:
-        """Process a single layer - generate PMTiles if needed."""
+        """Process a single layer - generate PMTiles if needed.
+
+        With incremental, existing PMTiles are updated from the rows changed
+        since their snapshot, see PMTilesGenerator.update_from_table.
+        """
         generator = self._get_generator()
 
         try:
@@ -404,9 +597,15 @@ class PMTilesSyncTask:
                 )
 
             # Generate PMTiles from DuckLake table
+            generation_stats = PMTilesGenerationStats()
             manager = self._get_manager()
+            generate = (
+                generator.update_from_table
+                if incremental
+                else generator.generate_from_table
+            )
             with manager.connection() as con:
-                output = generator.generate_from_table(
+                output = generate(
                     duckdb_con=con,
                     table_name=layer.full_table_name,
                     user_id=layer.user_id,
@@ -414,20 +613,27 @@ class PMTilesSyncTask:
                     geometry_column=layer.geometry_column,
                     snapshot_id=layer.snapshot_id,
                     show_progress=show_progress,
+                    stats=generation_stats,
                 )
 
             if output:
                 size_mb = output.stat().st_size / 1024 / 1024
+                action = "Updated" if generation_stats.incremental else "Generated"
                 return SyncResult(
                     layer_id=layer.layer_id,
                     status="generated",
-                    message=f"Generated {size_mb:.1f} MB",
+                    message=(
+                        f"{action} {size_mb:.1f} MB in "
+                        f"{generation_stats.total_seconds:.1f}s"
+                    ),
+                    timings=generation_stats.to_dict(),
                 )
             else:
                 return SyncResult(
                     layer_id=layer.layer_id,
                     status="failed",
                     message="Generation returned None",
+                    timings=generation_stats.to_dict(),
                 )
 
         except Exception as e:
@@ -437,6 +643,109 @@ class PMTilesSyncTask:
                 message=str(e),
             )
 
+    def _process_layers_parallel(
+        self: Self,
+        layers: list[LayerInfo],
+        workers: int,
+        params: PMTilesSyncParams,
+        record: Callable[[LayerInfo, SyncResult], None],
+    ) -> None:
+        """Generate PMTiles for layers in a pool of worker processes.
+
+        Layers are submitted in the given order, so with largest_first the
+        long generations start first and small layers fill up the workers
+        that become free. Each worker opens its own DuckLake connection with
+        an equal share of the memory budget and CPUs.
+
+        When a worker process dies, e.g. killed for running out of memory,
+        the pool fails the layers in flight. These are retried one at a time
+        in a fresh pool, a layer killing its worker again is recorded as an
+        error, and the rest of the queue continues in a new pool.
+        """
+        if not self.settings:
+            raise RuntimeError("Call init_from_env() before running task")
+
+        # The parent's connection is not needed while the workers run
+        self.close()
+
+        initargs = (
+            self.settings,
+            f"{max(256, params.worker_memory_mb // 2)}MB",
+            max(1, available_cpus() // workers),
+        )
+        incremental = params.incremental and not params.force
+        pending = deque(layers)
+        while pending:
+            in_flight = self._run_worker_pool(
+                pending, workers, initargs, incremental, record
+            )
+            if not in_flight:
+                continue
+            logger.warning(
+                f"Worker pool broke, retrying {len(in_flight)} layers one at a time"
+            )
+            for layer in in_flight:
+                if self._run_worker_pool(
+                    deque([layer]), 1, initargs, incremental, record
+                ):
+                    record(
+                        layer,
+                        SyncResult(
+                            layer_id=layer.layer_id,
+                            status="error",
+                            message="Worker process died",
+                        ),
+                    )
+
+    def _run_worker_pool(
+        self: Self,
+        pending: deque[LayerInfo],
+        workers: int,
+        initargs: tuple[ToolSettings, str, int],
+        incremental: bool,
+        record: Callable[[LayerInfo, SyncResult], None],
+    ) -> list[LayerInfo]:
+        """Process pending layers in a worker pool until it is empty or breaks.
+
+        At most one layer per worker is submitted at a time, so a broken pool
+        only fails the layers in flight; the others stay pending.
+
+        Returns:
+            Layers in flight when a worker process died
+        """
+        broken: list[LayerInfo] = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            # DuckDB is multi-threaded, fork would copy its locks
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=initargs,
+        ) as executor:
+            futures: dict[Future[SyncResult], LayerInfo] = {}
+            while pending or futures:
+                while pending and len(futures) < workers and not broken:
+                    layer = pending.popleft()
+                    future = executor.submit(
+                        _process_layer_in_worker, layer, incremental
+                    )
+                    futures[future] = layer
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    layer = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        broken.append(layer)
+                        continue
+                    except Exception as e:
+                        result = SyncResult(
+                            layer_id=layer.layer_id, status="error", message=str(e)
+                        )
+                    record(layer, result)
+        return broken
+
     def run(
         self: Self,
         params: PMTilesSyncParams,
@@ -458,6 +767,7 @@ class PMTilesSyncTask:
                 user_id=params.user_id,
                 limit=params.limit,
                 order_by_size=params.small_first,
+                largest_first=params.largest_first,
             )
 
             stats.total_layers = len(layers)
@@ -467,8 +777,25 @@ class PMTilesSyncTask:
                 logger.info("No layers to process")
                 return stats.to_dict()
 
-            # Categorize layers
             generator = self._get_generator()
+            journal = SyncJournal(generator.tiles_data_dir / JOURNAL_FILENAME)
+
+            # Skip layers finished by an interrupted run before touching files
+            if params.resume and not params.dry_run:
+                journaled = journal.load()
+                remaining = [
+                    layer
+                    for layer in layers
+                    if journaled.get(layer.layer_id) != layer.snapshot_id
+                ]
+                stats.resumed = len(layers) - len(remaining)
+                if stats.resumed:
+                    logger.info(f"Resuming: {stats.resumed} layers already done")
+                layers = remaining
+            elif not params.dry_run:
+                journal.reset()
+
+            # Categorize layers
             missing = []
             stale = []
             in_sync = []
@@ -497,7 +824,11 @@ class PMTilesSyncTask:
 
                 if not pmtiles_path.exists():
                     missing.append(layer)
-                elif not generator.is_pmtiles_valid(pmtiles_path):
+                    continue
+
+                # Header, metadata and sidecar are read in a single open
+                is_valid, stored_snapshot = generator.read_pmtiles_state(pmtiles_path)
+                if not is_valid:
                     # Corrupted file - delete it and treat as missing
                     logger.warning(f"Corrupted PMTiles file, deleting: {pmtiles_path}")
                     try:
@@ -506,7 +837,7 @@ class PMTilesSyncTask:
                         logger.error(f"Failed to delete corrupted file: {e}")
                     corrupted.append(layer)
                     missing.append(layer)
-                elif not generator.is_pmtiles_in_sync(pmtiles_path, layer.snapshot_id):
+                elif stored_snapshot is None or stored_snapshot != layer.snapshot_id:
                     stale.append(layer)
                 else:
                     in_sync.append(layer)
@@ -523,7 +854,7 @@ class PMTilesSyncTask:
                 status_msg += f" ({len(corrupted)} corrupted files deleted)"
             logger.info(status_msg)
 
-            # Determine what to process
+            # Determine what to process, keeping the size order of the query
             if params.force:
                 to_process = layers
             elif params.missing_only:
@@ -531,34 +862,26 @@ class PMTilesSyncTask:
                 if stale:
                     logger.info(f"Skipping {len(stale)} stale layers (--missing-only)")
             else:
-                to_process = missing + stale
+                selected = {id(layer) for layer in missing + stale}
+                to_process = [layer for layer in layers if id(layer) in selected]
 
             if not to_process:
                 logger.info("All PMTiles are up to date!")
                 return stats.to_dict()
 
-            logger.info(f"Processing {len(to_process)} layers...")
-
-            # Process layers
-            for i, layer in enumerate(to_process, 1):
-                size_str = (
-                    f"{layer.size_bytes / 1024 / 1024:.1f}MB"
-                    if layer.size_bytes >= 1024 * 1024
-                    else f"{layer.size_bytes / 1024:.1f}KB"
-                    if layer.size_bytes > 0
-                    else "?"
-                )
-                logger.info(
-                    f"Processing {i}/{len(to_process)}: {layer.layer_id} ({size_str})"
-                )
-
-                result = self._process_layer(
-                    layer,
-                    force=params.force,
-                    dry_run=params.dry_run,
-                    show_progress=params.show_progress,
+            if params.dry_run:
+                stats.workers = 1
+            else:
+                stats.workers = get_worker_count(
+                    len(to_process), params.worker_memory_mb, params.max_workers
                 )
+            logger.info(
+                f"Processing {len(to_process)} layers with "
+                f"{stats.workers} worker(s)..."
+            )
 
+            def record(layer: LayerInfo, result: SyncResult) -> None:
+                stats.add_timings(result.timings)
                 if result.status == "generated":
                     stats.generated += 1
                 elif result.status == "error":
@@ -567,8 +890,29 @@ class PMTilesSyncTask:
                     stats.failed += 1
                 elif result.status in ("skipped", "would_create", "would_regenerate"):
                     stats.skipped += 1
+                if not params.dry_run:
+                    journal.record(layer, result)
+
+                done = stats.processed + stats.skipped
+                logger.info(
+                    f"  [{result.status}] {done}/{len(to_process)} "
+                    f"{layer.layer_id} ({_format_size(layer.size_bytes)}): "
+                    f"{result.message} - {stats.layers_per_hour():.0f} layers/h"
+                )
 
-                logger.info(f"  [{result.status}] {result.message}")
+            # Sync state was determined above, so layers are not checked again
+            if stats.workers > 1:
+                self._process_layers_parallel(to_process, stats.workers, params, record)
+            else:
+                for layer in to_process:
+                    result = self._process_layer(
+                        layer,
+                        force=True,
+                        dry_run=params.dry_run,
+                        show_progress=params.show_progress,
+                        incremental=params.incremental and not params.force,
+                    )
+                    record(layer, result)
 
             # Summary
             logger.info("\n--- Summary ---")
@@ -582,6 +926,15 @@ class PMTilesSyncTask:
                 logger.info(f"  Failed: {stats.failed}")
             if stats.skipped > 0:
                 logger.info(f"  Skipped: {stats.skipped}")
+            if stats.timings:
+                logger.info(
+                    "  Stage timings: "
+                    + ", ".join(f"{k}={v:.1f}" for k, v in stats.timings.items())
+                )
+            logger.info(
+                f"  Throughput: {stats.layers_per_hour():.0f} layers/h "
+                f"({stats.workers} worker(s), {stats.elapsed_seconds():.0f}s)"
+            )
 
             return stats.to_dict()
 
@@ -589,6 +942,40 @@ class PMTilesSyncTask:
             self.close()
 
 
+def _format_size(size_bytes: int) -> str:
+    """Format a layer size for progress logs."""
+    if size_bytes >= 1024 * 1024:
+        return f"{size_bytes / 1024 / 1024:.1f}MB"
+    if size_bytes > 0:
+        return f"{size_bytes / 1024:.1f}KB"
+    return "?"
+
+
+# Sync task of a worker process, created by _init_worker
+_worker_task: PMTilesSyncTask | None = None
+
+
+def _init_worker(settings: ToolSettings, memory_limit: str, threads: int) -> None:
+    """Set up a worker process with its own DuckLake connection."""
+    global _worker_task
+    # Share the CPUs between the tippecanoe processes of all workers
+    os.environ["TIPPECANOE_MAX_THREADS"] = str(threads)
+    _worker_task = PMTilesSyncTask()
+    _worker_task.settings = settings
+    _worker_task.duckdb_memory_limit = memory_limit
+    _worker_task.duckdb_threads = threads
+    atexit.register(_worker_task.close)
+
+
+def _process_layer_in_worker(layer: LayerInfo, incremental: bool) -> SyncResult:
+    """Generate the PMTiles of a layer in a worker process."""
+    if _worker_task is None:
+        raise RuntimeError("Worker process not initialized")
+    return _worker_task._process_layer(
+        layer, force=True, show_progress=False, incremental=incremental
+    )
+
+
 def main(params: PMTilesSyncParams) -> dict:
     """Windmill entry point for PMTiles sync task.
 
@@ -638,6 +1025,20 @@ if __name__ == "__main__":
     parser.add_argument(
         "--small-first", action="store_true", help="Process smaller layers first"
     )
+    parser.add_argument(
+        "--largest-first", action="store_true", help="Process largest layers first"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Maximum number of parallel worker processes"
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="Resume an interrupted run"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Regenerate stale PMTiles fully instead of incrementally",
+    )
 
     args = parser.parse_args()
 
@@ -648,6 +1049,10 @@ if __name__ == "__main__":
         missing_only=args.missing_only,
         dry_run=args.dry_run,
         small_first=args.small_first,
+        largest_first=args.largest_first,
+        max_workers=args.workers,
+        resume=args.resume,
+        incremental=not args.full,
     )
 
     result = main(params)
@@ -1697,6 +1697,7 @@ class BaseToolRunner(SimpleToolRunner, ABC, Generic[TParams]):
         layer_id: str,
         table_name: str,
         geometry_column: str = "geometry",
+        incremental: bool = False,
     ) -> Path | None:
         """Generate PMTiles for a layer after DuckLake ingestion.
 
@@ -1712,6 +1713,8 @@ class BaseToolRunner(SimpleToolRunner, ABC, Generic[TParams]):
             layer_id: Layer UUID string
             table_name: Full DuckLake table path (e.g., "lake.user_xxx.t_yyy")
             geometry_column: Name of the geometry column (default: "geometry")
+            incremental: If True, update existing PMTiles from the rows
+                changed since their snapshot instead of regenerating them
 
         Returns:
             Path to generated PMTiles file, or None if generation was skipped/failed
@@ -1750,7 +1753,12 @@ class BaseToolRunner(SimpleToolRunner, ABC, Generic[TParams]):
             else:
                 snapshot_id = None
 
-            pmtiles_path = generator.generate_from_table(
+            generate = (
+                generator.update_from_table
+                if incremental
+                else generator.generate_from_table
+            )
+            pmtiles_path = generate(
                 duckdb_con=self.duckdb_con,
                 table_name=table_name,
                 user_id=user_id,
@@ -720,7 +720,8 @@ class CatchmentAreaToolRunner(BaseToolRunner[CatchmentAreaWindmillParams]):
             CatchmentAreaRoutingMode.bicycle,
             CatchmentAreaRoutingMode.pedelec,
         ]:
-            max_points = 1000
+            # Requests are split into batches of starting points by the tool
+            max_points = 10000
             if num_starting_points > max_points:
                 raise ValueError(
                     f"Active mobility catchment areas support a maximum of {max_points} "
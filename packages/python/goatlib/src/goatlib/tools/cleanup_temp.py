@@ -48,6 +48,7 @@ def cleanup_workflow_temp(
     user_id: str,
     workflow_id: str,
     node_ids: list[str] | None = None,
+    keep_node_ids: set[str] | None = None,
 ) -> CleanupTempLayersOutput:
     """Clean up temporary files for a workflow.
 
@@ -57,6 +58,8 @@ def cleanup_workflow_temp(
         user_id: User UUID
         workflow_id: Workflow UUID
         node_ids: Optional list of specific node IDs to cleanup
+        keep_node_ids: Optional node IDs to keep; all other nodes are cleaned.
+            Files in the workflow directory itself are kept as well.
 
     Returns:
         CleanupTempLayersOutput with status info
@@ -75,6 +78,21 @@ def cleanup_workflow_temp(
 
     nodes_cleaned: list[str] = []
 
+    if keep_node_ids is not None:
+        node_ids = [
+            item.name[2:]
+            for item in workflow_path.iterdir()
+            if item.is_dir()
+            and item.name.startswith("n_")
+            and item.name[2:] not in keep_node_ids
+        ]
+        if not node_ids:
+            return CleanupTempLayersOutput(
+                status="cleaned",
+                message=f"No stale temp files for workflow {workflow_id}",
+                nodes_cleaned=[],
+            )
+
     if node_ids:
         # Clean specific nodes (with n_ prefix)
         for node_id in node_ids:
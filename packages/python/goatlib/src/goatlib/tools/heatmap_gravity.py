@@ -4,13 +4,14 @@ Performs gravity-based spatial accessibility analysis.
 """
 
 import logging
+import time
 from pathlib import Path
 from typing import Any, Self
 
 from pydantic import ConfigDict, Field
 
 from goatlib.analysis.accessibility import HeatmapGravityTool
-from goatlib.analysis.schemas.heatmap import HeatmapGravityParams
+from goatlib.analysis.schemas.heatmap import HeatmapGravityParams, OpportunityGravity
 from goatlib.analysis.schemas.ui import (
     SECTION_CONFIGURATION,
     SECTION_OPPORTUNITIES,
@@ -28,9 +29,15 @@ from goatlib.tools.schemas import (
     get_default_layer_name,
 )
 from goatlib.tools.style import get_heatmap_style
+from goatlib.tools.temp_writer import TEMP_DATA_ROOT
+from goatlib.tools.workflow_runner import get_source_layer_snapshots
 
 logger = logging.getLogger(__name__)
 
+# Per-opportunity gravity partials, see HeatmapGravityParams.partials_path
+PARTIALS_DIRNAME = "heatmap_gravity_partials"
+PARTIALS_MAX_AGE_DAYS = 30
+
 
 class HeatmapGravityToolParams(
     ScenarioSelectorMixin, ToolInputBase, HeatmapGravityParams
@@ -193,15 +200,60 @@ class HeatmapGravityToolRunner(BaseToolRunner[HeatmapGravityToolParams]):
             color_range_name="Emrld",
         )
 
+    def version_opportunities(
+        self: Self, opportunities: list[OpportunityGravity]
+    ) -> list[OpportunityGravity]:
+        """Set the source version of opportunities read from layers.
+
+        DuckLake layers are versioned by their latest snapshot. Workflow
+        results carry a unique file id in their temp layer id. Other inputs
+        keep their version unset and are recomputed on every run.
+        """
+        layer_ids = {
+            opp.input_path
+            for opp in opportunities
+            if self.is_layer_id(opp.input_path) and ":" not in opp.input_path
+        }
+        snapshots = get_source_layer_snapshots(layer_ids)
+
+        versioned = []
+        for opp in opportunities:
+            version = None
+            if opp.input_path in snapshots:
+                version = f"{opp.input_path}@{snapshots[opp.input_path]}"
+            elif opp.input_path.count(":") == 2:
+                version = opp.input_path
+            versioned.append(opp.model_copy(update={"source_version": version}))
+        return versioned
+
+    def get_partials_path(self: Self, user_id: str) -> Path:
+        """Directory of the user's partial results, pruned of stale entries."""
+        partials_path = (
+            TEMP_DATA_ROOT / f"user_{user_id.replace('-', '')}" / PARTIALS_DIRNAME
+        )
+        if partials_path.exists():
+            cutoff = time.time() - PARTIALS_MAX_AGE_DAYS * 86400
+            for partial in partials_path.glob("*.parquet*"):
+                try:
+                    if partial.stat().st_mtime < cutoff:
+                        partial.unlink()
+                except OSError:
+                    pass
+        return partials_path
+
     def process(
         self: Self, params: HeatmapGravityToolParams, temp_dir: Path
     ) -> tuple[Path, DatasetMetadata]:
         """Run heatmap gravity analysis."""
         output_path = temp_dir / "output.parquet"
 
+        # Version opportunity layers before resolving them to temporary exports,
+        # so unchanged layers reuse their persisted partial results
+        opportunities = self.version_opportunities(params.opportunities)
+
         # Resolve opportunity layer IDs to parquet paths
         resolved_opportunities = self.resolve_layer_paths(
-            params.opportunities, params.user_id, "input_path"
+            opportunities, params.user_id, "input_path"
         )
 
         # Auto-resolve od_matrix_path from routing_mode if not provided
@@ -220,6 +272,7 @@ class HeatmapGravityToolRunner(BaseToolRunner[HeatmapGravityToolParams]):
                     "project_id",
                     "output_name",
                     "opportunities",  # Use resolved opportunities
+                    "partials_path",
                     # Exclude workflow-only numbered input fields
                     "opportunity_layer_1_id",
                     "opportunity_layer_1_filter",
@@ -232,6 +285,7 @@ class HeatmapGravityToolRunner(BaseToolRunner[HeatmapGravityToolParams]):
             opportunities=resolved_opportunities,
             od_matrix_path=od_matrix_path,
             output_path=str(output_path),
+            partials_path=str(self.get_partials_path(params.user_id)),
         )
 
         tool = self.tool_class()
@@ -418,31 +418,6 @@ class LayerUpdateRunner(SimpleToolRunner):
         finally:
             await pool.close()
 
-    def _delete_old_pmtiles(self: Self, user_id: str, layer_id: str) -> bool:
-        """Delete existing PMTiles file for a layer before regeneration.
-
-        Args:
-            user_id: Layer owner's UUID
-            layer_id: Layer UUID
-
-        Returns:
-            True if PMTiles was deleted, False if it didn't exist
-        """
-        if self.settings is None:
-            return False
-
-        try:
-            from goatlib.io.pmtiles import PMTilesGenerator
-
-            generator = PMTilesGenerator(tiles_data_dir=self.settings.tiles_data_dir)
-            deleted = generator.delete_pmtiles(user_id, layer_id)
-            if deleted:
-                logger.info("Deleted old PMTiles for layer: %s", layer_id)
-            return deleted
-        except Exception as e:
-            logger.warning("Error deleting old PMTiles for layer %s: %s", layer_id, e)
-            return False
-
     async def _update_layer_metadata(
         self: Self,
         layer_id: str,
@@ -609,14 +584,9 @@ class LayerUpdateRunner(SimpleToolRunner):
                     table_info.get("feature_count", 0),
                 )
 
-                # Step 3.5: Regenerate PMTiles (delete old + create new)
-                # First delete any existing PMTiles for this layer
-                self._delete_old_pmtiles(
-                    user_id=layer_info["user_id"],
-                    layer_id=params.layer_id,
-                )
-
-                # Then generate new PMTiles from updated data
+                # Step 3.5: Update PMTiles from the changed rows
+                # The old archive is kept for the incremental update and
+                # replaced atomically; a full regeneration is the fallback
                 # Find geometry column for tile generation
                 geom_col = "geometry"
                 for col_name, col_type in table_info.get("columns", {}).items():
@@ -629,6 +599,7 @@ class LayerUpdateRunner(SimpleToolRunner):
                     layer_id=params.layer_id,
                     table_name=table_info["table_name"],
                     geometry_column=geom_col,
+                    incremental=True,
                 )
 
                 # Step 4: Update PostgreSQL metadata
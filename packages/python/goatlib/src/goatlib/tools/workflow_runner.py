@@ -1,7 +1,9 @@
 """Workflow Runner - Executes workflow graphs in Windmill.
 
 This script receives a workflow definition (nodes + edges) and executes
-all tool nodes in topological order using temp_mode for preview results.
+all tool nodes in dependency order using temp_mode for preview results.
+Independent branches run concurrently, and node results are memoised so a
+re-run only recomputes nodes whose inputs changed and their descendants.
 
 Uses Windmill's workflow-as-code feature (@wmill.task decorator) to get
 proper progress tracking with running/completed status for each node.
@@ -10,8 +12,12 @@ Usage:
     Called from frontend via Windmill API when user clicks "Run Workflow"
 """
 
+import hashlib
+import json
 import logging
 import re
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
 from typing import Any
 
 import wmill
@@ -50,6 +56,16 @@ class WorkflowRunnerParams(BaseModel):
     variables: list[dict[str, Any]] = Field(
         default_factory=list, description="Workflow variables"
     )
+    max_parallel_nodes: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of tool nodes executed at the same time",
+    )
+    use_cache: bool = Field(
+        default=True,
+        description="Reuse results of nodes whose inputs did not change "
+        "since the previous run",
+    )
 
 
 class WorkflowResult(BaseModel):
@@ -66,6 +82,9 @@ class WorkflowResult(BaseModel):
     )
 
 
+# Memo of node results from previous runs, stored next to the temp results
+MEMO_FILENAME = "memo.json"
+
 # Regex to match {{@variable_name}} references
 VARIABLE_PATTERN = re.compile(r"\{\{@([a-zA-Z_][a-zA-Z0-9_]*)\}\}")
 
@@ -542,16 +561,323 @@ def run_tool_node(
     }
 
 
-def cleanup_previous_results(params: WorkflowRunnerParams) -> None:
-    """Clean up temp files from previous workflow run."""
+def cleanup_previous_results(
+    params: WorkflowRunnerParams,
+    node_ids: list[str] | None = None,
+    keep_node_ids: set[str] | None = None,
+) -> None:
+    """Clean up temp files from previous workflow run.
+
+    Without arguments all temp files of the workflow are removed.
+    """
     from goatlib.tools.cleanup_temp import cleanup_workflow_temp
 
     cleanup_workflow_temp(
         user_id=params.user_id,
         workflow_id=params.workflow_id,
+        node_ids=node_ids,
+        keep_node_ids=keep_node_ids,
+    )
+
+
+def get_memo_path(params: WorkflowRunnerParams) -> Path:
+    """Path of the memo file in the workflow's temp directory."""
+    from goatlib.tools.cleanup_temp import TEMP_DATA_ROOT
+
+    return (
+        TEMP_DATA_ROOT
+        / f"user_{params.user_id.replace('-', '')}"
+        / f"w_{params.workflow_id.replace('-', '')}"
+        / MEMO_FILENAME
     )
 
 
+def load_memo(params: WorkflowRunnerParams) -> dict[str, dict[str, Any]]:
+    """Load memoised node results ({node_id: {"key", "result"}})."""
+    path = get_memo_path(params)
+    try:
+        memo = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable workflow memo {path}: {e}")
+        return {}
+    return memo if isinstance(memo, dict) else {}
+
+
+def save_memo(params: WorkflowRunnerParams, memo: dict[str, dict[str, Any]]) -> None:
+    """Write the memo atomically so an interrupted run leaves a valid file."""
+    path = get_memo_path(params)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(memo, default=str))
+    tmp_path.replace(path)
+
+
+def get_source_layer_snapshots(layer_ids: set[str]) -> dict[str, int]:
+    """Get the latest DuckLake snapshot that changed each source layer.
+
+    Covers table creation as well as data files, delete files and columns
+    added or removed since, so any edit of a layer yields a new snapshot.
+    Layers that cannot be resolved are missing from the result.
+    """
+    if not layer_ids:
+        return {}
+
+    import asyncpg
+
+    from goatlib.storage import layer_snapshot_sql
+    from goatlib.tools.base import ToolSettings, _get_or_create_event_loop
+
+    table_names = {f"t_{layer_id.replace('-', '')}": layer_id for layer_id in layer_ids}
+
+    async def _fetch() -> dict[str, int]:
+        settings = ToolSettings.from_env()
+        catalog = settings.ducklake_catalog_schema
+        conn = await asyncpg.connect(
+            host=settings.postgres_server,
+            port=settings.postgres_port,
+            user=settings.postgres_user,
+            password=settings.postgres_password,
+            database=settings.postgres_db,
+        )
+        try:
+            rows = await conn.fetch(
+                f"""
+                SELECT t.table_name, {layer_snapshot_sql(catalog)} AS snapshot_id
+                FROM {catalog}.ducklake_table t
+                WHERE t.end_snapshot IS NULL
+                AND t.table_name = ANY($1::text[])
+                """,
+                list(table_names),
+            )
+        finally:
+            await conn.close()
+        return {table_names[row["table_name"]]: row["snapshot_id"] for row in rows}
+
+    try:
+        # Keep the thread's event loop, which tool runners share with their
+        # database pool (asyncio.run would leave the thread without one)
+        return _get_or_create_event_loop().run_until_complete(_fetch())
+    except Exception as e:
+        logger.warning(f"Could not get source layer snapshots: {e}")
+        return {}
+
+
+def get_node_cache_key(
+    node: dict,
+    process_id: str,
+    inputs: dict[str, Any],
+    edges: list[dict],
+    all_nodes: list[dict],
+    results: dict[str, dict],
+    snapshots: dict[str, int],
+) -> str | None:
+    """Hash everything a tool node's result depends on.
+
+    The key covers the process id, the resolved inputs, the result ids of
+    upstream tool nodes and the snapshots of upstream dataset layers.
+    Returns None if an upstream version is unknown, so the node always runs.
+    """
+    upstream: dict[str, Any] = {}
+    for edge in edges:
+        if edge["target"] != node["id"]:
+            continue
+        source_node = next((n for n in all_nodes if n["id"] == edge["source"]), None)
+        if not source_node:
+            continue
+
+        source_type = source_node.get("data", {}).get("type")
+        if source_type == "tool":
+            result_id = get_input_layer_id(source_node, results)
+            if not result_id:
+                return None
+            upstream[source_node["id"]] = result_id
+        elif source_type == "dataset":
+            layer_id = source_node.get("data", {}).get("layerId")
+            if not layer_id or layer_id not in snapshots:
+                return None
+            upstream[source_node["id"]] = [layer_id, snapshots[layer_id]]
+
+    payload = json.dumps(
+        {"process_id": process_id, "inputs": inputs, "upstream": upstream},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_memoised_result(
+    entry: dict[str, Any] | None,
+    cache_key: str | None,
+) -> dict[str, Any] | None:
+    """Return a memoised result if its key matches and its files still exist."""
+    if not entry or cache_key is None or entry.get("key") != cache_key:
+        return None
+    result = entry.get("result") or {}
+    parquet_path = result.get("parquet_path")
+    if not parquet_path or not Path(parquet_path).exists():
+        return None
+    return result
+
+
+def execute_tool_node(
+    node: dict,
+    edges: list[dict],
+    all_nodes: list[dict],
+    results: dict[str, dict],
+    params: WorkflowRunnerParams,
+    memo: dict[str, dict[str, Any]],
+    snapshots: dict[str, int],
+) -> tuple[str | None, dict[str, Any], str | None]:
+    """Run a tool node or reuse its memoised result.
+
+    Returns:
+        Tuple of (job_id, result_dict, cache_key)
+    """
+    node_id = node["id"]
+    process_id = node["data"]["processId"]
+
+    inputs = build_tool_inputs(node, edges, all_nodes, results, params)
+    print(f"[workflow_runner] Inputs built for {node_id}")
+
+    cache_key = None
+    if params.use_cache:
+        cache_key = get_node_cache_key(
+            node, process_id, inputs, edges, all_nodes, results, snapshots
+        )
+        cached = get_memoised_result(memo.get(node_id), cache_key)
+        if cached:
+            print(f"[workflow_runner] Node {node_id} unchanged, reusing result")
+            return cached.get("job_id"), {**cached, "cached": True}, cache_key
+
+    # Remove the node's previous result before writing a new one
+    cleanup_previous_results(params, node_ids=[node_id])
+
+    job_id, result = run_tool_node(node_id, process_id, inputs)
+    return job_id, result, cache_key
+
+
+def run_tool_nodes(
+    sorted_nodes: list[dict],
+    edges: list[dict],
+    params: WorkflowRunnerParams,
+    memo: dict[str, dict[str, Any]],
+    snapshots: dict[str, int],
+) -> tuple[dict[str, dict], dict[str, str], list[dict]]:
+    """Execute tool nodes, running independent branches concurrently.
+
+    A node is submitted once all its upstream tool nodes completed, in
+    topological order, with at most ``params.max_parallel_nodes`` running.
+    After a failure no further nodes are started; running ones finish.
+
+    Returns:
+        Tuple of (results, node_jobs, errors)
+    """
+    results: dict[str, dict] = {}
+    node_jobs: dict[str, str] = {}  # node_id → child job_id
+    errors: list[dict] = []
+
+    tool_nodes: list[dict] = []
+    for node in sorted_nodes:
+        # Skip non-tool nodes (datasets, results, exports)
+        if node.get("data", {}).get("type") != "tool":
+            continue
+        if not node.get("data", {}).get("processId"):
+            errors.append({"node_id": node["id"], "error": "No processId"})
+            continue
+        tool_nodes.append(node)
+
+    tool_node_ids = {n["id"] for n in tool_nodes}
+    dependencies = {
+        node["id"]: {
+            e["source"]
+            for e in edges
+            if e["target"] == node["id"] and e["source"] in tool_node_ids
+        }
+        for node in tool_nodes
+    }
+
+    pending = list(tool_nodes)
+    completed: set[str] = set()
+    running: dict[Future, str] = {}
+    failed = False
+
+    # Child jobs have parent_job set automatically, so backend can query
+    # Windmill for jobs with parent_job={this_job_id} to track progress
+    with ThreadPoolExecutor(max_workers=params.max_parallel_nodes) as executor:
+        while True:
+            if not failed:
+                for node in list(pending):
+                    if len(running) >= params.max_parallel_nodes:
+                        break
+                    if not dependencies[node["id"]] <= completed:
+                        continue
+                    pending.remove(node)
+                    print(
+                        f"[workflow_runner] Executing node {node['id']} "
+                        f"({node['data']['processId']})..."
+                    )
+                    future = executor.submit(
+                        execute_tool_node,
+                        node,
+                        edges,
+                        sorted_nodes,
+                        results,
+                        params,
+                        memo,
+                        snapshots,
+                    )
+                    running[future] = node["id"]
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node_id = running.pop(future)
+                try:
+                    job_id, result, cache_key = future.result()
+                except Exception as e:
+                    print(f"[workflow_runner] Node {node_id} failed: {e}")
+                    logger.error(f"Node {node_id} failed: {e}")
+                    errors.append({"node_id": node_id, "error": str(e)})
+                    memo.pop(node_id, None)
+                    # Stop execution on error - downstream nodes depend on this
+                    failed = True
+                    continue
+
+                # Track the node→job mapping
+                if job_id:
+                    node_jobs[node_id] = job_id
+                results[node_id] = result
+
+                # Check if node failed (result contains error)
+                if "error" in result:
+                    print(
+                        f"[workflow_runner] Node {node_id} failed: {result.get('error')}"
+                    )
+                    errors.append({"node_id": node_id, "error": result.get("error")})
+                    memo.pop(node_id, None)
+                    failed = True
+                    continue
+
+                completed.add(node_id)
+                print(
+                    f"[workflow_runner] Node {node_id} completed: "
+                    f"{result.get('temp_layer_id')}"
+                )
+
+                if params.use_cache and not result.get("cached"):
+                    if cache_key:
+                        memo[node_id] = {"key": cache_key, "result": result}
+                    else:
+                        memo.pop(node_id, None)
+                    save_memo(params, memo)
+
+    return results, node_jobs, errors
+
+
 def main(
     user_id: str,
     project_id: str,
@@ -560,8 +886,10 @@ def main(
     nodes: list[dict],
     edges: list[dict],
     variables: list[dict] | None = None,
+    max_parallel_nodes: int = 4,
+    use_cache: bool = True,
 ) -> dict:
-    """Execute workflow: run all tool nodes in topological order.
+    """Execute workflow: run all tool nodes in dependency order.
 
     This is the Windmill entry point.
 
@@ -572,6 +900,9 @@ def main(
         folder_id: Folder UUID
         nodes: List of workflow nodes
         edges: List of workflow edges
+        variables: Workflow variables
+        max_parallel_nodes: Maximum number of tool nodes running at once
+        use_cache: Reuse results of nodes whose inputs did not change
 
     Returns:
         Execution results for each node
@@ -588,81 +919,46 @@ def main(
         nodes=nodes,
         edges=edges,
         variables=variables or [],
+        max_parallel_nodes=max_parallel_nodes,
+        use_cache=use_cache,
     )
 
-    # Clean up previous temp results for this workflow
-    print("[workflow_runner] Cleaning up previous results...")
-    cleanup_previous_results(params)
-    print("[workflow_runner] Cleanup complete")
-
     # Sort nodes by dependency order
     print("[workflow_runner] Sorting nodes...")
     sorted_nodes = topological_sort(nodes, edges)
     print(f"[workflow_runner] Sorted {len(sorted_nodes)} nodes")
 
-    # Track results per node and node→job mapping
-    results: dict[str, dict] = {}
-    node_jobs: dict[str, str] = {}  # node_id → child job_id
-    errors: list[dict] = []
-
-    # Execute each tool node
-    # Child jobs have parent_job set automatically, so backend can query
-    # Windmill for jobs with parent_job={this_job_id} to track progress
-    for node in sorted_nodes:
-        node_type = node.get("data", {}).get("type")
-
-        # Skip non-tool nodes (datasets, results, exports)
-        if node_type != "tool":
-            continue
-
-        node_id = node["id"]
-        process_id = node.get("data", {}).get("processId")
-
-        if not process_id:
-            errors.append({"node_id": node_id, "error": "No processId"})
-            continue
-
-        print(f"[workflow_runner] Executing node {node_id} ({process_id})...")
-
-        try:
-            # Build inputs for this tool
-            inputs = build_tool_inputs(node, edges, nodes, results, params)
-            print(f"[workflow_runner] Inputs built for {node_id}")
-
-            # Execute the tool - returns (job_id, result)
-            job_id, result = run_tool_node(node_id, process_id, inputs)
-
-            # Track the node→job mapping
-            node_jobs[node_id] = job_id
-            results[node_id] = result
-
-            # Check if node failed (result contains error)
-            if "error" in result:
-                print(f"[workflow_runner] Node {node_id} failed: {result.get('error')}")
-                errors.append(
-                    {
-                        "node_id": node_id,
-                        "error": result.get("error"),
-                    }
-                )
-                # Stop execution on error - downstream nodes depend on this
-                break
-
-            print(
-                f"[workflow_runner] Node {node_id} completed: {result.get('temp_layer_id')}"
-            )
+    # Clean up previous temp results for this workflow, keeping the results
+    # of current tool nodes that may be reused
+    print("[workflow_runner] Cleaning up previous results...")
+    memo: dict[str, dict[str, Any]] = {}
+    snapshots: dict[str, int] = {}
+    if params.use_cache:
+        tool_node_ids = {
+            n["id"] for n in sorted_nodes if n.get("data", {}).get("type") == "tool"
+        }
+        memo = {
+            node_id: entry
+            for node_id, entry in load_memo(params).items()
+            if node_id in tool_node_ids
+        }
+        cleanup_previous_results(params, keep_node_ids=set(memo))
+        snapshots = get_source_layer_snapshots(
+            {
+                n["data"]["layerId"]
+                for n in sorted_nodes
+                if n.get("data", {}).get("type") == "dataset"
+                and n["data"].get("layerId")
+            }
+        )
+    else:
+        cleanup_previous_results(params)
+    print(f"[workflow_runner] Cleanup complete ({len(memo)} memoised results)")
 
-        except Exception as e:
-            print(f"[workflow_runner] Node {node_id} failed: {e}")
-            logger.error(f"Node {node_id} failed: {e}")
-            errors.append(
-                {
-                    "node_id": node_id,
-                    "error": str(e),
-                }
-            )
-            # Stop execution on error - downstream nodes depend on this
-            break
+    # Execute tool nodes, independent branches in parallel
+    results, node_jobs, errors = run_tool_nodes(
+        sorted_nodes, edges, params, memo, snapshots
+    )
 
     print(
         f"[workflow_runner] Tool nodes complete: {len(results)} results, {len(errors)} errors"
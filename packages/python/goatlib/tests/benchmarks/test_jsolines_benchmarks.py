@@ -0,0 +1,160 @@
+"""
+Micro-benchmark of marching squares contouring on a decoded R5 grid
+"""
+
+import json
+import time
+from typing import Callable
+
+import numpy as np
+from goatlib.analysis.accessibility.catchment_area import (
+    compute_r5_surface,
+    decode_r5_grid,
+    generate_jsolines,
+    get_contours,
+)
+from numba import njit
+from numpy.typing import NDArray
+
+GRID_SIZE = 1200
+TRAVEL_TIME = 60
+STEPS = 6
+PERCENTILES = 5
+REPEATS = 5
+
+
+@njit
+def reference_contour(
+    surface: NDArray[np.float64], width: int, height: int, cutoff: float
+) -> NDArray[np.int8]:
+    """Previous per-cutoff get_contour kernel, the reference of get_contours."""
+    contour = np.zeros((width - 1) * (height - 1), dtype=np.int8)
+
+    # compute contour values for each cell
+    for x in range(width - 1):
+        for y in range(height - 1):
+            index = y * width + x
+            top_left = surface[index] < cutoff
+            top_right = surface[index + 1] < cutoff
+            bot_left = surface[index + width] < cutoff
+            bot_right = surface[index + width + 1] < cutoff
+
+            # if we're at the edge of the area, set the outer sides to false, so that
+            # isochrones always close even when they actually extend beyond the edges
+            # of the surface
+
+            if x == 0:
+                top_left = bot_left = False
+            if x == width - 2:
+                top_right = bot_right = False
+            if y == 0:
+                top_left = top_right = False
+            if y == height - 2:
+                bot_right = bot_left = False
+
+            idx = 0
+
+            if top_left:
+                idx |= 1 << 3
+            if top_right:
+                idx |= 1 << 2
+            if bot_right:
+                idx |= 1 << 1
+            if bot_left:
+                idx |= 1
+
+            contour[y * (width - 1) + x] = idx
+
+    return contour
+
+
+def encode_r5_grid(width: int, height: int) -> bytes:
+    """
+    Build an R5 travel time grid with travel times growing away from the centre.
+
+    Pixels beyond the travel time are unreachable, like in R5 responses.
+    """
+    y, x = np.mgrid[0:height, 0:width]
+    distance = np.hypot(x - width / 2, y - height / 2) / (width / 2)
+    noise = np.random.default_rng(42).uniform(0, 3, (height, width))
+    times = distance * 1.5 * TRAVEL_TIME + noise
+    times = np.where(times > TRAVEL_TIME, 2**16 - 1, times).astype(np.int32).ravel()
+
+    header = np.array([0, 9, 272000, 175000, width, height, PERCENTILES], np.int32)
+    # Each percentile is delta-encoded
+    deltas = np.diff(times, prepend=np.int32(0)).astype(np.int32)
+    metadata = json.dumps({"accessibility": [], "pathSummaries": []}).encode()
+    data = np.tile(deltas, PERCENTILES).tobytes()
+    return b"ACCESSGR" + header.tobytes() + data + metadata
+
+
+def best_of(func: Callable[[], object], repeats: int = REPEATS) -> float:
+    """Best wall time of several runs, in seconds."""
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+def benchmark_jsolines_contours() -> tuple[float, float, float]:
+    """
+    Benchmark contouring all cutoffs at once against the previous kernel,
+    which made one pass per cutoff
+
+    Returns:
+        Tuple of (shared_pass_seconds, per_cutoff_seconds, generate_jsolines_seconds)
+    """
+    grid = decode_r5_grid(encode_r5_grid(GRID_SIZE, GRID_SIZE))
+    surface = compute_r5_surface(grid, 50)
+    width, height = grid["width"], grid["height"]
+    cutoffs = np.arange(TRAVEL_TIME / STEPS, TRAVEL_TIME + 1, TRAVEL_TIME / STEPS)
+
+    # Compile outside of the timings
+    generate_jsolines(decode_r5_grid(encode_r5_grid(8, 8)), TRAVEL_TIME, 50, STEPS)
+
+    print("🔧 Benchmark: Marching squares contouring")
+    print(f"📊 Grid: {width}x{height} pixels, {len(cutoffs)} cutoffs")
+
+    shared_time = best_of(lambda: get_contours(surface, width, height, cutoffs))
+    reference_contour(surface, width, height, cutoffs[0])
+    per_cutoff_time = best_of(
+        lambda: [
+            reference_contour(surface, width, height, cutoff) for cutoff in cutoffs
+        ]
+    )
+    jsolines_time = best_of(
+        lambda: generate_jsolines(grid, TRAVEL_TIME, 50, STEPS), repeats=2
+    )
+
+    print(f"⏱️  Contours, shared pass: {shared_time * 1000:.1f} ms")
+    print(f"⏱️  Contours, previous kernel per cutoff: {per_cutoff_time * 1000:.1f} ms")
+    print(f"⏱️  generate_jsolines: {jsolines_time * 1000:.1f} ms")
+
+    return shared_time, per_cutoff_time, jsolines_time
+
+
+def test_benchmark_jsolines_contours() -> None:
+    """
+    Test function for the marching squares benchmark.
+    """
+    grid = decode_r5_grid(encode_r5_grid(64, 48))
+    surface = compute_r5_surface(grid, 50)
+    cutoffs = np.array([10.0, 30.0, 60.0])
+
+    # The shared pass matches the previous kernel for every cutoff
+    contours = get_contours(surface, 64, 48, cutoffs)
+    for i, cutoff in enumerate(cutoffs):
+        np.testing.assert_array_equal(
+            contours[i], reference_contour(surface, 64, 48, cutoff)
+        )
+    # Edge pixels are never inside, so top corners of the first row are unset
+    assert not (contours[-1].reshape(47, 63)[0] & 0b1100).any()
+    assert contours[-1].any()
+
+    benchmark_jsolines_contours()
+
+
+if __name__ == "__main__":
+    benchmark_jsolines_contours()
@@ -179,3 +179,140 @@ def test_tippecanoe_command_point_layer() -> None:
             # Should NOT have polygon-specific settings
             assert "--drop-densest-as-needed" not in cmd
             assert "--no-tiny-polygon-reduction" not in cmd
+
+
+# =====================================================================
+#  Streaming Generation Tests
+# =====================================================================
+
+
+@pytest.fixture
+def streaming_generator(tmp_path):
+    """Generator that does not require tippecanoe to be installed."""
+    with patch("shutil.which", return_value="/usr/bin/tippecanoe"):
+        yield PMTilesGenerator(tiles_data_dir=str(tmp_path))
+
+
+def test_tippecanoe_command_reads_stdin(streaming_generator) -> None:
+    """Without an input path tippecanoe reads GeoJSON from stdin."""
+    cmd = streaming_generator._build_tippecanoe_command(None, "/out.pmtiles")
+    assert cmd[:4] == ["tippecanoe", "-o", "/out.pmtiles", "--force"]
+
+    cmd = streaming_generator._build_tippecanoe_command("/in.geojson", "/out.pmtiles")
+    assert cmd[3] == "/in.geojson"
+
+
+def test_tippecanoe_command_partial_render(streaming_generator) -> None:
+    """Partial renders of incremental updates override zooms and depth."""
+    import json
+
+    cmd = streaming_generator._build_tippecanoe_command(
+        None,
+        "/out.pmtiles",
+        "POLYGON",
+        snapshot_id=5,
+        columns=["name"],
+        zoom_range=(0, 7),
+        variable_depth=False,
+    )
+    assert "-Z0" in cmd and "-z7" in cmd and "-z14" not in cmd
+    assert "--generate-variable-depth-tile-pyramid" not in cmd
+    assert "--extend-zooms-if-still-dropping" not in cmd
+    description = json.loads(cmd[cmd.index("--description") + 1])
+    assert description["snapshot_id"] == 5
+    assert description["columns"] == ["name"]
+    assert description["geometry_type"] == "POLYGON"
+
+
+def test_export_columns_skip_unsupported_types(streaming_generator) -> None:
+    """Geometry, excluded and complex columns are not exported."""
+    import duckdb
+
+    con = duckdb.connect()
+    con.execute(
+        "CREATE TABLE t (name VARCHAR, count BIGINT, tags VARCHAR[], "
+        "bbox STRUCT(xmin DOUBLE), geometry VARCHAR)"
+    )
+    columns, has_id = streaming_generator._get_export_columns(
+        con, "t", "geometry", ["bbox"]
+    )
+    assert columns == ["name", "count"]
+    assert has_id is False
+
+
+def test_feature_query_keeps_types(streaming_generator) -> None:
+    """Properties are serialized with to_json and a synthetic id is added."""
+    sql = streaming_generator._build_feature_query(
+        "lake.s.t", ["name", 'we"ird'], has_id_column=False
+    )
+    assert '"id" := rowid' in sql
+    assert '"we""ird" := "we""ird"' in sql
+    assert "to_json(struct_pack(" in sql
+    assert 'ST_AsGeoJSON("geometry")' in sql
+    assert "'{\"type\":\"Feature\",\"properties\":'" in sql
+
+    sql = streaming_generator._build_feature_query("t", [], has_id_column=True)
+    assert "struct_pack" not in sql
+
+
+def test_iter_features_in_batches(streaming_generator) -> None:
+    """Features are streamed in bounded batches and counted."""
+    import duckdb
+
+    from goatlib.io.pmtiles import PMTilesGenerationStats
+
+    con = duckdb.connect()
+    con.execute("CREATE TABLE t (id INTEGER, geometry VARCHAR)")
+    stats = PMTilesGenerationStats()
+    with patch.object(
+        streaming_generator,
+        "_build_feature_query",
+        return_value="SELECT 'f' || i FROM range(25) r(i)",
+    ):
+        chunks = list(
+            streaming_generator._iter_geojson_features(
+                con, "t", stats=stats, batch_rows=10
+            )
+        )
+
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines == [f"f{i}" for i in range(25)]
+    assert len(chunks) >= 3
+    assert stats.num_features == 25
+    assert stats.bytes_streamed == sum(len(c) for c in chunks)
+
+
+def test_run_tippecanoe_streaming(streaming_generator, tmp_path) -> None:
+    """Chunks are piped into the process stdin and stage times are recorded."""
+    from goatlib.io.pmtiles import PMTilesGenerationStats
+
+    output = tmp_path / "out.txt"
+    stats = PMTilesGenerationStats()
+    with patch.object(
+        streaming_generator,
+        "_build_tippecanoe_command",
+        return_value=["sh", "-c", f"cat > {output}"],
+    ):
+        streaming_generator._run_tippecanoe_streaming(
+            iter([b"a\n", b"b\n"]), "/out.pmtiles", show_progress=False, stats=stats
+        )
+
+    assert output.read_bytes() == b"a\nb\n"
+    assert stats.tile_seconds >= 0
+
+
+def test_run_tippecanoe_streaming_failure(streaming_generator) -> None:
+    """A failing tippecanoe raises with its stderr."""
+    import subprocess
+
+    with patch.object(
+        streaming_generator,
+        "_build_tippecanoe_command",
+        return_value=["sh", "-c", "echo broken >&2; exit 3"],
+    ):
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
+            streaming_generator._run_tippecanoe_streaming(
+                iter([b"x\n"] * 1000), "/out.pmtiles", show_progress=False
+            )
+    assert exc_info.value.returncode == 3
+    assert "broken" in exc_info.value.stderr
@@ -0,0 +1,354 @@
+"""Tests for incremental PMTiles updates."""
+
+import gzip
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from goatlib.io.pmtiles import PMTilesGenerationStats, PMTilesGenerator
+from goatlib.io.pmtiles_incremental import (
+    TableChanges,
+    _decode_layers,
+    _decode_value,
+    _encode_field,
+    _feature_tags,
+    patch_tile,
+    splice_archive,
+    tiles_for_bbox,
+)
+from pmtiles.reader import MmapSource, all_tiles
+from pmtiles.reader import Reader as PMTilesReader
+from pmtiles.tile import Compression, TileType, zxy_to_tileid
+from pmtiles.writer import Writer
+
+BERLIN = (13.35, 52.6, 13.45, 52.7)
+
+
+def make_tile(features: list[tuple[int, str]]) -> bytes:
+    """Encode a tile with point features carrying an id and a name."""
+    keys = [b"id", b"name"]
+    values: list[bytes] = []
+    feature_messages = []
+    for feature_id, name in features:
+        tags = []
+        for key_index, value in ((0, _encode_field(5, 0, feature_id)), (1, None)):
+            if value is None:
+                value = _encode_field(1, 2, name.encode())
+            if value not in values:
+                values.append(value)
+            tags += [key_index, values.index(value)]
+        packed = bytes(tags)
+        feature_messages.append(
+            _encode_field(2, 2, packed)
+            + _encode_field(3, 0, 1)
+            + _encode_field(4, 2, bytes([9, 2, 2]))
+        )
+    layer = _encode_field(1, 2, b"default")
+    for message in feature_messages:
+        layer += _encode_field(2, 2, message)
+    for key in keys:
+        layer += _encode_field(3, 2, key)
+    for value in values:
+        layer += _encode_field(4, 2, value)
+    layer += _encode_field(5, 0, 4096) + _encode_field(15, 0, 2)
+    return _encode_field(3, 2, layer)
+
+
+def tile_features(data: bytes) -> list[dict]:
+    """Decode the properties of all features of a tile."""
+    features = []
+    for layer in _decode_layers(data):
+        for feature in layer["features"]:
+            tags = _feature_tags(feature)
+            features.append(
+                {
+                    layer["keys"][tags[i]].decode(): _decode_value(
+                        layer["values"][tags[i + 1]]
+                    )
+                    for i in range(0, len(tags), 2)
+                }
+            )
+    return features
+
+
+def write_archive(path: Path, tiles: dict, metadata: dict | None = None) -> None:
+    """Write gzip-compressed tiles {(z, x, y): features} to an archive."""
+    with open(path, "wb") as f:
+        writer = Writer(f)
+        for z, x, y in sorted(tiles, key=lambda t: zxy_to_tileid(*t)):
+            writer.write_tile(
+                zxy_to_tileid(z, x, y), gzip.compress(make_tile(tiles[(z, x, y)]))
+            )
+        writer.finalize(
+            {
+                "tile_type": TileType.MVT,
+                "tile_compression": Compression.GZIP,
+                "min_lon_e7": 0,
+                "min_lat_e7": 0,
+                "max_lon_e7": 0,
+                "max_lat_e7": 0,
+                "center_zoom": 0,
+                "center_lon_e7": 0,
+                "center_lat_e7": 0,
+            },
+            metadata or {},
+        )
+
+
+def read_archive(path: Path) -> dict:
+    with open(path, "rb") as f:
+        return {
+            zxy: tile_features(gzip.decompress(data))
+            for zxy, data in all_tiles(MmapSource(f))
+        }
+
+
+# =====================================================================
+#  Tile Math Tests
+# =====================================================================
+
+
+def test_tiles_for_bbox() -> None:
+    """Tiles covering a bbox, grown into neighbours by the tile buffer."""
+    assert list(tiles_for_bbox(BERLIN, 0)) == [(0, 0)]
+    assert list(tiles_for_bbox(BERLIN, 8)) == [(137, 83)]
+    # A point on a tile border touches the buffers of both tiles
+    assert list(tiles_for_bbox((0.0, 10.0, 0.0, 10.0), 1)) == [(0, 0), (1, 0)]
+    assert list(tiles_for_bbox((0.0, 10.0, 0.0, 10.0), 1, buffer=0)) == [(1, 0)]
+
+
+# =====================================================================
+#  Tile Patching Tests
+# =====================================================================
+
+
+def test_patch_tile_removes_and_appends_features() -> None:
+    """Removed ids are dropped and added features re-indexed into the layer."""
+    old = make_tile([(1, "a"), (2, "b"), (3, "a")])
+    addition = make_tile([(2, "c"), (4, "a")])
+
+    patched = patch_tile(old, addition, removed_ids={2, 3})
+
+    assert tile_features(patched) == [
+        {"id": 1, "name": "a"},
+        {"id": 2, "name": "c"},
+        {"id": 4, "name": "a"},
+    ]
+    layer = _decode_layers(patched)[0]
+    assert layer["name"] == b"default"
+    assert layer["keys"] == [b"id", b"name"]
+    # Extent and version are kept
+    assert (5, 0, 4096) in layer["fields"]
+    assert (15, 0, 2) in layer["fields"]
+
+
+def test_patch_tile_without_addition() -> None:
+    old = make_tile([(1, "a"), (2, "b")])
+    assert tile_features(patch_tile(old, None, {1})) == [{"id": 2, "name": "b"}]
+    assert tile_features(patch_tile(old, None, set())) == tile_features(old)
+
+
+# =====================================================================
+#  Archive Splicing Tests
+# =====================================================================
+
+
+def test_splice_archive(tmp_path: Path) -> None:
+    """Tiles in the region are replaced and low zoom tiles patched."""
+    old_path = tmp_path / "old.pmtiles"
+    write_archive(
+        old_path,
+        {
+            (0, 0, 0): [(1, "a"), (2, "b")],
+            (1, 0, 0): [(1, "a")],
+            (1, 1, 0): [(2, "b")],
+            (2, 3, 0): [(2, "b")],
+        },
+    )
+    high_path = tmp_path / "high.pmtiles"
+    write_archive(
+        high_path,
+        {
+            (1, 1, 0): [(2, "c")],
+            (2, 3, 0): [(2, "c")],
+            # Outside the region, must not replace the old tile
+            (1, 0, 0): [(9, "x")],
+        },
+    )
+    low_path = tmp_path / "low.pmtiles"
+    write_archive(low_path, {(0, 0, 0): [(2, "c")]})
+
+    output_path = tmp_path / "new.pmtiles"
+    updated = splice_archive(
+        old_path=old_path,
+        output_path=output_path,
+        split_zoom=1,
+        region={(1, 0)},
+        patched_tiles={(0, 0, 0)},
+        removed_ids={2},
+        high_zoom_path=high_path,
+        low_zoom_path=low_path,
+        metadata={"description": "new"},
+        bounds=(13.0, 52.0, 14.0, 53.0),
+    )
+
+    assert updated == 3
+    assert read_archive(output_path) == {
+        (0, 0, 0): [{"id": 1, "name": "a"}, {"id": 2, "name": "c"}],
+        (1, 0, 0): [{"id": 1, "name": "a"}],
+        (1, 1, 0): [{"id": 2, "name": "c"}],
+        (2, 3, 0): [{"id": 2, "name": "c"}],
+    }
+    with open(output_path, "rb") as f:
+        reader = PMTilesReader(MmapSource(f))
+        assert reader.metadata() == {"description": "new"}
+        assert reader.header()["max_lat_e7"] == 530_000_000
+
+
+def test_splice_archive_adds_tiles_in_empty_area(tmp_path: Path) -> None:
+    """Low zoom additions without an old tile are written as new tiles."""
+    old_path = tmp_path / "old.pmtiles"
+    write_archive(old_path, {(0, 0, 0): [(1, "a")], (1, 0, 0): [(1, "a")]})
+    low_path = tmp_path / "low.pmtiles"
+    write_archive(low_path, {(0, 0, 0): [(2, "b")], (1, 1, 1): [(2, "b")]})
+
+    output_path = tmp_path / "new.pmtiles"
+    updated = splice_archive(
+        old_path=old_path,
+        output_path=output_path,
+        split_zoom=2,
+        region=set(),
+        patched_tiles={(0, 0, 0), (1, 1, 1)},
+        removed_ids=set(),
+        high_zoom_path=None,
+        low_zoom_path=low_path,
+        metadata={},
+    )
+
+    assert updated == 2
+    assert read_archive(output_path) == {
+        (0, 0, 0): [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}],
+        (1, 0, 0): [{"id": 1, "name": "a"}],
+        (1, 1, 1): [{"id": 2, "name": "b"}],
+    }
+
+
+# =====================================================================
+#  Incremental Update Tests
+# =====================================================================
+
+
+@pytest.fixture
+def generator(tmp_path: Path) -> PMTilesGenerator:
+    with patch("shutil.which", return_value="/usr/bin/tippecanoe"):
+        generator = PMTilesGenerator(tiles_data_dir=str(tmp_path))
+    generator._detect_geometry_type = MagicMock(return_value="POINT")
+    generator._get_export_columns = MagicMock(return_value=(["name"], True))
+    return generator
+
+
+def write_layer_archive(generator: PMTilesGenerator, description: dict) -> Path:
+    path = generator.get_pmtiles_path("user1", "layer1")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_archive(
+        path,
+        {(0, 0, 0): [(1, "a"), (2, "b")], (8, 137, 83): [(2, "b")]},
+        {"description": json.dumps(description)},
+    )
+    return path
+
+
+def test_update_from_table_splices_changes(generator: PMTilesGenerator) -> None:
+    """Changed rows re-render their region and patch the low zooms."""
+    generator.config.incremental_split_zoom = 8
+    path = write_layer_archive(
+        generator,
+        {"snapshot_id": 1, "columns": ["name"], "geometry_type": "POINT"},
+    )
+    changes = TableChanges(bboxes=[BERLIN], removed_ids={2}, num_rows=2)
+    renders = {}
+
+    def render(*args: object) -> None:
+        where, output_path, _, zoom_range, variable_depth = args[4:9]
+        renders[zoom_range] = (where, variable_depth)
+        if zoom_range[0] == 8:
+            write_archive(output_path, {(8, 137, 83): [(2, "c")]})
+        else:
+            write_archive(output_path, {(0, 0, 0): [(2, "c")]})
+
+    stats = PMTilesGenerationStats()
+    con = MagicMock()
+    with (
+        patch(
+            "goatlib.io.pmtiles_incremental.find_table_changes",
+            return_value=changes,
+        ),
+        patch.object(generator, "_render_features", side_effect=render),
+        patch.object(generator, "generate_from_table") as full,
+    ):
+        output = generator.update_from_table(
+            con, "lake.s.t", "user1", "layer1", snapshot_id=2, stats=stats
+        )
+
+    full.assert_not_called()
+    assert output == path
+    assert stats.incremental is True
+    assert stats.changed_rows == 2
+    # Region at the split zoom, only added rows below it
+    assert "ST_Intersects" in renders[(8, 14)][0]
+    assert renders[(8, 14)][1] is True
+    assert "change = 'added'" in renders[(0, 7)][0]
+    assert renders[(0, 7)][1] is False
+
+    assert read_archive(path) == {
+        (0, 0, 0): [{"id": 1, "name": "a"}, {"id": 2, "name": "c"}],
+        (8, 137, 83): [{"id": 2, "name": "c"}],
+    }
+    with open(path, "rb") as f:
+        metadata = PMTilesReader(MmapSource(f)).metadata()
+    description = json.loads(metadata["description"])
+    assert description["snapshot_id"] == 2
+    assert description["incremental_from"] == 1
+    assert description["columns"] == ["name"]
+    con.execute.assert_called_with("DROP TABLE IF EXISTS _pmtiles_changes_layer1")
+
+
+@pytest.mark.parametrize(
+    "description, changes",
+    [
+        # Archive from before columns were recorded
+        ({"snapshot_id": 1}, TableChanges()),
+        ({"snapshot_id": 1, "columns": ["other"], "geometry_type": "POINT"}, None),
+        # Too many changed rows
+        ({"snapshot_id": 1, "columns": ["name"], "geometry_type": "POINT"}, None),
+    ],
+)
+def test_update_from_table_falls_back_to_full_generation(
+    generator: PMTilesGenerator, description: dict, changes: TableChanges | None
+) -> None:
+    write_layer_archive(generator, description)
+    with (
+        patch(
+            "goatlib.io.pmtiles_incremental.find_table_changes",
+            return_value=changes,
+        ),
+        patch.object(generator, "_render_features") as render,
+        patch.object(generator, "generate_from_table", return_value="full") as full,
+    ):
+        output = generator.update_from_table(
+            MagicMock(), "lake.s.t", "user1", "layer1", snapshot_id=2
+        )
+
+    assert output == "full"
+    full.assert_called_once()
+    render.assert_not_called()
+
+
+def test_update_from_table_without_archive(generator: PMTilesGenerator) -> None:
+    with patch.object(generator, "generate_from_table", return_value="full") as full:
+        output = generator.update_from_table(
+            MagicMock(), "lake.s.t", "user1", "layer1", snapshot_id=2
+        )
+    assert output == "full"
+    full.assert_called_once()
@@ -1,5 +1,14 @@
 """Tests for catchment area schemas and CatchmentAreaTool."""
 
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import httpx
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 from goatlib.analysis.accessibility import CatchmentAreaTool
 from goatlib.analysis.schemas import (
@@ -257,3 +266,128 @@ class TestCatchmentAreaTool:
         )
         # Since routing_url is mandatory in params, it should always be used
         assert tool._get_routing_url(params) == "https://params.example.com"
+
+
+# ---------------------------------------------------------------------------
+# Test: Batched routing requests
+# ---------------------------------------------------------------------------
+
+
+def network_response(costs: list[int]) -> bytes:
+    """Parquet body of a network catchment area response."""
+    table = pa.table(
+        {
+            "geometry": pa.array([f"edge_{i}".encode() for i in range(len(costs))]),
+            "cost": pa.array(costs, type=pa.int64()),
+            "cost_step": pa.array([c // 5 for c in costs], type=pa.int64()),
+        }
+    )
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    return sink.getvalue().to_pybytes()
+
+
+class TestCatchmentAreaBatching:
+    """Tests for batched requests to GOAT Routing."""
+
+    @pytest.fixture
+    def tool(self, monkeypatch: pytest.MonkeyPatch) -> CatchmentAreaTool:
+        tool = CatchmentAreaTool(routing_url=TEST_ROUTING_URL)
+        tool._batch_size = 2
+        tool._max_concurrent_requests = 2
+        tool._retry_interval = 1.0
+        tool.sleeps = []
+
+        async def sleep(delay: float) -> None:
+            tool.sleeps.append(delay)
+
+        monkeypatch.setattr(
+            "goatlib.analysis.accessibility.catchment_area.asyncio.sleep", sleep
+        )
+        return tool
+
+    def mock_routing(self, tool: CatchmentAreaTool, handler: Any) -> None:
+        tool._create_client = lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        )
+
+    def test_post_batched_splits_starting_points(
+        self, tool: CatchmentAreaTool, tmp_path: Path
+    ) -> None:
+        """Each batch is one request, all responses end up in one parquet file."""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            payload = json.loads(request.content)
+            requests.append(payload["starting_points"]["latitude"])
+            assert payload["routing_type"] == "walking"
+            return httpx.Response(200, content=network_response([5, 10]))
+
+        self.mock_routing(tool, handler)
+        output_path = tmp_path / "raw.parquet"
+        num_batches = asyncio.run(
+            tool._post_batched(
+                f"{TEST_ROUTING_URL}/active-mobility/catchment-area",
+                {"routing_type": "walking"},
+                None,
+                [1.0, 2.0, 3.0, 4.0, 5.0],
+                [6.0, 7.0, 8.0, 9.0, 10.0],
+                output_path,
+            )
+        )
+
+        assert num_batches == 3
+        assert sorted(requests) == [[1.0, 2.0], [3.0, 4.0], [5.0]]
+        assert pq.read_table(output_path).num_rows == 6
+
+    def test_post_with_retry_backs_off(self, tool: CatchmentAreaTool) -> None:
+        responses = [202] * 4 + [200]
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(responses.pop(0), content=b"done")
+
+        self.mock_routing(tool, handler)
+        result = asyncio.run(
+            tool._post_with_retry(TEST_ROUTING_URL, {}, "Bearer test-token")
+        )
+
+        assert result == b"done"
+        # Exponential backoff, capped at the retry interval
+        assert tool.sleeps == [0.25, 0.5, 1.0, 1.0]
+
+    def test_post_with_retry_keeps_polling_budget(
+        self, tool: CatchmentAreaTool
+    ) -> None:
+        """Backoff polls for retries * retry interval seconds, like fixed polling."""
+        tool._retries = 3
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(202)
+
+        self.mock_routing(tool, handler)
+        with pytest.raises(RuntimeError, match="took too long"):
+            asyncio.run(tool._post_with_retry(TEST_ROUTING_URL, {}, None))
+
+        assert tool.sleeps == [0.25, 0.5, 1.0, 1.0, 0.25]
+        assert sum(tool.sleeps) == 3.0
+
+    def test_merge_batches_keeps_lowest_cost(
+        self, tool: CatchmentAreaTool, tmp_path: Path
+    ) -> None:
+        """Edges and cells reached from several batches keep their lowest cost."""
+        path = tmp_path / "raw.parquet"
+        path.write_bytes(network_response([5, 10, 15]))
+        con = duckdb.connect()
+        con.execute(
+            f"COPY (SELECT * FROM '{path}' UNION ALL "
+            f"SELECT geometry, cost - 3, cost_step FROM '{path}') "
+            f"TO '{tmp_path / 'batches.parquet'}' (FORMAT PARQUET)"
+        )
+
+        sql = tool._merge_batches_sql(
+            f"read_parquet('{tmp_path / 'batches.parquet'}')",
+            CatchmentAreaType.network,
+            polygon_difference=True,
+        )
+        rows = con.execute(f"SELECT cost FROM ({sql}) ORDER BY cost").fetchall()
+        assert rows == [(2,), (7,), (12,)]
@@ -0,0 +1,160 @@
+from pathlib import Path
+
+import pytest
+from goatlib.analysis.accessibility.gravity import HeatmapGravityTool
+from goatlib.analysis.schemas.heatmap import (
+    HeatmapGravityParams,
+    ImpedanceFunction,
+    OpportunityGravity,
+)
+
+# Standardized opportunity rows (dest_id, potential) per source version
+OPPORTUNITY_ROWS = {
+    "schools@1": [(100, 1.0), (200, 2.0)],
+    "shops@1": [(300, 3.0)],
+    "shops@2": [(300, 5.0), (200, 1.0)],
+}
+
+
+@pytest.fixture
+def tool(tmp_path: Path) -> HeatmapGravityTool:
+    tool = HeatmapGravityTool()
+    tool.con.execute("""
+        CREATE TABLE od AS
+        SELECT 1 AS orig_id, 100 AS dest_id, 10 AS cost
+        UNION ALL SELECT 1, 200, 20
+        UNION ALL SELECT 1, 300, 12
+        UNION ALL SELECT 2, 100, 25
+        UNION ALL SELECT 2, 200, 14
+        UNION ALL SELECT 2, 300, 18
+    """)
+    tool.con.execute(f"COPY od TO '{tmp_path / 'od.parquet'}' (FORMAT PARQUET)")
+
+    tool.processed = []
+
+    def process_opportunities(
+        opportunities: list[OpportunityGravity],
+        h3_resolution: int,
+        indices: list[int] | None = None,
+    ) -> list[tuple[str, str]]:
+        tables = []
+        for idx in indices:
+            opp = opportunities[idx]
+            tool.processed.append(opp.name)
+            rows = ", ".join(
+                f"({dest_id}, {potential}, {opp.max_cost}, {opp.sensitivity})"
+                for dest_id, potential in OPPORTUNITY_ROWS[opp.source_version]
+            )
+            tool.con.execute(f"""
+                CREATE OR REPLACE TEMP TABLE opp_{idx}_std AS
+                SELECT * FROM (VALUES {rows})
+                    AS t(dest_id, potential, max_cost, sensitivity)
+            """)
+            tables.append((f"opp_{idx}_std", opp.name))
+        return tables
+
+    tool._process_opportunities = process_opportunities
+    return tool
+
+
+def make_params(tmp_path: Path, shops_version: str) -> HeatmapGravityParams:
+    return HeatmapGravityParams(
+        routing_mode="walking",
+        od_matrix_path=str(tmp_path / "od.parquet"),
+        output_path=str(tmp_path / "result.parquet"),
+        partials_path=str(tmp_path / "partials"),
+        impedance=ImpedanceFunction.linear,
+        opportunities=[
+            OpportunityGravity(
+                input_path="schools.parquet",
+                name="schools",
+                max_cost=30,
+                source_version="schools@1",
+            ),
+            OpportunityGravity(
+                input_path="shops.parquet",
+                name="shops",
+                max_cost=15,
+                source_version=shops_version,
+            ),
+        ],
+    )
+
+
+def scores(tool: HeatmapGravityTool, table: str) -> dict[int, tuple]:
+    rows = tool.con.execute(
+        f"""SELECT h3_index, schools_accessibility, shops_accessibility,
+                   total_accessibility
+            FROM {table}"""
+    ).fetchall()
+    return {row[0]: row[1:] for row in rows}
+
+
+def test_incremental_recomputes_only_changed_opportunities(
+    tool: HeatmapGravityTool, tmp_path: Path
+) -> None:
+    first = scores(
+        tool,
+        tool._compute_incremental_accessibility(
+            "od", 9, make_params(tmp_path, "shops@1")
+        ),
+    )
+    assert tool.processed == ["schools", "shops"]
+    assert len(list((tmp_path / "partials").glob("*.parquet"))) == 2
+
+    schools_1 = (1 - 10 / 30) * 1.0 + (1 - 20 / 30) * 2.0
+    shops_1 = (1 - 12 / 15) * 3.0
+    schools_2 = (1 - 25 / 30) * 1.0 + (1 - 14 / 30) * 2.0
+    assert first[1] == pytest.approx((schools_1, shops_1, schools_1 + shops_1))
+    # Origin 2 reaches no shop within 15 minutes, but still reaches the schools
+    assert first[2][0] == pytest.approx(schools_2)
+    assert first[2][1] is None
+    assert first[2][2] == pytest.approx(schools_2)
+
+    # Only the edited layer is imported and scored again
+    tool.processed.clear()
+    second = scores(
+        tool,
+        tool._compute_incremental_accessibility(
+            "od", 9, make_params(tmp_path, "shops@2")
+        ),
+    )
+    assert tool.processed == ["shops"]
+
+    shops_2 = (1 - 12 / 15) * 5.0
+    assert second[1] == pytest.approx((schools_1, shops_2, schools_1 + shops_2))
+    assert second[2] == pytest.approx(
+        (schools_2, (1 - 14 / 15) * 1.0, schools_2 + (1 - 14 / 15) * 1.0)
+    )
+
+    # Unchanged inputs are served from the stored partials only
+    tool.processed.clear()
+    third = scores(
+        tool,
+        tool._compute_incremental_accessibility(
+            "od", 9, make_params(tmp_path, "shops@2")
+        ),
+    )
+    assert tool.processed == []
+    assert third == pytest.approx(second)
+
+
+def test_partial_key(tool: HeatmapGravityTool, tmp_path: Path) -> None:
+    params = make_params(tmp_path, "shops@1")
+    od_version = tool._od_matrix_version(params.od_matrix_path)
+    schools, shops = params.opportunities
+
+    key = tool._partial_key(schools, params, od_version, 9)
+    assert key == tool._partial_key(schools, params, od_version, 9)
+    assert key != tool._partial_key(shops, params, od_version, 9)
+    assert key != tool._partial_key(schools, params, "other", 9)
+    assert key != tool._partial_key(
+        schools,
+        params.model_copy(update={"impedance": ImpedanceFunction.gaussian}),
+        od_version,
+        9,
+    )
+    # Sources without a version are not persisted
+    unversioned = schools.model_copy(update={"source_version": None})
+    assert tool._partial_key(unversioned, params, od_version, 9) is None
+    assert tool._od_matrix_version("s3://bucket/od/") is None
@@ -0,0 +1,148 @@
+import math
+
+import pytest
+from goatlib.analysis.accessibility.multi_measure import HeatmapMultiMeasureTool
+from goatlib.analysis.schemas.heatmap import (
+    HeatmapMeasure,
+    HeatmapMultiMeasureParams,
+    ImpedanceFunction,
+    OpportunityMultiMeasure,
+    TwoSFCAType,
+)
+
+
+def make_params(measures: list[str], **kwargs) -> HeatmapMultiMeasureParams:
+    return HeatmapMultiMeasureParams(
+        routing_mode="walking",
+        od_matrix_path="od/",
+        output_path="result.parquet",
+        measures=measures,
+        impedance=ImpedanceFunction.linear,
+        **{
+            "opportunities": [
+                OpportunityMultiMeasure(
+                    input_path="schools.parquet",
+                    name="schools",
+                    max_cost=30,
+                    n_destinations=2,
+                    capacity_field="seats",
+                ),
+                OpportunityMultiMeasure(
+                    input_path="shops.parquet",
+                    name="shops",
+                    max_cost=15,
+                    capacity_field="area",
+                ),
+            ],
+            **kwargs,
+        },
+    )
+
+
+def test_multi_measure_params_validation() -> None:
+    params = make_params(["gravity", "closest_average", "gravity"])
+    assert params.measures == [
+        HeatmapMeasure.gravity,
+        HeatmapMeasure.closest_average,
+    ]
+
+    with pytest.raises(ValueError, match="demand_path"):
+        make_params(["two_sfca"])
+    with pytest.raises(ValueError, match="capacity_field"):
+        make_params(
+            ["two_sfca"],
+            demand_path="population.parquet",
+            demand_field="population",
+            opportunities=[OpportunityMultiMeasure(input_path="shops.parquet")],
+        )
+
+
+def test_multi_measure_computation() -> None:
+    """All measures come from one grouped scan of the filtered matrix."""
+    tool = HeatmapMultiMeasureTool()
+
+    # Origins 1, 2 reach schools (100, 200) and shops (300)
+    tool.con.execute("""
+        CREATE TABLE filtered_matrix AS
+        SELECT 1 AS orig_id, 100 AS dest_id, 10 AS cost
+        UNION ALL SELECT 1, 200, 20
+        UNION ALL SELECT 1, 300, 12
+        UNION ALL SELECT 2, 100, 25
+        UNION ALL SELECT 2, 200, 28
+        UNION ALL SELECT 2, 300, 18
+    """)
+    tool.con.execute("""
+        CREATE TABLE opportunity_measures_unified AS
+        SELECT
+            100 AS dest_id,
+            1.0 AS schools_potential, 60.0 AS schools_capacity,
+            30.0 AS schools_max_cost, 300000.0 AS schools_sens, 2 AS schools_n_dest,
+            NULL::DOUBLE AS shops_potential, NULL::DOUBLE AS shops_capacity,
+            NULL::DOUBLE AS shops_max_cost, NULL::DOUBLE AS shops_sens,
+            NULL::INTEGER AS shops_n_dest
+        UNION ALL SELECT 200, 2.0, 40.0, 30.0, 300000.0, 2, NULL, NULL, NULL, NULL, NULL
+        UNION ALL SELECT 300, NULL, NULL, NULL, NULL, NULL, 3.0, 10.0, 15.0, 300000.0, 1
+    """)
+    tool.con.execute("""
+        CREATE TABLE demand AS
+        SELECT 1 AS orig_id, 100.0 AS demand_value
+        UNION ALL SELECT 2, 50.0
+    """)
+
+    params = make_params(
+        ["gravity", "closest_average", "two_sfca"],
+        demand_path="population.parquet",
+        demand_field="population",
+        two_sfca_type=TwoSFCAType.twosfca,
+    )
+    std_tables = [("opp_0_std", "schools"), ("opp_1_std", "shops")]
+    ratios_table = tool._compute_capacity_ratios(
+        "filtered_matrix",
+        "opportunity_measures_unified",
+        std_tables,
+        "demand",
+        params,
+    )
+    result_table = tool._compute_measures(
+        "filtered_matrix",
+        "opportunity_measures_unified",
+        std_tables,
+        ratios_table,
+        params,
+    )
+
+    df = (
+        tool.con.execute(f"SELECT * FROM {result_table} ORDER BY h3_index")
+        .fetchdf()
+        .set_index("h3_index")
+    )
+    assert list(df.columns) == [
+        "schools_gravity",
+        "shops_gravity",
+        "schools_closest_average",
+        "shops_closest_average",
+        "schools_two_sfca",
+        "shops_two_sfca",
+        "total_gravity",
+        "total_closest_average",
+        "total_two_sfca",
+    ]
+
+    # Gravity with linear impedance, shops only reachable from origin 1
+    schools_1 = (1 - 10 / 30) * 1.0 + (1 - 20 / 30) * 2.0
+    shops_1 = (1 - 12 / 15) * 3.0
+    assert df.loc[1, "schools_gravity"] == pytest.approx(schools_1)
+    assert df.loc[1, "shops_gravity"] == pytest.approx(shops_1)
+    assert df.loc[1, "total_gravity"] == pytest.approx(schools_1 + shops_1)
+    assert math.isnan(df.loc[2, "shops_gravity"])
+    assert df.loc[2, "total_gravity"] == pytest.approx(df.loc[2, "schools_gravity"])
+
+    # Closest average of the 2 closest schools and the closest shop
+    assert df.loc[1, "schools_closest_average"] == pytest.approx(15)
+    assert df.loc[1, "total_closest_average"] == pytest.approx((15 + 12) / 2)
+    assert df.loc[2, "total_closest_average"] == pytest.approx(26.5)
+
+    # 2SFCA: both origins share the schools, only origin 1 reaches the shop
+    assert df.loc[1, "schools_two_sfca"] == pytest.approx(60 / 150 + 40 / 150)
+    assert df.loc[1, "shops_two_sfca"] == pytest.approx(10 / 100)
+    assert df.loc[2, "total_two_sfca"] == pytest.approx(100 / 150)
@@ -0,0 +1,151 @@
+from pathlib import Path
+
+import pytest
+from goatlib.analysis.accessibility.gravity import HeatmapGravityTool
+from goatlib.analysis.accessibility.od_matrix import (
+    OD_MANIFEST_FILENAME,
+    ODMatrixManifest,
+    ODPartition,
+    partition_od_matrix,
+)
+
+# Resolution 9 cells around Munich and Augsburg, in different resolution 5 parents
+MUNICH = [617548228988239871, 617548228988502015, 617548228988764159]
+AUGSBURG = [617548141553778687, 617548141554040831]
+
+
+def make_partition(parent: int, **bounds: float) -> ODPartition:
+    return ODPartition(
+        h3_parent=parent,
+        path=f"h3_parent={parent}",
+        num_rows=10,
+        **{
+            "min_cost": 0,
+            "max_cost": 30,
+            "min_orig_id": 100,
+            "max_orig_id": 200,
+            **bounds,
+        },
+    )
+
+
+def test_manifest_selects_partitions() -> None:
+    manifest = ODMatrixManifest(
+        h3_resolution=9,
+        partition_resolution=5,
+        partitions=[
+            make_partition(1),
+            make_partition(2, min_cost=20),
+            make_partition(3, min_orig_id=300, max_orig_id=400),
+        ],
+    )
+
+    def selected(**filters) -> list[int]:
+        return [p.h3_parent for p in manifest.select(**filters)]
+
+    assert selected() == [1, 2, 3]
+    assert selected(parents={1, 3}) == [1, 3]
+    assert selected(max_cost=15) == [1, 3]
+    assert selected(min_cost=31) == []
+    assert selected(orig_range=(150, 250)) == [1, 2]
+    assert selected(parents={3}, orig_range=(350, 350)) == [3]
+
+
+def test_manifest_load(tmp_path: Path) -> None:
+    assert ODMatrixManifest.load(str(tmp_path)) is None
+    assert ODMatrixManifest.load(f"{tmp_path}/*.parquet") is None
+    assert ODMatrixManifest.load("s3://bucket/od/") is None
+
+    manifest = ODMatrixManifest(
+        h3_resolution=9, partition_resolution=5, partitions=[make_partition(1)]
+    )
+    manifest.save(tmp_path)
+    assert (tmp_path / OD_MANIFEST_FILENAME).exists()
+    assert ODMatrixManifest.load(f"{tmp_path}/") == manifest
+
+
+@pytest.fixture
+def partitioned_matrix(tmp_path: Path) -> tuple[HeatmapGravityTool, Path]:
+    tool = HeatmapGravityTool()
+    tool.con.execute("""
+        CREATE TABLE od AS
+        SELECT o.id AS from_id, d.id AS to_id, (o.i * 10 + d.i)::INT AS time
+        FROM UNNEST($cells) WITH ORDINALITY AS o(id, i),
+             UNNEST($cells) WITH ORDINALITY AS d(id, i)
+    """, {"cells": MUNICH + AUGSBURG})
+    source = tmp_path / "source.parquet"
+    tool.con.execute(f"COPY od TO '{source}' (FORMAT PARQUET)")
+
+    output = tmp_path / "partitioned"
+    partition_od_matrix(
+        tool.con,
+        str(source),
+        output,
+        partition_resolution=5,
+        od_column_map={"orig_id": "from_id", "dest_id": "to_id", "cost": "time"},
+    )
+    return tool, output
+
+
+def test_partition_od_matrix(partitioned_matrix) -> None:
+    tool, output = partitioned_matrix
+    manifest = ODMatrixManifest.load(str(output))
+
+    assert manifest.h3_resolution == 9
+    assert len(manifest.partitions) == 2
+    assert sum(p.num_rows for p in manifest.partitions) == 25
+    for partition in manifest.partitions:
+        assert (output / partition.path).is_dir()
+
+
+def test_stale_partitions_are_not_read(partitioned_matrix) -> None:
+    """Files outside the manifest are ignored and removed on repartitioning."""
+    tool, output = partitioned_matrix
+    stale = output / "h3_parent=1"
+    stale.mkdir()
+    tool.con.execute(
+        "COPY (SELECT 1 AS orig_id, 2 AS dest_id, 3 AS cost) "
+        f"TO '{stale}/data_0.parquet'"
+    )
+
+    od_table, _ = tool._prepare_od_matrix(str(output))
+    assert tool.con.execute(f"SELECT COUNT(*) FROM {od_table}").fetchone() == (25,)
+
+    partition_od_matrix(
+        tool.con,
+        str(output.parent / "source.parquet"),
+        output,
+        partition_resolution=5,
+        od_column_map={"orig_id": "from_id", "dest_id": "to_id", "cost": "time"},
+    )
+    assert not list(stale.glob("*.parquet"))
+    assert len(ODMatrixManifest.load(str(output)).partitions) == 2
+
+
+def test_filter_reads_only_matching_partitions(partitioned_matrix) -> None:
+    """Destination filters prune partitions and match by semi-join."""
+    tool, output = partitioned_matrix
+    od_table, h3_resolution = tool._prepare_od_matrix(str(output))
+    assert h3_resolution == 9
+
+    tool.con.execute(
+        "CREATE TABLE opportunities AS SELECT UNNEST($ids) AS dest_id",
+        {"ids": AUGSBURG},
+    )
+    assert tool._register_h3_ids("opportunities", "dest_id", "destination_ids") == 2
+
+    source = tool._od_partition_source(od_table, None, "destination_ids", None, None)
+    assert source.count("h3_parent=") == 1
+
+    filtered = tool._filter_od_matrix(
+        od_table, destination_ids="destination_ids", max_cost=50
+    )
+    rows = tool.con.execute(f"SELECT orig_id, dest_id, cost FROM {filtered}").fetchall()
+    assert {dest for _, dest, _ in rows} == set(AUGSBURG)
+    assert len(rows) == 8  # Origins 1-4 (cost <= 50), origin 5 exceeds max_cost
+
+    # Plain id lists are loaded into an id table as well
+    filtered = tool._filter_od_matrix(
+        od_table, origin_ids=[MUNICH[0]], destination_ids=[MUNICH[1]]
+    )
+    assert tool.con.execute(f"SELECT cost FROM {filtered}").fetchall() == [(12,)]
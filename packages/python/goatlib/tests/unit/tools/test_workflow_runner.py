@@ -0,0 +1,241 @@
+"""Unit tests for the workflow runner scheduler and result memoisation."""
+
+import threading
+import uuid
+from pathlib import Path
+from typing import Any
+
+import pytest
+from goatlib.tools import workflow_runner
+from goatlib.tools.workflow_runner import (
+    WorkflowRunnerParams,
+    get_memoised_result,
+    main,
+)
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+WORKFLOW_ID = "00000000-0000-0000-0000-000000000002"
+
+
+def dataset(node_id: str, layer_id: str) -> dict:
+    return {"id": node_id, "data": {"type": "dataset", "layerId": layer_id}}
+
+
+def tool(node_id: str, **config: Any) -> dict:
+    return {
+        "id": node_id,
+        "data": {"type": "tool", "processId": "buffer", "config": config},
+    }
+
+
+def edge(source: str, target: str, handle: str = "input_layer_id") -> dict:
+    return {
+        "id": f"{source}-{target}",
+        "source": source,
+        "target": target,
+        "targetHandle": handle,
+    }
+
+
+class FakeToolRunner:
+    """Stands in for run_tool_node, writing a temp result per call."""
+
+    def __init__(self, temp_root: Path) -> None:
+        self.temp_root = temp_root
+        self.calls: list[tuple[str, dict]] = []
+        self.lock = threading.Lock()
+        self.barrier: threading.Barrier | None = None
+        self.fail: set[str] = set()
+
+    def __call__(self, node_id: str, process_id: str, inputs: dict) -> tuple:
+        with self.lock:
+            self.calls.append((node_id, inputs))
+        if self.barrier and node_id in ("left", "right"):
+            self.barrier.wait()
+        if node_id in self.fail:
+            return f"job-{node_id}", {"node_id": node_id, "error": "boom"}
+
+        file_id = uuid.uuid4().hex
+        node_path = (
+            self.temp_root
+            / f"user_{USER_ID.replace('-', '')}"
+            / f"w_{WORKFLOW_ID.replace('-', '')}"
+            / f"n_{node_id}"
+        )
+        node_path.mkdir(parents=True, exist_ok=True)
+        parquet_path = node_path / f"t_{file_id}.parquet"
+        parquet_path.write_bytes(b"parquet")
+        return f"job-{node_id}", {
+            "node_id": node_id,
+            "job_id": f"job-{node_id}",
+            "temp_layer_id": f"{WORKFLOW_ID}:{node_id}:{file_id}",
+            "parquet_path": str(parquet_path),
+        }
+
+    @property
+    def node_ids(self) -> list[str]:
+        return [node_id for node_id, _ in self.calls]
+
+
+@pytest.fixture
+def runner(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> FakeToolRunner:
+    monkeypatch.setattr("goatlib.tools.cleanup_temp.TEMP_DATA_ROOT", tmp_path)
+    fake = FakeToolRunner(tmp_path)
+    monkeypatch.setattr(workflow_runner, "run_tool_node", fake)
+    monkeypatch.setattr(
+        workflow_runner, "coerce_inputs_from_schema", lambda _, inputs: inputs
+    )
+    monkeypatch.setattr(
+        workflow_runner, "get_source_layer_snapshots", lambda ids: {"layer-a": 1}
+    )
+    return fake
+
+
+def run(nodes: list[dict], edges: list[dict], **kwargs: Any) -> dict:
+    return main(
+        user_id=USER_ID,
+        project_id="project",
+        workflow_id=WORKFLOW_ID,
+        folder_id="folder",
+        nodes=nodes,
+        edges=edges,
+        **kwargs,
+    )
+
+
+def diamond(distance: int = 100) -> tuple[list[dict], list[dict]]:
+    """dataset → left, right → join, with left configurable."""
+    nodes = [
+        dataset("source", "layer-a"),
+        tool("left", distance=distance),
+        tool("right", distance=50),
+        tool("join"),
+    ]
+    edges = [
+        edge("source", "left"),
+        edge("source", "right"),
+        edge("left", "join", "target_layer_id"),
+        edge("right", "join", "join_layer_id"),
+    ]
+    return nodes, edges
+
+
+# =====================================================================
+#  Scheduling Tests
+# =====================================================================
+
+
+def test_independent_branches_run_concurrently(runner: FakeToolRunner) -> None:
+    """Both branches run at the same time, the join after both."""
+    runner.barrier = threading.Barrier(2, timeout=5)
+
+    result = run(*diamond(), max_parallel_nodes=2, use_cache=False)
+
+    assert set(runner.node_ids[:2]) == {"left", "right"}
+    assert runner.node_ids[2] == "join"
+    join_inputs = runner.calls[2][1]
+    assert join_inputs["target_layer_id"] == result["node_results"]["left"][
+        "temp_layer_id"
+    ]
+    assert join_inputs["join_layer_id"] == result["node_results"]["right"][
+        "temp_layer_id"
+    ]
+    assert result["node_jobs"] == {
+        "left": "job-left",
+        "right": "job-right",
+        "join": "job-join",
+    }
+
+
+def test_failure_stops_scheduling(runner: FakeToolRunner) -> None:
+    runner.fail = {"left"}
+
+    with pytest.raises(RuntimeError, match="Node left failed: boom"):
+        run(*diamond(), max_parallel_nodes=1)
+
+    assert "join" not in runner.node_ids
+
+
+# =====================================================================
+#  Memoisation Tests
+# =====================================================================
+
+
+def test_rerun_recomputes_only_changed_nodes(
+    runner: FakeToolRunner, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    first = run(*diamond())
+    assert sorted(runner.node_ids) == ["join", "left", "right"]
+
+    # Unchanged workflow: everything is reused
+    runner.calls.clear()
+    second = run(*diamond())
+    assert runner.node_ids == []
+    assert second["node_results"]["join"]["cached"] is True
+    assert (
+        second["node_results"]["join"]["temp_layer_id"]
+        == first["node_results"]["join"]["temp_layer_id"]
+    )
+
+    # Editing one node reruns it and its descendants only
+    runner.calls.clear()
+    third = run(*diamond(distance=200))
+    assert runner.node_ids == ["left", "join"]
+    assert third["node_results"]["right"]["cached"] is True
+    # The edited node's previous result was removed
+    assert not Path(first["node_results"]["left"]["parquet_path"]).exists()
+    assert Path(first["node_results"]["right"]["parquet_path"]).exists()
+
+    # A new snapshot of the source layer invalidates all dependents
+    monkeypatch.setattr(
+        workflow_runner, "get_source_layer_snapshots", lambda ids: {"layer-a": 2}
+    )
+    runner.calls.clear()
+    run(*diamond(distance=200))
+    assert sorted(runner.node_ids) == ["join", "left", "right"]
+
+
+def test_unknown_snapshot_disables_memoisation(
+    runner: FakeToolRunner, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(workflow_runner, "get_source_layer_snapshots", lambda ids: {})
+
+    run(*diamond())
+    runner.calls.clear()
+    run(*diamond())
+
+    assert sorted(runner.node_ids) == ["join", "left", "right"]
+
+
+def test_removed_nodes_are_cleaned_up(runner: FakeToolRunner) -> None:
+    first = run(*diamond())
+    nodes, edges = diamond()
+
+    run(nodes[:3], edges[:2])
+
+    assert not Path(first["node_results"]["join"]["parquet_path"]).exists()
+    assert Path(first["node_results"]["left"]["parquet_path"]).exists()
+
+
+def test_memoised_result_requires_existing_files(tmp_path: Path) -> None:
+    parquet_path = tmp_path / "t_1.parquet"
+    entry = {"key": "abc", "result": {"parquet_path": str(parquet_path)}}
+
+    assert get_memoised_result(entry, "abc") is None
+    parquet_path.write_bytes(b"parquet")
+    assert get_memoised_result(entry, "abc") == entry["result"]
+    assert get_memoised_result(entry, "other") is None
+    assert get_memoised_result(entry, None) is None
+
+
+def test_params_bound_parallelism() -> None:
+    with pytest.raises(ValueError):
+        WorkflowRunnerParams(
+            user_id=USER_ID,
+            project_id="p",
+            workflow_id=WORKFLOW_ID,
+            folder_id="f",
+            nodes=[],
+            edges=[],
+            max_parallel_nodes=0,
+        )